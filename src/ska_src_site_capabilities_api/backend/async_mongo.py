@@ -0,0 +1,273 @@
+import asyncio
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from ska_src_site_capabilities_api.backend.backend import Backend
+from ska_src_site_capabilities_api.backend.mongo import MongoBackend
+
+
+class AsyncMongoBackend(Backend):
+    """Asyncio backend API for MongoDB.
+
+    Every call that touches the database is run on a dedicated, bounded thread pool sharing the pooled client of an
+    underlying MongoBackend, so awaiting it never blocks the event loop and a worker keeps serving other requests while
+    MongoDB is busy.
+    """
+
+    def __init__(self, max_workers=32, backend=None, **kwargs):
+        """
+        Initialises an AsyncMongoBackend instance.
+
+        Args:
+            max_workers: Maximum number of backend calls run concurrently (should not exceed the MongoDB pool size).
+            backend: Optional MongoBackend instance to wrap, for mocking/testing.
+            **kwargs: Arguments used to instantiate the underlying MongoBackend if <backend> is not given.
+        """
+        super().__init__()
+        self.backend = backend if backend is not None else MongoBackend(**kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mongo-backend")
+
+    async def _run(self, func, *args, **kwargs):
+        """Runs a synchronous backend call on the backend thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def close(self):
+        """
+        Shuts down the backend thread pool and closes the underlying backend.
+        """
+        self._executor.shutdown(wait=True)
+        self.backend.close()
+
+    async def ensure_indexes(self):
+        return await self._run(self.backend.ensure_indexes)
+
+    async def get_index_report(self):
+        return await self._run(self.backend.get_index_report)
+
+    async def ping(self):
+        return await self._run(self.backend.ping)
+
+    def get_pool_statistics(self):
+        return self.backend.get_pool_statistics()
+
+    def start_watching(self, poll_interval_s=5.0):
+        # runs in its own thread
+        self.backend.start_watching(poll_interval_s=poll_interval_s)
+
+    def stop_watching(self):
+        self.backend.stop_watching()
+
+    def get_topology_revision(self):
+        return self.backend.get_topology_revision()
+
+    async def get_topology_validator(self):
+        return await self._run(self.backend.get_topology_validator)
+
+    async def add_edit_node(self, node_values, node_name=None):
+        return await self._run(self.backend.add_edit_node, node_values, node_name=node_name)
+
+    async def delete_all_nodes(self):
+        return await self._run(self.backend.delete_all_nodes)
+
+    async def delete_node_by_name(self, node_name):
+        return await self._run(self.backend.delete_node_by_name, node_name)
+
+    async def get_compute(self, compute_id):
+        return await self._run(self.backend.get_compute, compute_id)
+
+    async def get_compute_many(self, compute_ids):
+        return await self._run(self.backend.get_compute_many, compute_ids)
+
+    async def get_node(self, node_name, node_version="latest"):
+        return await self._run(self.backend.get_node, node_name, node_version=node_version)
+
+    async def get_service(self, service_id):
+        return await self._run(self.backend.get_service, service_id)
+
+    async def get_service_many(self, service_ids):
+        return await self._run(self.backend.get_service_many, service_ids)
+
+    async def get_site(self, site_id):
+        return await self._run(self.backend.get_site, site_id)
+
+    async def get_site_from_names(self, node_name, node_version, site_name):
+        return await self._run(self.backend.get_site_from_names, node_name=node_name, node_version=node_version, site_name=site_name)
+
+    async def get_storage(self, storage_id):
+        return await self._run(self.backend.get_storage, storage_id)
+
+    async def get_storage_many(self, storage_ids):
+        return await self._run(self.backend.get_storage_many, storage_ids)
+
+    async def get_storage_area(self, storage_area_id):
+        return await self._run(self.backend.get_storage_area, storage_area_id)
+
+    async def get_storage_area_many(self, storage_area_ids):
+        return await self._run(self.backend.get_storage_area_many, storage_area_ids)
+
+    async def get_queue_by_id(self, queue_id):
+        return await self._run(self.backend.get_queue_by_id, queue_id)
+
+    async def get_queue_many(self, queue_ids):
+        return await self._run(self.backend.get_queue_many, queue_ids)
+
+    async def list_compute(self, node_names=None, site_names=None, include_inactive=False, as_of=None, limit=None, cursor=None, fields=None):
+        return await self._run(
+            self.backend.list_compute,
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            as_of=as_of,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+
+    async def list_nodes(self, include_archived=False, include_inactive=True, limit=None, cursor=None):
+        return await self._run(
+            self.backend.list_nodes,
+            include_archived=include_archived,
+            include_inactive=include_inactive,
+            limit=limit,
+            cursor=cursor,
+        )
+
+    async def iter_nodes(self, include_archived=True, batch_size=None):
+        """Yields versions of all nodes (see MongoBackend.iter_nodes), fetching each batch on the backend thread pool."""
+        batch_size = batch_size or self.backend.dump_batch_size
+        nodes = self.backend.iter_nodes(include_archived=include_archived, batch_size=batch_size)
+        try:
+            while True:
+                batch = await self._run(list, itertools.islice(nodes, batch_size))
+                if not batch:
+                    break
+                for node in batch:
+                    yield node
+        finally:
+            await self._run(nodes.close)  # releases the MongoDB cursors of an abandoned export
+
+    async def list_queues(self, node_names=None, site_names=None, include_inactive=False, limit=None, cursor=None, fields=None):
+        return await self._run(
+            self.backend.list_queues,
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+
+    async def list_services(
+        self,
+        node_names=None,
+        site_names=None,
+        service_types=None,
+        service_scope="all",
+        include_inactive=False,
+        associated_storage_area_id=None,
+        for_prometheus=False,
+        as_of=None,
+        limit=None,
+        cursor=None,
+        fields=None,
+    ):
+        return await self._run(
+            self.backend.list_services,
+            node_names=node_names,
+            site_names=site_names,
+            service_types=service_types,
+            service_scope=service_scope,
+            include_inactive=include_inactive,
+            associated_storage_area_id=associated_storage_area_id,
+            for_prometheus=for_prometheus,
+            as_of=as_of,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+
+    async def list_service_types_from_schema(self, schema):
+        # no database access
+        return self.backend.list_service_types_from_schema(schema)
+
+    async def list_sites(self, node_names=None, include_inactive=False, as_of=None, limit=None, cursor=None, fields=None):
+        return await self._run(
+            self.backend.list_sites,
+            node_names=node_names,
+            include_inactive=include_inactive,
+            as_of=as_of,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+
+    async def list_storages(
+        self,
+        node_names=None,
+        site_names=None,
+        topojson=False,
+        for_grafana=False,
+        include_inactive=False,
+        as_of=None,
+        limit=None,
+        cursor=None,
+        fields=None,
+    ):
+        return await self._run(
+            self.backend.list_storages,
+            node_names=node_names,
+            site_names=site_names,
+            topojson=topojson,
+            for_grafana=for_grafana,
+            include_inactive=include_inactive,
+            as_of=as_of,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+
+    async def list_storage_areas(
+        self,
+        node_names=None,
+        site_names=None,
+        topojson=False,
+        for_grafana=False,
+        include_inactive=False,
+        as_of=None,
+        limit=None,
+        cursor=None,
+        fields=None,
+    ):
+        return await self._run(
+            self.backend.list_storage_areas,
+            node_names=node_names,
+            site_names=site_names,
+            topojson=topojson,
+            for_grafana=for_grafana,
+            include_inactive=include_inactive,
+            as_of=as_of,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+
+    async def list_storage_area_types_from_schema(self, schema):
+        # no database access
+        return self.backend.list_storage_area_types_from_schema(schema)
+
+    async def set_site_force_disabled_flag(self, site_id: str, flag: bool):
+        return await self._run(self.backend.set_site_force_disabled_flag, site_id, flag)
+
+    async def set_compute_force_disabled_flag(self, compute_id: str, flag: bool):
+        return await self._run(self.backend.set_compute_force_disabled_flag, compute_id, flag)
+
+    async def set_service_force_disabled_flag(self, service_id: str, flag: bool):
+        return await self._run(self.backend.set_service_force_disabled_flag, service_id, flag)
+
+    async def set_storage_force_disabled_flag(self, storage_id: str, flag: bool):
+        return await self._run(self.backend.set_storage_force_disabled_flag, storage_id, flag)
+
+    async def set_storage_area_force_disabled_flag(self, storage_area_id: str, flag: bool):
+        return await self._run(self.backend.set_storage_area_force_disabled_flag, storage_area_id, flag)
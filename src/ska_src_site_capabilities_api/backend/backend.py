@@ -7,6 +7,12 @@ class Backend(ABC):
     def __init__(self):
         pass
 
+    def close(self):
+        pass
+
+    def ensure_indexes(self):
+        pass
+
     @abstractmethod
     def add_edit_node(self, node_values):
         raise NotImplementedError
@@ -23,6 +29,10 @@ class Backend(ABC):
     def get_compute(self, compute_id):
         raise NotImplementedError
 
+    @abstractmethod
+    def get_compute_many(self, compute_ids):
+        raise NotImplementedError
+
     @abstractmethod
     def get_node(self, node_name, node_version):
         raise NotImplementedError
@@ -31,6 +41,10 @@ class Backend(ABC):
     def get_service(self, service_id):
         raise NotImplementedError
 
+    @abstractmethod
+    def get_service_many(self, service_ids):
+        raise NotImplementedError
+
     @abstractmethod
     def get_site(self, site_id):
         raise NotImplementedError
@@ -42,44 +56,73 @@ class Backend(ABC):
     def get_storage(self, storage_id):
         raise NotImplementedError
 
+    @abstractmethod
+    def get_storage_many(self, storage_ids):
+        raise NotImplementedError
+
     @abstractmethod
     def get_storage_area(self, storage_area_id):
         raise NotImplementedError
 
     @abstractmethod
-    def list_compute(self, node_names, site_names, include_inactive):
+    def get_storage_area_many(self, storage_area_ids):
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_compute(self, node_names, site_names, include_inactive, as_of, limit, cursor, fields):
         raise NotImplementedError
 
     @abstractmethod
-    def list_nodes(self, include_archived, include_inactive):
+    def iter_nodes(self, include_archived, batch_size):
         raise NotImplementedError
 
     @abstractmethod
-    def list_services(self, node_names, site_names, service_types, service_scope, include_inactive, associated_storage_area_id, for_prometheus):
+    def list_nodes(self, include_archived, include_inactive, limit, cursor):
         raise NotImplementedError
 
     @abstractmethod
-    def list_queues(self, node_names, site_names, include_inactive):
+    def list_services(
+        self,
+        node_names,
+        site_names,
+        service_types,
+        service_scope,
+        include_inactive,
+        associated_storage_area_id,
+        for_prometheus,
+        as_of,
+        limit,
+        cursor,
+        fields,
+    ):
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_queues(self, node_names, site_names, include_inactive, limit, cursor, fields):
         raise NotImplementedError
 
     @abstractmethod
     def get_queue_by_id(self, queue_id):
         raise NotImplementedError
 
+    @abstractmethod
+    def get_queue_many(self, queue_ids):
+        raise NotImplementedError
+
     @abstractmethod
     def list_service_types_from_schema(self, schema):
         raise NotImplementedError
 
     @abstractmethod
-    def list_sites(self, node_names, include_inactive):
+    def list_sites(self, node_names, include_inactive, as_of, limit, cursor, fields):
         raise NotImplementedError
 
     @abstractmethod
-    def list_storages(self, node_names, site_names, topojson, for_grafana, include_inactive):
+    def list_storages(self, node_names, site_names, topojson, for_grafana, include_inactive, as_of, limit, cursor, fields):
         raise NotImplementedError
 
     @abstractmethod
-    def list_storage_areas(self, node_names, site_names, topojson, for_grafana, include_inactive):
+    def list_storage_areas(self, node_names, site_names, topojson, for_grafana, include_inactive, as_of, limit, cursor, fields):
         raise NotImplementedError
 
     @abstractmethod
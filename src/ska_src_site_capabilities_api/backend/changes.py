@@ -0,0 +1,172 @@
+from datetime import datetime, timezone
+
+from pymongo.errors import ConfigurationError, OperationFailure
+
+# Path of the array holding each entity type in a node document, from the node down.
+ENTITY_ARRAY_PATHS = {
+    "site": ("sites",),
+    "compute": ("sites", "compute"),
+    "local_service": ("sites", "compute", "associated_local_services"),
+    "global_service": ("sites", "compute", "associated_global_services"),
+    "queue": ("sites", "compute", "queues"),
+    "storage": ("sites", "storages"),
+    "storage_area": ("sites", "storages", "areas"),
+}
+
+
+# Server error codes rejecting the arrayFilters of an update, by servers (or feature compatibility versions) predating
+# them: InvalidOptions, and an unknown field in the update statement.
+ARRAY_FILTERS_UNSUPPORTED_CODES = (72, 40415)
+
+
+def _get_array_path(entity_type, scope=None):
+    if entity_type == "service":
+        entity_type = "{}_service".format(scope)
+    try:
+        return ENTITY_ARRAY_PATHS[entity_type]
+    except KeyError:
+        raise ValueError("Unknown entity type: {}".format(entity_type))
+
+
+def build_set_entity_field_update(entity_type, entity_id, field, value, scope=None, updated_at=None):
+    """
+    Builds a targeted update setting a single field of a nested entity and bumping the node version.
+
+    Each array level is addressed with a filtered positional operator, so only the element(s) on the path to the entity
+    are touched and arrays missing from other elements do not cause the update to fail.
+
+    Args:
+        entity_type: The type of entity, e.g. "site", "compute", "service", "storage", "storage_area".
+        entity_id: The ID of the entity.
+        field: The name of the field to set.
+        value: The value to set.
+        scope: The scope ("local" or "global") for services.
+        updated_at: Optional timestamp to set as the node's last_updated_at.
+
+    Returns:
+        A (filter, update, array_filters, projection) tuple, where projection selects the node version, its
+        last_updated_at and the current value of the field so that a compact change record can be built from the
+        pre-image.
+    """
+    array_path = _get_array_path(entity_type, scope)
+    dotted_path = ".".join(array_path)
+
+    positional_path = []
+    array_filters = []
+    for level, array_name in enumerate(array_path):
+        identifier = "l{}".format(level)
+        positional_path.append("{}.$[{}]".format(array_name, identifier))
+        below = level + 1
+        remaining_path = ".".join(array_path[below:] + ("id",))
+        array_filters.append({"{}.{}".format(identifier, remaining_path): entity_id})
+
+    update_set = {"{}.{}".format(".".join(positional_path), field): value}
+    if updated_at is not None:
+        update_set["last_updated_at"] = updated_at
+    return (
+        {"{}.id".format(dotted_path): entity_id},
+        {"$set": update_set, "$inc": {"version": 1}},
+        array_filters,
+        {
+            "_id": 0,
+            "name": 1,
+            "version": 1,
+            "last_updated_at": 1,
+            "{}.id".format(dotted_path): 1,
+            "{}.{}".format(dotted_path, field): 1,
+        },
+    )
+
+
+def is_array_filters_unsupported(err):
+    """
+    Check whether an error raised by an update with array filters means that they are unsupported (so that the update
+    was not applied), rather than that the update failed, or failed to be acknowledged, for another reason.
+    """
+    if isinstance(err, NotImplementedError):  # e.g. mongomock
+        return True
+    if isinstance(err, ConfigurationError):  # unacknowledged writes
+        return "arrayFilters" in str(err)
+    if isinstance(err, OperationFailure):
+        return err.code in ARRAY_FILTERS_UNSUPPORTED_CODES and "arrayFilters" in str(err)
+    return False
+
+
+def iter_entities(node, entity_type, entity_id, scope=None):
+    """Yields (a reference to) every entity of <entity_type> with id <entity_id> in a node document."""
+    elements = [node]
+    for array_name in _get_array_path(entity_type, scope):
+        elements = [child for element in elements for child in element.get(array_name) or []]
+    for element in elements:
+        if element.get("id") == entity_id:
+            yield element
+
+
+def set_entity_field(node, entity_type, entity_id, field, value, scope=None):
+    """
+    Sets a field of a nested entity in a node document, in place.
+
+    Returns:
+        True if the entity was found.
+    """
+    found = False
+    for entity in iter_entities(node, entity_type, entity_id, scope):
+        entity[field] = value
+        found = True
+    return found
+
+
+def make_change_record(node_before, entity_type, entity_id, field, value, scope=None, updated_at=None):
+    """
+    Builds a compact record of a single field change, to be stored instead of a full copy of the previous node version.
+
+    Args:
+        node_before: The node document (or a projection of it) before the change.
+        entity_type: The type of entity changed.
+        entity_id: The ID of the entity changed.
+        field: The name of the field changed.
+        value: The new value of the field.
+        scope: The scope ("local" or "global") for services.
+        updated_at: The last_updated_at timestamp of the version the change produced, defaults to now (UTC).
+
+    Returns:
+        A change record dictionary. The version is the node version the change produced.
+    """
+    record = {
+        "name": node_before.get("name"),
+        "version": node_before.get("version") + 1,
+        "last_updated_at": updated_at or datetime.now(timezone.utc).replace(tzinfo=None).isoformat(),
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "field": field,
+        "value": value,
+    }
+    if scope:
+        record["scope"] = scope
+    if "last_updated_at" in node_before:
+        record["previous_last_updated_at"] = node_before["last_updated_at"]
+    for entity in iter_entities(node_before, entity_type, entity_id, scope):
+        if field in entity:
+            record["previous_value"] = entity[field]
+        break
+    return record
+
+
+def apply_change_record(node, record):
+    """Applies a change record to the previous version of a node, in place."""
+    set_entity_field(node, record["entity_type"], record["entity_id"], record["field"], record["value"], record.get("scope"))
+    node["version"] = record["version"]
+    if "last_updated_at" in record:
+        node["last_updated_at"] = record["last_updated_at"]
+
+
+def revert_change_record(node, record):
+    """Reverts a change record on the version of a node it produced, in place."""
+    for entity in iter_entities(node, record["entity_type"], record["entity_id"], record.get("scope")):
+        if "previous_value" in record:
+            entity[record["field"]] = record["previous_value"]
+        else:
+            entity.pop(record["field"], None)
+    node["version"] = record["version"] - 1
+    if "previous_last_updated_at" in record:
+        node["last_updated_at"] = record["previous_last_updated_at"]
@@ -0,0 +1,133 @@
+"""Delta-encoded node history.
+
+Superseded versions of a node are kept in the nodes_archived collection either as a full checkpoint (a plain node
+document) or as a delta against the previous archived version of the same node:
+
+    {"name": <node name>, "version": <version>, "base_version": <previous archived version>, "delta": [<op>, ...],
+     "last_updated_at": <timestamp of the version>}
+
+where each op either sets ({"path": [...], "value": <value>}) or removes ({"path": [...], "unset": True}) the value at
+a path of dictionary keys and list indexes. A version is reconstructed by replaying the deltas following the nearest
+checkpoint at or before it.
+"""
+
+import copy
+
+# Fields identifying a delta (rather than checkpoint) document in nodes_archived.
+DELTA_FIELD = "delta"
+BASE_VERSION_FIELD = "base_version"
+
+
+def is_checkpoint(archived_node):
+    """Check if a nodes_archived document is a full checkpoint rather than a delta."""
+    return DELTA_FIELD not in archived_node
+
+
+def make_delta(old, new, path=()):
+    """
+    Computes the structural changes turning <old> into <new>.
+
+    Dictionaries are compared key by key and lists of the same length element by element, so a change nested deep in
+    a node only records the changed value. Lists whose length changed are replaced in full.
+
+    Returns:
+        A list of ops (see module docstring).
+    """
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        delta = [{"path": list(path + (key,)), "unset": True} for key in old if key not in new]
+        for key, value in new.items():
+            if key in old:
+                delta.extend(make_delta(old[key], value, path + (key,)))
+            else:
+                delta.append({"path": list(path + (key,)), "value": copy.deepcopy(value)})
+        return delta
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        delta = []
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            delta.extend(make_delta(old_item, new_item, path + (index,)))
+        return delta
+    return [{"path": list(path), "value": copy.deepcopy(new)}]
+
+
+def apply_delta(document, delta):
+    """
+    Applies a delta (see make_delta) to <document> in place.
+
+    Returns:
+        The updated document (a new object if the delta replaces the document as a whole).
+    """
+    for op in delta:
+        path = op.get("path")
+        if not path:
+            document = copy.deepcopy(op.get("value"))
+            continue
+        parent = document
+        for key in path[:-1]:
+            parent = parent[key]
+        if op.get("unset"):
+            parent.pop(path[-1], None)
+        else:
+            parent[path[-1]] = copy.deepcopy(op.get("value"))
+    return document
+
+
+def make_delta_record(previous_node, node):
+    """Builds a nodes_archived delta document for <node> against the previous archived version <previous_node>."""
+    delta = make_delta(
+        {key: value for key, value in previous_node.items() if key != "version"},
+        {key: value for key, value in node.items() if key != "version"},
+    )
+    record = {
+        "name": node.get("name"),
+        "version": node.get("version"),
+        BASE_VERSION_FIELD: previous_node.get("version"),
+        DELTA_FIELD: delta,
+    }
+    # kept alongside the delta so that versions can be looked up by time (see point_in_time)
+    if "last_updated_at" in node:
+        record["last_updated_at"] = node["last_updated_at"]
+    return record
+
+
+def reconstruct_archived_nodes(archived_nodes):
+    """
+    Reconstructs the full version of each nodes_archived document.
+
+    Args:
+        archived_nodes: nodes_archived documents (without _id) of any nodes, sorted by name then version.
+
+    Returns:
+        A list with the full node document for each archived document, or None where it cannot be reconstructed (i.e.
+        a delta whose base version is missing or itself cannot be reconstructed).
+    """
+    return list(_iter_reconstructed_nodes(archived_nodes))
+
+
+def iter_archived_nodes(archived_nodes):
+    """
+    Yields the full version of each nodes_archived document that can be reconstructed (see reconstruct_archived_nodes).
+
+    Documents are consumed lazily, so only the latest version of the current node is held in memory.
+    """
+    for node in _iter_reconstructed_nodes(archived_nodes):
+        if node is not None:
+            yield node
+
+
+def _iter_reconstructed_nodes(archived_nodes):
+    current = None
+    for archived_node in archived_nodes:
+        if is_checkpoint(archived_node):
+            current = archived_node
+        elif (
+            current is not None
+            and current.get("name") == archived_node.get("name")
+            and current.get("version") == archived_node.get(BASE_VERSION_FIELD)
+        ):
+            current = apply_delta(copy.deepcopy(current), archived_node.get(DELTA_FIELD))
+            current["version"] = archived_node.get("version")
+        else:
+            current = None
+        yield current
@@ -0,0 +1,156 @@
+import logging
+
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+
+class IndexSpec:
+    """A secondary index the backend relies on."""
+
+    def __init__(self, collection, keys, name, unique=False):
+        """
+        Args:
+            collection: Name of the collection the index is declared on.
+            keys: List of (field, direction) pairs.
+            name: Name of the index.
+            unique: Whether the index enforces uniqueness.
+        """
+        self.collection = collection
+        self.keys = list(keys)
+        self.name = name
+        self.unique = unique
+
+    def matches(self, index_information):
+        """Check whether an existing index (as returned by index_information()) satisfies this spec."""
+        return [tuple(key) for key in index_information.get("key", [])] == self.keys and bool(index_information.get("unique", False)) == bool(
+            self.unique
+        )
+
+    def as_dict(self):
+        return {
+            "collection": self.collection,
+            "name": self.name,
+            "keys": [list(key) for key in self.keys],
+            "unique": self.unique,
+        }
+
+
+# Indexes required by the MongoBackend queries.
+#
+# - get_node() looks nodes up by (name, version) in the nodes, nodes_archived and nodes_changes collections,
+# - nodes holds exactly one (the latest) version of each node,
+# - list queries as of a past instant find the version of each node in effect by (name, last_updated_at),
+# - the set_*_force_disabled_flag() methods and aggregation pipelines match on entity ids (multikey),
+# - elements currently in downtime are found from the normalised downtime windows (multikey).
+REQUIRED_INDEXES = [
+    IndexSpec("nodes", [("name", ASCENDING), ("version", ASCENDING)], name="name_version"),
+    IndexSpec("nodes", [("name", ASCENDING)], name="name_unique", unique=True),
+    IndexSpec("nodes_archived", [("name", ASCENDING), ("version", ASCENDING)], name="name_version"),
+    IndexSpec("nodes_changes", [("name", ASCENDING), ("version", ASCENDING)], name="name_version"),
+    IndexSpec("nodes", [("name", ASCENDING), ("last_updated_at", ASCENDING)], name="name_last_updated_at"),
+    IndexSpec("nodes_archived", [("name", ASCENDING), ("last_updated_at", ASCENDING)], name="name_last_updated_at"),
+    IndexSpec("nodes_changes", [("name", ASCENDING), ("last_updated_at", ASCENDING)], name="name_last_updated_at"),
+    IndexSpec("nodes", [("sites.id", ASCENDING)], name="site_id"),
+    IndexSpec("nodes", [("sites.compute.id", ASCENDING)], name="compute_id"),
+    IndexSpec("nodes", [("sites.compute.associated_local_services.id", ASCENDING)], name="local_service_id"),
+    IndexSpec("nodes", [("sites.compute.associated_global_services.id", ASCENDING)], name="global_service_id"),
+    IndexSpec("nodes", [("sites.compute.queues.id", ASCENDING)], name="queue_id"),
+    IndexSpec("nodes", [("sites.storages.id", ASCENDING)], name="storage_id"),
+    IndexSpec("nodes", [("sites.storages.areas.id", ASCENDING)], name="storage_area_id"),
+    IndexSpec("nodes", [("downtime_windows.end", ASCENDING), ("downtime_windows.start", ASCENDING)], name="downtime_window"),
+]
+
+
+def _get_index_usage(collection):
+    """
+    Retrieves the number of operations that used each index of a collection since the server started.
+
+    Returns:
+        A dictionary of index name to number of operations, or None if the server does not report index statistics.
+    """
+    try:
+        return {stats.get("name"): int(stats.get("accesses", {}).get("ops", 0)) for stats in collection.aggregate([{"$indexStats": {}}])}
+    except (OperationFailure, NotImplementedError):
+        return None
+
+
+def ensure_indexes(db, specs=None):
+    """
+    Creates any missing required indexes and recreates those whose definition has changed.
+
+    Failures (e.g. a unique index that cannot be built over existing duplicates) are logged rather than raised, so the
+    service can still start.
+
+    Args:
+        db: A MongoDB database.
+        specs: List of IndexSpec instances, defaults to REQUIRED_INDEXES.
+
+    Returns:
+        A dictionary with the names ("<collection>.<index>") of the created indexes and of those that failed.
+    """
+    created = []
+    failed = []
+    for spec in specs if specs is not None else REQUIRED_INDEXES:
+        collection = db[spec.collection]
+        existing = collection.index_information()
+        if spec.name in existing and spec.matches(existing[spec.name]):
+            continue
+        label = "{}.{}".format(spec.collection, spec.name)
+        try:
+            if spec.name in existing:
+                logger.info("Recreating index %s as its definition has changed", label)
+                collection.drop_index(spec.name)
+            collection.create_index(spec.keys, name=spec.name, unique=spec.unique)
+            created.append(label)
+        except OperationFailure as err:
+            logger.error("Could not create index %s: %s", label, err)
+            failed.append(label)
+    if created:
+        logger.info("Created indexes: %s", ", ".join(created))
+    return {"created": created, "failed": failed}
+
+
+def get_index_report(db, specs=None):
+    """
+    Reports the state of the indexes of every collection used by the required indexes.
+
+    Args:
+        db: A MongoDB database.
+        specs: List of IndexSpec instances, defaults to REQUIRED_INDEXES.
+
+    Returns:
+        A dictionary with:
+            - missing: required indexes that do not exist (or do not match their definition),
+            - unused: existing indexes with no recorded accesses (None if the server does not report usage),
+            - undeclared: existing indexes that are not required by the backend (other than _id_).
+    """
+    specs = specs if specs is not None else REQUIRED_INDEXES
+    missing = []
+    unused = []
+    undeclared = []
+    usage_available = True
+    for collection_name in sorted({spec.collection for spec in specs}):
+        collection = db[collection_name]
+        existing = collection.index_information()
+        required = {spec.name: spec for spec in specs if spec.collection == collection_name}
+        for name, spec in required.items():
+            if name not in existing or not spec.matches(existing[name]):
+                missing.append(spec.as_dict())
+        for name in existing:
+            if name != "_id_" and name not in required:
+                undeclared.append({"collection": collection_name, "name": name})
+
+        usage = _get_index_usage(collection)
+        if usage is None:
+            usage_available = False
+            continue
+        for name, ops in usage.items():
+            if name != "_id_" and ops == 0:
+                unused.append({"collection": collection_name, "name": name})
+    return {
+        "missing": missing,
+        "unused": unused if usage_available else None,
+        "undeclared": undeclared,
+    }
@@ -1,16 +1,36 @@
+import bisect
 import copy
+import itertools
 import json
+import logging
+import os
+import threading
 from datetime import datetime, timezone
 
+import bson
 import dateutil.parser
 from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
 
+from ska_src_site_capabilities_api.backend import changes, history, indexes, point_in_time
 from ska_src_site_capabilities_api.backend.backend import Backend
+from ska_src_site_capabilities_api.backend.monitoring import ConnectionPoolStatistics
+from ska_src_site_capabilities_api.backend.watcher import TopologyRevision, TopologyWatcher
+from ska_src_site_capabilities_api.common import downtime, pagination
+from ska_src_site_capabilities_api.common.active_view import remove_inactive_elements
+from ska_src_site_capabilities_api.common.exceptions import NodeAlreadyExists, NodeVersionConflict
+from ska_src_site_capabilities_api.common.pipelines import EntityQuery
+from ska_src_site_capabilities_api.common.snapshot import TopologySnapshot
+
+logger = logging.getLogger(__name__)
 
 
 class MongoBackend(Backend):
     """Backend API for MongoDB."""
 
+    # Number of times a targeted field update is retried if the node is modified concurrently.
+    SET_ENTITY_FIELD_ATTEMPTS = 5
+
     def __init__(
         self,
         mongo_database,
@@ -19,10 +39,29 @@ class MongoBackend(Backend):
         mongo_host=None,
         mongo_port=None,
         client=None,
+        mongo_max_pool_size=100,
+        mongo_min_pool_size=0,
+        mongo_max_idle_time_ms=None,
+        mongo_connect_timeout_ms=20000,
+        mongo_server_selection_timeout_ms=30000,
+        mongo_socket_timeout_ms=None,
+        mongo_wait_queue_timeout_ms=None,
+        mongo_read_concern_level=None,
+        mongo_write_concern_w=None,
+        mongo_write_concern_timeout_ms=None,
+        snapshot_max_age_s=5.0,
+        use_aggregation=True,
+        use_active_view=True,
+        archive_checkpoint_interval=10,
+        as_of_cache_size=32,
+        dump_batch_size=100,
     ):
         """
         Initialises a MongoBackend instance.
 
+        A single pooled MongoDB client is created lazily on first use and shared by all backend calls made in the
+        same process. It is recreated if the process is forked.
+
         Args:
             mongo_database: Name of the MongoDB database.
             mongo_username: Username for MongoDB authentication.
@@ -30,24 +69,375 @@ class MongoBackend(Backend):
             mongo_host: Hostname of the MongoDB server.
             mongo_port: Port of the MongoDB server.
             client: Optional MongoDB client for mocking/testing.
+            mongo_max_pool_size: Maximum number of connections in the pool.
+            mongo_min_pool_size: Minimum number of connections kept open in the pool.
+            mongo_max_idle_time_ms: Time a connection can stay idle in the pool before being closed.
+            mongo_connect_timeout_ms: Timeout for establishing a connection.
+            mongo_server_selection_timeout_ms: Timeout for selecting a server for an operation.
+            mongo_socket_timeout_ms: Timeout for a send or receive on a socket.
+            mongo_wait_queue_timeout_ms: Timeout waiting for a free connection when the pool is exhausted.
+            mongo_read_concern_level: Read concern level (e.g. "local", "majority").
+            mongo_write_concern_w: Write concern acknowledgement (e.g. 1, "majority").
+            mongo_write_concern_timeout_ms: Write concern timeout.
+            snapshot_max_age_s: Maximum age of the in-memory topology snapshot used for get-by-id lookups before it
+                is reloaded from the database (None to only refresh on writes made through this backend).
+            use_aggregation: Push list filters down into MongoDB aggregation pipelines. If False, or if the server
+                cannot run the pipeline, node documents are fetched in full and filtered in Python.
+            use_active_view: Serve queries for active entities from a view of the topology snapshot that is filtered
+                once and only recomputed for a node when it is written or one of its downtime windows starts or ends.
+            archive_checkpoint_interval: Number of archived versions of a node per full checkpoint; the versions in
+                between are archived as deltas against the previous archived version (1 to archive every version in
+                full).
+            as_of_cache_size: Maximum number of past instants for which the resolved topology is cached.
+            dump_batch_size: Number of documents fetched per round trip when streaming all node versions (see
+                iter_nodes).
         """
         super().__init__()
         if mongo_database and mongo_username and mongo_password and mongo_host:
             self.connection_string = "mongodb://{}:{}@{}:{}/".format(mongo_username, mongo_password, mongo_host, int(mongo_port))
         self.mongo_database = mongo_database
         self.client = client  # used for mocking
+        self.use_aggregation = use_aggregation
+        self.use_active_view = use_active_view
+        self.archive_checkpoint_interval = max(1, int(archive_checkpoint_interval))
+        self.dump_batch_size = max(1, int(dump_batch_size))
+
+        if isinstance(mongo_write_concern_w, str) and mongo_write_concern_w.isdigit():
+            mongo_write_concern_w = int(mongo_write_concern_w)  # e.g. from environment, "majority" is kept as is
+        client_options = {
+            "maxPoolSize": mongo_max_pool_size,
+            "minPoolSize": mongo_min_pool_size,
+            "maxIdleTimeMS": mongo_max_idle_time_ms,
+            "connectTimeoutMS": mongo_connect_timeout_ms,
+            "serverSelectionTimeoutMS": mongo_server_selection_timeout_ms,
+            "socketTimeoutMS": mongo_socket_timeout_ms,
+            "waitQueueTimeoutMS": mongo_wait_queue_timeout_ms,
+            "readConcernLevel": mongo_read_concern_level,
+            "w": mongo_write_concern_w,
+            "wTimeoutMS": mongo_write_concern_timeout_ms,
+        }
+        self.client_options = {key: value for key, value in client_options.items() if value is not None}
+
+        # Pooled client state, (re)created per process by _get_mongo_client().
+        self.pool_statistics = ConnectionPoolStatistics()
+        self._pooled_client = None
+        self._pooled_client_pid = None
+        self._pooled_client_lock = threading.Lock()
+
+        # In-memory snapshot of the latest node versions, indexed by entity id.
+        self._snapshot = TopologySnapshot(max_age_s=snapshot_max_age_s)
+        self._as_of_cache = point_in_time.AsOfCache(max_entries=as_of_cache_size)
+
+        # Topology revision, advanced on every write and, once watching, on every change made by other processes.
+        self.topology_revision = TopologyRevision()
+        self._watcher = None
+
+        # (revision, sorted downtime window starts and ends of the latest node versions) for get_topology_validator.
+        self._downtime_boundaries = None
+
+        # Whether node documents without normalised downtime windows have been backfilled by this process.
+        self._downtime_windows_backfilled = False
 
     def _get_mongo_client(self):
         """
         Retrieves the MongoDB client.
 
+        The client is created once per process and reused thereafter, so connections are taken from its pool rather
+        than being established for every call.
+
         Returns:
             A MongoDB client instance.
         """
         if self.client:
             return self.client
-        else:
-            return MongoClient(self.connection_string)
+        pid = os.getpid()
+        if self._pooled_client is not None and self._pooled_client_pid == pid:
+            return self._pooled_client
+        with self._pooled_client_lock:
+            if self._pooled_client is None or self._pooled_client_pid != pid:
+                # A client inherited across a fork must not be used (or closed) by the child, so just drop it.
+                self.pool_statistics.reset()
+                self._pooled_client = MongoClient(
+                    self.connection_string,
+                    event_listeners=[self.pool_statistics],
+                    **self.client_options,
+                )
+                self._pooled_client_pid = pid
+            return self._pooled_client
+
+    def close(self):
+        """
+        Stops watching for topology changes and closes the pooled MongoDB client owned by this process, if any.
+        """
+        self.stop_watching()
+        with self._pooled_client_lock:
+            if self._pooled_client is not None and self._pooled_client_pid == os.getpid():
+                self._pooled_client.close()
+            self._pooled_client = None
+            self._pooled_client_pid = None
+
+    def start_watching(self, poll_interval_s=5.0):
+        """
+        Starts following changes made to the node collections by any process in a background thread.
+
+        Nodes inserted or updated elsewhere are patched into the topology snapshot, other changes cause it to be
+        reloaded, and every change advances the topology revision. A change stream is used if the server supports it,
+        otherwise the collections are polled.
+
+        Args:
+            poll_interval_s: Interval between polls when change streams are unavailable.
+        """
+        if self._watcher is None:
+            self._watcher = TopologyWatcher(
+                get_database=lambda: self._get_mongo_client()[self.mongo_database],
+                revision=self.topology_revision,
+                on_node_changed=self._on_node_changed,
+                on_reset=self._on_topology_reset,
+                poll_interval_s=poll_interval_s,
+            )
+        self._watcher.start()
+
+    def stop_watching(self):
+        """
+        Stops following changes made to the node collections, if started.
+        """
+        if self._watcher is not None:
+            self._watcher.stop()
+
+    def _on_node_changed(self, node):
+        """Patches a node changed by any process into the snapshot."""
+        if self._snapshot.is_loaded:
+            self._snapshot.put_node(node)
+
+    def _on_topology_reset(self):
+        """Drops all cached topology state after changes that cannot be patched in (e.g. deletions)."""
+        self._snapshot.invalidate()
+        self._as_of_cache.clear()
+
+    def get_topology_revision(self):
+        """
+        Retrieves the current topology revision.
+
+        Returns:
+            An integer that increases whenever the topology known to this process changes.
+        """
+        return self.topology_revision.value
+
+    def get_topology_validator(self):
+        """
+        Retrieves a validator for responses derived from the latest topology.
+
+        The validator changes whenever the topology revision advances or a downtime window of a latest node version
+        starts or ends (changing which elements are active), so a response computed under a given validator is
+        current for as long as the validator is unchanged. Computing it only reads the topology snapshot when the
+        revision has advanced.
+
+        Returns:
+            A string, or None if changes made by other processes are not being followed (see start_watching), in which
+            case the revision alone cannot tell whether a response is still current.
+        """
+        if self._watcher is None or not self._watcher.is_running:
+            return None
+        revision = self.topology_revision.value
+        downtime_boundaries = self._downtime_boundaries
+        if downtime_boundaries is None or downtime_boundaries[0] != revision:
+            nodes = list(self._get_snapshot().nodes.values())
+            downtime_boundaries = (
+                revision,
+                sorted(
+                    boundary
+                    for node in nodes
+                    for window in downtime.get_downtime_windows(node)
+                    for boundary in (window.get("start"), window.get("end"))
+                ),
+            )
+            self._downtime_boundaries = downtime_boundaries
+        # windows are open intervals, so an element only changes state once a boundary has passed
+        return "{}.{}".format(revision, bisect.bisect_left(downtime_boundaries[1], downtime.utcnow()))
+
+    def get_pool_statistics(self):
+        """
+        Retrieves connection pool statistics for this process' client.
+
+        Returns:
+            A dictionary of pool statistics, e.g. checked out connections, checkout wait time and pool exhaustion
+            events.
+        """
+        return {
+            "max_pool_size": self.client_options.get("maxPoolSize"),
+            **self.pool_statistics.as_dict(),
+        }
+
+    def ping(self):
+        """
+        Checks that MongoDB can be reached, with a round trip to the server.
+
+        Raises:
+            pymongo.errors.PyMongoError: If it cannot be reached within the server selection timeout.
+        """
+        self._get_mongo_client().admin.command("ping")
+
+    def ensure_indexes(self):
+        """
+        Creates the secondary indexes required by this backend's queries if they do not already exist.
+
+        The database being unreachable is logged rather than raised so that the service can still start.
+
+        Returns:
+            A dictionary with the names of the created indexes and of those that could not be created.
+        """
+        client = self._get_mongo_client()
+        try:
+            return indexes.ensure_indexes(client[self.mongo_database])
+        except PyMongoError as err:
+            logger.error("Could not reconcile indexes: %s", err)
+            return {"created": [], "failed": [], "error": str(err)}
+
+    def get_index_report(self):
+        """
+        Reports missing, unused and undeclared indexes on the node collections.
+
+        Returns:
+            A dictionary of missing, unused and undeclared indexes.
+        """
+        client = self._get_mongo_client()
+        return indexes.get_index_report(client[self.mongo_database])
+
+    def compact_archived_nodes(self, dry_run=False):
+        """
+        Rewrites archived node versions as full checkpoints every archive_checkpoint_interval versions and deltas in
+        between (see history), e.g. to migrate archives written before delta encoding.
+
+        Archived versions that cannot be reconstructed are left untouched.
+
+        Args:
+            dry_run: Only report what would be rewritten.
+
+        Returns:
+            A dictionary with the number of checkpoints, deltas and rewritten documents, and the total BSON size of the
+            archive before and after compaction.
+        """
+        client = self._get_mongo_client()
+        db = client[self.mongo_database]
+
+        report = {"checkpoints": 0, "deltas": 0, "rewritten": 0, "size_before": 0, "size_after": 0}
+        for node_name in sorted(db.nodes_archived.distinct("name")):
+            archived_nodes = list(db.nodes_archived.find({"name": node_name}).sort("version", 1))
+            document_ids = [archived_node.pop("_id") for archived_node in archived_nodes]
+            previous_node = None
+            versions_since_checkpoint = 0
+            for document_id, archived_node, node in zip(document_ids, archived_nodes, history.reconstruct_archived_nodes(archived_nodes)):
+                record = archived_node
+                if node is None:
+                    previous_node = None
+                elif previous_node is None or versions_since_checkpoint + 1 >= self.archive_checkpoint_interval:
+                    record = node
+                    previous_node = node
+                    versions_since_checkpoint = 0
+                else:
+                    record = history.make_delta_record(previous_node, node)
+                    previous_node = node
+                    versions_since_checkpoint += 1
+
+                report["checkpoints" if history.is_checkpoint(record) else "deltas"] += 1
+                report["size_before"] += len(bson.encode(archived_node))
+                report["size_after"] += len(bson.encode(record))
+                if record != archived_node:
+                    report["rewritten"] += 1
+                    if not dry_run:
+                        db.nodes_archived.replace_one({"_id": document_id}, record)
+        return report
+
+    def _archive_node(self, db, node):
+        """
+        Archives a superseded version of a node, as a delta against the previous archived version unless a full
+        checkpoint is due.
+
+        Args:
+            db: The MongoDB database.
+            node: The full node document to archive.
+
+        Returns:
+            The ID of the archived document.
+        """
+        node_name = node.get("name")
+        record = node
+        if self.archive_checkpoint_interval > 1:
+            last_checkpoint = db.nodes_archived.find_one(
+                {"name": node_name, history.DELTA_FIELD: {"$exists": False}},
+                {"_id": 0, "version": 1},
+                sort=[("version", -1)],
+            )
+            if last_checkpoint:
+                archived_nodes = self._get_archived_nodes(db, node_name, from_version=last_checkpoint.get("version"))
+                if (
+                    len(archived_nodes) < self.archive_checkpoint_interval
+                    and archived_nodes[-1] is not None
+                    and archived_nodes[-1].get("version") < node.get("version")
+                ):
+                    record = history.make_delta_record(archived_nodes[-1], node)
+        return db.nodes_archived.insert_one(dict(record)).inserted_id
+
+    def _get_archived_nodes(self, db, node_name, from_version, to_version=None):
+        """
+        Reconstructs the archived versions of a node in a version range, which should start at a checkpoint.
+
+        Returns:
+            A list of full node documents (or None where a version cannot be reconstructed), sorted by version.
+        """
+        version_range = {"$gte": from_version}
+        if to_version is not None:
+            version_range["$lte"] = to_version
+        archived_nodes = db.nodes_archived.find({"name": node_name, "version": version_range}, {"_id": 0}).sort("version", 1)
+        return history.reconstruct_archived_nodes(archived_nodes)
+
+    def _load_archived_node(self, db, node_name, node_version):
+        """
+        Reconstructs an archived version of a node by replaying deltas from the nearest checkpoint at or before it.
+
+        Returns:
+            A dictionary containing the node's attributes, or None if the version is not archived or cannot be
+            reconstructed.
+        """
+        checkpoint = db.nodes_archived.find_one(
+            {"name": node_name, "version": {"$lte": node_version}, history.DELTA_FIELD: {"$exists": False}},
+            {"_id": 0, "version": 1},
+            sort=[("version", -1)],
+        )
+        if not checkpoint:
+            return None
+        archived_nodes = self._get_archived_nodes(db, node_name, from_version=checkpoint.get("version"), to_version=node_version)
+        if archived_nodes and archived_nodes[-1] is not None and archived_nodes[-1].get("version") == node_version:
+            return archived_nodes[-1]
+        return None
+
+    def _get_snapshot(self):
+        """
+        Retrieves the topology snapshot, (re)loading it from the database if it has not been loaded yet or is stale.
+
+        Returns:
+            A TopologySnapshot instance.
+        """
+        if self._snapshot.is_stale:
+            client = self._get_mongo_client()
+            db = client[self.mongo_database]
+            self._snapshot.load(db.nodes.find({}, {downtime.DOWNTIME_WINDOWS_FIELD: 0}))
+        return self._snapshot
+
+    def _get_many(self, entity_type, entity_ids):
+        """
+        Retrieves several entities of a type by id from the topology snapshot, in one pass.
+
+        Args:
+            entity_type: The type of the entities (a TopologySnapshot entity type).
+            entity_ids: The ids of the entities.
+
+        Returns:
+            A dictionary with the entities found keyed by id ("found"), and a list of the ids that were not found
+            ("not_found").
+        """
+        found, not_found = self._get_snapshot().get_many(entity_type, entity_ids)
+        return {"found": found, "not_found": not_found}
 
     def _get_service_labels_for_prometheus(self, service):
         """
@@ -128,7 +518,7 @@ class MongoBackend(Backend):
 
         return formatted_services
 
-    def _get_storage_areas_with_host_for_prometheus(self, node_names=None, site_names=None, include_inactive=False):
+    def _get_storage_areas_with_host_for_prometheus(self, node_names=None, site_names=None, include_inactive=False, as_of=None):
         """
         Returns a list of storage areas with host information formatted for Prometheus Service Discovery.
 
@@ -136,6 +526,7 @@ class MongoBackend(Backend):
             node_names: List of node names to filter storage areas by. If None, no node filtering is applied.
             site_names: List of site names to filter storage areas by. If None, no site filtering is applied.
             include_inactive: Boolean to include inactive storage areas.
+            as_of: Optional instant to list storage areas as of.
 
         Returns:
             A list of dictionaries formatted for Prometheus Service Discovery.
@@ -147,6 +538,7 @@ class MongoBackend(Backend):
             node_names=node_names,
             site_names=site_names,
             include_inactive=include_inactive,
+            as_of=as_of,
         ):
             supported_protocols = storage.get("supported_protocols", [])
 
@@ -189,53 +581,278 @@ class MongoBackend(Backend):
             )
         return formatted
 
-    def _is_element_in_downtime(self, downtime):
+    def _backfill_downtime_windows(self, db):
         """
-        Checks if an element is in downtime.
+        Adds normalised downtime windows to node documents written before they were maintained on write.
 
         Args:
-            downtime: A list of downtime entries, each containing a date range.
+            db: The MongoDB database.
+        """
+        for node in db.nodes.find({downtime.DOWNTIME_WINDOWS_FIELD: {"$exists": False}}):
+            db.nodes.update_one(
+                {"_id": node.get("_id"), "version": node.get("version")},
+                {"$set": {downtime.DOWNTIME_WINDOWS_FIELD: downtime.get_downtime_windows(node)}},
+            )
+        self._downtime_windows_backfilled = True
+
+    def _get_ids_in_downtime(self, db):
+        """
+        Retrieves the ids of all elements currently in downtime, from the indexed, normalised downtime windows.
+
+        Args:
+            db: The MongoDB database.
 
         Returns:
-            Boolean indicating whether the element is in downtime.
+            A set of element ids.
+        """
+        if not self._downtime_windows_backfilled:
+            self._backfill_downtime_windows(db)
+
+        now = downtime.utcnow()
+        windows_field = downtime.DOWNTIME_WINDOWS_FIELD
+        in_effect = {"start": {"$lt": now}, "end": {"$gt": now}}
+        try:
+            rows = db.nodes.aggregate(
+                [
+                    {"$match": {windows_field: {"$elemMatch": in_effect}}},
+                    {"$unwind": "${}".format(windows_field)},
+                    {"$match": {"{}.{}".format(windows_field, key): value for key, value in in_effect.items()}},
+                    {"$group": {"_id": "${}.entity_id".format(windows_field)}},
+                ]
+            )
+            return {row.get("_id") for row in rows}
+        except (OperationFailure, NotImplementedError) as err:
+            logger.warning("Falling back to in-process downtime filtering: %s", err)
+            windows = [window for node in db.nodes.find({}, {windows_field: 1}) for window in node.get(windows_field) or []]
+            return downtime.get_ids_in_downtime(windows, now)
+
+    def _get_versions_as_of(self, db, timestamp):
         """
-        for entry in downtime:
-            if entry.get("date_range"):
-                start_date_str_utc, end_date_str_utc = entry.get("date_range").split(" to ")
-                start_date_utc = dateutil.parser.isoparse(start_date_str_utc)
-                end_date_utc = dateutil.parser.isoparse(end_date_str_utc)
-                now_utc = datetime.now(timezone.utc)
+        Gets the version of every node in effect at an instant, i.e. its latest version last updated at or before it.
 
-                if start_date_utc < now_utc < end_date_utc:
-                    return True
-        return False
+        Args:
+            db: The MongoDB database.
+            timestamp: The instant, formatted with point_in_time.format_timestamp.
 
-    def _remove_inactive_elements(self, element):
+        Returns:
+            A dictionary of version number by node name, without the nodes that did not exist yet.
+        """
+        # change records are written before their update, so ignore those of versions the nodes have not reached
+        latest_versions = {node.get("name"): node.get("version") for node in db.nodes.find({}, {"_id": 0, "name": 1, "version": 1})}
+        queries = [
+            (db.nodes, point_in_time.build_versions_as_of_pipeline(timestamp)),
+            (db.nodes_archived, point_in_time.build_versions_as_of_pipeline(timestamp)),
+        ]
+        if latest_versions:
+            queries.append((db.nodes_changes, point_in_time.build_versions_as_of_pipeline(timestamp, max_versions=latest_versions)))
+
+        versions = {}
+        for collection, pipeline in queries:
+            for row in collection.aggregate(pipeline):
+                node_name, version = row.get("_id"), row.get("version")
+                if version is not None and version > versions.get(node_name, -1):
+                    versions[node_name] = version
+        return versions
+
+    def _get_nodes_as_of(self, as_of, include_inactive=False):
         """
-        Recursively removes elements from a nested structure if they are in downtime or disabled.
+        Gets the version of every node in effect at an instant, caching the result for past instants.
 
         Args:
-            element: A dictionary or list representing the structure to filter.
+            as_of: The instant, as a datetime or ISO 8601 string (UTC if naive).
+            include_inactive: Keep elements that were force disabled or in downtime at the instant.
 
         Returns:
-            The filtered structure with inactive elements removed.
+            A list of node documents, which must not be modified.
+        """
+        instant = point_in_time.parse_as_of(as_of)
+        timestamp = point_in_time.format_timestamp(instant)
+        nodes = self._as_of_cache.get((timestamp, include_inactive))
+        if nodes is not None:
+            return nodes
+
+        client = self._get_mongo_client()
+        db = client[self.mongo_database]
+
+        nodes = []
+        for node_name, version in sorted(self._get_versions_as_of(db, timestamp).items()):
+            node = self.get_node(node_name, version)
+            if node:
+                nodes.append(node)
+        if not include_inactive:
+            nodes = [remove_inactive_elements(node, downtime.get_ids_in_downtime(downtime.get_downtime_windows(node), instant)) for node in nodes]
+            nodes = [node for node in nodes if node]
+
+        self._as_of_cache.put((timestamp, include_inactive), nodes, instant)
+        return nodes
+
+    def _query_entities(self, query, as_of=None, limit=None, cursor=None):
+        """
+        Runs an entity query, returning the matching entities with their parent information.
+
+        Queries for active entities only are evaluated against the snapshot's precomputed active view if enabled.
+        Otherwise the query is run as an aggregation pipeline if possible, or all node documents are fetched and the
+        query is evaluated in Python. Queries as of a past instant are evaluated against the node versions in effect at
+        that instant, with elements inactive at that instant removed. If the query selects fields, they are selected
+        from each entity as it is combined with its parent information.
+
+        Args:
+            query: An EntityQuery instance.
+            as_of: Optional instant (datetime or ISO 8601 string) to query the topology at.
+            limit: Maximum number of entities to return, in id order (see pagination).
+            cursor: Cursor of the page of entities to return, in id order (see pagination).
+
+        Returns:
+            A list of (entity, site) tuples, where entity contains parent information and site contains the
+            parent site's coordinates (for storages and storage areas). A pagination.Page if limit or cursor is given.
+        """
+        # Nested inactive elements are already removed from the active view.
+        ids_in_downtime = None
+        if as_of is not None:
+            rows = query.rows_from_nodes(self._get_nodes_as_of(as_of, include_inactive=query.include_inactive))
+        elif not query.include_inactive and self.use_active_view:
+            rows = query.rows_from_nodes(self._get_snapshot().get_active_nodes())
+        else:
+            client = self._get_mongo_client()
+            db = client[self.mongo_database]
+
+            if not query.include_inactive:
+                ids_in_downtime = self._get_ids_in_downtime(db)
+                query.ids_in_downtime = ids_in_downtime
+
+            if pagination.is_paginated(limit, cursor):
+                # only fetch the rows needed for the page (and to tell whether there is another)
+                query.after_id = pagination.decode_cursor(cursor, key_length=1)[0] if cursor else None
+                query.limit = limit
+
+            rows = None
+            if self.use_aggregation:
+                try:
+                    rows = list(db.nodes.aggregate(query.to_pipeline()))
+                except (OperationFailure, NotImplementedError) as err:
+                    logger.warning("Falling back to in-process filtering for %s query: %s", query.entity_type, err)
+            if rows is None:
+                rows = query.rows_from_nodes(db.nodes.find({}, {"_id": 0}))
+
+        response = query.entities_from_rows(rows, ids_in_downtime=ids_in_downtime)
+        if pagination.is_paginated(limit, cursor):
+            return pagination.paginate(response, key=lambda entity_and_site: pagination.entity_key(entity_and_site[0]), limit=limit, cursor=cursor)
+        return response
+
+    def _set_entity_field(self, entity_type, entity_id, field, value, scope=None):
+        """
+        Sets a single field of a nested entity in the latest version of its node.
+
+        The field is set with one targeted update that also bumps the node version (guarded on the version read just
+        before, so concurrent writes are retried rather than lost), and a compact change record is written to the
+        nodes_changes collection instead of archiving a full copy of the previous version. If the server does not
+        support filtered positional updates, the node is rewritten through add_edit_node instead.
+
+        The change record is written before the update, so that a version superseded by the update can always be
+        reconstructed. A record whose update is not applied is deleted, unless the process dies first; such an orphaned
+        record is told apart by its timestamp, which does not match that of the version of the same number (see
+        _reconstruct_node), and is deleted by the next write of the node.
+
+        Args:
+            entity_type: The type of entity, e.g. "site", "compute", "service", "storage", "storage_area".
+            entity_id: The ID of the entity.
+            field: The name of the field to set.
+            value: The value to set.
+            scope: The scope ("local" or "global") for services.
+
+        Returns:
+            Boolean indicating whether the entity was found and updated.
+        """
+        client = self._get_mongo_client()
+        db = client[self.mongo_database]
+
+        updated_at = point_in_time.format_timestamp(downtime.utcnow())
+        query, update, array_filters, projection = changes.build_set_entity_field_update(
+            entity_type, entity_id, field, value, scope=scope, updated_at=updated_at
+        )
+        for _ in range(self.SET_ENTITY_FIELD_ATTEMPTS):
+            # Read the current version and field value, then update only if the node has not changed in between
+            node_before = db.nodes.find_one(query, projection)
+            if not node_before:
+                return False
+            change_record = changes.make_change_record(node_before, entity_type, entity_id, field, value, scope=scope, updated_at=updated_at)
+            change_record_id = db.nodes_changes.insert_one(dict(change_record)).inserted_id
+            try:
+                result = db.nodes.update_one(
+                    {**query, "name": node_before.get("name"), "version": node_before.get("version")},
+                    update,
+                    array_filters=array_filters,
+                )
+            except Exception as err:
+                if not changes.is_array_filters_unsupported(err):
+                    # e.g. a write concern error, raised after the update was applied: the change record stays
+                    raise
+                db.nodes_changes.delete_one({"_id": change_record_id})
+                logger.warning("Falling back to rewriting the node for %s %s update: %s", entity_type, entity_id, err)
+                node = db.nodes.find_one(query, {"_id": 0})
+                if not node or not changes.set_entity_field(node, entity_type, entity_id, field, value, scope=scope):
+                    return False
+                node[point_in_time.TIMESTAMP_FIELD] = updated_at
+                self.add_edit_node(node, node_name=node.get("name"))
+                return True
+            if result.matched_count:
+                break
+            db.nodes_changes.delete_one({"_id": change_record_id})
+        else:
+            raise RuntimeError("Node containing {} {} was modified concurrently, giving up".format(entity_type, entity_id))
+
+        # Delete records of this version left by writes that did not complete
+        db.nodes_changes.delete_many({"name": change_record.get("name"), "version": change_record.get("version"), "_id": {"$ne": change_record_id}})
+
+        # Patch the snapshot if it holds the version that was changed, otherwise have it reloaded
+        if self._snapshot.is_loaded:
+            snapshot_node = self._snapshot.get_node(change_record.get("name"))
+            if snapshot_node.get("version") == node_before.get("version"):
+                changes.apply_change_record(snapshot_node, change_record)
+                self._snapshot.put_node(snapshot_node)
+            else:
+                self._snapshot.invalidate()
+        # advanced once the snapshot is patched, so that a response tagged with the new revision reflects the change
+        self.topology_revision.advance()
+        return True
+
+    def _reconstruct_node(self, db, node_name, node_version):
         """
-        if isinstance(element, dict):
-            if self._is_element_in_downtime(element.get("downtime", [])) or element.get("is_force_disabled", False):
-                return None
+        Reconstructs a version of a node that was superseded by a field change (see _set_entity_field) and so was not
+        archived in full, by reverting change records on the nearest later full version.
 
-            # Recurse through the element, checking downtime at each level
-            filtered_element = {}
-            for key, value in element.items():
-                filtered_child = self._remove_inactive_elements(value)
-                if filtered_child:
-                    filtered_element[key] = filtered_child
-            return filtered_element if filtered_element else None
+        Args:
+            db: The MongoDB database.
+            node_name: The name of the node.
+            node_version: The version of the node to reconstruct.
 
-        elif isinstance(element, list):
-            filtered_list = [self._remove_inactive_elements(item) for item in element]
-            return [item for item in filtered_list if item is not None]
-        return element
+        Returns:
+            A dictionary containing the node's attributes, or None if the version cannot be reconstructed.
+        """
+        later_archived_version = db.nodes_archived.find_one(
+            {"name": node_name, "version": {"$gt": node_version}},
+            {"_id": 0, "version": 1},
+            sort=[("version", 1)],
+        )
+        later_versions = [
+            db.nodes.find_one({"name": node_name, "version": {"$gt": node_version}}, {"_id": 0}),
+            self._load_archived_node(db, node_name, later_archived_version.get("version")) if later_archived_version else None,
+        ]
+        later_versions = [node for node in later_versions if node]
+        if not later_versions:
+            return None
+        node = min(later_versions, key=lambda node: node.get("version"))
+
+        change_records = db.nodes_changes.find(
+            {"name": node_name, "version": {"$gt": node_version, "$lte": node.get("version")}},
+            {"_id": 0},
+        ).sort("version", -1)
+        for change_record in change_records:
+            # skip records of updates that were not applied, which do not match the version they would have produced
+            if change_record.get("version") != node.get("version") or change_record.get("last_updated_at") != node.get("last_updated_at"):
+                continue
+            changes.revert_change_record(node, change_record)
+        return node if node.get("version") == node_version else None
 
     def add_edit_node(self, node_values, node_name=None):
         """
@@ -247,11 +864,14 @@ class MongoBackend(Backend):
 
         Returns:
             The ID of the inserted or updated node.
+
+        Raises:
+            NodeAlreadyExists: If a node with this name was added concurrently.
+            NodeVersionConflict: If the node was edited (or deleted) concurrently, since the latest version was read.
         """
         client = self._get_mongo_client()
         db = client[self.mongo_database]
         nodes = db.nodes
-        nodes_archived = db.nodes_archived
 
         # Get the latest version of this node
         latest_node = self.get_node(node_name=node_name, node_version="latest")
@@ -261,19 +881,42 @@ class MongoBackend(Backend):
             node_values["version"] = latest_node.get("version") + 1
 
         node_values.pop("_id", None)
-
-        # Insert this new version of the node into the nodes collection
-        inserted_node = nodes.insert_one(node_values)
-
-        # Move the previous version of the node to the nodes_archived collection
-        # only if a previous version existed and insertion into nodes was successful
-        if latest_node and inserted_node.inserted_id:
-            # Only delete it from nodes if we successfully added the previous version
-            # to nodes_archived
-            if nodes_archived.insert_one(latest_node).inserted_id:
-                nodes.delete_one({"name": node_name, "version": latest_node.get("version")})
-
-        return inserted_node.inserted_id
+        node_values[downtime.DOWNTIME_WINDOWS_FIELD] = downtime.get_downtime_windows(node_values)
+
+        if not latest_node:
+            # Insert the first version of the node into the nodes collection
+            try:
+                inserted_id = nodes.insert_one(node_values).inserted_id
+            except DuplicateKeyError:
+                raise NodeAlreadyExists(node_name=node_values.get("name"))
+        else:
+            # Replace the node in place with the new version, so that the nodes collection only ever holds one document
+            # per node name, provided that it is still at the version read above; only the edit winning a race archives
+            # the previous version, so that each version is archived once
+            try:
+                replaced_node = nodes.find_one_and_replace(
+                    {"name": node_name, "version": latest_node.get("version")},
+                    node_values,
+                    projection={"_id": 1},
+                )
+            except DuplicateKeyError:
+                # renamed to the name of another node
+                raise NodeAlreadyExists(node_name=node_values.get("name"))
+            if not replaced_node:
+                raise NodeVersionConflict(node_name=node_name, node_version=latest_node.get("version"))
+            inserted_id = replaced_node.get("_id")
+            self._archive_node(db, latest_node)
+            # the new version is a full one, so any change record of that version was left by an update not applied
+            db.nodes_changes.delete_many({"name": node_name, "version": node_values.get("version")})
+
+        # Patch the snapshot with the new version of the node
+        if self._snapshot.is_loaded:
+            if node_name and node_name != node_values.get("name"):
+                self._snapshot.remove_node(node_name)
+            self._snapshot.put_node({**copy.deepcopy(node_values), "_id": inserted_id})
+        self.topology_revision.advance()
+
+        return inserted_id
 
     def delete_all_nodes(self):
         """
@@ -286,6 +929,10 @@ class MongoBackend(Backend):
 
         result_nodes = db.nodes.delete_many({})
         result_archived = db.nodes_archived.delete_many({})
+        db.nodes_changes.delete_many({})
+        self._snapshot.clear()
+        self._as_of_cache.clear()
+        self.topology_revision.advance()
         return {
             "deleted_from_nodes_count": result_nodes.deleted_count,
             "deleted_from_nodes_archived_count": result_archived.deleted_count,
@@ -303,6 +950,10 @@ class MongoBackend(Backend):
 
         result_nodes = db.nodes.delete_many({"name": node_name})
         result_archived = db.nodes_archived.delete_many({"name": node_name})
+        db.nodes_changes.delete_many({"name": node_name})
+        self._snapshot.remove_node(node_name)
+        self._as_of_cache.clear()
+        self.topology_revision.advance()
         return {
             "deleted_from_nodes_count": result_nodes.deleted_count,
             "deleted_from_nodes_archived_count": result_archived.deleted_count,
@@ -318,20 +969,20 @@ class MongoBackend(Backend):
         Returns:
             A dictionary containing the compute resource and its parent information.
         """
-        response = {}
-        for compute in self.list_compute(include_inactive=True):
-            parent_node_name = compute.get("parent_node_name")
-            parent_site_name = compute.get("parent_site_name")
-            parent_site_id = compute.get("parent_site_id")
-            if compute.get("id") == compute_id:
-                response = {
-                    "parent_node_name": parent_node_name,
-                    "parent_site_name": parent_site_name,
-                    "parent_site_id": parent_site_id,
-                    **compute,
-                }
-                break
-        return response
+        return self._get_snapshot().get("compute", compute_id)
+
+    def get_compute_many(self, compute_ids):
+        """
+        Retrieves several compute resources by their IDs.
+
+        Args:
+            compute_ids: The IDs of the compute resources.
+
+        Returns:
+            A dictionary with the compute resources found (with their parent information) keyed by ID ("found"), and a list of the IDs
+            that were not found ("not_found").
+        """
+        return self._get_many("compute", compute_ids)
 
     def get_node(self, node_name, node_version="latest"):
         """
@@ -352,10 +1003,13 @@ class MongoBackend(Backend):
         else:
             this_node = db.nodes.find_one({"name": node_name, "version": int(node_version)})
             if not this_node:
-                this_node = db.nodes_archived.find_one({"name": node_name, "version": int(node_version)})
+                this_node = self._load_archived_node(db, node_name, int(node_version))
+            if not this_node:
+                this_node = self._reconstruct_node(db, node_name, int(node_version))
 
         if this_node:
-            this_node.pop("_id")
+            this_node.pop("_id", None)
+            this_node.pop(downtime.DOWNTIME_WINDOWS_FIELD, None)
         return this_node if this_node else {}
 
     def get_service(self, service_id):
@@ -366,35 +1020,22 @@ class MongoBackend(Backend):
             service_id: The ID of the service.
 
         Returns:
-            A dictionary containing the service and its parent information.
-        """
-        response = {}
-        for service in self.list_services(include_inactive=True):
-            parent_node_name = service.get("parent_node_name")
-            parent_site_name = service.get("parent_site_name")
-            parent_site_id = service.get("parent_site_id")
-            parent_compute_id = service.get("parent_compute_id")
-
-            # get compute element to establish if local or global service
-            compute = self.get_compute(parent_compute_id)
-            if any(s.get("id") == service_id for s in compute.get("associated_global_services", [])):
-                service_scope = "associated_global_services"
-            elif any(s.get("id") == service_id for s in compute.get("associated_local_services", [])):
-                service_scope = "associated_local_services"
-            else:
-                service_scope = None
-
-            if service.get("id") == service_id:
-                response = {
-                    "parent_node_name": parent_node_name,
-                    "parent_site_name": parent_site_name,
-                    "parent_site_id": parent_site_id,
-                    "parent_compute_id": parent_compute_id,
-                    "scope": service_scope,
-                    **service,
-                }
-                break
-        return response
+            A dictionary containing the service and its scope and parent information.
+        """
+        return self._get_snapshot().get("service", service_id)
+
+    def get_service_many(self, service_ids):
+        """
+        Retrieves several services by their IDs.
+
+        Args:
+            service_ids: The IDs of the services.
+
+        Returns:
+            A dictionary with the services found (with their parent information) keyed by ID ("found"), and a list of the IDs
+            that were not found ("not_found").
+        """
+        return self._get_many("service", service_ids)
 
     def get_site(self, site_id):
         """
@@ -406,13 +1047,7 @@ class MongoBackend(Backend):
         Returns:
             A dictionary containing the site and its parent information.
         """
-        response = {}
-        for site in self.list_sites(include_inactive=True):
-            parent_node_name = site.get("parent_node_name")
-            if site.get("id") == site_id:
-                response = {"parent_node_name": parent_node_name, **site}
-                break
-        return response
+        return self._get_snapshot().get("site", site_id)
 
     def get_site_from_names(self, node_name, node_version, site_name):
         """
@@ -445,20 +1080,20 @@ class MongoBackend(Backend):
         Returns:
             A dictionary containing the storage resource and its parent information.
         """
-        response = {}
-        for storage in self.list_storages(include_inactive=True):
-            parent_node_name = storage.get("parent_node_name")
-            parent_site_name = storage.get("parent_site_name")
-            parent_site_id = storage.get("parent_site_id")
-            if storage.get("id") == storage_id:
-                response = {
-                    "parent_node_name": parent_node_name,
-                    "parent_site_name": parent_site_name,
-                    "parent_site_id": parent_site_id,
-                    **storage,
-                }
-                break
-        return response
+        return self._get_snapshot().get("storage", storage_id)
+
+    def get_storage_many(self, storage_ids):
+        """
+        Retrieves several storage resources by their IDs.
+
+        Args:
+            storage_ids: The IDs of the storage resources.
+
+        Returns:
+            A dictionary with the storage resources found (with their parent information) keyed by ID ("found"), and a list of the IDs
+            that were not found ("not_found").
+        """
+        return self._get_many("storage", storage_ids)
 
     def get_storage_area(self, storage_area_id):
         """
@@ -470,24 +1105,22 @@ class MongoBackend(Backend):
         Returns:
             A dictionary containing the storage area and its parent information.
         """
-        response = {}
-        for storage_area in self.list_storage_areas(include_inactive=True):
-            parent_node_name = storage_area.get("parent_node_name")
-            parent_site_name = storage_area.get("parent_site_name")
-            parent_site_id = storage_area.get("parent_site_id")
-            parent_storage_id = storage_area.get("parent_storage_id")
-            if storage_area.get("id") == storage_area_id:
-                response = {
-                    "parent_node_name": parent_node_name,
-                    "parent_site_name": parent_site_name,
-                    "parent_site_id": parent_site_id,
-                    "parent_storage_id": parent_storage_id,
-                    **storage_area,
-                }
-                break
-        return response
+        return self._get_snapshot().get("storage_area", storage_area_id)
+
+    def get_storage_area_many(self, storage_area_ids):
+        """
+        Retrieves several storage areas by their IDs.
+
+        Args:
+            storage_area_ids: The IDs of the storage areas.
 
-    def list_compute(self, node_names=None, site_names=None, include_inactive=False):
+        Returns:
+            A dictionary with the storage areas found (with their parent information) keyed by ID ("found"), and a list of the IDs
+            that were not found ("not_found").
+        """
+        return self._get_many("storage_area", storage_area_ids)
+
+    def list_compute(self, node_names=None, site_names=None, include_inactive=False, as_of=None, limit=None, cursor=None, fields=None):
         """
         Lists compute resources based on specified filters.
 
@@ -495,46 +1128,82 @@ class MongoBackend(Backend):
             node_names: List of node names to filter compute resources by. If None, no node filtering is applied.
             site_names: List of site names to filter compute resources by. If None, no site filtering is applied.
             include_inactive: Boolean to include inactive compute resources.
+            as_of: Optional instant (datetime or ISO 8601 string, UTC if naive) to list compute resources as of.
+            limit: Maximum number of compute resources to return, ordered by id.
+            cursor: Cursor of the page to return, from the next_cursor of the previous page.
+            fields: List of dotted paths of the fields to return (the id is always returned). If None, all fields are
+                returned.
 
         Returns:
-            A list of compute dictionaries, each containing parent information.
+            A list of compute dictionaries, each containing parent information (a pagination.Page if limit or cursor
+            is given).
         """
-        node_names = node_names or []
-        site_names = site_names or []
-        response = []
-        for site in self.list_sites(node_names=node_names, include_inactive=include_inactive):
-            parent_site_name = site.get("name")
-            parent_site_id = site.get("id")
-            for compute in site.get("compute", []):
-                if site_names and parent_site_name not in site_names:
-                    continue
-                compute_with_parent = {
-                    "parent_node_name": site.get("parent_node_name"),
-                    "parent_site_name": parent_site_name,
-                    "parent_site_id": parent_site_id,
-                    **compute,
-                }
-                response.append(compute_with_parent)
-        return response
+        query = EntityQuery("compute", node_names=node_names, site_names=site_names, include_inactive=include_inactive, fields=fields)
+        rows = self._query_entities(query, as_of=as_of, limit=limit, cursor=cursor)
+        return pagination.map_page(rows, [compute for compute, _ in rows])
 
-    def list_nodes(self, include_archived=False, include_inactive=True):
-        """Retrieve versions of all nodes."""
-        client = self._get_mongo_client()
-        db = client[self.mongo_database]
+    def list_nodes(self, include_archived=False, include_inactive=True, limit=None, cursor=None):
+        """
+        Retrieve versions of all nodes.
 
-        nodes = list(db.nodes.find({}))  # query for active nodes
+        If limit or cursor is given, a pagination.Page of node versions ordered by name and version is returned.
+        """
+        if not include_archived and not include_inactive and self.use_active_view:
+            nodes = self._get_snapshot().get_active_nodes()
+            if pagination.is_paginated(limit, cursor):
+                nodes = pagination.paginate(nodes, key=pagination.node_key, limit=limit, cursor=cursor)
+            return pagination.map_page(nodes, copy.deepcopy(list(nodes)))
 
-        if include_archived:
-            nodes.extend(db.nodes_archived.find({}))  # include archived nodes
+        nodes = list(self.iter_nodes(include_archived=include_archived))
 
         if not include_inactive:
-            nodes = self._remove_inactive_elements(nodes)  # filter out inactive nodes
-
-        for node in nodes:
-            node.pop("_id", None)
+            client = self._get_mongo_client()
+            db = client[self.mongo_database]
+            nodes = remove_inactive_elements(nodes, self._get_ids_in_downtime(db))  # filter out inactive nodes
 
+        if pagination.is_paginated(limit, cursor):
+            return pagination.paginate(nodes or [], key=pagination.node_key, limit=limit, cursor=cursor)
         return nodes or []
 
+    def iter_nodes(self, include_archived=True, batch_size=None):
+        """
+        Yields versions of all nodes, in the same order as list_nodes, without holding them all in memory.
+
+        Documents are read from MongoDB cursors in batches and archived versions are reconstructed one at a time, so
+        memory use is bounded by the batch size rather than the size of the node history.
+
+        Args:
+            include_archived: Also yield archived versions and versions superseded by a field change.
+            batch_size: Number of documents fetched from MongoDB per round trip (defaults to dump_batch_size).
+
+        Returns:
+            A generator of node dictionaries.
+        """
+        client = self._get_mongo_client()
+        db = client[self.mongo_database]
+        batch_size = batch_size or self.dump_batch_size
+
+        # (name, version) of every version yielded in full, to skip change records of versions archived in full
+        full_versions = set()
+        latest_nodes = db.nodes.find({}, {"_id": 0}).batch_size(batch_size)
+        archived_nodes = db.nodes_archived.find({}, {"_id": 0}).sort([("name", 1), ("version", 1)]).batch_size(batch_size)
+        for node in itertools.chain(latest_nodes, history.iter_archived_nodes(archived_nodes) if include_archived else ()):
+            full_versions.add((node.get("name"), node.get("version")))
+            node.pop(downtime.DOWNTIME_WINDOWS_FIELD, None)
+            yield node
+
+        if include_archived:
+            # include versions superseded by a field change, which are not archived in full
+            for change_record in db.nodes_changes.find({}, {"_id": 0, "name": 1, "version": 1}).batch_size(batch_size):
+                previous_version = (change_record.get("name"), change_record.get("version") - 1)
+                if previous_version not in full_versions:
+                    node = self._reconstruct_node(db, *previous_version)
+                    if node:
+                        full_versions.add(previous_version)
+                        node.pop("_id", None)
+                        node.pop(downtime.DOWNTIME_WINDOWS_FIELD, None)
+                        yield node
+
     def get_queue_by_id(
         self,
         queue_id: str,
@@ -544,48 +1213,43 @@ class MongoBackend(Backend):
         :param queue_id: Unique Queue ID
         :return:
         """
-        queues = self.list_queues(include_inactive=True)
-        for queue in queues:
-            if queue.get("id") == queue_id:
-                return queue
-        return None
+        return self._get_snapshot().get("queue", queue_id) or None
+
+    def get_queue_many(self, queue_ids):
+        """
+        Retrieves several queues by their IDs.
+
+        Args:
+            queue_ids: The IDs of the queues.
+
+        Returns:
+            A dictionary with the queues found (with their parent information) keyed by ID ("found"), and a list of the IDs
+            that were not found ("not_found").
+        """
+        return self._get_many("queue", queue_ids)
 
     def list_queues(
         self,
         node_names=None,
         site_names=None,
         include_inactive=False,
+        limit=None,
+        cursor=None,
+        fields=None,
     ):
         """
         Lists queues based on specified filters.
         :param node_names: List of node names to filter services by. If None, no node filtering is applied.
         :param site_names: ist of site names to filter services by. If None, no site filtering is applied.
         :param include_inactive: Boolean to include inactive compute resources.
-        :return: list of queues with parent information
+        :param limit: Maximum number of queues to return, ordered by id.
+        :param cursor: Cursor of the page to return, from the next_cursor of the previous page.
+        :param fields: List of dotted paths of the fields to return (the id is always returned). If None, all fields are returned.
+        :return: list of queues with parent information (a pagination.Page if limit or cursor is given)
         """
-        response = []
-
-        # Handle None cases for input lists
-        node_names = node_names or []
-        site_names = site_names or []
-
-        for compute in self.list_compute(
-            node_names=node_names,
-            site_names=site_names,
-            include_inactive=include_inactive,
-        ):
-            for queue in compute.get("queues", []):
-                response.append(
-                    {
-                        "parent_node_name": compute.get("parent_node_name"),
-                        "parent_site_name": compute.get("parent_site_name"),
-                        "parent_site_id": compute.get("parent_site_id"),
-                        "parent_compute_id": compute.get("id"),
-                        "parent_compute_name": compute.get("name"),
-                        **queue,
-                    }
-                )
-        return response
+        query = EntityQuery("queue", node_names=node_names, site_names=site_names, include_inactive=include_inactive, fields=fields)
+        rows = self._query_entities(query, limit=limit, cursor=cursor)
+        return pagination.map_page(rows, [queue for queue, _ in rows])
 
     def list_services(
         self,
@@ -596,6 +1260,10 @@ class MongoBackend(Backend):
         include_inactive=False,
         associated_storage_area_id=None,
         for_prometheus=False,
+        as_of=None,
+        limit=None,
+        cursor=None,
+        fields=None,
     ):
         """
         Lists services based on specified filters.
@@ -608,66 +1276,37 @@ class MongoBackend(Backend):
             include_inactive: Boolean to include inactive compute resources.
             associated_storage_area_id: String to filter services by associated storage area ID.
             for_prometheus: Boolean to return data formatted for Prometheus Service Discovery Config.
+            as_of: Optional instant (datetime or ISO 8601 string, UTC if naive) to list services as of.
+            limit: Maximum number of services to return, ordered by id (not for Prometheus output).
+            cursor: Cursor of the page to return, from the next_cursor of the previous page.
+            fields: List of dotted paths of the fields to return (the id is always returned; not for Prometheus
+                output). If None, all fields are returned.
 
         Returns:
-            A list of service dictionaries, each containing scope and parent information.
+            A list of service dictionaries, each containing scope and parent information (a pagination.Page if limit
+            or cursor is given).
         """
-        response = []
-
-        # Handle None cases for input lists
-        node_names = node_names or []
-        site_names = site_names or []
-        service_types = service_types or []
-
-        for compute in self.list_compute(
+        query = EntityQuery(
+            "service",
             node_names=node_names,
             site_names=site_names,
+            service_types=service_types,
+            service_scope=service_scope,
+            associated_storage_area_id=associated_storage_area_id,
             include_inactive=include_inactive,
-        ):
-            if service_scope in ["all", "local"]:
-                for service in compute.get("associated_local_services", []):
-                    # Apply filters for service type and associated storage area ID
-                    if service_types and service.get("type") not in service_types:
-                        continue
-                    if associated_storage_area_id and service.get("associated_storage_area_id") != associated_storage_area_id:
-                        continue
-                    # Add parent information
-                    response.append(
-                        {
-                            "scope": "local",
-                            "parent_node_name": compute.get("parent_node_name"),
-                            "parent_site_name": compute.get("parent_site_name"),
-                            "parent_site_id": compute.get("parent_site_id"),
-                            "parent_compute_id": compute.get("id"),
-                            **service,
-                        }
-                    )
-
-            if service_scope in ["all", "global"]:
-                for service in compute.get("associated_global_services", []):
-                    # Apply filters for service type and associated storage area ID
-                    if service_types and service.get("type") not in service_types:
-                        continue
-                    if associated_storage_area_id and service.get("associated_storage_area_id") != associated_storage_area_id:
-                        continue
-                    # Add parent information
-                    response.append(
-                        {
-                            "scope": "global",
-                            "parent_node_name": compute.get("parent_node_name"),
-                            "parent_site_name": compute.get("parent_site_name"),
-                            "parent_site_id": compute.get("parent_site_id"),
-                            "parent_compute_id": compute.get("id"),
-                            **service,
-                        }
-                    )
+            fields=None if for_prometheus else fields,
+        )
+        if for_prometheus:
+            limit = cursor = None
+        rows = self._query_entities(query, as_of=as_of, limit=limit, cursor=cursor)
+        response = pagination.map_page(rows, [service for service, _ in rows])
 
         if for_prometheus:
             formatted = []
             services = self._format_services_with_targets_for_prometheus(response)
             formatted.extend(services)
             # Add RSE(storage areas) with host information
-            storages = self._get_storage_areas_with_host_for_prometheus(node_names, site_names, include_inactive)
+            storages = self._get_storage_areas_with_host_for_prometheus(node_names, site_names, include_inactive, as_of=as_of)
             formatted.extend(storages)
 
             return formatted
@@ -687,27 +1326,26 @@ class MongoBackend(Backend):
         response = schema.get("properties", {}).get("type", {}).get("enum", [])
         return response
 
-    def list_sites(self, node_names=None, include_inactive=False):
+    def list_sites(self, node_names=None, include_inactive=False, as_of=None, limit=None, cursor=None, fields=None):
         """
         Lists sites based on specified filters.
 
         Args:
             node_names: List of node names to filter sites by. If None, no node filtering is applied.
             include_inactive: Boolean to include inactive sites.
+            as_of: Optional instant (datetime or ISO 8601 string, UTC if naive) to list sites as of.
+            limit: Maximum number of sites to return, ordered by id.
+            cursor: Cursor of the page to return, from the next_cursor of the previous page.
+            fields: List of dotted paths of the fields to return (the id is always returned). If None, all fields are
+                returned.
 
         Returns:
-            A list of site dictionaries, each containing parent information.
+            A list of site dictionaries, each containing parent information (a pagination.Page if limit or cursor is
+            given).
         """
-        node_names = node_names or []
-        response = []
-        for node in self.list_nodes(include_inactive=include_inactive):
-            parent_node_name = node.get("name")
-            for site in node.get("sites", []):
-                if node_names:
-                    if parent_node_name not in node_names:
-                        continue
-                response.append({"parent_node_name": parent_node_name, **site})
-        return response
+        query = EntityQuery("site", node_names=node_names, include_inactive=include_inactive, fields=fields)
+        rows = self._query_entities(query, as_of=as_of, limit=limit, cursor=cursor)
+        return pagination.map_page(rows, [site for site, _ in rows])
 
     def list_storages(
         self,
@@ -716,6 +1354,10 @@ class MongoBackend(Backend):
         topojson=False,
         for_grafana=False,
         include_inactive=False,
+        as_of=None,
+        limit=None,
+        cursor=None,
+        fields=None,
     ):
         """
         Lists storage resources based on specified filters.
@@ -726,13 +1368,23 @@ class MongoBackend(Backend):
             topojson: Boolean to return data in TopoJSON format.
             for_grafana: Boolean to return data formatted for Grafana.
             include_inactive: Boolean to include inactive storages.
+            as_of: Optional instant (datetime or ISO 8601 string, UTC if naive) to list storages as of.
+            limit: Maximum number of storages to return, ordered by id (not for TopoJSON output).
+            cursor: Cursor of the page to return, from the next_cursor of the previous page.
+            fields: List of dotted paths of the fields to return (the id is always returned; not for TopoJSON or
+                Grafana output). If None, all fields are returned.
 
         Returns:
             A list of storage dictionaries, each containing parent information,
-            or a TopoJSON object if `topojson` is True.
+            or a TopoJSON object if `topojson` is True (a pagination.Page if limit or cursor is given otherwise).
         """
-        node_names = node_names or []
-        site_names = site_names or []
+        query = EntityQuery(
+            "storage",
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            fields=None if topojson or for_grafana else fields,
+        )
         if topojson:
             response = {
                 "type": "Topology",
@@ -740,44 +1392,33 @@ class MongoBackend(Backend):
             }
         else:
             response = []
-        for site in self.list_sites(node_names=node_names, include_inactive=include_inactive):
-            parent_site_name = site.get("name")
-            parent_site_id = site.get("id")
-            for storage in site.get("storages", []):
-                if site_names:
-                    if parent_site_name not in site_names:
-                        continue
-                if topojson:
-                    response["objects"]["sites"]["geometries"].append(
-                        {
-                            "type": "Point",
-                            "coordinates": [
-                                site.get("longitude"),
-                                site.get("latitude"),
-                            ],
-                            "properties": {"name": storage.get("name")},
-                        }
-                    )
-                elif for_grafana:
-                    response.append(
-                        {
-                            "key": storage.get("name"),
-                            "latitude": site["latitude"],
-                            "longitude": site["longitude"],
-                            "name": storage.get("name"),
-                        }
-                    )
-                else:
-                    # Add parent information
-                    response.append(
-                        {
-                            "parent_node_name": site.get("parent_node_name"),
-                            "parent_site_name": parent_site_name,
-                            "parent_site_id": parent_site_id,
-                            **storage,
-                        }
-                    )
-        return response
+        if topojson:
+            limit = cursor = None
+        rows = self._query_entities(query, as_of=as_of, limit=limit, cursor=cursor)
+        for storage, site in rows:
+            if topojson:
+                response["objects"]["sites"]["geometries"].append(
+                    {
+                        "type": "Point",
+                        "coordinates": [
+                            site.get("longitude"),
+                            site.get("latitude"),
+                        ],
+                        "properties": {"name": storage.get("name")},
+                    }
+                )
+            elif for_grafana:
+                response.append(
+                    {
+                        "key": storage.get("name"),
+                        "latitude": site.get("latitude"),
+                        "longitude": site.get("longitude"),
+                        "name": storage.get("name"),
+                    }
+                )
+            else:
+                response.append(storage)
+        return response if topojson else pagination.map_page(rows, response)
 
     def list_storage_areas(
         self,
@@ -786,6 +1427,10 @@ class MongoBackend(Backend):
         topojson=False,
         for_grafana=False,
         include_inactive=False,
+        as_of=None,
+        limit=None,
+        cursor=None,
+        fields=None,
     ):
         """
         Lists storage areas based on specified filters.
@@ -796,14 +1441,23 @@ class MongoBackend(Backend):
             topojson: Boolean to return data in TopoJSON format.
             for_grafana: Boolean to return data formatted for Grafana.
             include_inactive: Boolean to include inactive storage areas.
+            as_of: Optional instant (datetime or ISO 8601 string, UTC if naive) to list storage areas as of.
+            limit: Maximum number of storage areas to return, ordered by id (not for TopoJSON output).
+            cursor: Cursor of the page to return, from the next_cursor of the previous page.
+            fields: List of dotted paths of the fields to return (the id is always returned; not for TopoJSON or
+                Grafana output). If None, all fields are returned.
 
         Returns:
             A list of storage area dictionaries, each containing parent information,
-            or a TopoJSON object if `topojson` is True.
+            or a TopoJSON object if `topojson` is True (a pagination.Page if limit or cursor is given otherwise).
         """
-        node_names = node_names or []
-        site_names = site_names or []
-
+        query = EntityQuery(
+            "storage_area",
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            fields=None if topojson or for_grafana else fields,
+        )
         if topojson:
             response = {
                 "type": "Topology",
@@ -811,49 +1465,30 @@ class MongoBackend(Backend):
             }
         else:
             response = []
-        for storage in self.list_storages(
-            node_names=node_names,
-            site_names=site_names,
-            include_inactive=include_inactive,
-        ):
-            parent_storage = self.get_site_from_names(
-                node_name=storage.get("parent_node_name"),
-                node_version="latest",
-                site_name=storage.get("parent_site_name"),
-            )
-            site_latitude = parent_storage.get("latitude")
-            site_longitude = parent_storage.get("longitude")
-            for storage_area in storage.get("areas", []):
-                if topojson:
-                    print()
-                    response["objects"]["sites"]["geometries"].append(
-                        {
-                            "type": "Point",
-                            "coordinates": [site_longitude, site_latitude],
-                            "properties": {"name": storage_area.get("name")},
-                        }
-                    )
-                elif for_grafana:
-                    response.append(
-                        {
-                            "key": storage_area.get("name"),
-                            "latitude": site_latitude,
-                            "longitude": site_longitude,
-                            "name": storage_area.get("name"),
-                        }
-                    )
-                else:
-                    # Add parent information
-                    response.append(
-                        {
-                            "parent_node_name": storage.get("parent_node_name"),
-                            "parent_site_name": storage.get("parent_site_name"),
-                            "parent_site_id": storage.get("parent_site_id"),
-                            "parent_storage_id": storage.get("id"),
-                            **storage_area,
-                        }
-                    )
-        return response
+        if topojson:
+            limit = cursor = None
+        rows = self._query_entities(query, as_of=as_of, limit=limit, cursor=cursor)
+        for storage_area, site in rows:
+            if topojson:
+                response["objects"]["sites"]["geometries"].append(
+                    {
+                        "type": "Point",
+                        "coordinates": [site.get("longitude"), site.get("latitude")],
+                        "properties": {"name": storage_area.get("name")},
+                    }
+                )
+            elif for_grafana:
+                response.append(
+                    {
+                        "key": storage_area.get("name"),
+                        "latitude": site.get("latitude"),
+                        "longitude": site.get("longitude"),
+                        "name": storage_area.get("name"),
+                    }
+                )
+            else:
+                response.append(storage_area)
+        return response if topojson else pagination.map_page(rows, response)
 
     def list_storage_area_types_from_schema(self, schema):
         """
@@ -883,32 +1518,14 @@ class MongoBackend(Backend):
             flag (bool): The value to set for the `is_force_disabled` flag.
 
         Returns:
-            dict: The updated site dictionary if the site is found and updated,
+            dict: A dictionary containing the `site_id` and the new `is_force_disabled` value,
                   or an empty dictionary if the site is not found.
         """
-        client = self._get_mongo_client()
-        db = client[self.mongo_database]
-        nodes = db.nodes
-        node = nodes.find_one({"sites.id": site_id})
-        if not node:
-            return {}
-
-        updated_node = copy.deepcopy(node)
-        updated_site = None
-        for site in updated_node.get("sites", []):
-            if site.get("id") == site_id:
-                site["is_force_disabled"] = flag
-                updated_site = site
-                break
-
-        if updated_site is None:
+        if not self._set_entity_field("site", site_id, "is_force_disabled", flag):
             return {}
-
-        # Pass the modified node to add_edit_node
-        self.add_edit_node(updated_node, node_name=updated_node.get("name"))
         return {
             "site_id": site_id,
-            "is_force_disabled": updated_site.get("is_force_disabled"),
+            "is_force_disabled": flag,
         }
 
     def set_compute_force_disabled_flag(self, compute_id: str, flag: bool):
@@ -926,52 +1543,19 @@ class MongoBackend(Backend):
             dict: A dictionary containing the `compute_id` and the new `is_force_disabled` value,
                   or an empty dictionary if the compute resource is not found.
         """
-        client = self._get_mongo_client()
-        db = client[self.mongo_database]
-        nodes = db.nodes
-
-        # Get the compute with parent context
-        compute = self.get_compute(compute_id)
-        if not compute:
-            return {}
-        parent_node_name = compute.get("parent_node_name")
-        parent_site_name = compute.get("parent_site_name")
-
-        # Find the full node document by node name
-        node = nodes.find_one({"name": parent_node_name})
-        if not node:
+        if not self._set_entity_field("compute", compute_id, "is_force_disabled", flag):
             return {}
-
-        updated_node = copy.deepcopy(node)
-        updated_compute = None
-        for site in updated_node.get("sites", []):
-            if site.get("name") != parent_site_name:
-                continue
-            for compute in site.get("compute", []):
-                if compute.get("id") == compute_id:
-                    compute["is_force_disabled"] = flag
-                    updated_compute = compute
-                    break
-            if updated_compute:
-                break
-
-        if updated_compute is None:
-            return {}
-
-        # Pass the modified node to add_edit_node
-        self.add_edit_node(updated_node, node_name=parent_node_name)
         return {
             "compute_id": compute_id,
-            "is_force_disabled": updated_compute.get("is_force_disabled"),
+            "is_force_disabled": flag,
         }
 
     def set_service_force_disabled_flag(self, service_id: str, flag: bool):
         """
         Sets the 'is_force_disabled' flag for a specific service.
 
-        This method locates the service by its ID, determines whether it is a global
-        or local service, and updates the `is_force_disabled` field accordingly within
-        the compute configuration of the appropriate site in the MongoDB `nodes` collection.
+        This method updates the `is_force_disabled` field for the service identified by `service_id`
+        within the local or global services of a compute entry in the MongoDB `nodes` collection.
 
         Args:
             service_id (str): The ID of the service to update.
@@ -981,50 +1565,17 @@ class MongoBackend(Backend):
             dict: A dictionary containing the updated service ID and status,
                   or an empty dictionary if the service is not found.
         """
-        client = self._get_mongo_client()
-        db = client[self.mongo_database]
-        nodes = db.nodes
-
-        # Get the service with parent context
-        service = self.get_service(service_id)
-        if not service:
-            return {}
-        parent_node_name = service.get("parent_node_name")
-        parent_site_name = service.get("parent_site_name")
-        parent_compute_id = service.get("parent_compute_id")
-        service_scope = service.get("scope")
-
-        # Find the full node document by node name
-        node = nodes.find_one({"name": parent_node_name})
-        if not node:
-            return {}
-
-        updated_node = copy.deepcopy(node)
-        updated_service = None
-        for site in updated_node.get("sites", []):
-            if site.get("name") != parent_site_name:
-                continue
-            for compute in site.get("compute", []):
-                if compute.get("id") != parent_compute_id:
-                    continue
-                for svc in compute.get("associated_{}_services".format(service_scope), []):
-                    if svc.get("id") == service_id:
-                        svc["is_force_disabled"] = flag
-                        updated_service = svc
-                        break
-                if updated_service:
-                    break
-            if updated_service:
-                break
-
-        if not updated_service:
-            return {}
-
-        self.add_edit_node(updated_node, node_name=parent_node_name)
-        return {
-            "service_id": service_id,
-            "is_force_disabled": updated_service.get("is_force_disabled"),
-        }
+        # Try the scope known to the snapshot (if any) first, without reloading it
+        scopes = ["local", "global"]
+        if self._snapshot.get("service", service_id).get("scope") == "global":
+            scopes.reverse()
+        for scope in scopes:
+            if self._set_entity_field("service", service_id, "is_force_disabled", flag, scope=scope):
+                return {
+                    "service_id": service_id,
+                    "is_force_disabled": flag,
+                }
+        return {}
 
     def set_storage_force_disabled_flag(self, storage_id: str, flag: bool):
         """
@@ -1041,44 +1592,11 @@ class MongoBackend(Backend):
             dict: A dictionary containing the `storage_id` and the new `is_force_disabled` value,
                   or an empty dictionary if the storage resource is not found.
         """
-        client = self._get_mongo_client()
-        db = client[self.mongo_database]
-        nodes = db.nodes
-
-        # Get the storage with parent context
-        storage = self.get_storage(storage_id)
-        if not storage:
+        if not self._set_entity_field("storage", storage_id, "is_force_disabled", flag):
             return {}
-        parent_node_name = storage.get("parent_node_name")
-        parent_site_name = storage.get("parent_site_name")
-
-        # Find the full node document by node name
-        node = nodes.find_one({"name": parent_node_name})
-        if not node:
-            return {}
-
-        updated_node = copy.deepcopy(node)
-        updated_storage = None
-        for site in updated_node.get("sites", []):
-            if site.get("name") != parent_site_name:
-                continue
-            for storage in site.get("storages", []):
-                if storage.get("id") == storage_id:
-                    storage["is_force_disabled"] = flag
-                    updated_storage = storage
-                    break
-            if updated_storage:
-                break
-
-        if not updated_storage:
-            return {}
-
-        # Pass the modified node to add_edit_node
-        self.add_edit_node(updated_node, node_name=parent_node_name)
-
         return {
             "storage_id": storage_id,
-            "is_force_disabled": updated_storage.get("is_force_disabled"),
+            "is_force_disabled": flag,
         }
 
     def set_storage_area_force_disabled_flag(self, storage_area_id: str, flag: bool):
@@ -1097,47 +1615,9 @@ class MongoBackend(Backend):
             dict: A dictionary containing the `storage_area_id` and the new `is_force_disabled` value,
                   or an empty dictionary if the storage area is not found.
         """
-        client = self._get_mongo_client()
-        db = client[self.mongo_database]
-        nodes = db.nodes
-
-        # Get the storage area with parent context
-        storage_area = self.get_storage_area(storage_area_id)
-        if not storage_area:
-            return {}
-        parent_node_name = storage_area.get("parent_node_name")
-        parent_site_name = storage_area.get("parent_site_name")
-        parent_storage_id = storage_area.get("parent_storage_id")
-
-        # Load the full node document
-        node = nodes.find_one({"name": parent_node_name})
-        if not node:
+        if not self._set_entity_field("storage_area", storage_area_id, "is_force_disabled", flag):
             return {}
-
-        updated_node = copy.deepcopy(node)
-        updated_storage_area = None
-        for site in updated_node.get("sites", []):
-            if site.get("name") != parent_site_name:
-                continue
-            for storage in site.get("storages", []):
-                if storage.get("id") != parent_storage_id:
-                    continue
-                for area in storage.get("areas", []):
-                    if area.get("id") == storage_area_id:
-                        area["is_force_disabled"] = flag
-                        updated_storage_area = area
-                        break
-                if updated_storage_area:
-                    break
-            if updated_storage_area:
-                break
-        if not updated_storage_area:
-            return {}
-
-        # Pass the modified node to add_edit_node
-        self.add_edit_node(updated_node, node_name=parent_node_name)
-
         return {
             "storage_area_id": storage_area_id,
-            "is_force_disabled": updated_storage_area.get("is_force_disabled"),
+            "is_force_disabled": flag,
         }
@@ -0,0 +1,105 @@
+import threading
+
+from prometheus_client import Counter, Gauge, Histogram
+from pymongo import monitoring
+
+MONGO_POOL_CHECKED_OUT_CONNECTIONS = Gauge(
+    "scapi_mongo_pool_checked_out_connections",
+    "Number of MongoDB connections currently checked out of the pool.",
+)
+MONGO_POOL_CHECKOUT_WAIT_SECONDS = Histogram(
+    "scapi_mongo_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the MongoDB pool.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10),
+)
+MONGO_POOL_EXHAUSTED_TOTAL = Counter(
+    "scapi_mongo_pool_exhausted_total",
+    "Number of MongoDB connection checkouts that timed out waiting for a free connection.",
+)
+
+
+class ConnectionPoolStatistics(monitoring.ConnectionPoolListener):
+    """Connection pool listener keeping running statistics for a MongoDB client.
+
+    Statistics are kept locally (see as_dict()) and mirrored to Prometheus metrics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all statistics, e.g. after a fork when the pool is recreated."""
+        with self._lock:
+            self.checked_out = 0
+            self.open_connections = 0
+            self.total_checkouts = 0
+            self.total_checkout_wait_s = 0.0
+            self.max_checkout_wait_s = 0.0
+            self.failed_checkouts = 0
+            self.exhausted_checkouts = 0
+            self.pool_clears = 0
+
+    def as_dict(self):
+        """Return a snapshot of the statistics."""
+        with self._lock:
+            return {
+                "checked_out_connections": self.checked_out,
+                "open_connections": self.open_connections,
+                "total_checkouts": self.total_checkouts,
+                "mean_checkout_wait_s": (self.total_checkout_wait_s / self.total_checkouts) if self.total_checkouts else 0.0,
+                "max_checkout_wait_s": self.max_checkout_wait_s,
+                "failed_checkouts": self.failed_checkouts,
+                "pool_exhausted_events": self.exhausted_checkouts,
+                "pool_clears": self.pool_clears,
+            }
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections = max(self.open_connections - 1, 0)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.failed_checkouts += 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.exhausted_checkouts += 1
+                MONGO_POOL_EXHAUSTED_TOTAL.inc()
+
+    def connection_checked_out(self, event):
+        # <duration> is only reported by pymongo >= 4.7.
+        wait_s = getattr(event, "duration", None) or 0.0
+        with self._lock:
+            self.checked_out += 1
+            self.total_checkouts += 1
+            self.total_checkout_wait_s += wait_s
+            self.max_checkout_wait_s = max(self.max_checkout_wait_s, wait_s)
+        MONGO_POOL_CHECKED_OUT_CONNECTIONS.inc()
+        MONGO_POOL_CHECKOUT_WAIT_SECONDS.observe(wait_s)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+        MONGO_POOL_CHECKED_OUT_CONNECTIONS.dec()
@@ -0,0 +1,107 @@
+"""Point-in-time ("as of") topology queries.
+
+Every version of a node carries a last_updated_at timestamp (naive UTC, ISO 8601) - in the nodes and nodes_archived
+documents, and in the nodes_changes records of versions produced by a field change - so the version of a node in
+effect at an instant is the latest version whose timestamp is not after it. ISO 8601 strings in the same format sort
+chronologically, so this is resolved for all nodes at once with one indexed range query on (name, last_updated_at)
+per collection.
+
+History before an instant that is safely in the past can no longer change (other than by deleting a node), so the
+topology resolved for such instants is cached.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import dateutil.parser
+
+TIMESTAMP_FIELD = "last_updated_at"
+
+# Instants more recent than this (in seconds) are not cached, as writes from other workers may still be in flight.
+CACHE_MIN_AGE_S = 60
+
+
+def parse_as_of(as_of):
+    """
+    Parses an "as of" instant.
+
+    Args:
+        as_of: A datetime or ISO 8601 string. Naive values are taken to be UTC.
+
+    Returns:
+        A naive UTC datetime.
+
+    Raises:
+        ValueError: If the instant cannot be parsed.
+    """
+    if not isinstance(as_of, datetime):
+        try:
+            as_of = dateutil.parser.isoparse(str(as_of).strip())
+        except ValueError:
+            raise ValueError("Invalid as_of timestamp: {}".format(as_of))
+    if as_of.tzinfo is not None:
+        as_of = as_of.astimezone(timezone.utc).replace(tzinfo=None)
+    return as_of
+
+
+def format_timestamp(instant):
+    """Formats a naive UTC datetime for comparison with stored last_updated_at timestamps."""
+    return instant.isoformat(timespec="microseconds")
+
+
+def build_versions_as_of_pipeline(timestamp, max_versions=None):
+    """
+    Builds an aggregation pipeline resolving the latest version of every node last updated at or before <timestamp>.
+
+    Args:
+        timestamp: The instant, formatted with format_timestamp.
+        max_versions: Optional (non-empty) mapping of node name to the highest version to consider. Nodes missing
+            from it are ignored.
+
+    Returns:
+        The pipeline, yielding one {"_id": <node name>, "version": <version>} row per node.
+    """
+    match = {
+        "$or": [
+            {TIMESTAMP_FIELD: {"$lte": timestamp}},
+            # the first version of nodes added before last_updated_at was set on creation
+            {TIMESTAMP_FIELD: None, "created_at": {"$lte": timestamp}},
+        ]
+    }
+    if max_versions is not None:
+        versions_match = {"$or": [{"name": name, "version": {"$lte": version}} for name, version in max_versions.items()]}
+        match = {"$and": [match, versions_match]}
+    return [{"$match": match}, {"$group": {"_id": "$name", "version": {"$max": "$version"}}}]
+
+
+class AsOfCache:
+    """Least recently used cache of the topology resolved for past instants."""
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            nodes = self._entries.get(key)
+            if nodes is not None:
+                self._entries.move_to_end(key)
+            return nodes
+
+    def put(self, key, nodes, instant):
+        """Cache the nodes resolved for <instant> (a naive UTC datetime), unless it is too recent."""
+        if self.max_entries <= 0:
+            return
+        if (datetime.now(timezone.utc).replace(tzinfo=None) - instant).total_seconds() < CACHE_MIN_AGE_S:
+            return
+        with self._lock:
+            self._entries[key] = nodes
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
@@ -0,0 +1,155 @@
+"""Cross-process invalidation of in-memory topology state.
+
+Each worker process keeps its own caches (e.g. the topology snapshot). TopologyWatcher runs a background thread that
+follows writes made by any process, including operators editing the database directly, through a MongoDB change
+stream on the node collections, or by polling them where change streams are unavailable (e.g. a standalone mongod).
+"""
+
+import logging
+import threading
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Collections whose changes affect the topology or its history.
+WATCHED_COLLECTIONS = ("nodes", "nodes_archived", "nodes_changes")
+
+
+class TopologyRevision:
+    """A monotonically increasing topology revision number.
+
+    The revision is advanced on every local write and every change seen by the watcher. Changes seen through a change
+    stream advance it to (at least) the change's cluster time, so workers that have applied the same changes report
+    comparable revisions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+
+    @property
+    def value(self):
+        return self._value
+
+    def advance(self, at_least=None):
+        """Advance the revision by one, or to <at_least> if that is greater, and return it."""
+        with self._lock:
+            self._value = max(self._value + 1, at_least or 0)
+            return self._value
+
+
+def cluster_time_to_revision(cluster_time):
+    """Convert a BSON timestamp (e.g. a change event's clusterTime) to an integer revision."""
+    if cluster_time is None:
+        return None
+    return (cluster_time.time << 32) | cluster_time.inc
+
+
+class TopologyWatcher:
+    """Background thread following changes to the node collections."""
+
+    def __init__(self, get_database, revision, on_node_changed, on_reset, poll_interval_s=5.0):
+        """
+        Args:
+            get_database: Callable returning the MongoDB database to watch.
+            revision: TopologyRevision to advance on every change.
+            on_node_changed: Callback taking the full, latest document of a node that was inserted or updated.
+            on_reset: Callback invoked when changes cannot be applied node by node (e.g. deletions, or any change
+                detected by polling), which should drop all cached state.
+            poll_interval_s: Interval between polls when change streams are unavailable.
+        """
+        self.get_database = get_database
+        self.revision = revision
+        self.on_node_changed = on_node_changed
+        self.on_reset = on_reset
+        self.poll_interval_s = poll_interval_s
+        self.mode = None  # "change_stream" or "polling" once started
+
+        self._resume_token = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start following changes in a daemon thread."""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="topology-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stop following changes."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                if self.mode == "polling":
+                    self._poll()
+                else:
+                    self._watch()
+            except (OperationFailure, NotImplementedError) as err:
+                # e.g. "The $changeStream stage is only supported on replica sets"
+                logger.warning("Change streams are unavailable, polling for topology changes instead: %s", err)
+                self.mode = "polling"
+            except PyMongoError as err:
+                logger.error("Error following topology changes, retrying: %s", err)
+                self._stop_event.wait(self.poll_interval_s)
+            except Exception:
+                # e.g. a failing callback; keep the thread alive, but drop any cached state that may now be stale
+                logger.exception("Unexpected error following topology changes, retrying")
+                self.on_reset()
+                self._stop_event.wait(self.poll_interval_s)
+
+    def _watch(self):
+        db = self.get_database()
+        pipeline = [{"$match": {"ns.coll": {"$in": list(WATCHED_COLLECTIONS)}}}]
+        with db.watch(pipeline, full_document="updateLookup", resume_after=self._resume_token, max_await_time_ms=1000) as stream:
+            self.mode = "change_stream"
+            # Changes made before the stream was opened (or while it was down) cannot be replayed, so start afresh.
+            if self._resume_token is None:
+                self.on_reset()
+                self.revision.advance()
+            while not self._stop_event.is_set() and stream.alive:
+                change = stream.try_next()
+                self._resume_token = stream.resume_token
+                if change is not None:
+                    self.handle_change(change)
+
+    def handle_change(self, change):
+        """Apply a change stream event to the local caches."""
+        collection = change.get("ns", {}).get("coll")
+        operation_type = change.get("operationType")
+        if collection == "nodes":
+            full_document = change.get("fullDocument")
+            if operation_type in ("insert", "replace", "update") and full_document:
+                self.on_node_changed(full_document)
+            else:
+                self.on_reset()
+        self.revision.advance(at_least=cluster_time_to_revision(change.get("clusterTime")))
+
+    def _get_fingerprint(self, db):
+        """Get a summary of the node collections that changes on every write."""
+        return (
+            sorted((node.get("name"), node.get("version"), str(node.get("_id"))) for node in db.nodes.find({}, {"name": 1, "version": 1})),
+            db.nodes_archived.estimated_document_count(),
+            db.nodes_changes.estimated_document_count(),
+        )
+
+    def _poll(self):
+        db = self.get_database()
+        fingerprint = self._get_fingerprint(db)
+        while not self._stop_event.wait(self.poll_interval_s):
+            latest_fingerprint = self._get_fingerprint(db)
+            if latest_fingerprint != fingerprint:
+                fingerprint = latest_fingerprint
+                self.on_reset()
+                self.revision.advance()
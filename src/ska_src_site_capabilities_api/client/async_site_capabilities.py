@@ -0,0 +1,945 @@
+import asyncio
+import json
+from typing import List
+
+import httpx
+
+from ska_src_site_capabilities_api.common.exceptions import handle_async_client_exceptions
+from ska_src_site_capabilities_api.common.pagination import NEXT_CURSOR_HEADER
+
+
+class AsyncSiteCapabilitiesClient:
+    """Asynchronous counterpart of SiteCapabilitiesClient, built on a pooled httpx.AsyncClient.
+
+    Connections are kept alive and reused across requests (and multiplexed over HTTP/2 if enabled, which requires the
+    h2 package), so concurrent lookups share a bounded pool instead of serialising. Use gather() to fan out many
+    requests with bounded concurrency. The client should be closed with aclose(), or used as an async context manager.
+    """
+
+    def __init__(
+        self,
+        api_url,
+        client=None,
+        calling_service=None,
+        http2=False,
+        max_connections=100,
+        max_keepalive_connections=20,
+        keepalive_expiry_s=5.0,
+        timeout_s=30.0,
+        max_concurrency=16,
+        transport=None,
+    ):
+        """
+        :param str api_url: The url of the API (including the version prefix).
+        :param client: An existing httpx.AsyncClient to use (the pool options are then ignored).
+        :param str calling_service: The name of the calling service, sent in the X-Calling-Service header.
+        :param bool http2: Negotiate HTTP/2 with the server (requires the h2 package).
+        :param int max_connections: Maximum number of pooled connections.
+        :param int max_keepalive_connections: Maximum number of idle connections kept alive.
+        :param float keepalive_expiry_s: Time after which an idle connection is closed.
+        :param float timeout_s: Timeout of each request.
+        :param int max_concurrency: Default maximum number of requests in flight in gather().
+        :param transport: An httpx transport, e.g. httpx.ASGITransport(app=app) to call the app in-process.
+        """
+        self.api_url = api_url
+        self.calling_service = calling_service or "unknown"
+        self.max_concurrency = max_concurrency
+        if client:
+            self.client = client
+        else:
+            self.client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry_s,
+                ),
+                timeout=timeout_s,
+                transport=transport,
+            )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the pooled connections."""
+        await self.client.aclose()
+
+    def _get_headers(self):
+        """Build common headers for requests including calling service.
+
+        :return: Dictionary of headers.
+        :rtype: dict
+        """
+        headers = {
+            "X-Calling-Service": self.calling_service,
+        }
+        return headers
+
+    async def _get(self, url, params=None):
+        """Send a GET request.
+
+        :param str url: The url.
+        :param params: Query parameters (those set to None are not sent).
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        resp = await self.client.get(url, params=params, headers=self._get_headers())
+        resp.raise_for_status()
+        return resp
+
+    async def _put(self, url):
+        """Send a PUT request.
+
+        :param str url: The url.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        resp = await self.client.put(url, headers=self._get_headers())
+        resp.raise_for_status()
+        return resp
+
+    async def gather(self, *aws, max_concurrency=None, return_exceptions=False):
+        """Await coroutines concurrently, with at most max_concurrency of them running at a time.
+
+        :param aws: The coroutines, e.g. client.get_storage_area(storage_area_id) for many ids.
+        :param int max_concurrency: The maximum number of coroutines running at a time (defaults to the client's).
+        :param bool return_exceptions: Return exceptions as results rather than raising the first one.
+
+        :return: The results, in the order of the coroutines.
+        :rtype: list
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def run(aw):
+            async with semaphore:
+                return await aw
+
+        return await asyncio.gather(*(run(aw) for aw in aws), return_exceptions=return_exceptions)
+
+    async def _iter_pages(self, list_method, page_size, **kwargs):
+        """Iterate over all items of a paginated list, following the next page cursor of each response.
+
+        :param list_method: The list method to call for each page.
+        :param int page_size: The number of items to request per page.
+        :param kwargs: Other arguments of the list method.
+
+        :return: An async generator of items.
+        """
+        cursor = None
+        while True:
+            resp = await list_method(limit=page_size, cursor=cursor, **kwargs)
+            for item in resp.json():
+                yield item
+            cursor = resp.headers.get(NEXT_CURSOR_HEADER)
+            if not cursor:
+                break
+
+    async def _get_many(self, batch_endpoint, ids, chunk_size):
+        """Get entities from a batch endpoint, requesting chunks of their ids concurrently.
+
+        :param str batch_endpoint: The url of the batch endpoint.
+        :param ids: The ids of the entities.
+        :param int chunk_size: The maximum number of ids to request at a time.
+
+        :return: A dictionary with the entities found keyed by id ("found"), and a list of the ids not found ("not_found").
+        :rtype: dict
+        """
+        ids = list(dict.fromkeys(ids))
+        chunks = []
+        for start in range(0, len(ids), chunk_size):
+            end = start + chunk_size
+            chunks.append(ids[start:end])
+        responses = await self.gather(*(self._get(batch_endpoint, params={"ids": ",".join(chunk)}) for chunk in chunks))
+        result = {"found": {}, "not_found": []}
+        for resp in responses:
+            batch = resp.json()
+            result["found"].update(batch.get("found", {}))
+            result["not_found"].extend(batch.get("not_found", []))
+        return result
+
+    def get_add_node_www_url(self):
+        """Get the url to add a node.
+
+        :return: The url.
+        """
+        return "{api_url}/www/nodes".format(api_url=self.api_url)
+
+    def get_edit_node_www_url(self, node_name):
+        """Get the url to edit a node.
+
+        :return: The url.
+        """
+        return "{api_url}/www/nodes/{node_name}".format(api_url=self.api_url, node_name=node_name)
+
+    @handle_async_client_exceptions
+    async def get_compute(self, compute_id: str):
+        """Get description of a compute element from an identifier.
+
+        :param str compute_id: The unique compute id.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get("{api_url}/compute/{compute_id}".format(api_url=self.api_url, compute_id=compute_id))
+
+    @handle_async_client_exceptions
+    async def get_compute_many(self, compute_ids: List[str], chunk_size: int = 100):
+        """Get descriptions of compute elements from identifiers, requesting at most chunk_size at a time.
+
+        :param compute_ids: The unique compute element ids.
+        :param int chunk_size: The maximum number of ids per request (at most the server's BATCH_GET_MAX_IDS).
+
+        :return: A dictionary with the compute elements found keyed by id ("found"), and a list of the ids not found ("not_found").
+        :rtype: dict
+        """
+        return await self._get_many("{api_url}/compute/batch".format(api_url=self.api_url), compute_ids, chunk_size)
+
+    @handle_async_client_exceptions
+    async def get_schema(self, schema: str):
+        """Get a schema.
+
+        :param str schema: The name of the schema.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get("{api_url}/schemas/{schema}".format(api_url=self.api_url, schema=schema))
+
+    @handle_async_client_exceptions
+    async def get_service(self, service_id: str):
+        """Get description of a service from an identifier.
+
+        :param str service_id: The unique service id.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get("{api_url}/services/{service_id}".format(api_url=self.api_url, service_id=service_id))
+
+    @handle_async_client_exceptions
+    async def get_service_many(self, service_ids: List[str], chunk_size: int = 100):
+        """Get descriptions of services from identifiers, requesting at most chunk_size at a time.
+
+        :param service_ids: The unique service ids.
+        :param int chunk_size: The maximum number of ids per request (at most the server's BATCH_GET_MAX_IDS).
+
+        :return: A dictionary with the services found keyed by id ("found"), and a list of the ids not found ("not_found").
+        :rtype: dict
+        """
+        return await self._get_many("{api_url}/services/batch".format(api_url=self.api_url), service_ids, chunk_size)
+
+    @handle_async_client_exceptions
+    async def get_storage(self, storage_id: str):
+        """Get description of a storage from an identifier.
+
+        :param str storage_id: The unique storage id.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get("{api_url}/storages/{storage_id}".format(api_url=self.api_url, storage_id=storage_id))
+
+    @handle_async_client_exceptions
+    async def get_storage_many(self, storage_ids: List[str], chunk_size: int = 100):
+        """Get descriptions of storages from identifiers, requesting at most chunk_size at a time.
+
+        :param storage_ids: The unique storage ids.
+        :param int chunk_size: The maximum number of ids per request (at most the server's BATCH_GET_MAX_IDS).
+
+        :return: A dictionary with the storages found keyed by id ("found"), and a list of the ids not found ("not_found").
+        :rtype: dict
+        """
+        return await self._get_many("{api_url}/storages/batch".format(api_url=self.api_url), storage_ids, chunk_size)
+
+    @handle_async_client_exceptions
+    async def get_storage_area(self, storage_area_id: str):
+        """Get description of a storage area from an identifier.
+
+        :param str storage_area_id: The unique storage area id.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get("{api_url}/storage-areas/{storage_area_id}".format(api_url=self.api_url, storage_area_id=storage_area_id))
+
+    @handle_async_client_exceptions
+    async def get_storage_area_many(self, storage_area_ids: List[str], chunk_size: int = 100):
+        """Get descriptions of storage areas from identifiers, requesting at most chunk_size at a time.
+
+        :param storage_area_ids: The unique storage area ids.
+        :param int chunk_size: The maximum number of ids per request (at most the server's BATCH_GET_MAX_IDS).
+
+        :return: A dictionary with the storage areas found keyed by id ("found"), and a list of the ids not found ("not_found").
+        :rtype: dict
+        """
+        return await self._get_many("{api_url}/storage-areas/batch".format(api_url=self.api_url), storage_area_ids, chunk_size)
+
+    @handle_async_client_exceptions
+    async def get_node_version(self, node_name: str, node_version: str = "latest"):
+        """Get description of a node version.
+
+        :param str node_name: The unique name of the node.
+        :param str node_version: The version of the node (default to "latest").
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get(f"{self.api_url}/nodes/{node_name}", params={"node_version": node_version})
+
+    @handle_async_client_exceptions
+    async def get_site_from_node_version(self, node_name: str, site_name: str, node_version: str = "latest"):
+        """Get description of a site from a specific node version.
+
+        :param str node_name: The name of the node.
+        :param str site_name: The name of the site associated with the node.
+        :param str node_version: The version of the node (default to "latest").
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get(f"{self.api_url}/nodes/{node_name}/sites/{site_name}", params={"node_version": node_version})
+
+    @handle_async_client_exceptions
+    async def get_site_from_id(self, site_id: str):
+        """Get description of a site from an identifier.
+
+        :param str site_id: The unique identifier of the site.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get(f"{self.api_url}/sites/{site_id}")
+
+    @handle_async_client_exceptions
+    async def get_queue_from_id(self, queue_id: str):
+        """Get Queue from ID.
+
+        :param str queue_id: Unique queue identifier
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get("{api_url}/queues/{queue_id}".format(api_url=self.api_url, queue_id=queue_id))
+
+    @handle_async_client_exceptions
+    async def get_queue_many(self, queue_ids: List[str], chunk_size: int = 100):
+        """Get descriptions of queues from identifiers, requesting at most chunk_size at a time.
+
+        :param queue_ids: The unique queue ids.
+        :param int chunk_size: The maximum number of ids per request (at most the server's BATCH_GET_MAX_IDS).
+
+        :return: A dictionary with the queues found keyed by id ("found"), and a list of the ids not found ("not_found").
+        :rtype: dict
+        """
+        return await self._get_many("{api_url}/queues/batch".format(api_url=self.api_url), queue_ids, chunk_size)
+
+    @handle_async_client_exceptions
+    async def dump_nodes(self):
+        """Dump all information about all available nodes (see iter_dump_nodes to stream the dump instead).
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get(f"{self.api_url}/nodes/dump")
+
+    async def iter_dump_nodes(self):
+        """Iterate over all versions of all nodes, streaming the dump rather than loading it into memory.
+
+        :return: An async generator of node versions.
+        """
+        headers = {**self._get_headers(), "Accept-Encoding": "gzip"}
+        async with self.client.stream("GET", f"{self.api_url}/nodes/dump", params={"format": "ndjson"}, headers=headers) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if line:
+                    yield json.loads(line)
+
+    @handle_async_client_exceptions
+    async def health(self):
+        """Get API health.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get("{api_url}/health".format(api_url=self.api_url))
+
+    @handle_async_client_exceptions
+    async def ping(self):
+        """Ping the API.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get("{api_url}/ping".format(api_url=self.api_url))
+
+    def iter_compute(
+        self,
+        node_names: List[str] = None,
+        site_names: List[str] = None,
+        include_inactive: bool = False,
+        fields: str = None,
+        page_size: int = 100,
+    ):
+        """Iterate over all compute elements, requesting them a page at a time.
+
+        :param int page_size: The number of compute elements to request per page.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
+
+        :return: An async generator of compute elements.
+        """
+        return self._iter_pages(
+            self.list_compute,
+            page_size,
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            fields=fields,
+        )
+
+    def iter_nodes(
+        self,
+        include_inactive: bool = False,
+        page_size: int = 100,
+    ):
+        """Iterate over all nodes, requesting them a page at a time.
+
+        :param int page_size: The number of nodes to request per page.
+
+        :return: An async generator of nodes.
+        """
+        return self._iter_pages(
+            self.list_nodes,
+            page_size,
+            include_inactive=include_inactive,
+        )
+
+    def iter_queues(
+        self,
+        node_names: str | None = None,
+        site_names: str | None = None,
+        include_inactive: bool = False,
+        fields: str = None,
+        page_size: int = 100,
+    ):
+        """Iterate over all queues, requesting them a page at a time.
+
+        :param int page_size: The number of queues to request per page.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
+
+        :return: An async generator of queues.
+        """
+        return self._iter_pages(
+            self.list_queues,
+            page_size,
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            fields=fields,
+        )
+
+    def iter_services(
+        self,
+        include_inactive: bool = False,
+        associated_storage_area_id: str = None,
+        site_names: List[str] = None,
+        node_names: List[str] = None,
+        service_types: List[str] = None,
+        service_scope: str = "all",
+        fields: str = None,
+        page_size: int = 100,
+    ):
+        """Iterate over all services, requesting them a page at a time.
+
+        :param int page_size: The number of services to request per page.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
+
+        :return: An async generator of services.
+        """
+        return self._iter_pages(
+            self.list_services,
+            page_size,
+            include_inactive=include_inactive,
+            associated_storage_area_id=associated_storage_area_id,
+            site_names=site_names,
+            node_names=node_names,
+            service_types=service_types,
+            service_scope=service_scope,
+            fields=fields,
+        )
+
+    def iter_sites(
+        self,
+        node_names: List[str] = None,
+        include_inactive: bool = False,
+        fields: str = None,
+        page_size: int = 100,
+    ):
+        """Iterate over all sites, requesting them a page at a time.
+
+        :param int page_size: The number of sites to request per page.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
+
+        :return: An async generator of sites.
+        """
+        return self._iter_pages(
+            self.list_sites,
+            page_size,
+            node_names=node_names,
+            include_inactive=include_inactive,
+            fields=fields,
+        )
+
+    def iter_storages(
+        self,
+        node_names: List[str] = None,
+        site_names: List[str] = None,
+        include_inactive: bool = False,
+        fields: str = None,
+        page_size: int = 100,
+    ):
+        """Iterate over all storages, requesting them a page at a time.
+
+        :param int page_size: The number of storages to request per page.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
+
+        :return: An async generator of storages.
+        """
+        return self._iter_pages(
+            self.list_storages,
+            page_size,
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            fields=fields,
+        )
+
+    def iter_storage_areas(
+        self,
+        node_names: List[str] = None,
+        site_names: List[str] = None,
+        include_inactive: bool = False,
+        fields: str = None,
+        page_size: int = 100,
+    ):
+        """Iterate over all storage areas, requesting them a page at a time.
+
+        :param int page_size: The number of storage areas to request per page.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
+
+        :return: An async generator of storage areas.
+        """
+        return self._iter_pages(
+            self.list_storage_areas,
+            page_size,
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            fields=fields,
+        )
+
+    @handle_async_client_exceptions
+    async def list_compute(
+        self,
+        node_names: List[str] = None,
+        site_names: List[str] = None,
+        include_inactive: bool = False,
+        limit: int = None,
+        cursor: str = None,
+        fields: str = None,
+    ):
+        """List compute elements.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        params = {
+            "node_names": node_names,
+            "site_names": site_names,
+            "include_inactive": include_inactive,
+            "limit": limit,
+            "cursor": cursor,
+            "fields": fields,
+        }
+        return await self._get("{api_url}/compute".format(api_url=self.api_url), params=params)
+
+    @handle_async_client_exceptions
+    async def list_nodes(
+        self,
+        only_names: bool = False,
+        include_inactive: bool = False,
+        limit: int = None,
+        cursor: str = None,
+    ):
+        """List nodes with an option to return only node names.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        params = {
+            "only_names": only_names,
+            "include_inactive": include_inactive,
+            "limit": limit,
+            "cursor": cursor,
+        }
+        return await self._get("{api_url}/nodes".format(api_url=self.api_url), params=params)
+
+    @handle_async_client_exceptions
+    async def list_schemas(self):
+        """List schemas.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get("{api_url}/schemas".format(api_url=self.api_url))
+
+    @handle_async_client_exceptions
+    async def list_queues(
+        self,
+        node_names: str | None = None,
+        site_names: str | None = None,
+        include_inactive: bool = False,
+        limit: int | None = None,
+        cursor: str | None = None,
+        fields: str | None = None,
+    ):
+        """List queues.
+
+        :param node_names: Filter by node names (comma-separated string).
+        :param site_names: Filter by site names (comma-separated string).
+        :param include_inactive: Include inactive queues.
+        :param limit: Maximum number of queues in the response (a page).
+        :param cursor: Cursor of the page to get, from the previous page's X-Next-Cursor response header.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        params = {
+            "node_names": node_names,
+            "site_names": site_names,
+            "include_inactive": include_inactive,
+            "limit": limit,
+            "cursor": cursor,
+            "fields": fields,
+        }
+        return await self._get("{api_url}/queues".format(api_url=self.api_url), params=params)
+
+    @handle_async_client_exceptions
+    async def list_services(
+        self,
+        include_inactive: bool = False,
+        associated_storage_area_id: str = None,
+        site_names: List[str] = None,
+        node_names: List[str] = None,
+        service_types: List[str] = None,
+        service_scope: str = "all",
+        output: str = None,
+        limit: int = None,
+        cursor: str = None,
+        fields: str = None,
+    ):
+        """List services.
+
+        :param include_inactive: Include inactive services.
+        :param associated_storage_area_id: Include services associated with storage.
+        :param site_names: Filter by site names (comma-separated string).
+        :param node_names: Filter by node names (comma-separated string).
+        :param service_types: Filter by service types (comma-separated string).
+        :param service_scope: Filter by scope of service (all||local||global).
+        :param output: Output format (e.g., 'prometheus' for Prometheus HTTP SD response)
+        :param limit: Maximum number of services in the response (a page).
+        :param cursor: Cursor of the page to get, from the previous page's X-Next-Cursor response header.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        params = {
+            "include_inactive": include_inactive,
+            "associated_storage_area_id": associated_storage_area_id,
+            "site_names": site_names,
+            "node_names": node_names,
+            "service_types": service_types,
+            "service_scope": service_scope,
+            "output": output,
+            "limit": limit,
+            "cursor": cursor,
+            "fields": fields,
+        }
+        return await self._get("{api_url}/services".format(api_url=self.api_url), params=params)
+
+    @handle_async_client_exceptions
+    async def list_service_types(self):
+        """List service types.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get("{api_url}/services/types".format(api_url=self.api_url))
+
+    @handle_async_client_exceptions
+    async def list_sites(
+        self,
+        only_names: bool = False,
+        node_names: List[str] = None,
+        include_inactive: bool = False,
+        limit: int = None,
+        cursor: str = None,
+        fields: str = None,
+    ):
+        """List sites.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        params = {
+            "only_names": only_names,
+            "node_names": node_names,
+            "include_inactive": include_inactive,
+            "limit": limit,
+            "cursor": cursor,
+            "fields": fields,
+        }
+        return await self._get("{api_url}/sites".format(api_url=self.api_url), params=params)
+
+    @handle_async_client_exceptions
+    async def list_storages(
+        self,
+        node_names: List[str] = None,
+        site_names: List[str] = None,
+        include_inactive: bool = False,
+        limit: int = None,
+        cursor: str = None,
+        fields: str = None,
+    ):
+        """List storages.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        params = {
+            "node_names": node_names,
+            "site_names": site_names,
+            "include_inactive": include_inactive,
+            "limit": limit,
+            "cursor": cursor,
+            "fields": fields,
+        }
+        return await self._get("{api_url}/storages".format(api_url=self.api_url), params=params)
+
+    @handle_async_client_exceptions
+    async def list_storages_grafana(
+        self,
+        node_names: List[str] = None,
+        site_names: List[str] = None,
+        include_inactive: bool = False,
+    ):
+        """List storages (for grafana).
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        params = {
+            "node_names": node_names,
+            "site_names": site_names,
+            "include_inactive": include_inactive,
+        }
+        return await self._get("{api_url}/storages/grafana".format(api_url=self.api_url), params=params)
+
+    @handle_async_client_exceptions
+    async def list_storages_topojson(
+        self,
+        node_names: List[str] = None,
+        site_names: List[str] = None,
+        include_inactive: bool = False,
+    ):
+        """List storages (topojson).
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        params = {
+            "node_names": node_names,
+            "site_names": site_names,
+            "include_inactive": include_inactive,
+        }
+        return await self._get("{api_url}/storages/topojson".format(api_url=self.api_url), params=params)
+
+    @handle_async_client_exceptions
+    async def list_storage_areas(
+        self,
+        node_names: List[str] = None,
+        site_names: List[str] = None,
+        include_inactive: bool = False,
+        limit: int = None,
+        cursor: str = None,
+        fields: str = None,
+    ):
+        """List storage areas.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        params = {
+            "node_names": node_names,
+            "site_names": site_names,
+            "include_inactive": include_inactive,
+            "limit": limit,
+            "cursor": cursor,
+            "fields": fields,
+        }
+        return await self._get("{api_url}/storage-areas".format(api_url=self.api_url), params=params)
+
+    @handle_async_client_exceptions
+    async def list_storage_areas_grafana(
+        self,
+        node_names: List[str] = None,
+        site_names: List[str] = None,
+        include_inactive: bool = False,
+    ):
+        """List storage areas (for grafana).
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        params = {
+            "node_names": node_names,
+            "site_names": site_names,
+            "include_inactive": include_inactive,
+        }
+        return await self._get("{api_url}/storage-areas/grafana".format(api_url=self.api_url), params=params)
+
+    @handle_async_client_exceptions
+    async def list_storage_areas_topojson(
+        self,
+        node_names: List[str] = None,
+        site_names: List[str] = None,
+        include_inactive: bool = False,
+    ):
+        """List storage areas (topojson).
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        params = {
+            "node_names": node_names,
+            "site_names": site_names,
+            "include_inactive": include_inactive,
+        }
+        return await self._get("{api_url}/storage-areas/topojson".format(api_url=self.api_url), params=params)
+
+    @handle_async_client_exceptions
+    async def list_storage_area_types(self):
+        """List storage area types.
+
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._get(f"{self.api_url}/storage-areas/types")
+
+    @handle_async_client_exceptions
+    async def set_site_enabled(self, site_id: str):
+        """Unset site force disabled.
+
+        :param str site_id: The unique identifier of the site.
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._put(f"{self.api_url}/sites/{site_id}/enable")
+
+    @handle_async_client_exceptions
+    async def set_site_disabled(self, site_id: str):
+        """Set site force disabled.
+
+        :param str site_id: The unique identifier of the site.
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._put(f"{self.api_url}/sites/{site_id}/disable")
+
+    @handle_async_client_exceptions
+    async def set_compute_enabled(self, compute_id: str):
+        """Unset compute force disabled.
+
+        :param str compute_id: The unique identifier of the compute.
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._put(f"{self.api_url}/compute/{compute_id}/enable")
+
+    @handle_async_client_exceptions
+    async def set_compute_disabled(self, compute_id: str):
+        """Set compute force disabled.
+
+        :param str compute_id: The unique identifier of the compute.
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._put(f"{self.api_url}/compute/{compute_id}/disable")
+
+    @handle_async_client_exceptions
+    async def set_service_enabled(self, service_id: str):
+        """Unset service force disabled.
+
+        :param str service_id: The unique identifier of the service.
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._put(f"{self.api_url}/services/{service_id}/enable")
+
+    @handle_async_client_exceptions
+    async def set_service_disabled(self, service_id: str):
+        """Set service force disabled.
+
+        :param str service_id: The unique identifier of the service.
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._put(f"{self.api_url}/services/{service_id}/disable")
+
+    @handle_async_client_exceptions
+    async def set_storage_enabled(self, storage_id: str):
+        """Unset storage force disabled.
+
+        :param str storage_id: The unique identifier of the storage.
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._put(f"{self.api_url}/storages/{storage_id}/enable")
+
+    @handle_async_client_exceptions
+    async def set_storage_disabled(self, storage_id: str):
+        """Set storage force disabled.
+
+        :param str storage_id: The unique identifier of the storage.
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._put(f"{self.api_url}/storages/{storage_id}/disable")
+
+    @handle_async_client_exceptions
+    async def set_storage_area_enabled(self, storage_area_id: str):
+        """Unset storage area force disabled.
+
+        :param str storage_area_id: The unique identifier of the storage area.
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._put(f"{self.api_url}/storage-areas/{storage_area_id}/enable")
+
+    @handle_async_client_exceptions
+    async def set_storage_area_disabled(self, storage_area_id: str):
+        """Set storage area force disabled.
+
+        :param str storage_area_id: The unique identifier of the storage area.
+        :return: An httpx response.
+        :rtype: httpx.Response
+        """
+        return await self._put(f"{self.api_url}/storage-areas/{storage_area_id}/disable")
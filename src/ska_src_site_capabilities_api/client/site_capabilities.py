@@ -1,12 +1,36 @@
+import json
+import threading
+from collections import OrderedDict
 from typing import List
 
 import requests
 
+from ska_src_site_capabilities_api.client.topology_snapshot import ClientTopologySnapshot, list_entities
 from ska_src_site_capabilities_api.common.exceptions import handle_client_exceptions
+from ska_src_site_capabilities_api.common.json_encoding import encode_json
+from ska_src_site_capabilities_api.common.pagination import NEXT_CURSOR_HEADER, get_page_headers
 
 
 class SiteCapabilitiesClient:
-    def __init__(self, api_url, session=None, calling_service=None):
+    def __init__(
+        self,
+        api_url,
+        session=None,
+        calling_service=None,
+        etag_cache_size=128,
+        snapshot_max_staleness_s=None,
+        snapshot_refresh_interval_s=None,
+    ):
+        """
+        :param str api_url: The url of the API (including the version prefix).
+        :param session: An existing requests session to use.
+        :param str calling_service: The name of the calling service, sent in the X-Calling-Service header.
+        :param int etag_cache_size: Maximum number of responses kept for revalidation with their ETag (0 to disable).
+        :param float snapshot_max_staleness_s: Enables snapshot mode (see client.topology_snapshot): get-by-id and
+            entity list calls are answered from a local copy of the topology at most this old.
+        :param float snapshot_refresh_interval_s: Interval between background refreshes of the local copy of the
+            topology (defaults to half the maximum staleness).
+        """
         self.api_url = api_url
         self.calling_service = calling_service or "unknown"
         if session:
@@ -14,6 +38,25 @@ class SiteCapabilitiesClient:
         else:
             self.session = requests.Session()
 
+        # Responses carrying an ETag, by url, revalidated rather than downloaded again while unchanged.
+        self.etag_cache_size = etag_cache_size
+        self._etag_cache = OrderedDict()
+        self._etag_cache_lock = threading.Lock()
+
+        self.snapshot = None
+        self._snapshot_nodes_resp = None
+        if snapshot_max_staleness_s is not None:
+            self.snapshot = ClientTopologySnapshot(
+                self._fetch_snapshot_nodes,
+                snapshot_max_staleness_s,
+                refresh_interval_s=snapshot_refresh_interval_s,
+            )
+
+    def close(self):
+        """Stop refreshing the local copy of the topology (in snapshot mode)."""
+        if self.snapshot is not None:
+            self.snapshot.close()
+
     def _get_headers(self):
         """Build common headers for requests including calling service.
 
@@ -25,6 +68,161 @@ class SiteCapabilitiesClient:
         }
         return headers
 
+    def _get(self, url, params=None, headers=None, **kwargs):
+        """Send a GET request, revalidating the response previously received from the same url with its ETag.
+
+        :param str url: The url.
+        :param params: Query parameters.
+        :param headers: Request headers.
+
+        :return: A requests response (the previously received response if it has not been modified).
+        :rtype: requests.models.Response
+        """
+        if kwargs.get("stream") or not self.etag_cache_size:
+            return self.session.get(url, params=params, headers=headers, **kwargs)
+        key = requests.Request("GET", url, params=params).prepare().url
+        with self._etag_cache_lock:
+            cached_resp = self._etag_cache.get(key)
+        headers = dict(headers or {})
+        if cached_resp is not None:
+            headers["If-None-Match"] = cached_resp.headers["ETag"]
+        resp = self.session.get(url, params=params, headers=headers, **kwargs)
+        with self._etag_cache_lock:
+            if resp.status_code == 304 and cached_resp is not None:
+                self._etag_cache.move_to_end(key)
+                return cached_resp
+            if resp.status_code == 200 and resp.headers.get("ETag"):
+                self._etag_cache[key] = resp
+                self._etag_cache.move_to_end(key)
+                while len(self._etag_cache) > self.etag_cache_size:
+                    self._etag_cache.popitem(last=False)
+            else:
+                self._etag_cache.pop(key, None)
+        return resp
+
+    def _fetch_snapshot_nodes(self):
+        """Get the latest version of every node, revalidating the previous download with its ETag.
+
+        :return: The nodes, or None if they have not changed since the previous call.
+        :rtype: list
+        """
+        nodes_endpoint = "{api_url}/nodes".format(api_url=self.api_url)
+        headers = self._get_headers()
+        resp = self._get(nodes_endpoint, params={"include_inactive": True}, headers=headers)
+        resp.raise_for_status()
+        if resp is self._snapshot_nodes_resp:
+            return None
+        self._snapshot_nodes_resp = resp
+        return resp.json()
+
+    def _get_snapshot_topology(self):
+        """Get the local copy of the topology in snapshot mode.
+
+        :return: A TopologySnapshot, or None if not in snapshot mode or the copy is too stale to use.
+        """
+        if self.snapshot is None:
+            return None
+        return self.snapshot.get()
+
+    def _invalidate_snapshot(self):
+        """Refresh the local copy of the topology before its next use (after a write)."""
+        if self.snapshot is not None:
+            self.snapshot.invalidate()
+
+    @staticmethod
+    def _local_response(url, content, headers=None):
+        """Build a response answering a call locally, as the API would.
+
+        :param str url: The url of the call.
+        :param content: The JSON content of the response.
+        :param headers: Response headers.
+
+        :return: A requests response.
+        :rtype: requests.models.Response
+        """
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.url = url
+        resp.encoding = "utf-8"
+        resp.headers.update({"Content-Type": "application/json", **(headers or {})})
+        resp._content = encode_json(content)
+        return resp
+
+    def _get_from_snapshot(self, entity_type, entity_id, url):
+        """Get an entity by id from the local copy of the topology in snapshot mode.
+
+        :return: A requests response, or None if the call must be made to the API (e.g. the entity is not found).
+        :rtype: requests.models.Response
+        """
+        topology = self._get_snapshot_topology()
+        entity = topology.get(entity_type, entity_id) if topology is not None else None
+        if not entity:
+            return None
+        return self._local_response(url, entity)
+
+    def _list_from_snapshot(self, entity_type, url, only_names=False, **kwargs):
+        """List entities from the local copy of the topology in snapshot mode.
+
+        :param str entity_type: The type of entity to list.
+        :param str url: The url of the call.
+        :param bool only_names: Only return the entities' names.
+        :param kwargs: Other list_entities arguments.
+
+        :return: A requests response, or None if the call must be made to the API.
+        :rtype: requests.models.Response
+        """
+        topology = self._get_snapshot_topology()
+        if topology is None:
+            return None
+        entities = list_entities(topology, entity_type, **kwargs)
+        content = [entity["name"] for entity in entities if "name" in entity] if only_names else entities
+        return self._local_response(url, content, headers=get_page_headers(entities))
+
+    def _iter_pages(self, list_method, page_size, **kwargs):
+        """Iterate over all items of a paginated list, following the next page cursor of each response.
+
+        :param list_method: The list method to call for each page.
+        :param int page_size: The number of items to request per page.
+        :param kwargs: Other arguments of the list method.
+
+        :return: A generator of items.
+        """
+        cursor = None
+        while True:
+            resp = list_method(limit=page_size, cursor=cursor, **kwargs)
+            yield from resp.json()
+            cursor = resp.headers.get(NEXT_CURSOR_HEADER)
+            if not cursor:
+                break
+
+    def _get_many(self, batch_endpoint, ids, chunk_size, entity_type):
+        """Get entities from a batch endpoint, requesting their ids in chunks.
+
+        In snapshot mode, only the ids not found in the local copy of the topology are requested.
+
+        :param str batch_endpoint: The url of the batch endpoint.
+        :param ids: The ids of the entities.
+        :param int chunk_size: The maximum number of ids to request at a time.
+        :param str entity_type: The type of the entities.
+
+        :return: A dictionary with the entities found keyed by id ("found"), and a list of the ids not found ("not_found").
+        :rtype: dict
+        """
+        ids = list(dict.fromkeys(ids))
+        result = {"found": {}, "not_found": []}
+        topology = self._get_snapshot_topology()
+        if topology is not None:
+            result["found"], ids = topology.get_many(entity_type, ids)
+        for start in range(0, len(ids), chunk_size):
+            end = start + chunk_size
+            headers = self._get_headers()
+            resp = self._get(batch_endpoint, params={"ids": ",".join(ids[start:end])}, headers=headers)
+            resp.raise_for_status()
+            batch = resp.json()
+            result["found"].update(batch.get("found", {}))
+            result["not_found"].extend(batch.get("not_found", []))
+        return result
+
     @handle_client_exceptions
     def get_add_node_www_url(self):
         """Get the url to add a node.
@@ -53,11 +251,27 @@ class SiteCapabilitiesClient:
         :rtype: requests.models.Response
         """
         get_compute_by_id_endpoint = "{api_url}/compute/{compute_id}".format(api_url=self.api_url, compute_id=compute_id)
+        resp = self._get_from_snapshot("compute", compute_id, get_compute_by_id_endpoint)
+        if resp is not None:
+            return resp
         headers = self._get_headers()
-        resp = self.session.get(get_compute_by_id_endpoint, headers=headers)
+        resp = self._get(get_compute_by_id_endpoint, headers=headers)
         resp.raise_for_status()
         return resp
 
+    @handle_client_exceptions
+    def get_compute_many(self, compute_ids: List[str], chunk_size: int = 100):
+        """Get descriptions of compute elements from identifiers, requesting at most chunk_size at a time.
+
+        :param compute_ids: The unique compute element ids.
+        :param int chunk_size: The maximum number of ids per request (at most the server's BATCH_GET_MAX_IDS).
+
+        :return: A dictionary with the compute elements found keyed by id ("found"), and a list of the ids not found ("not_found").
+        :rtype: dict
+        """
+        batch_endpoint = "{api_url}/compute/batch".format(api_url=self.api_url)
+        return self._get_many(batch_endpoint, compute_ids, chunk_size, "compute")
+
     @handle_client_exceptions
     def get_schema(self, schema: str):
         """Get a schema.
@@ -69,7 +283,7 @@ class SiteCapabilitiesClient:
         """
         get_schema_endpoint = "{api_url}/schemas/{schema}".format(api_url=self.api_url, schema=schema)
         headers = self._get_headers()
-        resp = self.session.get(get_schema_endpoint, headers=headers)
+        resp = self._get(get_schema_endpoint, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -83,11 +297,27 @@ class SiteCapabilitiesClient:
         :rtype: requests.models.Response
         """
         get_service_by_id_endpoint = "{api_url}/services/{service_id}".format(api_url=self.api_url, service_id=service_id)
+        resp = self._get_from_snapshot("service", service_id, get_service_by_id_endpoint)
+        if resp is not None:
+            return resp
         headers = self._get_headers()
-        resp = self.session.get(get_service_by_id_endpoint, headers=headers)
+        resp = self._get(get_service_by_id_endpoint, headers=headers)
         resp.raise_for_status()
         return resp
 
+    @handle_client_exceptions
+    def get_service_many(self, service_ids: List[str], chunk_size: int = 100):
+        """Get descriptions of services from identifiers, requesting at most chunk_size at a time.
+
+        :param service_ids: The unique service ids.
+        :param int chunk_size: The maximum number of ids per request (at most the server's BATCH_GET_MAX_IDS).
+
+        :return: A dictionary with the services found keyed by id ("found"), and a list of the ids not found ("not_found").
+        :rtype: dict
+        """
+        batch_endpoint = "{api_url}/services/batch".format(api_url=self.api_url)
+        return self._get_many(batch_endpoint, service_ids, chunk_size, "service")
+
     @handle_client_exceptions
     def get_storage(self, storage_id: str):
         """Get description of a storage from an identifier.
@@ -98,11 +328,27 @@ class SiteCapabilitiesClient:
         :rtype: requests.models.Response
         """
         get_storage_by_id_endpoint = "{api_url}/storages/{storage_id}".format(api_url=self.api_url, storage_id=storage_id)
+        resp = self._get_from_snapshot("storage", storage_id, get_storage_by_id_endpoint)
+        if resp is not None:
+            return resp
         headers = self._get_headers()
-        resp = self.session.get(get_storage_by_id_endpoint, headers=headers)
+        resp = self._get(get_storage_by_id_endpoint, headers=headers)
         resp.raise_for_status()
         return resp
 
+    @handle_client_exceptions
+    def get_storage_many(self, storage_ids: List[str], chunk_size: int = 100):
+        """Get descriptions of storages from identifiers, requesting at most chunk_size at a time.
+
+        :param storage_ids: The unique storage ids.
+        :param int chunk_size: The maximum number of ids per request (at most the server's BATCH_GET_MAX_IDS).
+
+        :return: A dictionary with the storages found keyed by id ("found"), and a list of the ids not found ("not_found").
+        :rtype: dict
+        """
+        batch_endpoint = "{api_url}/storages/batch".format(api_url=self.api_url)
+        return self._get_many(batch_endpoint, storage_ids, chunk_size, "storage")
+
     @handle_client_exceptions
     def get_storage_area(self, storage_area_id: str):
         """Get description of a storage area from an identifier.
@@ -113,11 +359,27 @@ class SiteCapabilitiesClient:
         :rtype: requests.models.Response
         """
         get_storage_area_by_id_endpoint = "{api_url}/storage-areas/{storage_area_id}".format(api_url=self.api_url, storage_area_id=storage_area_id)
+        resp = self._get_from_snapshot("storage_area", storage_area_id, get_storage_area_by_id_endpoint)
+        if resp is not None:
+            return resp
         headers = self._get_headers()
-        resp = self.session.get(get_storage_area_by_id_endpoint, headers=headers)
+        resp = self._get(get_storage_area_by_id_endpoint, headers=headers)
         resp.raise_for_status()
         return resp
 
+    @handle_client_exceptions
+    def get_storage_area_many(self, storage_area_ids: List[str], chunk_size: int = 100):
+        """Get descriptions of storage areas from identifiers, requesting at most chunk_size at a time.
+
+        :param storage_area_ids: The unique storage area ids.
+        :param int chunk_size: The maximum number of ids per request (at most the server's BATCH_GET_MAX_IDS).
+
+        :return: A dictionary with the storage areas found keyed by id ("found"), and a list of the ids not found ("not_found").
+        :rtype: dict
+        """
+        batch_endpoint = "{api_url}/storage-areas/batch".format(api_url=self.api_url)
+        return self._get_many(batch_endpoint, storage_area_ids, chunk_size, "storage_area")
+
     @handle_client_exceptions
     def get_node_version(self, node_name: str, node_version: str = "latest"):
         """Get description of a node version.
@@ -131,7 +393,7 @@ class SiteCapabilitiesClient:
         endpoint = f"{self.api_url}/nodes/{node_name}"
         params = {"node_version": node_version}
         headers = self._get_headers()
-        resp = self.session.get(endpoint, params=params, headers=headers)
+        resp = self._get(endpoint, params=params, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -149,7 +411,7 @@ class SiteCapabilitiesClient:
         endpoint = f"{self.api_url}/nodes/{node_name}/sites/{site_name}"
         params = {"node_version": node_version}
         headers = self._get_headers()
-        resp = self.session.get(endpoint, params=params, headers=headers)
+        resp = self._get(endpoint, params=params, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -163,24 +425,45 @@ class SiteCapabilitiesClient:
         :rtype: requests.models.Response
         """
         endpoint = f"{self.api_url}/sites/{site_id}"
+        resp = self._get_from_snapshot("site", site_id, endpoint)
+        if resp is not None:
+            return resp
         headers = self._get_headers()
-        resp = self.session.get(endpoint, headers=headers)
+        resp = self._get(endpoint, headers=headers)
         resp.raise_for_status()
         return resp
 
     @handle_client_exceptions
-    def dump_nodes(self):
+    def dump_nodes(self, stream: bool = False):
         """Dump all information about all available nodes.
 
+        :param bool stream: Request the dump as (gzip compressed) newline-delimited JSON, streamed rather than read
+            into memory. The response should be used as a context manager and read with iter_lines (see
+            iter_dump_nodes).
+
         :return: A requests response.
         :rtype: requests.models.Response
         """
         endpoint = f"{self.api_url}/nodes/dump"
         headers = self._get_headers()
-        resp = self.session.get(endpoint, headers=headers)
+        if stream:
+            headers["Accept-Encoding"] = "gzip"
+            resp = self._get(endpoint, params={"format": "ndjson"}, headers=headers, stream=True)
+        else:
+            resp = self._get(endpoint, headers=headers)
         resp.raise_for_status()
         return resp
 
+    def iter_dump_nodes(self):
+        """Iterate over all versions of all nodes, streaming the dump rather than loading it into memory.
+
+        :return: A generator of node versions.
+        """
+        with self.dump_nodes(stream=True) as resp:
+            for line in resp.iter_lines():
+                if line:
+                    yield json.loads(line)
+
     @handle_client_exceptions
     def health(self):
         """Get API health.
@@ -190,16 +473,184 @@ class SiteCapabilitiesClient:
         """
         health_endpoint = "{api_url}/health".format(api_url=self.api_url)
         headers = self._get_headers()
-        resp = self.session.get(health_endpoint, headers=headers)
+        resp = self._get(health_endpoint, headers=headers)
         resp.raise_for_status()
         return resp
 
+    def iter_compute(
+        self,
+        node_names: List[str] = None,
+        site_names: List[str] = None,
+        include_inactive: bool = False,
+        fields: str = None,
+        page_size: int = 100,
+    ):
+        """Iterate over all compute elements, requesting them a page at a time.
+
+        :param int page_size: The number of compute elements to request per page.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
+
+        :return: A generator of compute elements.
+        """
+        return self._iter_pages(
+            self.list_compute,
+            page_size,
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            fields=fields,
+        )
+
+    def iter_nodes(
+        self,
+        include_inactive: bool = False,
+        page_size: int = 100,
+    ):
+        """Iterate over all nodes, requesting them a page at a time.
+
+        :param int page_size: The number of nodes to request per page.
+
+        :return: A generator of nodes.
+        """
+        return self._iter_pages(
+            self.list_nodes,
+            page_size,
+            include_inactive=include_inactive,
+        )
+
+    def iter_queues(
+        self,
+        node_names: str | None = None,
+        site_names: str | None = None,
+        include_inactive: bool = False,
+        fields: str = None,
+        page_size: int = 100,
+    ):
+        """Iterate over all queues, requesting them a page at a time.
+
+        :param int page_size: The number of queues to request per page.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
+
+        :return: A generator of queues.
+        """
+        return self._iter_pages(
+            self.list_queues,
+            page_size,
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            fields=fields,
+        )
+
+    def iter_services(
+        self,
+        include_inactive: bool = False,
+        associated_storage_area_id: str = None,
+        site_names: List[str] = None,
+        node_names: List[str] = None,
+        service_types: List[str] = None,
+        service_scope: str = "all",
+        fields: str = None,
+        page_size: int = 100,
+    ):
+        """Iterate over all services, requesting them a page at a time.
+
+        :param int page_size: The number of services to request per page.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
+
+        :return: A generator of services.
+        """
+        return self._iter_pages(
+            self.list_services,
+            page_size,
+            include_inactive=include_inactive,
+            associated_storage_area_id=associated_storage_area_id,
+            site_names=site_names,
+            node_names=node_names,
+            service_types=service_types,
+            service_scope=service_scope,
+            fields=fields,
+        )
+
+    def iter_sites(
+        self,
+        node_names: List[str] = None,
+        include_inactive: bool = False,
+        fields: str = None,
+        page_size: int = 100,
+    ):
+        """Iterate over all sites, requesting them a page at a time.
+
+        :param int page_size: The number of sites to request per page.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
+
+        :return: A generator of sites.
+        """
+        return self._iter_pages(
+            self.list_sites,
+            page_size,
+            node_names=node_names,
+            include_inactive=include_inactive,
+            fields=fields,
+        )
+
+    def iter_storages(
+        self,
+        node_names: List[str] = None,
+        site_names: List[str] = None,
+        include_inactive: bool = False,
+        fields: str = None,
+        page_size: int = 100,
+    ):
+        """Iterate over all storages, requesting them a page at a time.
+
+        :param int page_size: The number of storages to request per page.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
+
+        :return: A generator of storages.
+        """
+        return self._iter_pages(
+            self.list_storages,
+            page_size,
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            fields=fields,
+        )
+
+    def iter_storage_areas(
+        self,
+        node_names: List[str] = None,
+        site_names: List[str] = None,
+        include_inactive: bool = False,
+        fields: str = None,
+        page_size: int = 100,
+    ):
+        """Iterate over all storage areas, requesting them a page at a time.
+
+        :param int page_size: The number of storage areas to request per page.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
+
+        :return: A generator of storage areas.
+        """
+        return self._iter_pages(
+            self.list_storage_areas,
+            page_size,
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            fields=fields,
+        )
+
     @handle_client_exceptions
     def list_compute(
         self,
         node_names: List[str] = None,
         site_names: List[str] = None,
         include_inactive: bool = False,
+        limit: int = None,
+        cursor: str = None,
+        fields: str = None,
     ):
         """List compute elements.
 
@@ -207,13 +658,28 @@ class SiteCapabilitiesClient:
         :rtype: requests.models.Response
         """
         compute_endpoint = "{api_url}/compute".format(api_url=self.api_url)
+        resp = self._list_from_snapshot(
+            "compute",
+            compute_endpoint,
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+        if resp is not None:
+            return resp
         params = {
             "node_names": node_names,
             "site_names": site_names,
             "include_inactive": include_inactive,
+            "limit": limit,
+            "cursor": cursor,
+            "fields": fields,
         }
         headers = self._get_headers()
-        resp = self.session.get(compute_endpoint, params=params, headers=headers)
+        resp = self._get(compute_endpoint, params=params, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -222,6 +688,8 @@ class SiteCapabilitiesClient:
         self,
         only_names: bool = False,
         include_inactive: bool = False,
+        limit: int = None,
+        cursor: str = None,
     ):
         """List nodes with an option to return only node names.
 
@@ -232,9 +700,11 @@ class SiteCapabilitiesClient:
         params = {
             "only_names": only_names,
             "include_inactive": include_inactive,
+            "limit": limit,
+            "cursor": cursor,
         }
         headers = self._get_headers()
-        resp = self.session.get(nodes_endpoint, params=params, headers=headers)
+        resp = self._get(nodes_endpoint, params=params, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -247,28 +717,54 @@ class SiteCapabilitiesClient:
         """
         schemas_endpoint = "{api_url}/schemas".format(api_url=self.api_url)
         headers = self._get_headers()
-        resp = self.session.get(schemas_endpoint, headers=headers)
+        resp = self._get(schemas_endpoint, headers=headers)
         resp.raise_for_status()
         return resp
 
     @handle_client_exceptions
-    def list_queues(self, node_names: str | None = None, site_names: str | None = None, include_inactive: bool = False):
+    def list_queues(
+        self,
+        node_names: str | None = None,
+        site_names: str | None = None,
+        include_inactive: bool = False,
+        limit: int | None = None,
+        cursor: str | None = None,
+        fields: str | None = None,
+    ):
         """List queues.
 
         :param node_names: Filter by node names (comma-separated string).
         :param site_names: Filter by site names (comma-separated string).
         :param include_inactive: Include inactive queues.
+        :param limit: Maximum number of queues in the response (a page).
+        :param cursor: Cursor of the page to get, from the previous page's X-Next-Cursor response header.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
 
         :return: A requests response.
         :rtype: requests.models.Response
         """
         queues_endpoint = "{api_url}/queues".format(api_url=self.api_url)
+        resp = self._list_from_snapshot(
+            "queue",
+            queues_endpoint,
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+        if resp is not None:
+            return resp
         params = {
             "node_names": node_names,
             "site_names": site_names,
             "include_inactive": include_inactive,
+            "limit": limit,
+            "cursor": cursor,
+            "fields": fields,
         }
-        resp = self.session.get(queues_endpoint, params=params)
+        resp = self._get(queues_endpoint, params=params)
         resp.raise_for_status()
         return resp
 
@@ -282,10 +778,26 @@ class SiteCapabilitiesClient:
         :rtype: requests.models.Response
         """
         get_queue_by_id_endpoint = "{api_url}/queues/{queue_id}".format(api_url=self.api_url, queue_id=queue_id)
-        resp = self.session.get(get_queue_by_id_endpoint)
+        resp = self._get_from_snapshot("queue", queue_id, get_queue_by_id_endpoint)
+        if resp is not None:
+            return resp
+        resp = self._get(get_queue_by_id_endpoint)
         resp.raise_for_status()
         return resp
 
+    @handle_client_exceptions
+    def get_queue_many(self, queue_ids: List[str], chunk_size: int = 100):
+        """Get descriptions of queues from identifiers, requesting at most chunk_size at a time.
+
+        :param queue_ids: The unique queue ids.
+        :param int chunk_size: The maximum number of ids per request (at most the server's BATCH_GET_MAX_IDS).
+
+        :return: A dictionary with the queues found keyed by id ("found"), and a list of the ids not found ("not_found").
+        :rtype: dict
+        """
+        batch_endpoint = "{api_url}/queues/batch".format(api_url=self.api_url)
+        return self._get_many(batch_endpoint, queue_ids, chunk_size, "queue")
+
     @handle_client_exceptions
     def list_services(
         self,
@@ -296,6 +808,9 @@ class SiteCapabilitiesClient:
         service_types: List[str] = None,
         service_scope: str = "all",
         output: str = None,
+        limit: int = None,
+        cursor: str = None,
+        fields: str = None,
     ):
         """List services.
 
@@ -306,11 +821,31 @@ class SiteCapabilitiesClient:
         :param service_types: Filter by service types (comma-separated string).
         :param service_scope: Filter by scope of service (all||local||global).
         :param output: Output format (e.g., 'prometheus' for Prometheus HTTP SD response)
+        :param limit: Maximum number of services in the response (a page).
+        :param cursor: Cursor of the page to get, from the previous page's X-Next-Cursor response header.
+        :param fields: Fields to return, as comma-separated dotted paths (the id is always returned).
 
         :return: A requests response.
         :rtype: requests.models.Response
         """
         services_endpoint = "{api_url}/services".format(api_url=self.api_url)
+        resp = None
+        if output is None:
+            resp = self._list_from_snapshot(
+                "service",
+                services_endpoint,
+                node_names=node_names,
+                site_names=site_names,
+                service_types=service_types,
+                service_scope=service_scope,
+                associated_storage_area_id=associated_storage_area_id,
+                include_inactive=include_inactive,
+                limit=limit,
+                cursor=cursor,
+                fields=fields,
+            )
+        if resp is not None:
+            return resp
         params = {
             "include_inactive": include_inactive,
             "associated_storage_area_id": associated_storage_area_id,
@@ -319,9 +854,12 @@ class SiteCapabilitiesClient:
             "service_types": service_types,
             "service_scope": service_scope,
             "output": output,
+            "limit": limit,
+            "cursor": cursor,
+            "fields": fields,
         }
         headers = self._get_headers()
-        resp = self.session.get(services_endpoint, params=params, headers=headers)
+        resp = self._get(services_endpoint, params=params, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -334,7 +872,7 @@ class SiteCapabilitiesClient:
         """
         service_types_endpoint = "{api_url}/services/types".format(api_url=self.api_url)
         headers = self._get_headers()
-        resp = self.session.get(service_types_endpoint, headers=headers)
+        resp = self._get(service_types_endpoint, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -344,6 +882,9 @@ class SiteCapabilitiesClient:
         only_names: bool = False,
         node_names: List[str] = None,
         include_inactive: bool = False,
+        limit: int = None,
+        cursor: str = None,
+        fields: str = None,
     ):
         """List sites.
 
@@ -351,13 +892,28 @@ class SiteCapabilitiesClient:
         :rtype: requests.models.Response
         """
         sites_endpoint = "{api_url}/sites".format(api_url=self.api_url)
+        resp = self._list_from_snapshot(
+            "site",
+            sites_endpoint,
+            only_names=only_names,
+            node_names=node_names,
+            include_inactive=include_inactive,
+            limit=limit,
+            cursor=cursor,
+            fields="name" if only_names else fields,
+        )
+        if resp is not None:
+            return resp
         params = {
             "only_names": only_names,
             "node_names": node_names,
             "include_inactive": include_inactive,
+            "limit": limit,
+            "cursor": cursor,
+            "fields": fields,
         }
         headers = self._get_headers()
-        resp = self.session.get(sites_endpoint, params=params, headers=headers)
+        resp = self._get(sites_endpoint, params=params, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -367,6 +923,9 @@ class SiteCapabilitiesClient:
         node_names: List[str] = None,
         site_names: List[str] = None,
         include_inactive: bool = False,
+        limit: int = None,
+        cursor: str = None,
+        fields: str = None,
     ):
         """List storages.
 
@@ -374,13 +933,28 @@ class SiteCapabilitiesClient:
         :rtype: requests.models.Response
         """
         storages_endpoint = "{api_url}/storages".format(api_url=self.api_url)
+        resp = self._list_from_snapshot(
+            "storage",
+            storages_endpoint,
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+        if resp is not None:
+            return resp
         params = {
             "node_names": node_names,
             "site_names": site_names,
             "include_inactive": include_inactive,
+            "limit": limit,
+            "cursor": cursor,
+            "fields": fields,
         }
         headers = self._get_headers()
-        resp = self.session.get(storages_endpoint, params=params, headers=headers)
+        resp = self._get(storages_endpoint, params=params, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -403,7 +977,7 @@ class SiteCapabilitiesClient:
             "include_inactive": include_inactive,
         }
         headers = self._get_headers()
-        resp = self.session.get(storages_grafana_endpoint, params=params, headers=headers)
+        resp = self._get(storages_grafana_endpoint, params=params, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -426,7 +1000,7 @@ class SiteCapabilitiesClient:
             "include_inactive": include_inactive,
         }
         headers = self._get_headers()
-        resp = self.session.get(storages_topojson_endpoint, params=params, headers=headers)
+        resp = self._get(storages_topojson_endpoint, params=params, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -436,6 +1010,9 @@ class SiteCapabilitiesClient:
         node_names: List[str] = None,
         site_names: List[str] = None,
         include_inactive: bool = False,
+        limit: int = None,
+        cursor: str = None,
+        fields: str = None,
     ):
         """List storage areas.
 
@@ -443,13 +1020,28 @@ class SiteCapabilitiesClient:
         :rtype: requests.models.Response
         """
         storage_areas_endpoint = "{api_url}/storage-areas".format(api_url=self.api_url)
+        resp = self._list_from_snapshot(
+            "storage_area",
+            storage_areas_endpoint,
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+        if resp is not None:
+            return resp
         params = {
             "node_names": node_names,
             "site_names": site_names,
             "include_inactive": include_inactive,
+            "limit": limit,
+            "cursor": cursor,
+            "fields": fields,
         }
         headers = self._get_headers()
-        resp = self.session.get(storage_areas_endpoint, params=params, headers=headers)
+        resp = self._get(storage_areas_endpoint, params=params, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -472,7 +1064,7 @@ class SiteCapabilitiesClient:
             "include_inactive": include_inactive,
         }
         headers = self._get_headers()
-        resp = self.session.get(storage_areas_grafana_endpoint, params=params, headers=headers)
+        resp = self._get(storage_areas_grafana_endpoint, params=params, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -495,7 +1087,7 @@ class SiteCapabilitiesClient:
             "include_inactive": include_inactive,
         }
         headers = self._get_headers()
-        resp = self.session.get(storage_areas_topojson_endpoint, params=params, headers=headers)
+        resp = self._get(storage_areas_topojson_endpoint, params=params, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -507,7 +1099,7 @@ class SiteCapabilitiesClient:
         """
         endpoint = f"{self.api_url}/storage-areas/types"
         headers = self._get_headers()
-        resp = self.session.get(endpoint, headers=headers)
+        resp = self._get(endpoint, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -520,7 +1112,7 @@ class SiteCapabilitiesClient:
         """
         ping_endpoint = "{api_url}/ping".format(api_url=self.api_url)
         headers = self._get_headers()
-        resp = self.session.get(ping_endpoint, headers=headers)
+        resp = self._get(ping_endpoint, headers=headers)
         resp.raise_for_status()
         return resp
 
@@ -536,6 +1128,7 @@ class SiteCapabilitiesClient:
         headers = self._get_headers()
         resp = self.session.put(endpoint, headers=headers)
         resp.raise_for_status()
+        self._invalidate_snapshot()
         return resp
 
     @handle_client_exceptions
@@ -550,6 +1143,7 @@ class SiteCapabilitiesClient:
         headers = self._get_headers()
         resp = self.session.put(endpoint, headers=headers)
         resp.raise_for_status()
+        self._invalidate_snapshot()
         return resp
 
     @handle_client_exceptions
@@ -564,6 +1158,7 @@ class SiteCapabilitiesClient:
         headers = self._get_headers()
         resp = self.session.put(endpoint, headers=headers)
         resp.raise_for_status()
+        self._invalidate_snapshot()
         return resp
 
     @handle_client_exceptions
@@ -578,6 +1173,7 @@ class SiteCapabilitiesClient:
         headers = self._get_headers()
         resp = self.session.put(endpoint, headers=headers)
         resp.raise_for_status()
+        self._invalidate_snapshot()
         return resp
 
     @handle_client_exceptions
@@ -592,6 +1188,7 @@ class SiteCapabilitiesClient:
         headers = self._get_headers()
         resp = self.session.put(endpoint, headers=headers)
         resp.raise_for_status()
+        self._invalidate_snapshot()
         return resp
 
     @handle_client_exceptions
@@ -606,6 +1203,7 @@ class SiteCapabilitiesClient:
         headers = self._get_headers()
         resp = self.session.put(endpoint, headers=headers)
         resp.raise_for_status()
+        self._invalidate_snapshot()
         return resp
 
     @handle_client_exceptions
@@ -620,6 +1218,7 @@ class SiteCapabilitiesClient:
         headers = self._get_headers()
         resp = self.session.put(endpoint, headers=headers)
         resp.raise_for_status()
+        self._invalidate_snapshot()
         return resp
 
     @handle_client_exceptions
@@ -634,6 +1233,7 @@ class SiteCapabilitiesClient:
         headers = self._get_headers()
         resp = self.session.put(endpoint, headers=headers)
         resp.raise_for_status()
+        self._invalidate_snapshot()
         return resp
 
     @handle_client_exceptions
@@ -648,6 +1248,7 @@ class SiteCapabilitiesClient:
         headers = self._get_headers()
         resp = self.session.put(endpoint, headers=headers)
         resp.raise_for_status()
+        self._invalidate_snapshot()
         return resp
 
     @handle_client_exceptions
@@ -662,4 +1263,5 @@ class SiteCapabilitiesClient:
         headers = self._get_headers()
         resp = self.session.put(endpoint, headers=headers)
         resp.raise_for_status()
+        self._invalidate_snapshot()
         return resp
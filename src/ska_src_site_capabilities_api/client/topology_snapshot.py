@@ -0,0 +1,115 @@
+"""Client-side topology snapshot.
+
+In snapshot mode, SiteCapabilitiesClient downloads the latest version of every node once and answers get-by-id and
+entity list calls in-process, from the same id index and query evaluation the API itself uses (see
+common.snapshot.TopologySnapshot and common.pipelines.EntityQuery), so answers match what the API would return for
+the same topology.
+
+The snapshot is refreshed in the background with conditional requests, so an unchanged topology costs a 304 response
+rather than a download. A snapshot older than its maximum staleness (e.g. because the API could not be reached) is not
+used: it is refreshed first, and calls go to the API while it cannot be.
+"""
+
+import logging
+import threading
+import time
+
+from ska_src_site_capabilities_api.common import pagination
+from ska_src_site_capabilities_api.common.pipelines import EntityQuery
+from ska_src_site_capabilities_api.common.snapshot import TopologySnapshot
+
+logger = logging.getLogger(__name__)
+
+
+def list_entities(topology, entity_type, include_inactive=False, limit=None, cursor=None, **filters):
+    """List the entities of a type in a topology snapshot, as the API's list routes do.
+
+    :param TopologySnapshot topology: The topology snapshot.
+    :param str entity_type: The type of entity to list (see EntityQuery).
+    :param bool include_inactive: Include inactive entities.
+    :param int limit: Maximum number of entities to return, ordered by id.
+    :param str cursor: Cursor of the page to return.
+    :param filters: Other EntityQuery arguments (node_names, site_names, fields, ...).
+
+    :return: A list of entities with their parent information (a pagination.Page if limit or cursor is given).
+    """
+    query = EntityQuery(entity_type, include_inactive=include_inactive, **filters)
+    nodes = topology.get_latest_nodes() if include_inactive else topology.get_active_nodes()
+    rows = query.entities_from_rows(query.rows_from_nodes(nodes))
+    if pagination.is_paginated(limit, cursor):
+        rows = pagination.paginate(rows, key=lambda entity_and_site: pagination.entity_key(entity_and_site[0]), limit=limit, cursor=cursor)
+    return pagination.map_page(rows, [entity for entity, _ in rows])
+
+
+class ClientTopologySnapshot:
+    """Topology snapshot kept fresh by a background thread."""
+
+    def __init__(self, fetch_nodes, max_staleness_s, refresh_interval_s=None):
+        """
+        :param fetch_nodes: Function returning the latest version of every node, or None if unchanged since its last call.
+        :param float max_staleness_s: Age after which the snapshot is not used until it has been refreshed.
+        :param float refresh_interval_s: Interval between background refreshes (defaults to half the maximum staleness).
+        """
+        self.fetch_nodes = fetch_nodes
+        self.max_staleness_s = max_staleness_s
+        self.refresh_interval_s = refresh_interval_s if refresh_interval_s is not None else max_staleness_s / 2
+        self.topology = TopologySnapshot()
+        self.refreshed_at = None
+        self._generation = 0  # incremented when invalidated, so that a refresh started before is not considered fresh
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_fresh(self):
+        return self.refreshed_at is not None and time.monotonic() - self.refreshed_at <= self.max_staleness_s
+
+    def refresh(self):
+        """Fetch the topology, reloading the snapshot if it has changed."""
+        with self._refresh_lock:
+            generation = self._generation
+            nodes = self.fetch_nodes()
+            if nodes is not None:
+                self.topology.load(nodes)
+            if generation == self._generation:
+                self.refreshed_at = time.monotonic()
+
+    def invalidate(self):
+        """Refresh the snapshot before its next use."""
+        self._generation += 1
+        self.refreshed_at = None
+
+    def get(self):
+        """Get the topology snapshot, refreshing it first if it is too stale.
+
+        :return: A TopologySnapshot, or None if it is too stale and cannot be refreshed.
+        """
+        self._start()
+        if not self.is_fresh:
+            try:
+                self.refresh()
+            except Exception as err:
+                logger.warning("Could not refresh the topology snapshot: %s", err)
+                return None
+        return self.topology
+
+    def close(self):
+        """Stop refreshing the snapshot in the background."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _start(self):
+        if self._thread is None and not self._stop.is_set():
+            with self._refresh_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="topology-snapshot-refresh", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval_s):
+            try:
+                self.refresh()
+            except Exception as err:
+                logger.warning("Could not refresh the topology snapshot: %s", err)
@@ -0,0 +1,109 @@
+"""Precomputed active view of the topology.
+
+An element is inactive if it is force disabled or currently in downtime, so the active (filtered) version of a node only
+changes when the node is written or when one of its downtime windows starts or ends. ActiveView caches the active
+version of each node together with the next such boundary, and only recomputes a node once it has been replaced (i.e.
+written or reloaded) or its boundary has passed.
+"""
+
+import threading
+
+from ska_src_site_capabilities_api.common import downtime
+
+
+def is_element_inactive(element, ids_in_downtime):
+    """Check if an element is force disabled or (by id) in downtime."""
+    return bool(element.get("is_force_disabled", False)) or element.get("id") in ids_in_downtime
+
+
+def remove_inactive_elements(element, ids_in_downtime):
+    """
+    Recursively removes elements from a nested structure if they are in downtime or disabled.
+
+    Args:
+        element: A dictionary or list representing the structure to filter.
+        ids_in_downtime: A set of the ids of the elements currently in downtime.
+
+    Returns:
+        The filtered structure with inactive elements removed.
+    """
+    if isinstance(element, dict):
+        if is_element_inactive(element, ids_in_downtime):
+            return None
+
+        # Recurse through the element, checking downtime at each level
+        filtered_element = {}
+        for key, value in element.items():
+            filtered_child = remove_inactive_elements(value, ids_in_downtime)
+            if filtered_child:
+                filtered_element[key] = filtered_child
+        return filtered_element if filtered_element else None
+
+    elif isinstance(element, list):
+        filtered_list = [remove_inactive_elements(item, ids_in_downtime) for item in element]
+        return [item for item in filtered_list if item is not None]
+    return element
+
+
+def get_next_boundary(windows, now):
+    """
+    Get the earliest downtime window start or end not before <now>, or None if there is none.
+
+    Windows are open intervals, so an element only changes state just after a boundary; a boundary equal to <now> is
+    therefore still pending.
+    """
+    boundaries = [boundary for window in windows for boundary in (window.get("start"), window.get("end")) if boundary >= now]
+    return min(boundaries) if boundaries else None
+
+
+class ActiveView:
+    """Cache of the active version of each node.
+
+    Entries are keyed by node name and remember the node document they were computed from, so a node replaced in the
+    source mapping (e.g. TopologySnapshot.nodes after a write or reload) is recomputed on next use without needing to
+    be notified. Active nodes are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    @property
+    def valid_until(self):
+        """The earliest instant at which a cached active node becomes stale (None if no boundary is pending)."""
+        boundaries = [entry[2] for entry in list(self._entries.values()) if entry[2] is not None]
+        return min(boundaries) if boundaries else None
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+    def get_active_nodes(self, nodes, now=None):
+        """
+        Get the active version of each node.
+
+        Args:
+            nodes: A mapping of node name to (full) node document, in node order.
+            now: The current time as a naive UTC datetime, defaults to now.
+
+        Returns:
+            A list of active node documents, excluding nodes that are themselves inactive.
+        """
+        now = now or downtime.utcnow()
+        active_nodes = []
+        with self._lock:
+            for node_name in [node_name for node_name in self._entries if node_name not in nodes]:
+                del self._entries[node_name]
+            for node_name, node in nodes.items():
+                entry = self._entries.get(node_name)
+                if entry is None or entry[0] is not node or (entry[2] is not None and entry[2] <= now):
+                    entry = self._compute_entry(node, now)
+                    self._entries[node_name] = entry
+                if entry[1] is not None:
+                    active_nodes.append(entry[1])
+        return active_nodes
+
+    def _compute_entry(self, node, now):
+        windows = downtime.get_downtime_windows(node)
+        active_node = remove_inactive_elements(node, downtime.get_ids_in_downtime(windows, now))
+        return node, active_node, get_next_boundary(windows, now)
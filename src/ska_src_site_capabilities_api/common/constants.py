@@ -1,7 +1,3 @@
-import os
-
-import requests
-
 from ska_src_site_capabilities_api.common.exceptions import IAMEndpointNotFoundInWellKnown
 from ska_src_site_capabilities_api.common.utility import retry_request
 
@@ -12,12 +8,8 @@ class IAM:
     """
 
     def __init__(self, client_conf_url=None):
-        # Get oidc endpoints from IAM .well_known.
-        # Use custom CA bundle if available for SSL verification
-        session = requests.Session()
-        ca_bundle = os.environ.get("REQUESTS_CA_BUNDLE")
-        if ca_bundle:
-            session.verify = ca_bundle
+        # Get oidc endpoints from IAM .well_known (on the shared session for IAM, which uses the custom CA bundle if
+        # available for SSL verification).
         resp = retry_request(method="GET", url=client_conf_url)
         self.client_well_known = resp.json()
 
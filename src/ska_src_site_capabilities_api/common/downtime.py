@@ -0,0 +1,74 @@
+"""Normalised downtime windows.
+
+Downtime entries are stored on each element as free-form "<start> to <end>" date_range strings. So that the strings do
+not have to be parsed on every read, each node document also carries a flat, indexed "downtime_windows" array with
+one entry per downtime entry in its tree:
+
+    {"entity_id": <id of the element in downtime>, "start": <datetime>, "end": <datetime>}
+
+Datetimes are naive UTC, as they are stored and returned by pymongo.
+"""
+
+import logging
+from datetime import datetime, timezone
+
+import dateutil.parser
+
+logger = logging.getLogger(__name__)
+
+# Name of the node-level field holding the normalised windows.
+DOWNTIME_WINDOWS_FIELD = "downtime_windows"
+
+
+def utcnow():
+    """Get the current time as a naive UTC datetime."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def parse_date_range(date_range):
+    """
+    Parses a "<start> to <end>" date range.
+
+    Returns:
+        A (start, end) tuple of naive UTC datetimes, or None if the date range cannot be parsed.
+    """
+    try:
+        start_str, end_str = date_range.split(" to ")
+        start = dateutil.parser.isoparse(start_str.strip())
+        end = dateutil.parser.isoparse(end_str.strip())
+    except (AttributeError, ValueError):
+        return None
+    if start.tzinfo is not None:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+    if end.tzinfo is not None:
+        end = end.astimezone(timezone.utc).replace(tzinfo=None)
+    return start, end
+
+
+def iter_downtime_windows(element):
+    """Yields a normalised window for each parseable downtime entry of <element> and of every element nested in it."""
+    if isinstance(element, dict):
+        for entry in element.get("downtime") or []:
+            window = parse_date_range(entry.get("date_range")) if isinstance(entry, dict) else None
+            if window is None:
+                if isinstance(entry, dict) and entry.get("date_range"):
+                    logger.warning("Ignoring unparseable downtime date range for %s: %s", element.get("id"), entry.get("date_range"))
+                continue
+            yield {"entity_id": element.get("id"), "start": window[0], "end": window[1]}
+        for key, value in element.items():
+            if key not in ("downtime", DOWNTIME_WINDOWS_FIELD):
+                yield from iter_downtime_windows(value)
+    elif isinstance(element, list):
+        for item in element:
+            yield from iter_downtime_windows(item)
+
+
+def get_downtime_windows(node):
+    """Get the normalised downtime windows of a node document."""
+    return list(iter_downtime_windows(node))
+
+
+def get_ids_in_downtime(windows, now=None):
+    """Get the ids of the elements whose downtime windows (strictly) contain <now>."""
+    now = now or utcnow()
+    return {window.get("entity_id") for window in windows if window.get("start") < now < window.get("end")}
@@ -3,6 +3,7 @@ import logging
 import traceback
 from functools import wraps
 
+import httpx
 import requests
 from fastapi import HTTPException, status
 
@@ -37,6 +38,31 @@ def handle_client_exceptions(func):
     return wrapper
 
 
+def handle_async_client_exceptions(func):
+    """Decorator to handle (asynchronous) client exceptions."""
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
+            detail = f"HTTP error occurred: {e}, response: {e.response.text}"
+            logger.error(detail, exc_info=True)
+            raise HTTPException(status_code=status_code, detail=detail)
+        except HTTPException as e:
+            raise e
+        except CustomHTTPException as e:
+            logger.error("HTTP exception [%s]: %s", e.http_error_status, e.message, exc_info=True)
+            raise HTTPException(status_code=e.http_error_status, detail=e.message)
+        except Exception as e:
+            detail = "General error occurred: {}, traceback: {}".format(repr(e), "".join(traceback.format_tb(e.__traceback__)))
+            logger.error(detail, exc_info=True)
+            raise HTTPException(status_code=500, detail=detail)
+
+    return wrapper
+
+
 def handle_exceptions(func):
     """Decorator to handle server exceptions."""
 
@@ -115,6 +141,13 @@ class IncorrectNodeVersionType(CustomHTTPException):
         super().__init__(self.message)
 
 
+class InvalidCursor(CustomHTTPException):
+    def __init__(self, cursor):
+        self.message = "Invalid pagination cursor '{}'".format(cursor)
+        self.http_error_status = status.HTTP_400_BAD_REQUEST
+        super().__init__(self.message)
+
+
 class NodeAlreadyExists(CustomHTTPException):
     def __init__(self, node_name):
         self.message = "Node with name '{}' already exists".format(node_name)
@@ -122,6 +155,15 @@ class NodeAlreadyExists(CustomHTTPException):
         super().__init__(self.message)
 
 
+class NodeVersionConflict(CustomHTTPException):
+    def __init__(self, node_name, node_version):
+        self.message = "Node with name '{}' was modified concurrently (version '{}' is no longer the latest), retry the edit".format(
+            node_name, node_version
+        )
+        self.http_error_status = status.HTTP_409_CONFLICT
+        super().__init__(self.message)
+
+
 class NodeVersionNotFound(CustomHTTPException):
     def __init__(self, node_name, node_version):
         self.message = "Node with name '{}' and version '{}' could not be found".format(node_name, node_version)
@@ -129,6 +171,13 @@ class NodeVersionNotFound(CustomHTTPException):
         super().__init__(self.message)
 
 
+class OutboundCallTimeout(CustomHTTPException):
+    def __init__(self, service, timeout_s):
+        self.message = "Call to {} did not complete within {}s".format(service, timeout_s)
+        self.http_error_status = status.HTTP_504_GATEWAY_TIMEOUT
+        super().__init__(self.message)
+
+
 class RetryRequestError(CustomHTTPException):
     def __init__(self, last_error, last_response):
         error_type = type(last_error).__name__ if last_error else ""
@@ -144,6 +193,7 @@ class RetryRequestError(CustomHTTPException):
             f"Last Error Message: {error_message}\n"
             f"Last Response Content: {json.dumps(response_content, indent=2) if response_content else ''}"
         )
+        self.http_error_status = status.HTTP_502_BAD_GATEWAY
         super().__init__(self.message)
 
 
@@ -194,3 +244,10 @@ class StorageAreaNotFound(CustomHTTPException):
         self.message = "Storage area with identifier '{}' could not be found".format(storage_area_id)
         self.http_error_status = status.HTTP_404_NOT_FOUND
         super().__init__(self.message)
+
+
+class TooManyIdentifiers(CustomHTTPException):
+    def __init__(self, number_of_ids, max_ids):
+        self.message = "Too many identifiers requested ({}), at most {} are allowed per request".format(number_of_ids, max_ids)
+        self.http_error_status = status.HTTP_400_BAD_REQUEST
+        super().__init__(self.message)
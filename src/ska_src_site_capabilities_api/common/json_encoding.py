@@ -0,0 +1,46 @@
+"""Fast JSON encoding of backend outputs.
+
+Responses are nested dictionaries and lists of JSON types, encoded with orjson straight to bytes, which is several
+times faster than the standard library for large listings; the output is the same compact UTF-8 JSON as Starlette's
+JSONResponse. Content orjson cannot encode (e.g. integers beyond 64 bits or non-string keys) falls back to the standard
+library, as does everything if orjson is not installed (e.g. when the client is installed without the service's
+dependencies).
+
+Responses are encoded from the dictionaries the backend builds rather than through typed structures mirroring the
+models: listings carry fields the models do not describe (parent_* fields, free-form other_attributes), which typed
+structures would drop, and building them would cost more than the encoding saves.
+
+This module does not depend on Starlette, so that the clients can encode the responses they answer locally with it
+(the REST routes use rest.responses.FastJSONResponse).
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # a dependency of the service, but the standard library encoder is used without it
+    orjson = None
+
+
+def encode_json_stdlib(content):
+    """Encode content as compact UTF-8 JSON with the standard library (as Starlette's JSONResponse does)."""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def encode_json(content):
+    """
+    Encode content as compact UTF-8 JSON.
+
+    Args:
+        content: A JSON-serialisable object.
+
+    Returns:
+        The encoded bytes. NaN and infinite floats, which are not valid JSON, are encoded as null by orjson (and
+        rejected with a ValueError by the standard library).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content)
+        except (orjson.JSONEncodeError, TypeError):
+            return encode_json_stdlib(content)
+    return encode_json_stdlib(content)
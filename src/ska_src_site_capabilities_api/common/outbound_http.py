@@ -0,0 +1,168 @@
+"""Shared, pooled HTTP sessions for outbound calls.
+
+Every call the service makes to another service (permissions, auth, IAM) goes through a session shared by the whole
+process for that upstream (scheme, host and port), so connections, and their TLS sessions, are kept alive and reused
+rather than established for every call. Sessions trust the REQUESTS_CA_BUNDLE if set, apply a default timeout to
+requests made without one, and record the latency and errors of every request by upstream.
+
+Sessions are recreated in a process forked from the one that created them, since pooled connections must not be shared
+across processes. AsyncClients are likewise kept per upstream for each event loop.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from urllib.parse import urlparse
+
+import httpx
+import requests
+from prometheus_client import Counter, Histogram
+from requests.adapters import HTTPAdapter
+
+UPSTREAM_REQUEST_DURATION_SECONDS = Histogram(
+    "scapi_upstream_request_duration_seconds",
+    "Duration of HTTP requests made to other services, by upstream.",
+    ["upstream"],
+)
+UPSTREAM_REQUEST_ERRORS_TOTAL = Counter(
+    "scapi_upstream_request_errors_total",
+    "Number of HTTP requests made to other services that failed, by upstream and reason (exception type or 5xx status).",
+    ["upstream", "reason"],
+)
+
+# Settings of the sessions created from now on (see configure).
+settings = {"pool_maxsize": 10, "default_timeout_s": 10.0}
+
+_lock = threading.Lock()
+_sessions = {}
+_sessions_pid = None
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def configure(pool_maxsize=None, default_timeout_s=None):
+    """
+    Sets the connection pool size per upstream and the default request timeout of the sessions and clients created from
+    now on (i.e. call before any outbound call is made).
+    """
+    if pool_maxsize is not None:
+        settings["pool_maxsize"] = pool_maxsize
+    if default_timeout_s is not None:
+        settings["default_timeout_s"] = default_timeout_s
+
+
+def get_upstream(url):
+    """Get the upstream (scheme://host[:port]) a url belongs to."""
+    parsed = urlparse(str(url))
+    return "{}://{}".format(parsed.scheme, parsed.netloc)
+
+
+def record_error(upstream, reason):
+    UPSTREAM_REQUEST_ERRORS_TOTAL.labels(upstream=upstream, reason=reason).inc()
+
+
+class UpstreamSession(requests.Session):
+    """A requests session pooling connections to an upstream, recording the latency and errors of its requests."""
+
+    def __init__(self, upstream, pool_maxsize=10, default_timeout_s=None):
+        super().__init__()
+        self.upstream = upstream
+        self.default_timeout_s = default_timeout_s
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        ca_bundle = os.environ.get("REQUESTS_CA_BUNDLE")
+        if ca_bundle:
+            self.verify = ca_bundle
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.default_timeout_s
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, **kwargs)
+        except requests.exceptions.RequestException as err:
+            record_error(self.upstream, type(err).__name__)
+            raise
+        finally:
+            UPSTREAM_REQUEST_DURATION_SECONDS.labels(upstream=self.upstream).observe(time.perf_counter() - start)
+        if response.status_code >= 500:
+            record_error(self.upstream, str(response.status_code))
+        return response
+
+
+class UpstreamAsyncClient(httpx.AsyncClient):
+    """An httpx AsyncClient pooling connections to an upstream, recording the latency and errors of its requests."""
+
+    def __init__(self, upstream, pool_maxsize=10, default_timeout_s=None, **kwargs):
+        ca_bundle = os.environ.get("REQUESTS_CA_BUNDLE")
+        if ca_bundle:
+            kwargs.setdefault("verify", ca_bundle)
+        super().__init__(
+            limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize),
+            timeout=default_timeout_s,
+            **kwargs,
+        )
+        self.upstream = upstream
+
+    async def send(self, request, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await super().send(request, **kwargs)
+        except httpx.HTTPError as err:
+            record_error(self.upstream, type(err).__name__)
+            raise
+        finally:
+            UPSTREAM_REQUEST_DURATION_SECONDS.labels(upstream=self.upstream).observe(time.perf_counter() - start)
+        if response.status_code >= 500:
+            record_error(self.upstream, str(response.status_code))
+        return response
+
+
+def get_session(url):
+    """Get the process-wide session for the upstream of <url>."""
+    global _sessions_pid
+    upstream = get_upstream(url)
+    with _lock:
+        if _sessions_pid != os.getpid():
+            # sessions inherited across a fork must not be used (or closed) by the child, so just drop them
+            _sessions.clear()
+            _sessions_pid = os.getpid()
+        session = _sessions.get(upstream)
+        if session is None:
+            session = _sessions[upstream] = UpstreamSession(upstream, **settings)
+        return session
+
+
+def get_async_client(url):
+    """Get the AsyncClient for the upstream of <url> on the running event loop."""
+    loop = asyncio.get_running_loop()
+    upstream = get_upstream(url)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(upstream)
+        if client is None or client.is_closed:
+            client = clients[upstream] = UpstreamAsyncClient(upstream, **settings)
+        return client
+
+
+def use_shared_session(client, url):
+    """Make a client with a requests session (its <session> attribute) use the shared session for <url> instead."""
+    if isinstance(getattr(client, "session", None), requests.Session):
+        client.session = get_session(url)
+
+
+def close_sessions():
+    """Close the sessions of this process."""
+    with _lock:
+        if _sessions_pid == os.getpid():
+            for session in _sessions.values():
+                session.close()
+        _sessions.clear()
+
+
+def backoff_delay(attempt, base_s, max_s):
+    """Get the time to wait before retry number <attempt> (from 1): exponential in <attempt>, capped, with full jitter."""
+    return random.uniform(0, min(max_s, base_s * 2 ** (attempt - 1)))
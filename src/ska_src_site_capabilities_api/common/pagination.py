@@ -0,0 +1,101 @@
+"""Cursor-based pagination of list results.
+
+Paginated results are ordered by a stable key (the entity id, or the node name and version) and a page's cursor
+encodes the key of its last item, so that the next page starts strictly after it. Unlike offsets, cursors are not
+affected by items added or removed before them between requests.
+"""
+
+import base64
+import binascii
+import json
+
+from ska_src_site_capabilities_api.common.exceptions import InvalidCursor
+
+# Response header carrying the cursor of the next page, absent on the last page.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Page(list):
+    """A page of results: a list carrying the opaque cursor of the next page (None on the last page)."""
+
+    def __init__(self, items=(), next_cursor=None):
+        super().__init__(items)
+        self.next_cursor = next_cursor
+
+
+def entity_key(entity):
+    """Sort key of an entity."""
+    return (entity.get("id") or "",)
+
+
+def node_key(node):
+    """Sort key of a node version."""
+    return (node.get("name") or "", node.get("version") or 0)
+
+
+def encode_cursor(key):
+    """Encodes a sort key as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(list(key), separators=(",", ":")).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, key_length=None):
+    """
+    Decodes a cursor into the sort key it was made from.
+
+    Args:
+        cursor: The cursor.
+        key_length: The expected number of fields in the key, if known.
+
+    Raises:
+        InvalidCursor: If the cursor was not made by encode_cursor (from a key of <key_length> fields).
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor)
+    if not isinstance(key, list) or (key_length is not None and len(key) != key_length):
+        raise InvalidCursor(cursor)
+    return tuple(key)
+
+
+def is_paginated(limit=None, cursor=None):
+    return limit is not None or cursor is not None
+
+
+def paginate(items, key, limit=None, cursor=None):
+    """
+    Gets a page of items.
+
+    Args:
+        items: An iterable of items.
+        key: Function returning the (tuple) sort key of an item; keys must be unique.
+        limit: Maximum number of items in the page (None for all remaining items).
+        cursor: Cursor of the page to get, from the previous page's next_cursor (None for the first page).
+
+    Returns:
+        A Page of items.
+    """
+    keyed_items = sorted(((key(item), item) for item in items), key=lambda keyed_item: keyed_item[0])
+    after = decode_cursor(cursor, key_length=len(keyed_items[0][0]) if keyed_items else None) if cursor else None
+    if after is not None:
+        try:
+            keyed_items = [keyed_item for keyed_item in keyed_items if keyed_item[0] > after]
+        except TypeError:  # a cursor for a different kind of item
+            raise InvalidCursor(cursor)
+    if limit is None or len(keyed_items) <= limit:
+        return Page([item for _, item in keyed_items])
+    return Page([item for _, item in keyed_items[:limit]], next_cursor=encode_cursor(keyed_items[limit - 1][0]))
+
+
+def map_page(page, items):
+    """Wraps items derived from <page> in a Page with the same next cursor if <page> is one."""
+    if isinstance(page, Page):
+        return Page(items, next_cursor=page.next_cursor)
+    return items
+
+
+def get_page_headers(page):
+    """Gets the response headers for a page of results."""
+    if isinstance(page, Page) and page.next_cursor:
+        return {NEXT_CURSOR_HEADER: page.next_cursor}
+    return {}
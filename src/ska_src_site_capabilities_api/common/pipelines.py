@@ -0,0 +1,334 @@
+"""Query planning for the list_* backend methods.
+
+An EntityQuery describes which entities (sites, compute, services, queues, storages or storage areas) are wanted and
+how they are filtered. It can be compiled into a MongoDB aggregation pipeline, so that filtering happens server-side
+and only the matching sub-documents cross the wire, or evaluated in Python against full node documents as a fallback.
+Both paths produce the same rows:
+
+    {
+        "parents": {<parent field>: <value>, ...},  # e.g. parent_node_name, parent_site_id
+        "entity": {...},                             # the entity sub-document
+        "site": {"latitude": <float>, "longitude": <float>},  # storages and storage areas only
+        "scope": "local" | "global",                 # services only
+    }
+
+Unless inactive entities are included, both paths drop entities that are force disabled or in downtime, or that have
+such an ancestor; downtime is given as the set of element ids currently in downtime (see common.downtime).
+
+If only some fields are wanted (see common.projection), the pipeline only projects the selected parent fields and the
+selected top-level entity fields (plus those it filters on), so that unwanted sub-documents never cross the wire;
+nested paths are selected by the caller, once nested inactive elements have been removed.
+"""
+
+from ska_src_site_capabilities_api.common import projection
+from ska_src_site_capabilities_api.common.active_view import remove_inactive_elements
+
+# Array fields unwound (in order) from a node document to reach each entity type.
+ENTITY_LEVELS = {
+    "site": ("sites",),
+    "compute": ("sites", "compute"),
+    "service": ("sites", "compute"),  # services are then taken from the compute's local/global service lists
+    "queue": ("sites", "compute", "queues"),
+    "storage": ("sites", "storages"),
+    "storage_area": ("sites", "storages", "areas"),
+}
+
+# Parent fields added to each entity type, as (output key, level, field) where level is the ancestor level ("node" or
+# an array field from ENTITY_LEVELS).
+PARENT_FIELDS = {
+    "site": (("parent_node_name", "node", "name"),),
+    "compute": (
+        ("parent_node_name", "node", "name"),
+        ("parent_site_name", "sites", "name"),
+        ("parent_site_id", "sites", "id"),
+    ),
+    "service": (
+        ("parent_node_name", "node", "name"),
+        ("parent_site_name", "sites", "name"),
+        ("parent_site_id", "sites", "id"),
+        ("parent_compute_id", "compute", "id"),
+    ),
+    "queue": (
+        ("parent_node_name", "node", "name"),
+        ("parent_site_name", "sites", "name"),
+        ("parent_site_id", "sites", "id"),
+        ("parent_compute_id", "compute", "id"),
+        ("parent_compute_name", "compute", "name"),
+    ),
+    "storage": (
+        ("parent_node_name", "node", "name"),
+        ("parent_site_name", "sites", "name"),
+        ("parent_site_id", "sites", "id"),
+    ),
+    "storage_area": (
+        ("parent_node_name", "node", "name"),
+        ("parent_site_name", "sites", "name"),
+        ("parent_site_id", "sites", "id"),
+        ("parent_storage_id", "storages", "id"),
+    ),
+}
+
+# Entity fields the pipeline filters on after projecting entities, which are projected even if not selected.
+FILTERED_ENTITY_FIELDS = ("id", "is_force_disabled", "type", "associated_storage_area_id")
+
+SERVICE_SCOPES = {"all": ("local", "global"), "local": ("local",), "global": ("global",)}
+
+
+def _normalise_names(names):
+    """Accept either a list of names or a comma-separated string of names."""
+    if not names:
+        return []
+    if isinstance(names, str):
+        return [name.strip() for name in names.split(",") if name.strip()]
+    return list(names)
+
+
+class EntityQuery:
+    """A filtered query for one entity type."""
+
+    def __init__(
+        self,
+        entity_type,
+        node_names=None,
+        site_names=None,
+        service_types=None,
+        service_scope="all",
+        associated_storage_area_id=None,
+        include_inactive=False,
+        ids_in_downtime=None,
+        after_id=None,
+        limit=None,
+        fields=None,
+    ):
+        """
+        Args:
+            entity_type: The type of entity to list.
+            node_names: List (or comma-separated string) of node names to filter by.
+            site_names: List (or comma-separated string) of site names to filter by.
+            service_types: List (or comma-separated string) of service types to filter by (services only).
+            service_scope: Service scope ("all", "local" or "global") to filter by (services only).
+            associated_storage_area_id: Associated storage area id to filter by (services only).
+            include_inactive: Include entities that are, or have an ancestor that is, force disabled or in downtime.
+            ids_in_downtime: Ids of the elements currently in downtime, used if include_inactive is False.
+            after_id: Only return entities with an id after this one, in id order (pipeline only, for pagination).
+            limit: Only return the first <limit> + 1 entities in id order (pipeline only, so that the caller can tell
+                whether there is another page).
+            fields: List (or comma-separated string) of dotted paths of the fields to return (see common.projection),
+                or None for all fields.
+        """
+        if entity_type not in ENTITY_LEVELS:
+            raise ValueError("Unknown entity type: {}".format(entity_type))
+        self.entity_type = entity_type
+        self.node_names = _normalise_names(node_names)
+        self.site_names = _normalise_names(site_names)
+        self.service_types = _normalise_names(service_types)
+        self.service_scopes = SERVICE_SCOPES.get(service_scope, ())
+        self.associated_storage_area_id = associated_storage_area_id
+        self.include_inactive = include_inactive
+        self.ids_in_downtime = set(ids_in_downtime or [])
+        self.after_id = after_id
+        self.limit = limit
+        self.fields = projection.parse_fields(fields)
+        self.levels = ENTITY_LEVELS[entity_type]
+
+    def _level_paths(self):
+        """Map each level to its dotted path in the unwound document ("" for the node itself)."""
+        paths = {"node": ""}
+        path = ""
+        for level in self.levels:
+            path = "{}.{}".format(path, level) if path else level
+            paths[level] = path
+        return paths
+
+    def _parent_fields(self):
+        """Get the parent fields to return, as (output key, level, field)."""
+        return [parent for parent in PARENT_FIELDS[self.entity_type] if self.fields is None or parent[0] in self.fields]
+
+    def _entity_projection(self, path):
+        """Get the projection of the entity at <path> (an aggregation expression) keeping the selected top-level fields."""
+        if self.fields is None:
+            return path
+        names = list(self.fields) + [name for name in FILTERED_ENTITY_FIELDS if name not in self.fields]
+        return {name: "{}.{}".format(path, name) for name in names}
+
+    def _is_inactive(self, element):
+        return bool(element.get("is_force_disabled", False)) or element.get("id") in self.ids_in_downtime
+
+    def _service_matches(self, service):
+        if self.service_types and service.get("type") not in self.service_types:
+            return False
+        if self.associated_storage_area_id and service.get("associated_storage_area_id") != self.associated_storage_area_id:
+            return False
+        return True
+
+    def to_pipeline(self):
+        """Compile the query into a MongoDB aggregation pipeline over the nodes collection."""
+        pipeline = self._build_pipeline()
+        if self.after_id is not None:
+            pipeline.append({"$match": {"entity.id": {"$gt": self.after_id}}})
+        if self.limit is not None:
+            pipeline.append({"$sort": {"entity.id": 1}})
+            pipeline.append({"$limit": self.limit + 1})
+        return pipeline
+
+    def _build_pipeline(self):
+        paths = self._level_paths()
+
+        def field(level, name):
+            return "${}".format("{}.{}".format(paths[level], name) if paths[level] else name)
+
+        # Coarse match on whole node documents first, so that indexes on e.g. name and sites.name can be used.
+        conditions = []
+        if self.node_names:
+            conditions.append({"name": {"$in": self.node_names}})
+        if self.site_names:
+            conditions.append({"sites.name": {"$in": self.site_names}})
+        if not self.include_inactive:
+            conditions.append({"is_force_disabled": {"$ne": True}})
+        if self.entity_type == "service":
+            if self.service_types:
+                conditions.append(
+                    {
+                        "$or": [
+                            {"sites.compute.associated_{}_services.type".format(scope): {"$in": self.service_types}} for scope in self.service_scopes
+                        ]
+                    }
+                )
+            if self.associated_storage_area_id:
+                conditions.append(
+                    {
+                        "$or": [
+                            {"sites.compute.associated_{}_services.associated_storage_area_id".format(scope): self.associated_storage_area_id}
+                            for scope in self.service_scopes
+                        ]
+                    }
+                )
+        pipeline = []
+        if conditions:
+            pipeline.append({"$match": conditions[0] if len(conditions) == 1 else {"$and": conditions}})
+
+        # Unwind down to the requested level, matching at each level on the way.
+        for level in self.levels:
+            pipeline.append({"$unwind": "${}".format(paths[level])})
+            match = {}
+            if level == "sites" and self.site_names:
+                match["sites.name"] = {"$in": self.site_names}
+            if not self.include_inactive:
+                match["{}.is_force_disabled".format(paths[level])] = {"$ne": True}
+                if self.ids_in_downtime:
+                    match["{}.id".format(paths[level])] = {"$nin": sorted(self.ids_in_downtime)}
+            if match:
+                pipeline.append({"$match": match})
+
+        # missing parent fields are reported as null, as they are by the Python path
+        parents = {key: {"$ifNull": [field(level, name), None]} for key, level, name in self._parent_fields()}
+        projection = {"_id": 0, "parents": parents or {"$literal": {}}}  # an empty sub-projection is not valid
+        if self.entity_type in ("storage", "storage_area"):
+            projection["site"] = {"latitude": field("sites", "latitude"), "longitude": field("sites", "longitude")}
+
+        if self.entity_type != "service":
+            projection["entity"] = self._entity_projection("${}".format(paths[self.levels[-1]]))
+            pipeline.append({"$project": projection})
+            return pipeline
+
+        # Services: combine the local/global lists of each compute element, tagging each with its scope.
+        projection["services"] = {
+            "$concatArrays": [
+                {
+                    "$map": {
+                        "input": {"$ifNull": [field("compute", "associated_{}_services".format(scope)), []]},
+                        "as": "service",
+                        "in": {"scope": scope, "entity": self._entity_projection("$$service")},
+                    }
+                }
+                for scope in self.service_scopes
+            ]
+        }
+        pipeline.append({"$project": projection})
+        pipeline.append({"$unwind": "$services"})
+        match = {}
+        if self.service_types:
+            match["services.entity.type"] = {"$in": self.service_types}
+        if self.associated_storage_area_id:
+            match["services.entity.associated_storage_area_id"] = self.associated_storage_area_id
+        if not self.include_inactive:
+            match["services.entity.is_force_disabled"] = {"$ne": True}
+            if self.ids_in_downtime:
+                match["services.entity.id"] = {"$nin": sorted(self.ids_in_downtime)}
+        if match:
+            pipeline.append({"$match": match})
+        pipeline.append(
+            {
+                "$project": {
+                    "parents": 1,
+                    "scope": "$services.scope",
+                    "entity": "$services.entity",
+                }
+            }
+        )
+        return pipeline
+
+    def rows_from_nodes(self, nodes):
+        """Evaluate the query in Python against full node documents, yielding the same rows as the pipeline."""
+        for node in nodes:
+            if self.node_names and node.get("name") not in self.node_names:
+                continue
+            if not self.include_inactive and self._is_inactive(node):
+                continue
+            yield from self._rows_from_level(node, 0, {"node": node})
+
+    def _rows_from_level(self, element, depth, ancestors):
+        if depth == len(self.levels):
+            yield from self._rows_from_leaf(element, ancestors)
+            return
+        level = self.levels[depth]
+        for child in element.get(level, []):
+            if level == "sites" and self.site_names and child.get("name") not in self.site_names:
+                continue
+            if not self.include_inactive and self._is_inactive(child):
+                continue
+            yield from self._rows_from_level(child, depth + 1, {**ancestors, level: child})
+
+    def _rows_from_leaf(self, element, ancestors):
+        row = {"parents": {key: ancestors[level].get(name) for key, level, name in self._parent_fields()}}
+        if self.entity_type in ("storage", "storage_area"):
+            row["site"] = {"latitude": ancestors["sites"].get("latitude"), "longitude": ancestors["sites"].get("longitude")}
+
+        if self.entity_type != "service":
+            yield {**row, "entity": element}
+            return
+        for scope in self.service_scopes:
+            for service in element.get("associated_{}_services".format(scope), []):
+                if not self.include_inactive and self._is_inactive(service):
+                    continue
+                if self._service_matches(service):
+                    yield {**row, "scope": scope, "entity": service}
+
+    def entities_from_rows(self, rows, ids_in_downtime=None):
+        """
+        Combines each row's entity with its parent information, selecting the query's fields if any.
+
+        Args:
+            rows: Rows produced by the pipeline or by rows_from_nodes.
+            ids_in_downtime: Ids of the elements currently in downtime, to remove inactive elements nested in each
+                entity (None if they are already removed).
+
+        Returns:
+            A list of (entity, site) tuples, where entity contains parent information and site contains the parent
+            site's coordinates (for storages and storage areas).
+        """
+        entities = []
+        for row in rows:
+            entity = row.get("entity")
+            if ids_in_downtime is not None:
+                entity = remove_inactive_elements(entity, ids_in_downtime)
+            if not entity:
+                continue
+            parents = row.get("parents", {})
+            if "scope" in row:
+                parents = {"scope": row.get("scope"), **parents}
+            if self.fields is not None:
+                parents = projection.project(parents, self.fields)
+                entity = projection.project(entity, self.fields)
+            entities.append(({**parents, **entity}, row.get("site", {})))
+        return entities
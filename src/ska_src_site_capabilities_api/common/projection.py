@@ -0,0 +1,65 @@
+"""Sparse field selection for list results.
+
+Callers can ask for a subset of each entity's fields as a list of dotted paths, e.g. ["host", "port",
+"parent_site_name", "downtime.date_range"]. Paths are parsed into a tree of keys,
+
+    {"id": None, "host": None, "port": None, "parent_site_name": None, "downtime": {"date_range": None}}
+
+where None selects the whole value. Paths through a list of sub-documents apply to each of its items. An entity's id
+is always selected, as it identifies the entity (and orders pages of results).
+"""
+
+
+def parse_fields(fields):
+    """
+    Parses the paths of the fields to select.
+
+    Args:
+        fields: List (or comma-separated string) of dotted field paths, or None to select all fields.
+
+    Returns:
+        The field tree (see module docstring), or None if all fields are selected.
+    """
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    paths = [path.strip() for path in fields or [] if path and path.strip()]
+    if not paths:
+        return None
+
+    tree = {"id": None}
+    for path in paths:
+        keys = [key.strip() for key in path.split(".") if key.strip()]
+        node = tree
+        for depth, key in enumerate(keys):
+            if depth == len(keys) - 1:
+                node[key] = None
+                break
+            if key in node and node[key] is None:  # the whole value is already selected
+                break
+            node = node.setdefault(key, {})
+    return tree
+
+
+def project(document, tree):
+    """
+    Selects fields from a document.
+
+    Args:
+        document: A dictionary.
+        tree: A field tree, as returned by parse_fields.
+
+    Returns:
+        A new dictionary with only the selected fields that are present in <document>.
+    """
+    projected = {}
+    for key, subtree in tree.items():
+        if key not in document:
+            continue
+        value = document[key]
+        if subtree is None:
+            projected[key] = value
+        elif isinstance(value, dict):
+            projected[key] = project(value, subtree)
+        elif isinstance(value, list):
+            projected[key] = [project(item, subtree) for item in value if isinstance(item, dict)]
+    return projected
@@ -0,0 +1,180 @@
+"""In-memory registry of the JSON schemas defining entities.
+
+The schemas under SCHEMAS_RELPATH are loaded and dereferenced once, and kept as plain dictionaries together with their
+encoded JSON and the enums derived from them (service and storage area types), so that the routes serving them do no
+file or dereferencing work.
+
+Once watching, the registry checks the files for changes (names, modification times and sizes) from a background thread
+at a fixed interval, and reloads all schemas if any has changed, since a schema can include others by reference. A
+reload that fails (e.g. on a file being written) keeps the schemas previously loaded.
+"""
+
+import logging
+import os
+import pathlib
+import threading
+from collections import namedtuple
+
+from prometheus_client import Counter
+
+from ska_src_site_capabilities_api.common.exceptions import SchemaNotFound
+from ska_src_site_capabilities_api.common.json_encoding import encode_json
+from ska_src_site_capabilities_api.common.utility import load_and_dereference_schema
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_REGISTRY_RELOADS_TOTAL = Counter(
+    "scapi_schema_registry_reloads_total",
+    "Number of times the schema registry (re)loaded the schemas, by result (success or failure).",
+    ["result"],
+)
+
+SCHEMA_EXTENSION = ".json"
+
+Schemas = namedtuple("Schemas", ["fingerprint", "schemas", "encoded", "service_types", "storage_area_types"])
+
+
+def get_enum_of_type(schema):
+    """Get the enum of the "type" property of a schema (e.g. the service types of a service schema)."""
+    return schema.get("properties", {}).get("type", {}).get("enum", [])
+
+
+class SchemaRegistry:
+    """Dereferenced schemas, loaded once and reloaded when their files change."""
+
+    def __init__(self, schemas_path):
+        """
+        Args:
+            schemas_path: The directory holding the schemas (one <name>.json file per schema).
+        """
+        self.schemas_path = pathlib.Path(schemas_path).absolute()
+        self._lock = threading.Lock()
+        self._reload_listeners = []
+        self._schemas = self._load(self._get_fingerprint())
+        self._failed_fingerprint = None
+        SCHEMA_REGISTRY_RELOADS_TOTAL.labels(result="success").inc()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_reload_listener(self, listener):
+        """Call <listener> (without arguments) whenever the schemas are reloaded, e.g. to drop responses derived from them."""
+        self._reload_listeners.append(listener)
+
+    def _get_fingerprint(self):
+        files = []
+        with os.scandir(self.schemas_path) as entries:
+            for entry in entries:
+                if entry.name.endswith(SCHEMA_EXTENSION) and entry.is_file():
+                    stat = entry.stat()
+                    files.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(sorted(files))
+
+    def _load(self, fingerprint):
+        schemas = {}
+        for file_name, _, _ in fingerprint:
+            schemas[file_name[: -len(SCHEMA_EXTENSION)]] = load_and_dereference_schema(schema_path=self.schemas_path / file_name)
+        service_types = None
+        if "local-service" in schemas and "global-service" in schemas:
+            service_types = {
+                "local": get_enum_of_type(schemas["local-service"]),
+                "global": get_enum_of_type(schemas["global-service"]),
+            }
+        storage_area_types = get_enum_of_type(schemas["storage-area"]) if "storage-area" in schemas else None
+        return Schemas(
+            fingerprint=fingerprint,
+            schemas=schemas,
+            encoded={name: encode_json(schema) for name, schema in schemas.items()},
+            service_types=service_types,
+            storage_area_types=storage_area_types,
+        )
+
+    def reload_if_changed(self):
+        """
+        Reload the schemas if their files have changed since they were loaded.
+
+        Returns:
+            True if the schemas were reloaded.
+        """
+        with self._lock:
+            fingerprint = None
+            try:
+                fingerprint = self._get_fingerprint()
+                if fingerprint in (self._schemas.fingerprint, self._failed_fingerprint):
+                    return False
+                self._schemas = self._load(fingerprint)
+            except Exception as err:
+                # not retried until the files change again
+                self._failed_fingerprint = fingerprint
+                SCHEMA_REGISTRY_RELOADS_TOTAL.labels(result="failure").inc()
+                logger.warning("Could not reload the schemas from %s, keeping those previously loaded: %s", self.schemas_path, err)
+                return False
+            SCHEMA_REGISTRY_RELOADS_TOTAL.labels(result="success").inc()
+            logger.info("Reloaded the schemas from %s", self.schemas_path)
+        for listener in self._reload_listeners:
+            listener()
+        return True
+
+    def start_watching(self, check_interval_s=5.0):
+        """Start checking the files for changes every <check_interval_s> seconds in a background thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, args=(check_interval_s,), name="schema-registry-watch", daemon=True)
+            self._thread.start()
+
+    def stop_watching(self):
+        """Stop checking the files for changes."""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def _watch(self, check_interval_s):
+        while not self._stop.wait(check_interval_s):
+            self.reload_if_changed()
+
+    @property
+    def names(self):
+        """The sorted names of the schemas."""
+        return sorted(self._schemas.schemas)
+
+    def get(self, name):
+        """
+        Get a dereferenced schema.
+
+        The dictionary returned is shared by every caller, so it must not be modified (copy it first).
+
+        Raises:
+            SchemaNotFound: If there is no schema with this name.
+        """
+        try:
+            return self._schemas.schemas[name]
+        except KeyError:
+            raise SchemaNotFound(name)
+
+    def get_encoded(self, name):
+        """
+        Get a dereferenced schema encoded as JSON.
+
+        Raises:
+            SchemaNotFound: If there is no schema with this name.
+        """
+        try:
+            return self._schemas.encoded[name]
+        except KeyError:
+            raise SchemaNotFound(name)
+
+    @property
+    def service_types(self):
+        """The local and global service types (as {"local": [...], "global": [...]})."""
+        schemas = self._schemas
+        if schemas.service_types is None:
+            raise SchemaNotFound("local-service" if "local-service" not in schemas.schemas else "global-service")
+        return schemas.service_types
+
+    @property
+    def storage_area_types(self):
+        """The storage area types."""
+        storage_area_types = self._schemas.storage_area_types
+        if storage_area_types is None:
+            raise SchemaNotFound("storage-area")
+        return storage_area_types
@@ -0,0 +1,220 @@
+import copy
+import threading
+import time
+
+from ska_src_site_capabilities_api.common.active_view import ActiveView
+from ska_src_site_capabilities_api.common.downtime import DOWNTIME_WINDOWS_FIELD
+
+ENTITY_TYPES = ("site", "compute", "service", "storage", "storage_area", "queue")
+
+
+def iter_node_entities(node):
+    """Flatten a node document into its entities.
+
+    Yields (entity_type, entity_id, entity, parent_chain) tuples in the same order a walk of the node hierarchy would
+    find them. Each entity carries the same parent fields as the corresponding list_* backend method output, and the
+    parent chain is a tuple of (entity_type, identifier) pairs from the node down to the entity's direct parent.
+    """
+    node_name = node.get("name")
+    node_chain = (("node", node_name),)
+    for site in node.get("sites", []):
+        site_id = site.get("id")
+        site_name = site.get("name")
+        site_chain = node_chain + (("site", site_id),)
+        yield "site", site_id, {"parent_node_name": node_name, **site}, node_chain
+
+        for compute in site.get("compute", []):
+            compute_id = compute.get("id")
+            compute_chain = site_chain + (("compute", compute_id),)
+            yield "compute", compute_id, {
+                "parent_node_name": node_name,
+                "parent_site_name": site_name,
+                "parent_site_id": site_id,
+                **compute,
+            }, site_chain
+            for scope in ("local", "global"):
+                for service in compute.get("associated_{}_services".format(scope), []):
+                    yield "service", service.get("id"), {
+                        "parent_node_name": node_name,
+                        "parent_site_name": site_name,
+                        "parent_site_id": site_id,
+                        "parent_compute_id": compute_id,
+                        "scope": scope,
+                        **service,
+                    }, compute_chain
+            for queue in compute.get("queues", []):
+                yield "queue", queue.get("id"), {
+                    "parent_node_name": node_name,
+                    "parent_site_name": site_name,
+                    "parent_site_id": site_id,
+                    "parent_compute_id": compute_id,
+                    "parent_compute_name": compute.get("name"),
+                    **queue,
+                }, compute_chain
+
+        for storage in site.get("storages", []):
+            storage_id = storage.get("id")
+            yield "storage", storage_id, {
+                "parent_node_name": node_name,
+                "parent_site_name": site_name,
+                "parent_site_id": site_id,
+                **storage,
+            }, site_chain
+            for area in storage.get("areas", []):
+                yield "storage_area", area.get("id"), {
+                    "parent_node_name": node_name,
+                    "parent_site_name": site_name,
+                    "parent_site_id": site_id,
+                    "parent_storage_id": storage_id,
+                    **area,
+                }, site_chain + (("storage", storage_id),)
+
+
+class TopologySnapshot:
+    """Materialised, in-memory view of the latest version of every node.
+
+    Holds the latest node documents keyed by name, plus a hash index per entity type mapping each entity id to its
+    flattened representation (with parent fields) and parent chain, so that get-by-id lookups are dictionary hits.
+
+    Nodes are kept in the order they were loaded or last written, mirroring MongoDB's natural order for the nodes
+    collection; where an id is (incorrectly) used more than once, the first occurrence in this order wins, as it would
+    for a linear scan.
+    """
+
+    def __init__(self, max_age_s=None):
+        """
+        Args:
+            max_age_s: Age in seconds after which the snapshot is considered stale and should be reloaded. None
+                means never stale.
+        """
+        self.max_age_s = max_age_s
+        self._lock = threading.RLock()
+        self.active_view = ActiveView()
+        self.clear()
+        self.loaded_at = None
+
+    @property
+    def is_loaded(self):
+        return self.loaded_at is not None
+
+    @property
+    def is_stale(self):
+        if not self.is_loaded:
+            return True
+        if self.max_age_s is None:
+            return False
+        return time.monotonic() - self.loaded_at > self.max_age_s
+
+    def clear(self):
+        """Empty the snapshot (it is still considered loaded, e.g. after all nodes are deleted)."""
+        with self._lock:
+            self.nodes = {}
+            self._index = {entity_type: {} for entity_type in ENTITY_TYPES}
+            self._keys_by_node = {}
+            self._names_by_document_id = {}
+            self.loaded_at = time.monotonic()
+
+    def invalidate(self):
+        """Mark the snapshot as stale so that it is reloaded on next use."""
+        with self._lock:
+            self.loaded_at = None
+
+    def load(self, nodes):
+        """Replace the snapshot contents with the node documents in <nodes>."""
+        with self._lock:
+            self.clear()
+            for node in nodes:
+                self._add_node(node)
+            self.loaded_at = time.monotonic()
+
+    def put_node(self, node):
+        """
+        Add or replace a single node, moving it to the end of the node order.
+
+        If the node carries its MongoDB _id and the same document was previously stored under another name (i.e. the
+        node was renamed), the node is also removed under its previous name.
+        """
+        with self._lock:
+            previous_name = self._names_by_document_id.get(node.get("_id"))
+            if previous_name is not None and previous_name != node.get("name"):
+                self._remove_node(previous_name)
+            self._remove_node(node.get("name"))
+            self._add_node(node)
+
+    def remove_node(self, node_name):
+        """Remove a single node and all of its entities."""
+        with self._lock:
+            self._remove_node(node_name)
+            for document_id in [document_id for document_id, name in self._names_by_document_id.items() if name == node_name]:
+                del self._names_by_document_id[document_id]
+
+    def get(self, entity_type, entity_id):
+        """Get a copy of an entity (including its parent fields) by id, or an empty dict if not found."""
+        entries = self._index[entity_type].get(entity_id)
+        if not entries:
+            return {}
+        return copy.deepcopy(entries[0][1])
+
+    def get_many(self, entity_type, entity_ids):
+        """
+        Get copies of several entities (including their parent fields) by id, all from the same state of the topology.
+
+        Returns:
+            A tuple of a dict of the entities found by id, and a list of the ids not found (without duplicates).
+        """
+        found, not_found = {}, []
+        with self._lock:
+            index = self._index[entity_type]
+            for entity_id in dict.fromkeys(entity_ids):
+                entries = index.get(entity_id)
+                if entries:
+                    found[entity_id] = copy.deepcopy(entries[0][1])
+                else:
+                    not_found.append(entity_id)
+        return found, not_found
+
+    def get_parent_chain(self, entity_type, entity_id):
+        """Get an entity's parent chain as a tuple of (entity_type, identifier) pairs, or None if not found."""
+        entries = self._index[entity_type].get(entity_id)
+        if not entries:
+            return None
+        return entries[0][2]
+
+    def get_active_nodes(self, now=None):
+        """Get the active version of every node (see ActiveView); the returned documents must not be modified."""
+        with self._lock:
+            return self.active_view.get_active_nodes(self.nodes, now=now)
+
+    def get_latest_nodes(self):
+        """Get the latest version of every node, in node order; the returned documents must not be modified."""
+        with self._lock:
+            return list(self.nodes.values())
+
+    def get_node(self, node_name):
+        """Get a copy of the latest version of a node, or an empty dict if not found."""
+        node = self.nodes.get(node_name)
+        return copy.deepcopy(node) if node else {}
+
+    def _add_node(self, node):
+        document_id = node.get("_id")
+        node = {key: value for key, value in node.items() if key not in ("_id", DOWNTIME_WINDOWS_FIELD)}
+        node_name = node.get("name")
+        if document_id is not None:
+            self._names_by_document_id[document_id] = node_name
+        keys = []
+        for entity_type, entity_id, entity, parent_chain in iter_node_entities(node):
+            self._index[entity_type].setdefault(entity_id, []).append((node_name, entity, parent_chain))
+            keys.append((entity_type, entity_id))
+        self.nodes[node_name] = node
+        self._keys_by_node[node_name] = keys
+
+    def _remove_node(self, node_name):
+        if node_name not in self.nodes:
+            return
+        del self.nodes[node_name]
+        for entity_type, entity_id in set(self._keys_by_node.pop(node_name, [])):
+            remaining = [entry for entry in self._index[entity_type].get(entity_id, []) if entry[0] != node_name]
+            if remaining:
+                self._index[entity_type][entity_id] = remaining
+            else:
+                self._index[entity_type].pop(entity_id, None)
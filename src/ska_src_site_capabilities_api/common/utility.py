@@ -1,15 +1,20 @@
-import ast
+import asyncio
 import json
 import os
 import time
 import uuid
+import zlib
+from collections.abc import Mapping
 from urllib.parse import urlparse
 
+import httpx
 import jsonref
 import markdown
 import requests
 
-from ska_src_site_capabilities_api.common.exceptions import RetryRequestError
+from ska_src_site_capabilities_api.common import outbound_http
+from ska_src_site_capabilities_api.common.exceptions import RetryRequestError, TooManyIdentifiers
+from ska_src_site_capabilities_api.common.json_encoding import encode_json
 
 
 def convert_readme_to_html_docs(
@@ -119,11 +124,45 @@ def get_url_for_app_from_request(function_name, request, path_params={}, scheme=
     ).geturl()
 
 
+async def iter_ndjson(items, compress=False, chunk_size=65536):
+    """Encode an async iterable of JSON-serialisable items as newline-delimited JSON, optionally gzip compressed.
+
+    Lines are buffered into chunks of about chunk_size bytes so that a large export is not sent one line at a time.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+    buffer = []
+    buffered_size = 0
+    async for item in items:
+        line = encode_json(item) + b"\n"
+        buffer.append(line)
+        buffered_size += len(line)
+        if buffered_size >= chunk_size:
+            chunk = b"".join(buffer)
+            buffer, buffered_size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    chunk = b"".join(buffer)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def _to_plain(value):
+    """Recursively copy a (dereferenced) JSON value into plain dicts and lists, resolving any lazy references."""
+    if isinstance(value, Mapping):
+        return {key: _to_plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_plain(item) for item in value]
+    return value
+
+
 def load_and_dereference_schema(schema_path):
-    """Load a schema and dereference it."""
+    """Load a schema and dereference it (into plain dicts and lists)."""
     with open(schema_path) as f:
         dereferenced_schema = jsonref.load(f, base_uri=schema_path.as_uri())
-    return ast.literal_eval(str(dereferenced_schema))
+    return _to_plain(dereferenced_schema)
 
 
 def recursive_autogen_id(input, autogen_keys=["id"], placeholder_value="to be assigned"):
@@ -167,16 +206,26 @@ def retry_request(
     n_max_retries=3,
     wait_for_s=0.1,
     timeout_s=3,
+    max_wait_s=2.0,
+    deadline_s=None,
 ):
-    """Retries generic HTTP requests using the requests library (non-streamed response)."""
-    # Assign requests session if provided, otherwise create a new one.
-    #
-    session = session or requests.Session()
-
-    # Attempt request <n_max_retries>, waiting <wait_for_s> between each attempt.
-    #
-    n_current_retry = 1
-    while n_current_retry <= n_max_retries:
+    """Retries generic HTTP requests using the requests library (non-streamed response).
+
+    Requests are sent on the shared, pooled session of the url's upstream (see outbound_http) unless <session> is given.
+    Server errors, connection errors and timeouts are retried, up to <n_max_retries> attempts in all, waiting a jittered
+    time growing exponentially from <wait_for_s> (up to <max_wait_s>) between attempts. If <deadline_s> is given, all
+    attempts (and waits) must fit within it.
+    """
+    session = session or outbound_http.get_session(url)
+    deadline = time.monotonic() + deadline_s if deadline_s is not None else None
+
+    last_error, last_response = None, None
+    for attempt in range(1, n_max_retries + 1):
+        attempt_timeout_s = timeout_s
+        if deadline is not None:
+            attempt_timeout_s = min(timeout_s, deadline - time.monotonic())
+            if attempt_timeout_s <= 0:
+                break
         try:
             response = session.request(
                 method=method,
@@ -185,21 +234,85 @@ def retry_request(
                 data=data,
                 json=json,
                 params=params,
-                timeout=timeout_s,
+                timeout=attempt_timeout_s,
             )
             response.raise_for_status()
             return response
         except requests.exceptions.HTTPError as err:
-            if 500 <= response.status_code < 600:
-                last_response = response
-                last_error = err
-                n_current_retry += 1
-            else:
+            if not 500 <= response.status_code < 600:
                 raise err
-        time.sleep(wait_for_s)
+            last_error, last_response = err, response
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
+            last_error, last_response = err, None
+        if attempt < n_max_retries:
+            wait_s = outbound_http.backoff_delay(attempt, wait_for_s, max_wait_s)
+            if deadline is not None and time.monotonic() + wait_s >= deadline:
+                break
+            time.sleep(wait_s)
     raise RetryRequestError(last_error, last_response)
 
 
+async def async_retry_request(
+    method,
+    url,
+    headers=None,
+    data=None,
+    params=None,
+    json=None,
+    client=None,
+    n_max_retries=3,
+    wait_for_s=0.1,
+    timeout_s=3,
+    max_wait_s=2.0,
+    deadline_s=None,
+):
+    """Asynchronous variant of retry_request, sending requests with the shared httpx AsyncClient of the url's upstream
+    on the running event loop (see outbound_http) unless <client> is given."""
+    client = client or outbound_http.get_async_client(url)
+    deadline = time.monotonic() + deadline_s if deadline_s is not None else None
+
+    last_error, last_response = None, None
+    for attempt in range(1, n_max_retries + 1):
+        attempt_timeout_s = timeout_s
+        if deadline is not None:
+            attempt_timeout_s = min(timeout_s, deadline - time.monotonic())
+            if attempt_timeout_s <= 0:
+                break
+        try:
+            response = await client.request(
+                method,
+                url,
+                headers=headers,
+                data=data,
+                json=json,
+                params=params,
+                timeout=attempt_timeout_s,
+            )
+            response.raise_for_status()
+            return response
+        except httpx.HTTPStatusError as err:
+            if not 500 <= response.status_code < 600:
+                raise err
+            last_error, last_response = err, response
+        except httpx.TransportError as err:
+            last_error, last_response = err, None
+        if attempt < n_max_retries:
+            wait_s = outbound_http.backoff_delay(attempt, wait_for_s, max_wait_s)
+            if deadline is not None and time.monotonic() + wait_s >= deadline:
+                break
+            await asyncio.sleep(wait_s)
+    raise RetryRequestError(last_error, last_response)
+
+
+def split_ids(ids, max_ids=None):
+    """Split a comma-separated string of identifiers, dropping blanks and duplicates (raising TooManyIdentifiers if more
+    than max_ids remain)."""
+    split = list(dict.fromkeys(identifier.strip() for identifier in (ids or "").split(",") if identifier.strip()))
+    if max_ids is not None and len(split) > max_ids:
+        raise TooManyIdentifiers(len(split), max_ids)
+    return split
+
+
 def strip_version_prefix(route_path: str) -> str:
     """Strip version prefix from route path (e.g., /v1/nodes -> /nodes)."""
     if route_path.startswith("/v"):
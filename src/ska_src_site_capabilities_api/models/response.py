@@ -1,4 +1,4 @@
-from typing import List, Literal, Union
+from typing import Any, Dict, List, Literal, Optional, Union
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel, ConfigDict, Field, HttpUrl
@@ -38,6 +38,11 @@ ComputeGetResponse = ComputeWithParents
 ComputeListResponse = List[ComputeWithParents]
 
 
+class ComputeBatchGetResponse(Response):
+    found: Dict[str, ComputeWithParents]
+    not_found: List[str]
+
+
 class ComputeEnableResponse(Response):
     compute_id: UUID = Field(default_factory=uuid4)
     is_force_disabled: bool = Field(default=False, examples=[False])
@@ -99,6 +104,11 @@ ServicesListResponsePrometheus = List[ServicesPrometheusResponse]
 ServicesListResponse = Union[ServicesListResponseGeneric, ServicesListResponsePrometheus]
 
 
+class ServicesBatchGetResponse(Response):
+    found: Dict[str, Union[GlobalServiceWithParentsAndType, LocalServiceWithParentsAndType]]
+    not_found: List[str]
+
+
 class QueueResponse(Queue):
     parent_node_name: str = Field(examples=["SKAOSRC", "CNSRC", "KRSRC", "SPSRC", "JPSRC"])
     parent_site_name: str = Field(examples=["SKAOSRC", "CNSRC", "KRSRC", "SPSRC", "JPSRC"])
@@ -110,6 +120,11 @@ class QueueResponse(Queue):
 QueuesListResponse = List[QueueResponse]
 
 
+class QueuesBatchGetResponse(Response):
+    found: Dict[str, QueueResponse]
+    not_found: List[str]
+
+
 class ServiceEnableResponse(Response):
     service_id: UUID = Field(default_factory=uuid4)
     is_force_disabled: bool = Field(default=False, examples=[False])
@@ -167,6 +182,11 @@ StoragesGrafanaResponse = List[StorageGrafana]
 StoragesTopojsonResponse = List[StorageTopojson]
 
 
+class StoragesBatchGetResponse(Response):
+    found: Dict[str, StorageWithParents]
+    not_found: List[str]
+
+
 class StorageEnableResponse(Response):
     storage_id: UUID = Field(default_factory=uuid4)
     is_force_disabled: bool = Field(default=False, examples=[False])
@@ -191,6 +211,11 @@ StorageAreasTopojsonResponse = List[StorageAreaTopojson]
 StorageAreasTypesResponse = List[str]
 
 
+class StorageAreasBatchGetResponse(Response):
+    found: Dict[str, StorageAreaWithParents]
+    not_found: List[str]
+
+
 class StorageAreaEnableResponse(Response):
     storage_area_id: UUID = Field(default_factory=uuid4)
     is_force_disabled: bool = Field(default=False, examples=[False])
@@ -238,12 +263,23 @@ class HealthResponse(Response):
 
         class DependentServiceStatus(BaseModel):
             status: Literal["UP", "DOWN"] = Field(examples=["UP"])
+            latency_s: float = Field(ge=0, examples=[0.012])
+            error: Optional[str] = Field(default=None, examples=["no response within 5.0s"])
+
+        class MongoDBStatus(DependentServiceStatus):
+            pool: Optional[Dict[str, Any]] = Field(
+                default=None,
+                examples=[{"max_pool_size": 100, "checked_out_connections": 2, "open_connections": 5, "pool_exhausted_events": 0}],
+            )
 
         permissions_api: DependentServiceStatus = Field(alias="permissions-api")
         auth_api: DependentServiceStatus = Field(alias="auth-api")
+        mongodb: MongoDBStatus
 
     uptime: int = Field(ge=0, examples=[1000])
     number_of_managed_requests: int = Field(ge=0, examples=[50])
+    checked_at: float = Field(examples=[1700000000.0])
+    age_s: float = Field(ge=0, examples=[4.2])
     dependent_services: DependentServices
 
 
@@ -1,4 +1,6 @@
 import asyncio
+import functools
+import logging
 from typing import Union
 
 from fastapi import Depends, HTTPException
@@ -7,6 +9,9 @@ from starlette.requests import Request
 
 from ska_src_site_capabilities_api.common.exceptions import PermissionDenied, handle_exceptions
 from ska_src_site_capabilities_api.common.utility import strip_version_prefix
+from ska_src_site_capabilities_api.rest.permissions_cache import get_decision_key, get_token_expiry
+
+logger = logging.getLogger(__name__)
 
 
 class Common:
@@ -37,31 +42,66 @@ class Permissions:
         permissions,
         permissions_service_name,
         permissions_service_version,
+        permissions_cache=None,
+        outbound_calls=None,
     ):
         self.permissions = permissions
         self.permissions_service_name = permissions_service_name
         self.permissions_service_version = permissions_service_version
+        self.permissions_cache = permissions_cache
+        self.outbound_calls = outbound_calls
 
-    @handle_exceptions
-    async def verify_permission_for_service_route(self, request: Request, authorization: str = Depends(HTTPBearer())) -> Union[HTTPException, bool]:
-        """Dependency to verify permission for a service's route using the bearer token from the request's headers.
+    async def is_authorised(self, request: Request, token: str, correlation_id: str = None) -> bool:
+        """Check if a token is authorised for a request's route, method and path parameters.
 
-        This is the default authz route. Parameters for the verification are passed from the request path parameters.
+        Decisions are taken from the permissions cache if one is set, and otherwise requested from the permissions API
+        (and then cached), off the event loop if outbound calls are set. Only well-formed decisions from successful
+        responses are cached; any other answer is a denial for this request alone.
         """
-        if authorization.credentials is None:
-            raise PermissionDenied
-        access_token = authorization.credentials
         # Strip version prefix from route path (e.g., /v1/nodes -> /nodes)
         route_path = strip_version_prefix(request.scope["route"].path)
-        rtn = self.permissions.authorise_service_route(
+        key = None
+        if self.permissions_cache is not None:
+            key = get_decision_key(token, route_path, request.method, request.path_params)
+            is_authorised = self.permissions_cache.get(key)
+            if is_authorised is not None:
+                return is_authorised
+
+        kwargs = {"correlation_id": correlation_id} if correlation_id is not None else {}
+        authorise_service_route = functools.partial(
+            self.permissions.authorise_service_route,
             service=self.permissions_service_name,
             version=self.permissions_service_version,
             route=route_path,
             method=request.method,
-            token=access_token,
+            token=token,
             body=request.path_params,
-        ).json()
-        if rtn.get("is_authorised", False):
+            **kwargs,
+        )
+        if self.outbound_calls is not None:
+            resp = await self.outbound_calls.run("permissions-api", authorise_service_route)
+        else:
+            resp = authorise_service_route()
+        rtn = resp.json()
+        is_authorised = rtn.get("is_authorised") if isinstance(rtn, dict) else None
+        if resp.status_code != 200 or not isinstance(is_authorised, bool):
+            # an error or malformed answer is a denial, but not a decision to be cached
+            logger.warning("Unexpected answer from the permissions API (status %s): %s", resp.status_code, rtn)
+            return False
+        if key is not None:
+            self.permissions_cache.put(key, is_authorised, token_expiry=get_token_expiry(token))
+        return is_authorised
+
+    @handle_exceptions
+    async def verify_permission_for_service_route(self, request: Request, authorization: str = Depends(HTTPBearer())) -> Union[HTTPException, bool]:
+        """Dependency to verify permission for a service's route using the bearer token from the request's headers.
+
+        This is the default authz route. Parameters for the verification are passed from the request path parameters.
+        """
+        if authorization.credentials is None:
+            raise PermissionDenied
+        access_token = authorization.credentials
+        if await self.is_authorised(request, access_token):
             return
         raise PermissionDenied
 
@@ -78,17 +118,7 @@ class Permissions:
     async def verify_permission_for_service_route_query_params(self, request: Request, token: str = None) -> Union[HTTPException, bool]:
         if token is None:
             raise PermissionDenied
-        # Strip version prefix from route path (e.g., /v1/nodes -> /nodes)
-        route_path = strip_version_prefix(request.scope["route"].path)
-        rtn = self.permissions.authorise_service_route(
-            service=self.permissions_service_name,
-            version=self.permissions_service_version,
-            route=route_path,
-            method=request.method,
-            token=token,
-            body=request.path_params,
-        ).json()
-        if rtn.get("is_authorised", False):
+        if await self.is_authorised(request, token):
             return
         raise PermissionDenied
 
@@ -0,0 +1,160 @@
+"""Cached health of the services this service depends on.
+
+Probing every dependency on each call to /health would make the endpoint as slow as the slowest dependency (or its
+timeout) and would multiply the load that frequent liveness checks put on the dependencies. HealthMonitor instead
+probes all dependencies concurrently, each within its own timeout, from a background task at a fixed interval, and
+/health serves the last known state together with its age.
+
+A state older than its maximum age (e.g. because the background task has not run yet) is refreshed before being served.
+
+Some services can be reported without counting towards the overall health, e.g. MongoDB: /health serves as a liveness
+probe, and restarting every replica would not bring back a database that is briefly unreachable.
+"""
+
+import asyncio
+import logging
+import time
+
+from prometheus_client import Gauge
+
+logger = logging.getLogger(__name__)
+
+DEPENDENCY_UP = Gauge(
+    "scapi_dependency_up",
+    "Whether a dependent service was reachable at its last health probe (1) or not (0), by service.",
+    ["service"],
+)
+
+
+def http_ping_probe(outbound_calls, service, ping):
+    """
+    Make a probe calling the ping function of a service's client (off the event loop), healthy if it returns a 200.
+
+    Args:
+        outbound_calls: The OutboundCalls to run the (blocking) ping on.
+        service: The name of the service, e.g. "permissions-api".
+        ping: The ping function of the service's client.
+    """
+
+    async def probe(timeout_s):
+        response = await outbound_calls.run(service, ping, timeout_s=timeout_s)
+        if response.status_code != 200:
+            raise RuntimeError("ping returned status {}".format(response.status_code))
+
+    return probe
+
+
+def mongodb_probe(backend):
+    """
+    Make a probe pinging MongoDB through an AsyncMongoBackend, reporting the statistics of its connection pool.
+
+    Args:
+        backend: The AsyncMongoBackend.
+    """
+
+    async def probe(timeout_s):
+        await backend.ping()
+        return {"pool": backend.get_pool_statistics()}
+
+    return probe
+
+
+class HealthMonitor:
+    """Probes dependent services concurrently in the background, keeping their last known state."""
+
+    def __init__(self, probes, interval_s=10.0, timeout_s=5.0, max_age_s=None, report_only=()):
+        """
+        Args:
+            probes: Mapping of service name to probe, an async function taking the probe timeout, raising if the
+                service is unhealthy and optionally returning a dictionary of details to report.
+            interval_s: Interval between background refreshes.
+            timeout_s: Time each probe is given to complete before its service is considered down.
+            max_age_s: Age after which the state is refreshed before being served (defaults to three intervals).
+            report_only: Names of services whose state is reported, but not taken into account by is_healthy.
+        """
+        self.probes = probes
+        self.interval_s = interval_s
+        self.timeout_s = timeout_s
+        self.max_age_s = max_age_s if max_age_s is not None else 3 * interval_s
+        self.report_only = frozenset(report_only)
+        self.services = {}
+        self.checked_at = None
+        self._refreshed_at = None  # monotonic
+        self._refresh_lock = asyncio.Lock()
+        self._task = None
+
+    @property
+    def age_s(self):
+        return None if self._refreshed_at is None else time.monotonic() - self._refreshed_at
+
+    def _is_healthy(self, services):
+        return bool(services) and all(service["status"] == "UP" for name, service in services.items() if name not in self.report_only)
+
+    @property
+    def is_healthy(self):
+        """Whether every service that is not only reported was UP at the last probe."""
+        return self._is_healthy(self.services)
+
+    async def _probe(self, name, probe):
+        start = time.perf_counter()
+        try:
+            details = await asyncio.wait_for(probe(self.timeout_s), self.timeout_s)
+            result = {"status": "UP", **(details or {})}
+        except asyncio.TimeoutError:
+            result = {"status": "DOWN", "error": "no response within {}s".format(self.timeout_s)}
+        except Exception as err:
+            result = {"status": "DOWN", "error": "{}: {}".format(type(err).__name__, err)}
+        result["latency_s"] = round(time.perf_counter() - start, 6)
+        DEPENDENCY_UP.labels(service=name).set(1 if result["status"] == "UP" else 0)
+        return result
+
+    async def refresh(self):
+        """Probe all services concurrently, replacing the last known state."""
+        names = list(self.probes)
+        results = await asyncio.gather(*(self._probe(name, self.probes[name]) for name in names))
+        self.services = dict(zip(names, results))
+        self.checked_at = time.time()
+        self._refreshed_at = time.monotonic()
+        for name, result in self.services.items():
+            if result["status"] != "UP":
+                logger.warning("Dependent service %s is down: %s", name, result.get("error"))
+
+    async def get(self):
+        """Get the last known state, refreshing it first if there is none or it is too old.
+
+        Returns:
+            A dictionary with the state of each service (<services>), whether they are healthy (<healthy>, see
+            is_healthy), when they were probed (<checked_at>, a UNIX timestamp) and the age of that state in seconds
+            (<age_s>).
+        """
+        if self.age_s is None or self.age_s > self.max_age_s:
+            async with self._refresh_lock:
+                # another request may have refreshed it while this one waited
+                if self.age_s is None or self.age_s > self.max_age_s:
+                    await self.refresh()
+        services = self.services
+        return {"services": services, "healthy": self._is_healthy(services), "checked_at": self.checked_at, "age_s": self.age_s}
+
+    def start(self):
+        """Start refreshing the state in the background (on the running event loop)."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop refreshing the state in the background."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        while True:
+            try:
+                async with self._refresh_lock:
+                    await self.refresh()
+            except Exception as err:
+                logger.warning("Could not refresh the health of dependent services: %s", err)
+            await asyncio.sleep(self.interval_s)
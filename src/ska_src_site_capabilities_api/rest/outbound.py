@@ -0,0 +1,71 @@
+"""Non-blocking calls to other services.
+
+The permissions, authentication and IAM clients are synchronous (requests based). Calling them from a route handler or
+dependency would block the worker's event loop for the duration of the call, so that one slow response from, e.g., the
+permissions API would hold up every other request served by the worker. OutboundCalls runs them instead on a dedicated,
+bounded thread pool, and bounds the time a request waits for each of them.
+
+The clients use the shared sessions of common.outbound_http, whose default socket timeout ensures that a call abandoned
+by a request does not hold a thread of the pool for much longer than that.
+"""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from prometheus_client import Counter, Histogram
+
+from ska_src_site_capabilities_api.common.exceptions import OutboundCallTimeout
+
+OUTBOUND_CALL_DURATION_SECONDS = Histogram(
+    "scapi_outbound_call_duration_seconds",
+    "Duration of calls to other services (including time queued for a thread), by service.",
+    ["service"],
+)
+OUTBOUND_CALL_TIMEOUTS_TOTAL = Counter(
+    "scapi_outbound_call_timeouts_total",
+    "Number of calls to other services that did not complete within their timeout, by service.",
+    ["service"],
+)
+
+
+class OutboundCalls:
+    """Runs blocking calls to other services on a bounded thread pool, with per-call timeouts."""
+
+    def __init__(self, max_workers=16, timeout_s=10.0):
+        """
+        Args:
+            max_workers: Maximum number of calls run concurrently; further calls wait for a free thread.
+            timeout_s: Default time to wait for a call to complete (including time waiting for a thread).
+        """
+        self.timeout_s = timeout_s
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="outbound-calls")
+
+    async def run(self, service, func, *args, timeout_s=None, **kwargs):
+        """
+        Runs a blocking call on the thread pool.
+
+        Args:
+            service: The name of the service called (for metrics and errors), e.g. "permissions-api".
+            func: The blocking function to call with *args and **kwargs.
+            timeout_s: Time to wait for the call to complete, if not the default.
+
+        Raises:
+            OutboundCallTimeout: If the call does not complete in time (the call itself is left to complete on its
+                thread).
+        """
+        timeout_s = self.timeout_s if timeout_s is None else timeout_s
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs)), timeout_s)
+        except asyncio.TimeoutError:
+            OUTBOUND_CALL_TIMEOUTS_TOTAL.labels(service=service).inc()
+            raise OutboundCallTimeout(service, timeout_s)
+        finally:
+            OUTBOUND_CALL_DURATION_SECONDS.labels(service=service).observe(time.perf_counter() - start)
+
+    def close(self):
+        """Shuts down the thread pool, without waiting for abandoned calls."""
+        self._executor.shutdown(wait=False)
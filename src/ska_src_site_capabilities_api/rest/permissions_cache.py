@@ -0,0 +1,113 @@
+"""Cache of permission decisions.
+
+Authorising a request is a call to the permissions API, made with the bearer token, route, method and path parameters
+of the request. The same token typically hits the same routes many times a minute, so each worker keeps the decisions it
+received, positive and negative, keyed by a digest of the token (tokens themselves are not kept) and the other inputs of
+the decision.
+
+Decisions expire after a TTL (shorter for negative decisions, so that newly granted permissions apply quickly), and never
+outlive the token's own expiry (its "exp" claim). Lookups are counted by result, from which the hit ratio follows.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from prometheus_client import Counter, Gauge
+
+PERMISSIONS_CACHE_REQUESTS_TOTAL = Counter(
+    "scapi_permissions_cache_requests_total",
+    "Number of permission decisions looked up in the permissions cache, by result (hit or miss).",
+    ["result"],
+)
+PERMISSIONS_CACHE_EVICTIONS_TOTAL = Counter(
+    "scapi_permissions_cache_evictions_total",
+    "Number of permission decisions evicted from the permissions cache to stay within its size bound.",
+)
+PERMISSIONS_CACHE_ENTRIES = Gauge(
+    "scapi_permissions_cache_entries",
+    "Number of permission decisions held in the permissions cache.",
+)
+
+
+def get_token_expiry(token):
+    """Get the expiry (as a UNIX timestamp) of a JWT from its "exp" claim, without verifying it; None if unknown."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError, binascii.Error):
+        return None
+
+
+def get_decision_key(token, route, method, path_params):
+    """Get the cache key of a permission decision."""
+    token_digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    return token_digest, route, method, json.dumps(path_params, sort_keys=True, default=str)
+
+
+class PermissionsCache:
+    """Per-worker, size-bounded LRU cache of permission decisions with expiry."""
+
+    def __init__(self, max_entries=10000, ttl_s=60.0, negative_ttl_s=10.0):
+        """
+        Args:
+            max_entries: Maximum number of decisions held, least recently used decisions being evicted first.
+            ttl_s: Time for which a positive decision is kept.
+            negative_ttl_s: Time for which a negative decision is kept.
+        """
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.negative_ttl_s = negative_ttl_s
+        self._lock = threading.Lock()
+        self._decisions = OrderedDict()
+
+    def __len__(self):
+        return len(self._decisions)
+
+    def clear(self):
+        """Drop all cached decisions."""
+        with self._lock:
+            self._decisions.clear()
+            PERMISSIONS_CACHE_ENTRIES.set(0)
+
+    def get(self, key):
+        """Get the unexpired decision for <key> (True if authorised, False if not), or None if there is none."""
+        with self._lock:
+            entry = self._decisions.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._decisions[key]
+                PERMISSIONS_CACHE_ENTRIES.set(len(self._decisions))
+                entry = None
+            if entry is None:
+                PERMISSIONS_CACHE_REQUESTS_TOTAL.labels(result="miss").inc()
+                return None
+            self._decisions.move_to_end(key)
+            PERMISSIONS_CACHE_REQUESTS_TOTAL.labels(result="hit").inc()
+            return entry[0]
+
+    def put(self, key, is_authorised, token_expiry=None):
+        """
+        Store a decision.
+
+        Args:
+            key: The key of the decision (see get_decision_key).
+            is_authorised: The decision.
+            token_expiry: The expiry (UNIX timestamp) of the token the decision was made for, if known.
+        """
+        ttl_s = self.ttl_s if is_authorised else self.negative_ttl_s
+        if token_expiry is not None:
+            ttl_s = min(ttl_s, token_expiry - time.time())
+        if ttl_s <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._decisions[key] = (is_authorised, time.monotonic() + ttl_s)
+            self._decisions.move_to_end(key)
+            while len(self._decisions) > self.max_entries:
+                self._decisions.popitem(last=False)
+                PERMISSIONS_CACHE_EVICTIONS_TOTAL.inc()
+            PERMISSIONS_CACHE_ENTRIES.set(len(self._decisions))
@@ -0,0 +1,231 @@
+"""Response cache for topology read routes.
+
+Each worker keeps the final encoded body of every read response it computed under the current topology validator (see
+MongoBackend.get_topology_validator), together with gzip (and, if the zstandard package is installed, zstd) compressed
+variants. While the validator is unchanged, the same request is answered with a copy of the stored bytes, without
+querying the backend, serialising or compressing anything.
+
+Responses are tagged with an ETag derived from their body, so that every worker tags identical content identically, and
+a request whose If-None-Match matches is answered with 304 Not Modified.
+"""
+
+import functools
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from prometheus_client import Counter, Gauge
+from starlette.responses import Response
+
+try:
+    import zstandard
+except ImportError:  # zstd responses are only offered if the (optional) zstandard package is installed
+    zstandard = None
+
+RESPONSE_CACHE_REQUESTS_TOTAL = Counter(
+    "scapi_response_cache_requests_total",
+    "Number of read requests looked up in the response cache, by result (hit, not_modified or miss).",
+    ["result"],
+)
+RESPONSE_CACHE_EVICTIONS_TOTAL = Counter(
+    "scapi_response_cache_evictions_total",
+    "Number of responses evicted from the response cache to stay within its size bound.",
+)
+RESPONSE_CACHE_SIZE_BYTES = Gauge(
+    "scapi_response_cache_size_bytes",
+    "Total size of the responses (and their compressed variants) held in the response cache.",
+)
+
+# Bodies smaller than this are not worth compressing.
+MIN_COMPRESSED_SIZE = 1024
+
+# Response headers not stored with a cached response (they are set when it is served).
+UNCACHED_HEADERS = ("content-length", "content-type", "content-encoding", "etag", "cache-control", "vary")
+
+
+def make_etag(body):
+    """Make a (weak, as the body may be served with different content encodings) ETag for a response body."""
+    return 'W/"{}"'.format(hashlib.blake2b(body, digest_size=16).hexdigest())
+
+
+def etag_matches(if_none_match, etag):
+    """Check if an If-None-Match header value matches <etag> (using weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque_tag for candidate in if_none_match.split(","))
+
+
+def get_request_key(request):
+    """Get the cache key of a request: its path and (order-independent) query parameters."""
+    return request.url.path, tuple(sorted(request.query_params.multi_items()))
+
+
+def get_accepted_encodings(accept_encoding):
+    """Get the content codings accepted by a client from its Accept-Encoding header (ignoring those with q=0)."""
+    accepted = set()
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+class CachedResponse:
+    """The encoded body of a response, its compressed variants and the headers it was sent with."""
+
+    def __init__(self, body, media_type, headers):
+        self.body = body
+        self.media_type = media_type
+        self.headers = headers
+        self.etag = make_etag(body)
+        self.encoded_bodies = {}
+        if len(body) >= MIN_COMPRESSED_SIZE:
+            if zstandard is not None:
+                self.encoded_bodies["zstd"] = zstandard.ZstdCompressor(level=3).compress(body)
+            self.encoded_bodies["gzip"] = gzip.compress(body, compresslevel=6, mtime=0)
+
+    @property
+    def size(self):
+        return len(self.body) + sum(len(encoded_body) for encoded_body in self.encoded_bodies.values())
+
+    def to_response(self, accept_encoding=None):
+        """Build a response serving the stored bytes, compressed with the best coding accepted by the client."""
+        headers = {**self.headers, "ETag": self.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        accepted_encodings = get_accepted_encodings(accept_encoding)
+        for encoding, encoded_body in self.encoded_bodies.items():
+            if encoding in accepted_encodings:
+                return Response(content=encoded_body, media_type=self.media_type, headers={**headers, "Content-Encoding": encoding})
+        return Response(content=self.body, media_type=self.media_type, headers=headers)
+
+    def to_not_modified_response(self):
+        return Response(status_code=304, headers={"ETag": self.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"})
+
+
+class ResponseCache:
+    """Per-worker, size-bounded LRU cache of the responses computed under the current topology validator.
+
+    Entries are dropped as soon as the validator changes (or the cache is cleared after a write), so the cache only
+    ever holds current responses.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._validator = None
+        self._responses = OrderedDict()
+        self._size = 0
+
+    @property
+    def size(self):
+        return self._size
+
+    def __len__(self):
+        return len(self._responses)
+
+    def clear(self):
+        """Drop all cached responses."""
+        with self._lock:
+            self._validator = None
+            self._clear()
+
+    def _clear(self):
+        self._responses.clear()
+        self._size = 0
+        RESPONSE_CACHE_SIZE_BYTES.set(0)
+
+    def get(self, validator, key):
+        """Get the response to <key> computed under <validator>, if any."""
+        with self._lock:
+            if validator != self._validator:
+                return None
+            cached_response = self._responses.get(key)
+            if cached_response is not None:
+                self._responses.move_to_end(key)
+            return cached_response
+
+    def put(self, validator, key, cached_response):
+        """Store the response to <key> computed under <validator>, evicting the least recently used responses."""
+        if cached_response.size > self.max_bytes:
+            return
+        with self._lock:
+            if validator != self._validator:
+                self._validator = validator
+                self._clear()
+            previous_response = self._responses.pop(key, None)
+            if previous_response is not None:
+                self._size -= previous_response.size
+            self._responses[key] = cached_response
+            self._size += cached_response.size
+            while self._size > self.max_bytes:
+                _, evicted_response = self._responses.popitem(last=False)
+                self._size -= evicted_response.size
+                RESPONSE_CACHE_EVICTIONS_TOTAL.inc()
+            RESPONSE_CACHE_SIZE_BYTES.set(self._size)
+
+
+def cached_response(func):
+    """Decorator serving a read route from the response cache, with ETags and If-None-Match handling.
+
+    The route must take the request as a <request> argument. Only 200 responses with a rendered body (i.e. not
+    streamed) are cached. Nothing is cached if the backend cannot provide a topology validator.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        request = kwargs.get("request")
+        cache = getattr(request.app.state, "response_cache", None) if request is not None else None
+        validator = await request.app.state.backend.get_topology_validator() if cache is not None else None
+        if validator is None:
+            return await func(*args, **kwargs)
+
+        key = get_request_key(request)
+        if_none_match = request.headers.get("if-none-match")
+        accept_encoding = request.headers.get("accept-encoding")
+        cached = cache.get(validator, key)
+        if cached is not None:
+            if etag_matches(if_none_match, cached.etag):
+                RESPONSE_CACHE_REQUESTS_TOTAL.labels(result="not_modified").inc()
+                return cached.to_not_modified_response()
+            RESPONSE_CACHE_REQUESTS_TOTAL.labels(result="hit").inc()
+            return cached.to_response(accept_encoding)
+
+        RESPONSE_CACHE_REQUESTS_TOTAL.labels(result="miss").inc()
+        response = await func(*args, **kwargs)
+        body = getattr(response, "body", None)
+        if response.status_code != 200 or body is None:
+            return response
+        headers = {name: value for name, value in response.headers.items() if name not in UNCACHED_HEADERS}
+        cached = CachedResponse(body, response.media_type, headers)
+        # only keep the response if the topology did not change while it was computed
+        if await request.app.state.backend.get_topology_validator() == validator:
+            cache.put(validator, key, cached)
+        if etag_matches(if_none_match, cached.etag):
+            return cached.to_not_modified_response()
+        return cached.to_response(accept_encoding)
+
+    return wrapper
+
+
+def invalidates_response_cache(func):
+    """Decorator clearing the response cache once a write route has completed.
+
+    Writes also advance the topology revision, which invalidates cached responses on every worker; clearing the cache
+    releases this worker's memory straight away. The route must take the request as a <request> argument.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            request = kwargs.get("request")
+            cache = getattr(request.app.state, "response_cache", None) if request is not None else None
+            if cache is not None:
+                cache.clear()
+
+    return wrapper
@@ -0,0 +1,10 @@
+from starlette.responses import JSONResponse
+
+from ska_src_site_capabilities_api.common.json_encoding import encode_json
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoding its content with encode_json (see common.json_encoding)."""
+
+    def render(self, content):
+        return encode_json(content)
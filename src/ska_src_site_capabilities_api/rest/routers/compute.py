@@ -1,4 +1,5 @@
 import os
+from datetime import datetime
 
 from fastapi import APIRouter, Depends, Path, Query
 from fastapi.security import HTTPBearer
@@ -10,8 +11,12 @@ from starlette.responses import JSONResponse
 
 from ska_src_site_capabilities_api import models
 from ska_src_site_capabilities_api.common.exceptions import ComputeNotFound, handle_exceptions
+from ska_src_site_capabilities_api.common.pagination import get_page_headers
+from ska_src_site_capabilities_api.common.utility import split_ids
 from ska_src_site_capabilities_api.rest.dependencies import Common, Permissions
 from ska_src_site_capabilities_api.rest.logger import logger
+from ska_src_site_capabilities_api.rest.response_cache import cached_response, invalidates_response_cache
+from ska_src_site_capabilities_api.rest.responses import FastJSONResponse
 
 compute_router = APIRouter()
 
@@ -34,6 +39,7 @@ compute_router = APIRouter()
     summary="List all compute",
 )
 @handle_exceptions
+@cached_response
 async def list_compute(
     request: Request,
     node_names: str = Query(default=None, description="Filter by node names (comma-separated)"),
@@ -42,6 +48,10 @@ async def list_compute(
         default=False,
         description="Include inactive resources? e.g. in downtime, force disabled",
     ),
+    as_of: datetime = Query(default=None, description="List as of this time (ISO 8601, UTC unless an offset is given)"),
+    limit: int = Query(default=None, ge=1, description="Maximum number of results per page (see the X-Next-Cursor response header)"),
+    cursor: str = Query(default=None, description="Cursor of the page to return, from the X-Next-Cursor header of the previous page"),
+    fields: str = Query(default=None, description="Fields to return as comma-separated dotted paths, e.g. host,port (id is always returned)"),
 ) -> JSONResponse:
     """List all compute."""
     token = request.headers.get("authorization", "").removeprefix("Bearer ")
@@ -53,8 +63,51 @@ async def list_compute(
         if site_names:
             site_names = [name.strip() for name in site_names.split(",")]
 
-        rtn = request.app.state.backend.list_compute(node_names=node_names, site_names=site_names, include_inactive=include_inactive)
-        return JSONResponse(rtn)
+        rtn = await request.app.state.backend.list_compute(
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            as_of=as_of,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+        return FastJSONResponse(rtn, headers=get_page_headers(rtn))
+
+
+@api_version(1)
+@compute_router.get(
+    "/compute/batch",
+    response_model=None,
+    responses={
+        200: {"model": models.response.ComputeBatchGetResponse},
+        400: {"model": models.response.GenericErrorResponse},
+        401: {},
+        403: {},
+    },
+    dependencies=[Depends(Common.increment_requests_counter_depends)]
+    + (
+        []
+        if os.environ.get("DISABLE_AUTHENTICATION", "no") == "yes"
+        else [Depends(Permissions.conditional_verify_permission_for_service_route_depends)]
+    ),
+    tags=["Compute"],
+    summary="Get compute elements from ids",
+)
+@handle_exceptions
+@cached_response
+async def get_compute_from_ids(
+    request: Request,
+    ids: str = Query(description="Unique compute element identifiers (comma-separated)"),
+) -> JSONResponse:
+    """Get descriptions of compute elements from unique identifiers, with the identifiers that could not be found."""
+    token = request.headers.get("authorization", "").removeprefix("Bearer ")
+    enduser_id = extract_username_from_token(token) if token else None
+    with LogContext(resource_id="compute", operation="get_compute_many", **({"enduser_id": enduser_id} if enduser_id else {})):
+        compute_ids = split_ids(ids, max_ids=request.app.state.batch_get_max_ids)
+        logger.info(f"Retrieving {len(compute_ids)} compute elements")
+        rtn = await request.app.state.backend.get_compute_many(compute_ids)
+        return FastJSONResponse(rtn)
 
 
 @api_version(1)
@@ -77,6 +130,7 @@ async def list_compute(
     summary="Get compute from id",
 )
 @handle_exceptions
+@cached_response
 async def get_compute_from_id(
     request: Request,
     compute_id: str = Path(description="Unique compute identifier"),
@@ -86,10 +140,10 @@ async def get_compute_from_id(
     enduser_id = extract_username_from_token(token) if token else None
     with LogContext(resource_id=compute_id, operation="get_compute", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Retrieving compute: {compute_id}")
-        rtn = request.app.state.backend.get_compute(compute_id)
+        rtn = await request.app.state.backend.get_compute(compute_id)
         if not rtn:
             raise ComputeNotFound(compute_id)
-        return JSONResponse(rtn)
+        return FastJSONResponse(rtn)
 
 
 @api_version(1)
@@ -112,6 +166,7 @@ async def get_compute_from_id(
     summary="Unset a compute from being force disabled",
 )
 @handle_exceptions
+@invalidates_response_cache
 async def set_compute_enabled(
     request: Request,
     compute_id: str = Path(description="Compute ID"),
@@ -120,10 +175,10 @@ async def set_compute_enabled(
     enduser_id = extract_username_from_token(authorization.credentials) if authorization else None
     with LogContext(resource_id=compute_id, operation="enable_compute", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Enabling compute: {compute_id}")
-        response = request.app.state.backend.set_compute_force_disabled_flag(compute_id, False)
+        response = await request.app.state.backend.set_compute_force_disabled_flag(compute_id, False)
         if not response:
             raise ComputeNotFound(compute_id)
-        return JSONResponse(response)
+        return FastJSONResponse(response)
 
 
 @api_version(1)
@@ -146,6 +201,7 @@ async def set_compute_enabled(
     summary="Set a compute to be force disabled",
 )
 @handle_exceptions
+@invalidates_response_cache
 async def set_compute_disabled(
     request: Request,
     compute_id: str = Path(description="Compute ID"),
@@ -154,7 +210,7 @@ async def set_compute_disabled(
     enduser_id = extract_username_from_token(authorization.credentials) if authorization else None
     with LogContext(resource_id=compute_id, operation="disable_compute", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Disabling compute: {compute_id}")
-        response = request.app.state.backend.set_compute_force_disabled_flag(compute_id, True)
+        response = await request.app.state.backend.set_compute_force_disabled_flag(compute_id, True)
         if not response:
             raise ComputeNotFound(compute_id)
-        return JSONResponse(response)
+        return FastJSONResponse(response)
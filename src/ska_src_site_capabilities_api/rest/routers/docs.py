@@ -1,7 +1,6 @@
 import copy
 import json
 import os
-import pathlib
 from typing import Union
 
 from fastapi import APIRouter, Depends, Query
@@ -18,9 +17,7 @@ from ska_src_site_capabilities_api.common.utility import (
     get_api_server_url_from_request,
     get_base_url_from_request,
     get_url_for_app_from_request,
-    load_and_dereference_schema,
     recursive_stringify,
-    strip_version_prefix,
 )
 from ska_src_site_capabilities_api.rest.dependencies import Common
 
@@ -128,24 +125,17 @@ async def get_downtime_statusboard(request: Request, node_name: str) -> Union[HT
     if request.session.get("access_token"):
         # Check access permissions.
         if not request.app.state.debug:
-            try:
-                # Get correlation ID from log context for distributed tracing
-                correlation_id = get_log_context().get("correlation_id")
-                rtn = request.app.state.permissions_dependencies.permissions.authorise_service_route(
-                    service=request.app.state.permissions_service_name,
-                    version=request.app.state.permissions_service_version,
-                    route=strip_version_prefix(request.scope["route"].path),
-                    method=request.method,
-                    token=request.session.get("access_token"),
-                    body=request.path_params,
-                    correlation_id=correlation_id,
-                ).json()
-            except Exception as err:
-                raise err
-            if not rtn.get("is_authorised", False):
+            # Get correlation ID from log context for distributed tracing
+            correlation_id = get_log_context().get("correlation_id")
+            is_authorised = await request.app.state.permissions_dependencies.is_authorised(
+                request,
+                request.session.get("access_token"),
+                correlation_id=correlation_id,
+            )
+            if not is_authorised:
                 raise PermissionDenied
 
-        node = request.app.state.backend.get_node(node_name=node_name)
+        node = await request.app.state.backend.get_node(node_name=node_name)
         if not node:
             raise NodeVersionNotFound(node_name=node_name, node_version="latest")
 
@@ -201,12 +191,18 @@ async def www_login(
         # get token from authorization code
         code = request.query_params.get("code")
         original_request_url = request.url.remove_query_params(keys=["code", "state"])
-        response = request.app.state.auth.token(code=code, redirect_uri=original_request_url)
+        outbound_calls = request.app.state.outbound_calls
+        response = await outbound_calls.run("auth-api", request.app.state.auth.token, code=code, redirect_uri=original_request_url)
 
         # exchange token for site-capabilities-api
         access_token = response.json().get("token", {}).get("access_token")
         if access_token:
-            response = request.app.state.auth.exchange_token(service="site-capabilities-api", access_token=access_token)
+            response = await outbound_calls.run(
+                "auth-api",
+                request.app.state.auth.exchange_token,
+                service="site-capabilities-api",
+                access_token=access_token,
+            )
             request.session["access_token"] = response.json().get("access_token")
 
         # redirect back now we have a valid token
@@ -215,7 +211,7 @@ async def www_login(
         # start login process
         request.session["landing_page"] = landing_page  # if being redirected from /www/sites
         redirect_uri = request.url.remove_query_params(keys=["landing_page"])
-        response = request.app.state.auth.login(flow="legacy", redirect_uri=redirect_uri)
+        response = await request.app.state.outbound_calls.run("auth-api", request.app.state.auth.login, flow="legacy", redirect_uri=redirect_uri)
         authorization_uri = response.json().get("authorization_uri")
         return RedirectResponse(authorization_uri)
 
@@ -254,30 +250,21 @@ async def add_node_form(
     if request.session.get("access_token"):
         # Check access permissions.
         if not request.app.state.debug:
-            try:
-                # Get correlation ID from log context for distributed tracing
-                correlation_id = get_log_context().get("correlation_id")
-                rtn = request.app.state.permissions_dependencies.permissions.authorise_service_route(
-                    service=request.app.state.permissions_service_name,
-                    version=request.app.state.permissions_service_version,
-                    route=strip_version_prefix(request.scope["route"].path),
-                    method=request.method,
-                    token=request.session.get("access_token"),
-                    body=request.path_params,
-                    correlation_id=correlation_id,
-                ).json()
-            except Exception as err:
-                raise err
-            if not rtn.get("is_authorised", False):
+            # Get correlation ID from log context for distributed tracing
+            correlation_id = get_log_context().get("correlation_id")
+            is_authorised = await request.app.state.permissions_dependencies.is_authorised(
+                request,
+                request.session.get("access_token"),
+                correlation_id=correlation_id,
+            )
+            if not is_authorised:
                 raise PermissionDenied
 
         # Load schema.
-        schema = load_and_dereference_schema(schema_path=pathlib.Path(os.path.join(config.get("SCHEMAS_RELPATH"), "node.json")).absolute())
-        downtime_schema = load_and_dereference_schema(
-            schema_path=pathlib.Path(os.path.join(config.get("SCHEMAS_RELPATH"), "downtime.json")).absolute()
-        )
-        # Remove sites
-        schema.get("properties", {}).pop("sites")
+        schema = request.app.state.schema_registry.get("node")
+        downtime_schema = request.app.state.schema_registry.get("downtime")
+        # Remove sites (from a copy, the registry's schema being shared)
+        schema = {**schema, "properties": {key: value for key, value in schema.get("properties", {}).items() if key != "sites"}}
 
         return request.app.state.templates.TemplateResponse(
             "node.html",
@@ -326,30 +313,21 @@ async def edit_node_form(request: Request, node_name: str) -> Union[HTMLResponse
     if request.session.get("access_token"):
         # Check access permissions.
         if not request.app.state.debug:
-            try:
-                # Get correlation ID from log context for distributed tracing
-                correlation_id = get_log_context().get("correlation_id")
-                rtn = request.app.state.permissions_dependencies.permissions.authorise_service_route(
-                    service=request.app.state.permissions_service_name,
-                    version=request.app.state.permissions_service_version,
-                    route=strip_version_prefix(request.scope["route"].path),
-                    method=request.method,
-                    token=request.session.get("access_token"),
-                    body=request.path_params,
-                    correlation_id=correlation_id,
-                ).json()
-            except Exception as err:
-                raise err
-            if not rtn.get("is_authorised", False):
+            # Get correlation ID from log context for distributed tracing
+            correlation_id = get_log_context().get("correlation_id")
+            is_authorised = await request.app.state.permissions_dependencies.is_authorised(
+                request,
+                request.session.get("access_token"),
+                correlation_id=correlation_id,
+            )
+            if not is_authorised:
                 raise PermissionDenied
 
         # Load schema.
-        schema = load_and_dereference_schema(schema_path=pathlib.Path(os.path.join(config.get("SCHEMAS_RELPATH"), "node.json")).absolute())
-        downtime_schema = load_and_dereference_schema(
-            schema_path=pathlib.Path(os.path.join(config.get("SCHEMAS_RELPATH"), "downtime.json")).absolute()
-        )
+        schema = request.app.state.schema_registry.get("node")
+        downtime_schema = request.app.state.schema_registry.get("downtime")
         # Get latest values for requested node.
-        node = request.app.state.backend.get_node(node_name=node_name)
+        node = await request.app.state.backend.get_node(node_name=node_name)
         if not node:
             raise NodeVersionNotFound(node_name=node_name, node_version="latest")
 
@@ -410,21 +388,14 @@ async def topology(request: Request) -> Union[HTMLResponse, RedirectResponse]:
     if request.session.get("access_token"):
         # Check access permissions.
         if not request.app.state.debug:
-            try:
-                # Get correlation ID from log context for distributed tracing
-                correlation_id = get_log_context().get("correlation_id")
-                rtn = request.app.state.permissions_dependencies.permissions.authorise_service_route(
-                    service=request.app.state.permissions_service_name,
-                    version=request.app.state.permissions_service_version,
-                    route=strip_version_prefix(request.scope["route"].path),
-                    method=request.method,
-                    token=request.session.get("access_token"),
-                    body=request.path_params,
-                    correlation_id=correlation_id,
-                ).json()
-            except Exception as err:
-                raise err
-            if not rtn.get("is_authorised", False):
+            # Get correlation ID from log context for distributed tracing
+            correlation_id = get_log_context().get("correlation_id")
+            is_authorised = await request.app.state.permissions_dependencies.is_authorised(
+                request,
+                request.session.get("access_token"),
+                correlation_id=correlation_id,
+            )
+            if not is_authorised:
                 raise PermissionDenied
         return request.app.state.templates.TemplateResponse(
             "topology.html",
@@ -432,7 +403,7 @@ async def topology(request: Request) -> Union[HTMLResponse, RedirectResponse]:
                 "request": request,
                 "base_url": get_base_url_from_request(request, config.get("API_SCHEME", default="http")),
                 "title": "Topology of SRCNet",
-                "data": request.app.state.backend.list_nodes(include_archived=False, include_inactive=True),
+                "data": await request.app.state.backend.list_nodes(include_archived=False, include_inactive=True),
                 "sign_out_url": get_url_for_app_from_request(
                     "www_logout",
                     request,
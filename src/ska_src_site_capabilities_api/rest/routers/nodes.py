@@ -1,6 +1,6 @@
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 
 import jwt
 from fastapi import APIRouter, Body, Depends, Path, Query
@@ -9,7 +9,7 @@ from fastapi_versionizer.versionizer import api_version
 from ska_src_logging import LogContext
 from ska_src_logging.integrations.fastapi import extract_username_from_token
 from starlette.requests import Request
-from starlette.responses import HTMLResponse, JSONResponse
+from starlette.responses import HTMLResponse, JSONResponse, StreamingResponse
 
 from ska_src_site_capabilities_api import models
 from ska_src_site_capabilities_api.common.exceptions import (
@@ -19,9 +19,12 @@ from ska_src_site_capabilities_api.common.exceptions import (
     SiteNotFoundInNodeVersion,
     handle_exceptions,
 )
-from ska_src_site_capabilities_api.common.utility import recursive_autogen_id
+from ska_src_site_capabilities_api.common.pagination import get_page_headers
+from ska_src_site_capabilities_api.common.utility import iter_ndjson, recursive_autogen_id
 from ska_src_site_capabilities_api.rest.dependencies import Common, Permissions
 from ska_src_site_capabilities_api.rest.logger import logger
+from ska_src_site_capabilities_api.rest.response_cache import cached_response, get_accepted_encodings, invalidates_response_cache
+from ska_src_site_capabilities_api.rest.responses import FastJSONResponse
 
 nodes_router = APIRouter()
 
@@ -44,6 +47,7 @@ nodes_router = APIRouter()
     summary="List all nodes",
 )
 @handle_exceptions
+@cached_response
 async def list_nodes(
     request: Request,
     only_names: bool = Query(default=False, description="Return only node names"),
@@ -51,18 +55,20 @@ async def list_nodes(
         default=False,
         description="Include inactive resources? e.g. in downtime, force disabled",
     ),
+    limit: int = Query(default=None, ge=1, description="Maximum number of results per page (see the X-Next-Cursor response header)"),
+    cursor: str = Query(default=None, description="Cursor of the page to return, from the X-Next-Cursor header of the previous page"),
 ) -> JSONResponse:
     """List nodes with an option to return only node names."""
     token = request.headers.get("authorization", "").removeprefix("Bearer ")
     enduser_id = extract_username_from_token(token) if token else None
     with LogContext(resource_id="nodes", operation="list_nodes", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Listing nodes (only_names={only_names}, include_inactive={include_inactive})")
-        rtn = request.app.state.backend.list_nodes(include_archived=False, include_inactive=include_inactive)
+        rtn = await request.app.state.backend.list_nodes(include_archived=False, include_inactive=include_inactive, limit=limit, cursor=cursor)
         if only_names:
             names = [node["name"] for node in rtn if "name" in node]
-            return JSONResponse(names)
+            return FastJSONResponse(names, headers=get_page_headers(rtn))
 
-        return JSONResponse(rtn)
+        return FastJSONResponse(rtn, headers=get_page_headers(rtn))
 
 
 @api_version(1)
@@ -81,6 +87,7 @@ async def list_nodes(
     summary="Add a node",
 )
 @handle_exceptions
+@invalidates_response_cache
 async def add_node(
     request: Request,
     values=Body(default="Node JSON."),
@@ -96,11 +103,12 @@ async def add_node(
 
     with LogContext(resource_id=node_name, operation="add_node", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Adding node: {node_name}")
-        if request.app.state.backend.get_node(node_name, node_version="latest"):
+        if await request.app.state.backend.get_node(node_name, node_version="latest"):
             raise NodeAlreadyExists(node_name=node_name)
 
         # add some custom fields e.g. date, user
-        values["created_at"] = datetime.now().isoformat()
+        values["created_at"] = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+        values["last_updated_at"] = values["created_at"]
         if request.app.state.debug and not authorization:
             values["created_by_username"] = "admin"
         else:
@@ -110,7 +118,7 @@ async def add_node(
         # autogenerate ids for id keys
         values = recursive_autogen_id(values)
 
-        id = request.app.state.backend.add_edit_node(values)
+        id = await request.app.state.backend.add_edit_node(values)
         return HTMLResponse(repr(id))
 
 
@@ -119,7 +127,7 @@ async def add_node(
     "/nodes/{node_name}",
     response_model=None,
     include_in_schema=False,
-    responses={200: {}, 401: {}, 403: {}},
+    responses={200: {}, 401: {}, 403: {}, 409: {}},
     dependencies=[Depends(Common.increment_requests_counter_depends)]
     + (
         []
@@ -130,6 +138,7 @@ async def add_node(
     summary="Edit a node",
 )
 @handle_exceptions
+@invalidates_response_cache
 async def edit_node(
     request: Request,
     node_name: str = Path(description="Node name"),
@@ -144,7 +153,7 @@ async def edit_node(
             values = json.loads(values.decode("utf-8"))
 
         # add some custom fields e.g. date, user
-        values["last_updated_at"] = datetime.now().isoformat()
+        values["last_updated_at"] = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
         if request.app.state.debug and not authorization:
             values["last_updated_by_username"] = "admin"
         else:
@@ -154,7 +163,7 @@ async def edit_node(
         # autogenerate ids for id keys
         values = recursive_autogen_id(values)
 
-        id = request.app.state.backend.add_edit_node(values, node_name=node_name)
+        id = await request.app.state.backend.add_edit_node(values, node_name=node_name)
         return HTMLResponse(repr(id))
 
 
@@ -177,6 +186,7 @@ async def edit_node(
     summary="Delete a node by name",
 )
 @handle_exceptions
+@invalidates_response_cache
 async def delete_node_by_name(
     request: Request,
     node_name: str = Path(description="Node name"),
@@ -185,8 +195,8 @@ async def delete_node_by_name(
     enduser_id = extract_username_from_token(token) if token else None
     with LogContext(resource_id=node_name, operation="delete_node", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Deleting node: {node_name}")
-        result = request.app.state.backend.delete_node_by_name(node_name)
-        return JSONResponse(result)
+        result = await request.app.state.backend.delete_node_by_name(node_name)
+        return FastJSONResponse(result)
 
 
 @api_version(1)
@@ -208,14 +218,27 @@ async def delete_node_by_name(
     summary="Dump all versions of all nodes",
 )
 @handle_exceptions
-async def dump_nodes(request: Request) -> HTMLResponse:
+async def dump_nodes(
+    request: Request,
+    format: str = Query(
+        default="json",
+        description="Output format (json||ndjson); ndjson streams one node version per line, gzip compressed if accepted by the client",
+    ),
+) -> HTMLResponse:
     """Dump all versions of all nodes."""
     token = request.headers.get("authorization", "").removeprefix("Bearer ")
     enduser_id = extract_username_from_token(token) if token else None
     with LogContext(resource_id="nodes", operation="dump_nodes", **({"enduser_id": enduser_id} if enduser_id else {})):
-        logger.info("Dumping all node versions")
-        rtn = request.app.state.backend.list_nodes(include_archived=True)
-        return JSONResponse(rtn)
+        logger.info(f"Dumping all node versions (format={format})")
+        if format == "ndjson":
+            compress = "gzip" in get_accepted_encodings(request.headers.get("accept-encoding"))
+            return StreamingResponse(
+                iter_ndjson(request.app.state.backend.iter_nodes(include_archived=True), compress=compress),
+                media_type="application/x-ndjson",
+                headers={"Vary": "Accept-Encoding", **({"Content-Encoding": "gzip"} if compress else {})},
+            )
+        rtn = await request.app.state.backend.list_nodes(include_archived=True)
+        return FastJSONResponse(rtn)
 
 
 @api_version(1)
@@ -238,6 +261,7 @@ async def dump_nodes(request: Request) -> HTMLResponse:
     summary="Get node from name",
 )
 @handle_exceptions
+@cached_response
 async def get_node_version(
     request: Request,
     node_name: str = Path(description="Node name"),
@@ -253,10 +277,10 @@ async def get_node_version(
                 int(node_version)
             except ValueError:
                 raise IncorrectNodeVersionType
-        node = request.app.state.backend.get_node(node_name=node_name, node_version=node_version)
+        node = await request.app.state.backend.get_node(node_name=node_name, node_version=node_version)
         if not node:
             raise NodeVersionNotFound(node_name=node_name, node_version=node_version)
-        return JSONResponse(node)
+        return FastJSONResponse(node)
 
 
 @api_version(1)
@@ -279,6 +303,7 @@ async def get_node_version(
     summary="Get site from node and site names",
 )
 @handle_exceptions
+@cached_response
 async def get_site_from_node_version(
     request: Request,
     node_name: str = Path(description="Node name"),
@@ -295,7 +320,7 @@ async def get_site_from_node_version(
                 int(node_version)
             except ValueError:
                 raise IncorrectNodeVersionType
-        rtn = request.app.state.backend.get_site_from_names(node_name=node_name, node_version=node_version, site_name=site_name)
+        rtn = await request.app.state.backend.get_site_from_names(node_name=node_name, node_version=node_version, site_name=site_name)
         if not rtn:
             raise SiteNotFoundInNodeVersion(node_name=node_name, node_version=node_version, site_name=site_name)
-        return JSONResponse(rtn)
+        return FastJSONResponse(rtn)
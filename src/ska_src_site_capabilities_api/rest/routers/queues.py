@@ -10,8 +10,12 @@ from starlette.responses import JSONResponse
 
 from ska_src_site_capabilities_api import models
 from ska_src_site_capabilities_api.common.exceptions import QueueNotFound, handle_exceptions
+from ska_src_site_capabilities_api.common.pagination import get_page_headers
+from ska_src_site_capabilities_api.common.utility import split_ids
 from ska_src_site_capabilities_api.rest.dependencies import Common, Permissions
 from ska_src_site_capabilities_api.rest.logger import logger
+from ska_src_site_capabilities_api.rest.response_cache import cached_response
+from ska_src_site_capabilities_api.rest.responses import FastJSONResponse
 
 queues_router = APIRouter()
 config = Config(".env")
@@ -39,11 +43,15 @@ api_dependencies = (
     summary="List all queues",
 )
 @handle_exceptions
+@cached_response
 async def list_queues(
     request: Request,
     node_names: str = Query(default=None, description="Filter by node names (comma-separated)"),
     site_names: str = Query(default=None, description="Filter by site names (comma-separated)"),
     include_inactive: bool = Query(default=False, description="Include inactive (down/disabled) Queues?"),
+    limit: int = Query(default=None, ge=1, description="Maximum number of results per page (see the X-Next-Cursor response header)"),
+    cursor: str = Query(default=None, description="Cursor of the page to return, from the X-Next-Cursor header of the previous page"),
+    fields: str = Query(default=None, description="Fields to return as comma-separated dotted paths, e.g. host,port (id is always returned)"),
 ) -> JSONResponse:
     """List all Queues."""
     token = request.headers.get("authorization", "").removeprefix("Bearer ")
@@ -55,12 +63,45 @@ async def list_queues(
         if site_names:
             site_names = [name.strip() for name in site_names.split(",")]
 
-        queue_list_response = request.app.state.backend.list_queues(
+        queue_list_response = await request.app.state.backend.list_queues(
             node_names=node_names,
             site_names=site_names,
             include_inactive=include_inactive,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
         )
-        return JSONResponse(queue_list_response)
+        return FastJSONResponse(queue_list_response, headers=get_page_headers(queue_list_response))
+
+
+@api_version(1)
+@queues_router.get(
+    "/queues/batch",
+    response_model=None,
+    responses={
+        200: {"model": models.response.QueuesBatchGetResponse},
+        400: {"model": models.response.GenericErrorResponse},
+        401: {},
+        403: {},
+    },
+    dependencies=api_dependencies,
+    tags=["Queues"],
+    summary="Get queues from ids",
+)
+@handle_exceptions
+@cached_response
+async def get_queues_from_ids(
+    request: Request,
+    ids: str = Query(description="Unique queue identifiers (comma-separated)"),
+) -> JSONResponse:
+    """Get descriptions of queues from unique identifiers, with the identifiers that could not be found."""
+    token = request.headers.get("authorization", "").removeprefix("Bearer ")
+    enduser_id = extract_username_from_token(token) if token else None
+    with LogContext(resource_id="queues", operation="get_queue_many", **({"enduser_id": enduser_id} if enduser_id else {})):
+        queue_ids = split_ids(ids, max_ids=request.app.state.batch_get_max_ids)
+        logger.info(f"Retrieving {len(queue_ids)} queues")
+        rtn = await request.app.state.backend.get_queue_many(queue_ids)
+        return FastJSONResponse(rtn)
 
 
 @api_version(1)
@@ -77,6 +118,7 @@ async def list_queues(
     summary="Get Queue from ID",
 )
 @handle_exceptions
+@cached_response
 async def get_queue_from_id(
     request: Request,
     queue_id: str = Path(description="Unique queue identifier"),
@@ -86,9 +128,9 @@ async def get_queue_from_id(
     enduser_id = extract_username_from_token(token) if token else None
     with LogContext(resource_id=queue_id, operation="get_queue", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Retrieving queue: {queue_id}")
-        queue = request.app.state.backend.get_queue_by_id(
+        queue = await request.app.state.backend.get_queue_by_id(
             queue_id=queue_id,
         )
         if not queue:
             raise QueueNotFound(queue_id=queue_id)
-        return JSONResponse(queue)
+        return FastJSONResponse(queue)
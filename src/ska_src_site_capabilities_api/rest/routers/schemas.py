@@ -1,7 +1,7 @@
+import copy
 import io
 import json
 import os
-import pathlib
 import tempfile
 
 from fastapi import APIRouter, Depends, Path
@@ -9,18 +9,15 @@ from fastapi_versionizer.versionizer import api_version
 from plantuml import PlantUML
 from ska_src_logging import LogContext
 from ska_src_logging.integrations.fastapi import extract_username_from_token
-from starlette.config import Config
 from starlette.requests import Request
-from starlette.responses import JSONResponse, StreamingResponse
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
 from ska_src_site_capabilities_api import models
-from ska_src_site_capabilities_api.common.exceptions import SchemaNotFound, handle_exceptions
-from ska_src_site_capabilities_api.common.utility import load_and_dereference_schema
+from ska_src_site_capabilities_api.common.exceptions import handle_exceptions
 from ska_src_site_capabilities_api.rest.dependencies import Common
 from ska_src_site_capabilities_api.rest.logger import logger
 
 schemas_router = APIRouter()
-config = Config(".env")
 
 
 @api_version(1)
@@ -42,8 +39,7 @@ async def list_schemas(request: Request) -> JSONResponse:
     enduser_id = extract_username_from_token(token) if token else None
     with LogContext(resource_id="schemas", operation="list_schemas", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info("Listing schemas")
-        schema_basenames = sorted(["".join(fi.split(".")[:-1]) for fi in os.listdir(config.get("SCHEMAS_RELPATH"))])
-        return JSONResponse(schema_basenames)
+        return JSONResponse(request.app.state.schema_registry.names)
 
 
 @api_version(1)
@@ -67,13 +63,7 @@ async def get_schema(request: Request, schema: str = Path(description="Schema na
     enduser_id = extract_username_from_token(token) if token else None
     with LogContext(resource_id=schema, operation="get_schema", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Retrieving schema: {schema}")
-        try:
-            dereferenced_schema = load_and_dereference_schema(
-                schema_path=pathlib.Path("{}.json".format(os.path.join(config.get("SCHEMAS_RELPATH"), schema))).absolute()
-            )
-            return JSONResponse(dereferenced_schema)  # some issue with jsonref return != dict
-        except FileNotFoundError:
-            raise SchemaNotFound
+        return Response(content=request.app.state.schema_registry.get_encoded(schema), media_type="application/json")
 
 
 @api_version(1)
@@ -97,12 +87,7 @@ async def render_schema(request: Request, schema: str = Path(description="Schema
     enduser_id = extract_username_from_token(token) if token else None
     with LogContext(resource_id=schema, operation="render_schema", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Rendering schema: {schema}")
-        try:
-            dereferenced_schema = load_and_dereference_schema(
-                schema_path=pathlib.Path("{}.json".format(os.path.join(config.get("SCHEMAS_RELPATH"), schema))).absolute()
-            )
-        except FileNotFoundError:
-            raise SchemaNotFound
+        dereferenced_schema = copy.deepcopy(request.app.state.schema_registry.get(schema))
 
         # pop countries enum for readability
         dereferenced_schema.get("properties").get("sites", {}).get("items", {}).get("properties", {}).get("country", {}).pop("enum", None)
@@ -1,5 +1,5 @@
 import os
-import pathlib
+from datetime import datetime
 from typing import Union
 
 from fastapi import APIRouter, Depends, Path, Query
@@ -7,18 +7,19 @@ from fastapi.security import HTTPBearer
 from fastapi_versionizer.versionizer import api_version
 from ska_src_logging import LogContext
 from ska_src_logging.integrations.fastapi import extract_username_from_token
-from starlette.config import Config
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 from ska_src_site_capabilities_api import models
-from ska_src_site_capabilities_api.common.exceptions import SchemaNotFound, ServiceNotFound, handle_exceptions
-from ska_src_site_capabilities_api.common.utility import load_and_dereference_schema
+from ska_src_site_capabilities_api.common.exceptions import ServiceNotFound, handle_exceptions
+from ska_src_site_capabilities_api.common.pagination import get_page_headers
+from ska_src_site_capabilities_api.common.utility import split_ids
 from ska_src_site_capabilities_api.rest.dependencies import Common, Permissions
 from ska_src_site_capabilities_api.rest.logger import logger
+from ska_src_site_capabilities_api.rest.response_cache import cached_response, invalidates_response_cache
+from ska_src_site_capabilities_api.rest.responses import FastJSONResponse
 
 services_router = APIRouter()
-config = Config(".env")
 
 
 @api_version(1)
@@ -39,6 +40,7 @@ config = Config(".env")
     summary="List all services",
 )
 @handle_exceptions
+@cached_response
 async def list_services(
     request: Request,
     node_names: str = Query(default=None, description="Filter by node names (comma-separated)"),
@@ -46,11 +48,15 @@ async def list_services(
     service_types: str = Query(default=None, description="Filter by service types (comma-separated)"),
     service_scope: str = Query(default="all", description="Filter by scope of service (all||local||global)"),
     include_inactive: bool = Query(default=False, description="Include inactive (down/disabled) services?"),
+    as_of: datetime = Query(default=None, description="List as of this time (ISO 8601, UTC unless an offset is given)"),
     associated_storage_area_id: str = Query(default=None, description="Filter by associated storage area ID"),
     output: str = Query(
         default=None,
         description="Output format (e.g., 'prometheus' for Prometheus HTTP SD response)",
     ),
+    limit: int = Query(default=None, ge=1, description="Maximum number of results per page (see the X-Next-Cursor response header)"),
+    cursor: str = Query(default=None, description="Cursor of the page to return, from the X-Next-Cursor header of the previous page"),
+    fields: str = Query(default=None, description="Fields to return as comma-separated dotted paths, e.g. host,port (id is always returned)"),
 ) -> JSONResponse:
     """List all services."""
     token = request.headers.get("authorization", "").removeprefix("Bearer ")
@@ -66,16 +72,20 @@ async def list_services(
 
         for_prometheus = output == "prometheus"
 
-        rtn = request.app.state.backend.list_services(
+        rtn = await request.app.state.backend.list_services(
             node_names=node_names,
             site_names=site_names,
             service_types=service_types,
             service_scope=service_scope,
             include_inactive=include_inactive,
+            as_of=as_of,
             associated_storage_area_id=associated_storage_area_id,
             for_prometheus=for_prometheus,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
         )
-        return JSONResponse(rtn)
+        return FastJSONResponse(rtn, headers=get_page_headers(rtn))
 
 
 @api_version(1)
@@ -91,29 +101,50 @@ async def list_services(
     summary="List service types",
 )
 @handle_exceptions
+@cached_response
 async def list_service_types(request: Request) -> JSONResponse:
     """List service types."""
     token = request.headers.get("authorization", "").removeprefix("Bearer ")
     enduser_id = extract_username_from_token(token) if token else None
     with LogContext(resource_id="service_types", operation="list_service_types", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info("Listing service types")
-        try:
-            # local
-            dereferenced_local_schema = load_and_dereference_schema(
-                schema_path=pathlib.Path("{}.json".format(os.path.join(config.get("SCHEMAS_RELPATH"), "local-service"))).absolute()
-            )
-
-            # global
-            dereferenced_global_schema = load_and_dereference_schema(
-                schema_path=pathlib.Path("{}.json".format(os.path.join(config.get("SCHEMAS_RELPATH"), "global-service"))).absolute()
-            )
-        except FileNotFoundError:
-            raise SchemaNotFound
-        rtn = {
-            "local": request.app.state.backend.list_service_types_from_schema(schema=dereferenced_local_schema),
-            "global": request.app.state.backend.list_service_types_from_schema(schema=dereferenced_global_schema),
-        }
-        return JSONResponse(rtn)
+        rtn = request.app.state.schema_registry.service_types
+        return FastJSONResponse(rtn)
+
+
+@api_version(1)
+@services_router.get(
+    "/services/batch",
+    response_model=None,
+    responses={
+        200: {"model": models.response.ServicesBatchGetResponse},
+        400: {"model": models.response.GenericErrorResponse},
+        401: {},
+        403: {},
+    },
+    dependencies=[Depends(Common.increment_requests_counter_depends)]
+    + (
+        []
+        if os.environ.get("DISABLE_AUTHENTICATION", "no") == "yes"
+        else [Depends(Permissions.conditional_verify_permission_for_service_route_depends)]
+    ),
+    tags=["Services"],
+    summary="Get services from ids",
+)
+@handle_exceptions
+@cached_response
+async def get_services_from_ids(
+    request: Request,
+    ids: str = Query(description="Unique service identifiers (comma-separated)"),
+) -> JSONResponse:
+    """Get descriptions of services from unique identifiers, with the identifiers that could not be found."""
+    token = request.headers.get("authorization", "").removeprefix("Bearer ")
+    enduser_id = extract_username_from_token(token) if token else None
+    with LogContext(resource_id="services", operation="get_service_many", **({"enduser_id": enduser_id} if enduser_id else {})):
+        service_ids = split_ids(ids, max_ids=request.app.state.batch_get_max_ids)
+        logger.info(f"Retrieving {len(service_ids)} services")
+        rtn = await request.app.state.backend.get_service_many(service_ids)
+        return FastJSONResponse(rtn)
 
 
 @api_version(1)
@@ -141,6 +172,7 @@ async def list_service_types(request: Request) -> JSONResponse:
     summary="Get service from id",
 )
 @handle_exceptions
+@cached_response
 async def get_service_from_id(
     request: Request,
     service_id: str = Path(description="Unique service identifier"),
@@ -150,10 +182,10 @@ async def get_service_from_id(
     enduser_id = extract_username_from_token(token) if token else None
     with LogContext(resource_id=service_id, operation="get_service", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Retrieving service: {service_id}")
-        rtn = request.app.state.backend.get_service(service_id)
+        rtn = await request.app.state.backend.get_service(service_id)
         if not rtn:
             raise ServiceNotFound(service_id)
-        return JSONResponse(rtn)
+        return FastJSONResponse(rtn)
 
 
 @api_version(1)
@@ -176,6 +208,7 @@ async def get_service_from_id(
     summary="Unset a service from being force disabled",
 )
 @handle_exceptions
+@invalidates_response_cache
 async def set_service_enabled(
     request: Request,
     service_id: str = Path(description="Service ID"),
@@ -184,10 +217,10 @@ async def set_service_enabled(
     enduser_id = extract_username_from_token(authorization.credentials) if authorization else None
     with LogContext(resource_id=service_id, operation="enable_service", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Enabling service: {service_id}")
-        response = request.app.state.backend.set_service_force_disabled_flag(service_id, False)
+        response = await request.app.state.backend.set_service_force_disabled_flag(service_id, False)
         if not response:
             raise ServiceNotFound(service_id)
-        return JSONResponse(response)
+        return FastJSONResponse(response)
 
 
 @api_version(1)
@@ -210,6 +243,7 @@ async def set_service_enabled(
     summary="Set a service to be force disabled",
 )
 @handle_exceptions
+@invalidates_response_cache
 async def set_service_disabled(
     request: Request,
     service_id: str = Path(description="Service ID"),
@@ -218,7 +252,7 @@ async def set_service_disabled(
     enduser_id = extract_username_from_token(authorization.credentials) if authorization else None
     with LogContext(resource_id=service_id, operation="disable_service", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Disabling service: {service_id}")
-        response = request.app.state.backend.set_service_force_disabled_flag(service_id, True)
+        response = await request.app.state.backend.set_service_force_disabled_flag(service_id, True)
         if not response:
             raise ServiceNotFound(service_id)
-        return JSONResponse(response)
+        return FastJSONResponse(response)
@@ -1,4 +1,5 @@
 import os
+from datetime import datetime
 
 from fastapi import APIRouter, Depends, Path, Query
 from fastapi.security import HTTPBearer
@@ -10,8 +11,11 @@ from starlette.responses import JSONResponse
 
 from ska_src_site_capabilities_api import models
 from ska_src_site_capabilities_api.common.exceptions import SiteNotFound, handle_exceptions
+from ska_src_site_capabilities_api.common.pagination import get_page_headers
 from ska_src_site_capabilities_api.rest.dependencies import Common, Permissions
 from ska_src_site_capabilities_api.rest.logger import logger
+from ska_src_site_capabilities_api.rest.response_cache import cached_response, invalidates_response_cache
+from ska_src_site_capabilities_api.rest.responses import FastJSONResponse
 
 sites_router = APIRouter()
 
@@ -34,6 +38,7 @@ sites_router = APIRouter()
     summary="List all sites",
 )
 @handle_exceptions
+@cached_response
 async def list_sites(
     request: Request,
     only_names: bool = Query(default=False, description="Return only site names"),
@@ -42,6 +47,10 @@ async def list_sites(
         default=False,
         description="Include inactive resources? e.g. in downtime, force disabled",
     ),
+    as_of: datetime = Query(default=None, description="List as of this time (ISO 8601, UTC unless an offset is given)"),
+    limit: int = Query(default=None, ge=1, description="Maximum number of results per page (see the X-Next-Cursor response header)"),
+    cursor: str = Query(default=None, description="Cursor of the page to return, from the X-Next-Cursor header of the previous page"),
+    fields: str = Query(default=None, description="Fields to return as comma-separated dotted paths, e.g. host,port (id is always returned)"),
 ) -> JSONResponse:
     """List versions of all sites."""
     token = request.headers.get("authorization", "").removeprefix("Bearer ")
@@ -51,12 +60,19 @@ async def list_sites(
         if node_names:
             node_names = [name.strip() for name in node_names.split(",")]
 
-        rtn = request.app.state.backend.list_sites(node_names=node_names, include_inactive=include_inactive)
+        rtn = await request.app.state.backend.list_sites(
+            node_names=node_names,
+            include_inactive=include_inactive,
+            as_of=as_of,
+            limit=limit,
+            cursor=cursor,
+            fields="name" if only_names else fields,
+        )
         if only_names:
             names = [site["name"] for site in rtn if "name" in site]
-            return JSONResponse(names)
+            return FastJSONResponse(names, headers=get_page_headers(rtn))
 
-        return JSONResponse(rtn)
+        return FastJSONResponse(rtn, headers=get_page_headers(rtn))
 
 
 @api_version(1)
@@ -79,6 +95,7 @@ async def list_sites(
     summary="Get site from id",
 )
 @handle_exceptions
+@cached_response
 async def get_site_from_id(
     request: Request,
     site_id: str = Path(description="Unique site identifier"),
@@ -88,10 +105,10 @@ async def get_site_from_id(
     enduser_id = extract_username_from_token(token) if token else None
     with LogContext(resource_id=site_id, operation="get_site", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Retrieving site: {site_id}")
-        rtn = request.app.state.backend.get_site(site_id)
+        rtn = await request.app.state.backend.get_site(site_id)
         if not rtn:
             raise SiteNotFound(site_id)
-        return JSONResponse(rtn)
+        return FastJSONResponse(rtn)
 
 
 @api_version(1)
@@ -114,6 +131,7 @@ async def get_site_from_id(
     summary="Unset a site from being force disabled",
 )
 @handle_exceptions
+@invalidates_response_cache
 async def set_site_enabled(
     request: Request,
     site_id: str = Path(description="Site ID"),
@@ -122,10 +140,10 @@ async def set_site_enabled(
     enduser_id = extract_username_from_token(authorization.credentials) if authorization else None
     with LogContext(resource_id=site_id, operation="enable_site", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Enabling site: {site_id}")
-        response = request.app.state.backend.set_site_force_disabled_flag(site_id, False)
+        response = await request.app.state.backend.set_site_force_disabled_flag(site_id, False)
         if not response:
             raise SiteNotFound(site_id)
-        return JSONResponse(response)
+        return FastJSONResponse(response)
 
 
 @api_version(1)
@@ -148,6 +166,7 @@ async def set_site_enabled(
     summary="Set a site to be force disabled",
 )
 @handle_exceptions
+@invalidates_response_cache
 async def set_site_disabled(
     request: Request,
     site_id: str = Path(description="Site ID"),
@@ -156,7 +175,7 @@ async def set_site_disabled(
     enduser_id = extract_username_from_token(authorization.credentials) if authorization else None
     with LogContext(resource_id=site_id, operation="disable_site", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Disabling site: {site_id}")
-        response = request.app.state.backend.set_site_force_disabled_flag(site_id, True)
+        response = await request.app.state.backend.set_site_force_disabled_flag(site_id, True)
         if not response:
             raise SiteNotFound(site_id)
-        return JSONResponse(response)
+        return FastJSONResponse(response)
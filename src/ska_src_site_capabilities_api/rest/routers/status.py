@@ -49,48 +49,33 @@ async def ping(request: Request):
 async def health(request: Request):
     """Service health.
 
-    This endpoint will return a 500 if any of the dependent services are down.
+    The state of dependent services is their last known state, probed periodically in the background; its age is
+    given in seconds. This endpoint will return a 500 if the permissions or auth API is down.
+
+    The reachability of MongoDB and the health of its connection pool are reported, but do not make this endpoint
+    return a 500: it serves as a liveness probe, and a short MongoDB outage should not restart every replica. Requests
+    needing MongoDB fail on their own meanwhile.
     """
     with LogContext(resource_id="status", operation="health_check"):
         logger.info("Health check requested")
 
-        # Dependent services.
-        #
-        # Permissions API
-        #
-        try:
-            response = request.app.state.permissions_dependencies.permissions.ping()
-            permissions_api_healthy = response.status_code == 200
-        except Exception:
-            permissions_api_healthy = False
-
-        # Auth API
-        #
-        try:
-            response = request.app.state.auth.ping()
-            auth_api_healthy = response.status_code == 200
-        except Exception:
-            auth_api_healthy = False
+        health_state = await request.app.state.health_monitor.get()
+        dependent_services = health_state["services"]
 
         # Set return code dependent on criteria e.g. dependent service statuses
         #
-        healthy_criteria = [permissions_api_healthy, auth_api_healthy]
-        health_status = "healthy" if all(healthy_criteria) else "unhealthy"
+        healthy = health_state["healthy"]
+        health_status = "healthy" if healthy else "unhealthy"
         logger.info(f"Health check result: {health_status}")
 
         return JSONResponse(
-            status_code=status.HTTP_200_OK if all(healthy_criteria) else status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=status.HTTP_200_OK if healthy else status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={
                 "uptime": round(time.time() - request.app.state.service_start_time),
                 "number_of_managed_requests": request.app.state.common_dependencies.requests_counter,
-                "dependent_services": {
-                    "permissions-api": {
-                        "status": "UP" if permissions_api_healthy else "DOWN",
-                    },
-                    "auth-api": {
-                        "status": "UP" if auth_api_healthy else "DOWN",
-                    },
-                },
+                "checked_at": health_state["checked_at"],
+                "age_s": round(health_state["age_s"], 3),
+                "dependent_services": dependent_services,
             },
         )
 
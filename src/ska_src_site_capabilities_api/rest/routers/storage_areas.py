@@ -1,23 +1,24 @@
 import os
-import pathlib
+from datetime import datetime
 
 from fastapi import APIRouter, Depends, Path, Query
 from fastapi.security import HTTPBearer
 from fastapi_versionizer.versionizer import api_version
 from ska_src_logging import LogContext
 from ska_src_logging.integrations.fastapi import extract_username_from_token
-from starlette.config import Config
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 from ska_src_site_capabilities_api import models
-from ska_src_site_capabilities_api.common.exceptions import SchemaNotFound, StorageAreaNotFound, handle_exceptions
-from ska_src_site_capabilities_api.common.utility import load_and_dereference_schema
+from ska_src_site_capabilities_api.common.exceptions import StorageAreaNotFound, handle_exceptions
+from ska_src_site_capabilities_api.common.pagination import get_page_headers
+from ska_src_site_capabilities_api.common.utility import split_ids
 from ska_src_site_capabilities_api.rest.dependencies import Common, Permissions
 from ska_src_site_capabilities_api.rest.logger import logger
+from ska_src_site_capabilities_api.rest.response_cache import cached_response, invalidates_response_cache
+from ska_src_site_capabilities_api.rest.responses import FastJSONResponse
 
 storage_areas_router = APIRouter()
-config = Config(".env")
 
 
 @api_version(1)
@@ -38,6 +39,7 @@ config = Config(".env")
     summary="List all storage areas",
 )
 @handle_exceptions
+@cached_response
 async def list_storage_areas(
     request: Request,
     node_names: str = Query(default=None, description="Filter by node names (comma-separated)"),
@@ -46,6 +48,10 @@ async def list_storage_areas(
         default=False,
         description="Include inactive resources? e.g. in downtime, force disabled",
     ),
+    as_of: datetime = Query(default=None, description="List as of this time (ISO 8601, UTC unless an offset is given)"),
+    limit: int = Query(default=None, ge=1, description="Maximum number of results per page (see the X-Next-Cursor response header)"),
+    cursor: str = Query(default=None, description="Cursor of the page to return, from the X-Next-Cursor header of the previous page"),
+    fields: str = Query(default=None, description="Fields to return as comma-separated dotted paths, e.g. host,port (id is always returned)"),
 ) -> JSONResponse:
     """List all storage areas."""
     token = request.headers.get("authorization", "").removeprefix("Bearer ")
@@ -57,8 +63,16 @@ async def list_storage_areas(
         if site_names:
             site_names = [name.strip() for name in site_names.split(",")]
 
-        rtn = request.app.state.backend.list_storage_areas(node_names=node_names, site_names=site_names, include_inactive=include_inactive)
-        return JSONResponse(rtn)
+        rtn = await request.app.state.backend.list_storage_areas(
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            as_of=as_of,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+        return FastJSONResponse(rtn, headers=get_page_headers(rtn))
 
 
 @api_version(1)
@@ -74,6 +88,7 @@ async def list_storage_areas(
     summary="List all storage areas (Grafana format)",
 )
 @handle_exceptions
+@cached_response
 async def list_storage_areas_for_grafana(
     request: Request,
     node_names: str = Query(default=None, description="Filter by node names (comma-separated)"),
@@ -82,6 +97,7 @@ async def list_storage_areas_for_grafana(
         default=False,
         description="Include inactive resources? e.g. in downtime, force disabled",
     ),
+    as_of: datetime = Query(default=None, description="List as of this time (ISO 8601, UTC unless an offset is given)"),
 ) -> JSONResponse:
     """List all storage areas in a format digestible by Grafana world map panels."""
     token = request.headers.get("authorization", "").removeprefix("Bearer ")
@@ -93,13 +109,14 @@ async def list_storage_areas_for_grafana(
         if site_names:
             site_names = [name.strip() for name in site_names.split(",")]
 
-        rtn = request.app.state.backend.list_storage_areas(
+        rtn = await request.app.state.backend.list_storage_areas(
             node_names=node_names,
             site_names=site_names,
             for_grafana=True,
             include_inactive=include_inactive,
+            as_of=as_of,
         )
-        return JSONResponse(rtn)
+        return FastJSONResponse(rtn)
 
 
 @api_version(1)
@@ -115,6 +132,7 @@ async def list_storage_areas_for_grafana(
     summary="List all storage areas (topojson format)",
 )
 @handle_exceptions
+@cached_response
 async def list_storage_areas_in_topojson_format(
     request: Request,
     node_names: str = Query(default=None, description="Filter by node names (comma-separated)"),
@@ -123,6 +141,7 @@ async def list_storage_areas_in_topojson_format(
         default=False,
         description="Include inactive resources? e.g. in downtime, force disabled",
     ),
+    as_of: datetime = Query(default=None, description="List as of this time (ISO 8601, UTC unless an offset is given)"),
 ) -> JSONResponse:
     """List all storage areas in topojson format."""
     token = request.headers.get("authorization", "").removeprefix("Bearer ")
@@ -134,13 +153,14 @@ async def list_storage_areas_in_topojson_format(
         if site_names:
             site_names = [name.strip() for name in site_names.split(",")]
 
-        rtn = request.app.state.backend.list_storage_areas(
+        rtn = await request.app.state.backend.list_storage_areas(
             node_names=node_names,
             site_names=site_names,
             topojson=True,
             include_inactive=include_inactive,
+            as_of=as_of,
         )
-        return JSONResponse(rtn)
+        return FastJSONResponse(rtn)
 
 
 @api_version(1)
@@ -156,20 +176,50 @@ async def list_storage_areas_in_topojson_format(
     summary="List storage area types",
 )
 @handle_exceptions
+@cached_response
 async def list_storage_area_types(request: Request) -> JSONResponse:
     """List storage area types."""
     token = request.headers.get("authorization", "").removeprefix("Bearer ")
     enduser_id = extract_username_from_token(token) if token else None
     with LogContext(resource_id="storage_area_types", operation="list_storage_area_types", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info("Listing storage area types")
-        try:
-            dereferenced_storage_area_schema = load_and_dereference_schema(
-                schema_path=pathlib.Path("{}.json".format(os.path.join(config.get("SCHEMAS_RELPATH"), "storage-area"))).absolute()
-            )
-        except FileNotFoundError:
-            raise SchemaNotFound
-        rtn = request.app.state.backend.list_storage_area_types_from_schema(schema=dereferenced_storage_area_schema)
-        return JSONResponse(rtn)
+        rtn = request.app.state.schema_registry.storage_area_types
+        return FastJSONResponse(rtn)
+
+
+@api_version(1)
+@storage_areas_router.get(
+    "/storage-areas/batch",
+    response_model=None,
+    responses={
+        200: {"model": models.response.StorageAreasBatchGetResponse},
+        400: {"model": models.response.GenericErrorResponse},
+        401: {},
+        403: {},
+    },
+    dependencies=[Depends(Common.increment_requests_counter_depends)]
+    + (
+        []
+        if os.environ.get("DISABLE_AUTHENTICATION", "no") == "yes"
+        else [Depends(Permissions.conditional_verify_permission_for_service_route_depends)]
+    ),
+    tags=["Storage Areas"],
+    summary="Get storage areas from ids",
+)
+@handle_exceptions
+@cached_response
+async def get_storage_areas_from_ids(
+    request: Request,
+    ids: str = Query(description="Unique storage area identifiers (comma-separated)"),
+) -> JSONResponse:
+    """Get descriptions of storage areas from unique identifiers, with the identifiers that could not be found."""
+    token = request.headers.get("authorization", "").removeprefix("Bearer ")
+    enduser_id = extract_username_from_token(token) if token else None
+    with LogContext(resource_id="storage-areas", operation="get_storage_area_many", **({"enduser_id": enduser_id} if enduser_id else {})):
+        storage_area_ids = split_ids(ids, max_ids=request.app.state.batch_get_max_ids)
+        logger.info(f"Retrieving {len(storage_area_ids)} storage areas")
+        rtn = await request.app.state.backend.get_storage_area_many(storage_area_ids)
+        return FastJSONResponse(rtn)
 
 
 @api_version(1)
@@ -192,6 +242,7 @@ async def list_storage_area_types(request: Request) -> JSONResponse:
     summary="Get storage area from id",
 )
 @handle_exceptions
+@cached_response
 async def get_storage_area_from_id(
     request: Request,
     storage_area_id: str = Path(description="Unique storage area identifier"),
@@ -201,10 +252,10 @@ async def get_storage_area_from_id(
     enduser_id = extract_username_from_token(token) if token else None
     with LogContext(resource_id=storage_area_id, operation="get_storage_area", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Retrieving storage area: {storage_area_id}")
-        rtn = request.app.state.backend.get_storage_area(storage_area_id)
+        rtn = await request.app.state.backend.get_storage_area(storage_area_id)
         if not rtn:
             raise StorageAreaNotFound(storage_area_id)
-        return JSONResponse(rtn)
+        return FastJSONResponse(rtn)
 
 
 @api_version(1)
@@ -227,6 +278,7 @@ async def get_storage_area_from_id(
     summary="Unset a storage area from being force disabled",
 )
 @handle_exceptions
+@invalidates_response_cache
 async def set_storage_area_enabled(
     request: Request,
     storage_area_id: str = Path(description="Storage Area ID"),
@@ -235,10 +287,10 @@ async def set_storage_area_enabled(
     enduser_id = extract_username_from_token(authorization.credentials) if authorization else None
     with LogContext(resource_id=storage_area_id, operation="enable_storage_area", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Enabling storage area: {storage_area_id}")
-        response = request.app.state.backend.set_storage_area_force_disabled_flag(storage_area_id, False)
+        response = await request.app.state.backend.set_storage_area_force_disabled_flag(storage_area_id, False)
         if not response:
             raise StorageAreaNotFound(storage_area_id)
-        return JSONResponse(response)
+        return FastJSONResponse(response)
 
 
 @api_version(1)
@@ -261,6 +313,7 @@ async def set_storage_area_enabled(
     summary="Set a storage area to be force disabled",
 )
 @handle_exceptions
+@invalidates_response_cache
 async def set_storage_area_disabled(
     request: Request,
     storage_area_id: str = Path(description="Storage Area ID"),
@@ -269,7 +322,7 @@ async def set_storage_area_disabled(
     enduser_id = extract_username_from_token(authorization.credentials) if authorization else None
     with LogContext(resource_id=storage_area_id, operation="disable_storage_area", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Disabling storage area: {storage_area_id}")
-        response = request.app.state.backend.set_storage_area_force_disabled_flag(storage_area_id, True)
+        response = await request.app.state.backend.set_storage_area_force_disabled_flag(storage_area_id, True)
         if not response:
             raise StorageAreaNotFound(storage_area_id)
-        return JSONResponse(response)
+        return FastJSONResponse(response)
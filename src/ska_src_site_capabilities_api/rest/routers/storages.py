@@ -1,4 +1,5 @@
 import os
+from datetime import datetime
 
 from fastapi import APIRouter, Depends, Path, Query
 from fastapi.security import HTTPBearer
@@ -10,8 +11,12 @@ from starlette.responses import JSONResponse
 
 from ska_src_site_capabilities_api import models
 from ska_src_site_capabilities_api.common.exceptions import StorageNotFound, handle_exceptions
+from ska_src_site_capabilities_api.common.pagination import get_page_headers
+from ska_src_site_capabilities_api.common.utility import split_ids
 from ska_src_site_capabilities_api.rest.dependencies import Common, Permissions
 from ska_src_site_capabilities_api.rest.logger import logger
+from ska_src_site_capabilities_api.rest.response_cache import cached_response, invalidates_response_cache
+from ska_src_site_capabilities_api.rest.responses import FastJSONResponse
 
 storages_router = APIRouter()
 
@@ -34,6 +39,7 @@ storages_router = APIRouter()
     summary="List all storages",
 )
 @handle_exceptions
+@cached_response
 async def list_storages(
     request: Request,
     node_names: str = Query(default=None, description="Filter by node names (comma-separated)"),
@@ -42,6 +48,10 @@ async def list_storages(
         default=False,
         description="Include inactive resources? e.g. in downtime, force disabled",
     ),
+    as_of: datetime = Query(default=None, description="List as of this time (ISO 8601, UTC unless an offset is given)"),
+    limit: int = Query(default=None, ge=1, description="Maximum number of results per page (see the X-Next-Cursor response header)"),
+    cursor: str = Query(default=None, description="Cursor of the page to return, from the X-Next-Cursor header of the previous page"),
+    fields: str = Query(default=None, description="Fields to return as comma-separated dotted paths, e.g. host,port (id is always returned)"),
 ) -> JSONResponse:
     """List all storages."""
     token = request.headers.get("authorization", "").removeprefix("Bearer ")
@@ -53,8 +63,16 @@ async def list_storages(
         if site_names:
             site_names = [name.strip() for name in site_names.split(",")]
 
-        rtn = request.app.state.backend.list_storages(node_names=node_names, site_names=site_names, include_inactive=include_inactive)
-        return JSONResponse(rtn)
+        rtn = await request.app.state.backend.list_storages(
+            node_names=node_names,
+            site_names=site_names,
+            include_inactive=include_inactive,
+            as_of=as_of,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+        return FastJSONResponse(rtn, headers=get_page_headers(rtn))
 
 
 @api_version(1)
@@ -70,6 +88,7 @@ async def list_storages(
     summary="List all storages (Grafana format)",
 )
 @handle_exceptions
+@cached_response
 async def list_storages_for_grafana(
     request: Request,
     node_names: str = Query(default=None, description="Filter by node names (comma-separated)"),
@@ -78,6 +97,7 @@ async def list_storages_for_grafana(
         default=False,
         description="Include inactive resources? e.g. in downtime, force disabled",
     ),
+    as_of: datetime = Query(default=None, description="List as of this time (ISO 8601, UTC unless an offset is given)"),
 ) -> JSONResponse:
     """List all storages in a format digestible by Grafana world map panels."""
     token = request.headers.get("authorization", "").removeprefix("Bearer ")
@@ -89,13 +109,14 @@ async def list_storages_for_grafana(
         if site_names:
             site_names = [name.strip() for name in site_names.split(",")]
 
-        rtn = request.app.state.backend.list_storages(
+        rtn = await request.app.state.backend.list_storages(
             node_names=node_names,
             site_names=site_names,
             for_grafana=True,
             include_inactive=include_inactive,
+            as_of=as_of,
         )
-        return JSONResponse(rtn)
+        return FastJSONResponse(rtn)
 
 
 @api_version(1)
@@ -111,6 +132,7 @@ async def list_storages_for_grafana(
     summary="List all storages (topojson format)",
 )
 @handle_exceptions
+@cached_response
 async def list_storages_in_topojson_format(
     request: Request,
     node_names: str = Query(default=None, description="Filter by node names (comma-separated)"),
@@ -119,6 +141,7 @@ async def list_storages_in_topojson_format(
         default=False,
         description="Include inactive resources? e.g. in downtime, force disabled",
     ),
+    as_of: datetime = Query(default=None, description="List as of this time (ISO 8601, UTC unless an offset is given)"),
 ) -> JSONResponse:
     """List all storages in topojson format."""
     token = request.headers.get("authorization", "").removeprefix("Bearer ")
@@ -130,13 +153,49 @@ async def list_storages_in_topojson_format(
         if site_names:
             site_names = [name.strip() for name in site_names.split(",")]
 
-        rtn = request.app.state.backend.list_storages(
+        rtn = await request.app.state.backend.list_storages(
             node_names=node_names,
             site_names=site_names,
             topojson=True,
             include_inactive=include_inactive,
+            as_of=as_of,
         )
-        return JSONResponse(rtn)
+        return FastJSONResponse(rtn)
+
+
+@api_version(1)
+@storages_router.get(
+    "/storages/batch",
+    response_model=None,
+    responses={
+        200: {"model": models.response.StoragesBatchGetResponse},
+        400: {"model": models.response.GenericErrorResponse},
+        401: {},
+        403: {},
+    },
+    dependencies=[Depends(Common.increment_requests_counter_depends)]
+    + (
+        []
+        if os.environ.get("DISABLE_AUTHENTICATION", "no") == "yes"
+        else [Depends(Permissions.conditional_verify_permission_for_service_route_depends)]
+    ),
+    tags=["Storages"],
+    summary="Get storages from ids",
+)
+@handle_exceptions
+@cached_response
+async def get_storages_from_ids(
+    request: Request,
+    ids: str = Query(description="Unique storage identifiers (comma-separated)"),
+) -> JSONResponse:
+    """Get descriptions of storages from unique identifiers, with the identifiers that could not be found."""
+    token = request.headers.get("authorization", "").removeprefix("Bearer ")
+    enduser_id = extract_username_from_token(token) if token else None
+    with LogContext(resource_id="storages", operation="get_storage_many", **({"enduser_id": enduser_id} if enduser_id else {})):
+        storage_ids = split_ids(ids, max_ids=request.app.state.batch_get_max_ids)
+        logger.info(f"Retrieving {len(storage_ids)} storages")
+        rtn = await request.app.state.backend.get_storage_many(storage_ids)
+        return FastJSONResponse(rtn)
 
 
 @api_version(1)
@@ -159,6 +218,7 @@ async def list_storages_in_topojson_format(
     summary="Get storage from id",
 )
 @handle_exceptions
+@cached_response
 async def get_storage_from_id(
     request: Request,
     storage_id: str = Path(description="Unique storage identifier"),
@@ -168,10 +228,10 @@ async def get_storage_from_id(
     enduser_id = extract_username_from_token(token) if token else None
     with LogContext(resource_id=storage_id, operation="get_storage", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Retrieving storage: {storage_id}")
-        rtn = request.app.state.backend.get_storage(storage_id)
+        rtn = await request.app.state.backend.get_storage(storage_id)
         if not rtn:
             raise StorageNotFound(storage_id)
-        return JSONResponse(rtn)
+        return FastJSONResponse(rtn)
 
 
 @api_version(1)
@@ -194,6 +254,7 @@ async def get_storage_from_id(
     summary="Unset a storage from being force disabled",
 )
 @handle_exceptions
+@invalidates_response_cache
 async def set_storage_enabled(
     request: Request,
     storage_id: str = Path(description="Storage ID"),
@@ -202,10 +263,10 @@ async def set_storage_enabled(
     enduser_id = extract_username_from_token(authorization.credentials) if authorization else None
     with LogContext(resource_id=storage_id, operation="enable_storage", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Enabling storage: {storage_id}")
-        response = request.app.state.backend.set_storage_force_disabled_flag(storage_id, False)
+        response = await request.app.state.backend.set_storage_force_disabled_flag(storage_id, False)
         if not response:
             raise StorageNotFound(storage_id)
-        return JSONResponse(response)
+        return FastJSONResponse(response)
 
 
 @api_version(1)
@@ -228,6 +289,7 @@ async def set_storage_enabled(
     summary="Set a storage to be force disabled",
 )
 @handle_exceptions
+@invalidates_response_cache
 async def set_storage_disabled(
     request: Request,
     storage_id: str = Path(description="Storage ID"),
@@ -236,7 +298,7 @@ async def set_storage_disabled(
     enduser_id = extract_username_from_token(authorization.credentials) if authorization else None
     with LogContext(resource_id=storage_id, operation="disable_storage", **({"enduser_id": enduser_id} if enduser_id else {})):
         logger.info(f"Disabling storage: {storage_id}")
-        response = request.app.state.backend.set_storage_force_disabled_flag(storage_id, True)
+        response = await request.app.state.backend.set_storage_force_disabled_flag(storage_id, True)
         if not response:
             raise StorageNotFound(storage_id)
-        return JSONResponse(response)
+        return FastJSONResponse(response)
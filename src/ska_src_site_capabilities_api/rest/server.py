@@ -14,11 +14,17 @@ from ska_src_permissions_api.client.permissions import PermissionsClient
 from starlette.config import Config
 from starlette.middleware.sessions import SessionMiddleware
 
-from ska_src_site_capabilities_api.backend.mongo import MongoBackend
-from ska_src_site_capabilities_api.common import constants
+from ska_src_site_capabilities_api.backend.async_mongo import AsyncMongoBackend
+from ska_src_site_capabilities_api.common import constants, outbound_http
+from ska_src_site_capabilities_api.common.pagination import NEXT_CURSOR_HEADER
+from ska_src_site_capabilities_api.common.schema_registry import SchemaRegistry
 from ska_src_site_capabilities_api.rest import dependencies
+from ska_src_site_capabilities_api.rest.health import HealthMonitor, http_ping_probe, mongodb_probe
 from ska_src_site_capabilities_api.rest.logger import logger, setup_logging, setup_otel_fastapi
 from ska_src_site_capabilities_api.rest.openapi import create_custom_openapi_schema
+from ska_src_site_capabilities_api.rest.outbound import OutboundCalls
+from ska_src_site_capabilities_api.rest.permissions_cache import PermissionsCache
+from ska_src_site_capabilities_api.rest.response_cache import ResponseCache
 from ska_src_site_capabilities_api.rest.routers.compute import compute_router
 from ska_src_site_capabilities_api.rest.routers.docs import docs_router
 from ska_src_site_capabilities_api.rest.routers.nodes import nodes_router
@@ -42,19 +48,43 @@ async def lifespan(app: FastAPI):
     # Setup uvicorn logging to use ska-src-logging
     setup_logging()
 
+    # Run calls to other services (permissions, auth, IAM) off the event loop, with timeouts, on connections pooled
+    # per upstream
+    outbound_calls_timeout_s = config.get("OUTBOUND_CALLS_TIMEOUT_S", cast=float, default=10.0)
+    outbound_calls = OutboundCalls(
+        max_workers=config.get("OUTBOUND_CALLS_MAX_WORKERS", cast=int, default=16),
+        timeout_s=outbound_calls_timeout_s,
+    )
+    outbound_http.configure(
+        pool_maxsize=config.get("OUTBOUND_HTTP_POOL_MAXSIZE", cast=int, default=16),
+        default_timeout_s=outbound_calls_timeout_s,
+    )
+
     # Get instance of IAM constants
-    iam_endpoints = constants.IAM(client_conf_url=config.get("IAM_CLIENT_CONF_URL"))
+    iam_endpoints = await outbound_calls.run("iam", constants.IAM, client_conf_url=config.get("IAM_CLIENT_CONF_URL"))
 
     # Instantiate a Permissions client
     permissions = PermissionsClient(config.get("PERMISSIONS_API_URL"), calling_service="SCAPI")
+    outbound_http.use_shared_session(permissions, config.get("PERMISSIONS_API_URL"))
     permissions_service_name = config.get("PERMISSIONS_SERVICE_NAME")
     permissions_service_version = config.get("PERMISSIONS_SERVICE_VERSION")
 
+    # Cache permission decisions per worker, keyed by token digest, route, method and path parameters
+    permissions_cache = None
+    if config.get("PERMISSIONS_CACHE", cast=bool, default=True):
+        permissions_cache = PermissionsCache(
+            max_entries=config.get("PERMISSIONS_CACHE_MAX_ENTRIES", cast=int, default=10000),
+            ttl_s=config.get("PERMISSIONS_CACHE_TTL_S", cast=float, default=60.0),
+            negative_ttl_s=config.get("PERMISSIONS_CACHE_NEGATIVE_TTL_S", cast=float, default=10.0),
+        )
+
     # Instantiate permissions dependencies
     permissions_dependencies = dependencies.Permissions(
         permissions=permissions,
         permissions_service_name=permissions_service_name,
         permissions_service_version=permissions_service_version,
+        permissions_cache=permissions_cache,
+        outbound_calls=outbound_calls,
     )
 
     # Instantiate OAuth2 request session for the ska_src_site_capabilities_api client
@@ -65,16 +95,41 @@ async def lifespan(app: FastAPI):
     )
 
     # Instantiate Mongo backend
-    backend = MongoBackend(
+    backend = AsyncMongoBackend(
+        max_workers=config.get("MONGO_BACKEND_MAX_WORKERS", cast=int, default=32),
         mongo_username=config.get("MONGO_USERNAME"),
         mongo_password=config.get("MONGO_PASSWORD"),
         mongo_host=config.get("MONGO_HOST"),
         mongo_port=config.get("MONGO_PORT"),
         mongo_database=config.get("MONGO_DATABASE"),
+        mongo_max_pool_size=config.get("MONGO_MAX_POOL_SIZE", cast=int, default=100),
+        mongo_min_pool_size=config.get("MONGO_MIN_POOL_SIZE", cast=int, default=0),
+        mongo_max_idle_time_ms=config.get("MONGO_MAX_IDLE_TIME_MS", cast=int, default=None),
+        mongo_connect_timeout_ms=config.get("MONGO_CONNECT_TIMEOUT_MS", cast=int, default=20000),
+        mongo_server_selection_timeout_ms=config.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", cast=int, default=30000),
+        mongo_socket_timeout_ms=config.get("MONGO_SOCKET_TIMEOUT_MS", cast=int, default=None),
+        mongo_wait_queue_timeout_ms=config.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", cast=int, default=None),
+        mongo_read_concern_level=config.get("MONGO_READ_CONCERN_LEVEL", default=None),
+        mongo_write_concern_w=config.get("MONGO_WRITE_CONCERN_W", default=None),
+        mongo_write_concern_timeout_ms=config.get("MONGO_WRITE_CONCERN_TIMEOUT_MS", cast=int, default=None),
+        snapshot_max_age_s=config.get("TOPOLOGY_SNAPSHOT_MAX_AGE_S", cast=float, default=5.0),
+        use_aggregation=config.get("MONGO_USE_AGGREGATION", cast=bool, default=True),
+        use_active_view=config.get("TOPOLOGY_ACTIVE_VIEW", cast=bool, default=True),
+        archive_checkpoint_interval=config.get("NODE_HISTORY_CHECKPOINT_INTERVAL", cast=int, default=10),
+        dump_batch_size=config.get("NODES_DUMP_BATCH_SIZE", cast=int, default=100),
     )
 
+    # Create any missing secondary indexes
+    if config.get("MONGO_ENSURE_INDEXES", cast=bool, default=True):
+        await backend.ensure_indexes()
+
+    # Follow changes made by other workers (or directly in the database) to keep this worker's caches fresh
+    if config.get("TOPOLOGY_WATCH", cast=bool, default=True):
+        backend.start_watching(poll_interval_s=config.get("TOPOLOGY_WATCH_POLL_INTERVAL_S", cast=float, default=5.0))
+
     # Instantiate authentication client for browser based www/ routes
     auth = AuthenticationClient(config.get("AUTH_API_URL"))
+    outbound_http.use_shared_session(auth, config.get("AUTH_API_URL"))
 
     # Store state in app
     app.state.iam_endpoints = iam_endpoints
@@ -82,9 +137,41 @@ async def lifespan(app: FastAPI):
     app.state.api_iam_client = api_iam_client
     app.state.backend = backend
     app.state.auth = auth
+    app.state.outbound_calls = outbound_calls
+
+    # Load and dereference the schemas once, reloading them if their files change (responses derived from them, e.g.
+    # service types, are then dropped from the response cache)
+    schema_registry = SchemaRegistry(config.get("SCHEMAS_RELPATH"))
+    if getattr(app.state, "response_cache", None) is not None:
+        schema_registry.add_reload_listener(app.state.response_cache.clear)
+    if config.get("SCHEMAS_RELOAD", cast=bool, default=True):
+        schema_registry.start_watching(check_interval_s=config.get("SCHEMAS_RELOAD_CHECK_INTERVAL_S", cast=float, default=5.0))
+    app.state.schema_registry = schema_registry
+
+    # Probe dependent services concurrently in the background, so that /health serves their last known state
+    health_monitor = HealthMonitor(
+        {
+            "permissions-api": http_ping_probe(outbound_calls, "permissions-api", permissions.ping),
+            "auth-api": http_ping_probe(outbound_calls, "auth-api", auth.ping),
+            "mongodb": mongodb_probe(backend),
+        },
+        interval_s=config.get("HEALTH_CHECK_INTERVAL_S", cast=float, default=10.0),
+        timeout_s=config.get("HEALTH_CHECK_TIMEOUT_S", cast=float, default=5.0),
+        # reported, but a MongoDB outage does not fail the liveness check (restarting the service would not help)
+        report_only=("mongodb",),
+    )
+    health_monitor.start()
+    app.state.health_monitor = health_monitor
 
     yield
 
+    # Release the backend's pooled resources
+    await health_monitor.stop()
+    schema_registry.stop_watching()
+    backend.close()
+    outbound_calls.close()
+    outbound_http.close_sessions()
+
 
 # Instantiate FastAPI app
 app = FastAPI(
@@ -100,6 +187,11 @@ app.state.permissions_service_name = config.get("PERMISSIONS_SERVICE_NAME")
 app.state.permissions_service_version = config.get("PERMISSIONS_SERVICE_VERSION")
 app.state.common_dependencies = dependencies.Common()
 app.state.service_start_time = time.time()
+app.state.batch_get_max_ids = config.get("BATCH_GET_MAX_IDS", cast=int, default=100)
+
+# Cache encoded topology read responses, also to answer conditional requests (requires TOPOLOGY_WATCH)
+if config.get("RESPONSE_CACHE", cast=bool, default=True):
+    app.state.response_cache = ResponseCache(max_bytes=config.get("RESPONSE_CACHE_MAX_BYTES", cast=int, default=64 * 1024 * 1024))
 
 # Add CORS middleware. Static mounts must be added later after the versionize() call.
 #
@@ -108,6 +200,7 @@ CORSMiddleware_params = {
     "allow_credentials": True,
     "allow_methods": ["*"],
     "allow_headers": ["*"],
+    "expose_headers": [NEXT_CURSOR_HEADER, "ETag"],
 }
 app.add_middleware(CORSMiddleware, **CORSMiddleware_params)
 app.add_middleware(
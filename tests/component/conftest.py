@@ -24,6 +24,11 @@ else:
 
 DISABLE_AUTHENTICATION = os.getenv("DISABLE_AUTHENTICATION") == "yes"
 
+# Read responses are tagged with ETags while the service caches them and follows topology changes (falling back to
+# polling without change streams), which it does unless configured not to. The service and the component tests share
+# their environment.
+RESPONSES_TAGGED = all(os.getenv(name, "true").lower() not in ("false", "0") for name in ("RESPONSE_CACHE", "TOPOLOGY_WATCH"))
+
 
 def get_api_url() -> str:
     """Get the base API URL for component tests."""
@@ -54,5 +54,4 @@ def test_get_schema_not_found():
     api_url = get_api_url()
     response = httpx.get(f"{api_url}/schemas/nonexistent_schema")  # noqa: E231
     # Schema endpoint doesn't require authentication
-    # API returns 500 (Internal Server Error) when schema file not found
-    assert response.status_code == 500
+    assert response.status_code == 404
@@ -7,7 +7,7 @@ import os
 import httpx
 import pytest
 
-from tests.component.conftest import get_api_url, send_get_request
+from tests.component.conftest import RESPONSES_TAGGED, get_api_url, send_get_request
 
 KUBE_NAMESPACE = os.getenv("KUBE_NAMESPACE")
 CLUSTER_DOMAIN = os.getenv("CLUSTER_DOMAIN")
@@ -90,6 +90,43 @@ def test_list_sites_include_inactive(load_nodes_data):
         assert response.status_code == 401
 
 
+@pytest.mark.component
+def test_list_sites_conditional_get(load_nodes_data):
+    """Test that an unchanged site listing is revalidated with its ETag"""
+    api_url = get_api_url()
+    response = httpx.get(f"{api_url}/sites")  # noqa: E231
+    if os.getenv("DISABLE_AUTHENTICATION") == "yes":
+        assert response.status_code == 200
+        etag = response.headers.get("etag")
+        if not RESPONSES_TAGGED:
+            assert etag is None
+            return
+        assert etag
+        revalidate_response = httpx.get(f"{api_url}/sites", headers={"If-None-Match": etag})  # noqa: E231
+        assert revalidate_response.status_code == 304
+        assert revalidate_response.headers.get("etag") == etag
+        assert not revalidate_response.content
+    else:
+        assert response.status_code == 401
+
+
+@pytest.mark.component
+def test_list_sites_cached_response_is_compressed(load_nodes_data):
+    """Test that a cached site listing is served compressed to clients accepting gzip"""
+    api_url = get_api_url()
+    response = httpx.get(f"{api_url}/sites", headers={"Accept-Encoding": "gzip"})  # noqa: E231
+    if os.getenv("DISABLE_AUTHENTICATION") == "yes":
+        assert response.status_code == 200
+        assert bool(response.headers.get("etag")) == RESPONSES_TAGGED
+        # small bodies are not compressed
+        if RESPONSES_TAGGED and len(response.content) >= 1024:
+            cached_response = httpx.get(f"{api_url}/sites", headers={"Accept-Encoding": "gzip"})  # noqa: E231
+            assert cached_response.headers.get("content-encoding") == "gzip"
+            assert cached_response.json() == response.json()
+    else:
+        assert response.status_code == 401
+
+
 @pytest.mark.component
 def test_get_site_by_id(load_nodes_data):
     """Test to get a site by ID"""
@@ -192,6 +192,25 @@ def test_get_storage_area_not_found():
         assert response.status_code in (401, 404)
 
 
+@pytest.mark.component
+def test_get_storage_areas_by_ids(load_nodes_data):
+    """Test to get several storage areas by ID in one request"""
+    api_url = get_api_url()
+    storage_areas_response = send_get_request(f"{api_url}/storage-areas")
+    if storage_areas_response.status_code == 200:
+        storage_area_ids = [storage_area["id"] for storage_area in storage_areas_response.json()[:2]]
+        fake_id = "00000000-0000-0000-0000-000000000000"
+        response = httpx.get(f"{api_url}/storage-areas/batch", params={"ids": ",".join(storage_area_ids + [fake_id])})  # noqa: E231
+        if os.getenv("DISABLE_AUTHENTICATION") == "yes":
+            assert response.status_code == 200
+            data = response.json()
+            assert sorted(data["found"]) == sorted(storage_area_ids)
+            assert all(data["found"][storage_area_id]["id"] == storage_area_id for storage_area_id in storage_area_ids)
+            assert data["not_found"] == [fake_id]
+        else:
+            assert response.status_code == 401
+
+
 @pytest.mark.component
 def test_enable_storage_area(load_nodes_data):
     """Test to enable a storage area and verify state change"""
@@ -0,0 +1,45 @@
+"""
+Configuration and fixtures for unit tests.
+"""
+
+import json
+from pathlib import Path
+
+import mongomock
+import pytest
+
+from ska_src_site_capabilities_api.backend.mongo import MongoBackend
+
+
+@pytest.fixture(scope="module")
+def dummy_nodes():
+    """Fixture to return nodes json."""
+    with Path("tests/assets/unit/nodes.json").open("r") as nodes_file:
+        return json.load(nodes_file)
+
+
+@pytest.fixture(scope="module")
+def dummy_nodes_archived():
+    """Fixture to return nodes_archived json."""
+    with Path("tests/assets/unit/nodes.json").open("r") as nodes_file:
+        return json.load(nodes_file)
+
+
+@pytest.fixture(scope="function")
+def mock_backend(mock_client, mock_db, dummy_nodes, dummy_nodes_archived):
+    """Fixture that returns a mocked backend with prepopulated data."""
+    if mock_db["nodes"].count_documents({}) == 0:
+        mock_db["nodes"].insert_many(dummy_nodes)
+    if mock_db["nodes_archived"].count_documents({}) == 0:
+        mock_db["nodes_archived"].insert_many(dummy_nodes_archived)
+    return MongoBackend(client=mock_client, mongo_database="test")
+
+
+@pytest.fixture(scope="module")
+def mock_client():
+    return mongomock.MongoClient()
+
+
+@pytest.fixture(scope="module")
+def mock_db(mock_client):
+    return mock_client["test"]
@@ -1,44 +1,69 @@
+import asyncio
+import copy
+import gzip
 import json
-from pathlib import Path
+import time
+from datetime import datetime
+from types import SimpleNamespace
 
+import bson
 import mongomock
 import pytest
+from bson import Timestamp
+from pymongo import monitoring
+from pymongo.errors import OperationFailure, WriteConcernError
 
+from ska_src_site_capabilities_api.backend import changes, history
+from ska_src_site_capabilities_api.backend.async_mongo import AsyncMongoBackend
 from ska_src_site_capabilities_api.backend.mongo import MongoBackend
+from ska_src_site_capabilities_api.backend.watcher import TopologyWatcher, cluster_time_to_revision
+from ska_src_site_capabilities_api.common import downtime, json_encoding, projection
+from ska_src_site_capabilities_api.common.active_view import ActiveView
+from ska_src_site_capabilities_api.common.exceptions import InvalidCursor, NodeAlreadyExists, NodeVersionConflict, TooManyIdentifiers
+from ska_src_site_capabilities_api.common.utility import iter_ndjson, split_ids
 
 
-@pytest.fixture(scope="module")
-def dummy_nodes():
-    """Fixture to return nodes json."""
-    with Path("tests/assets/unit/nodes.json").open("r") as nodes_file:
-        return json.load(nodes_file)
-
-
-@pytest.fixture(scope="module")
-def dummy_nodes_archived():
-    """Fixture to return nodes_archived json."""
-    with Path("tests/assets/unit/nodes.json").open("r") as nodes_file:
-        return json.load(nodes_file)
-
-
-@pytest.fixture(scope="function")
-def mock_backend(mock_client, mock_db, dummy_nodes, dummy_nodes_archived):
-    """Fixture that returns a mocked backend with prepopulated data."""
-    if mock_db["nodes"].count_documents({}) == 0:
-        mock_db["nodes"].insert_many(dummy_nodes)
-    if mock_db["nodes_archived"].count_documents({}) == 0:
-        mock_db["nodes_archived"].insert_many(dummy_nodes_archived)
-    return MongoBackend(client=mock_client, mongo_database="test")
-
-
-@pytest.fixture(scope="module")
-def mock_client():
-    return mongomock.MongoClient()
+@pytest.mark.unit
+def test_pooled_client_is_reused_per_process(monkeypatch):
+    backend = MongoBackend(
+        mongo_database="test",
+        mongo_username="user",
+        mongo_password="password",
+        mongo_host="localhost",
+        mongo_port=27017,
+        mongo_max_pool_size=5,
+        mongo_write_concern_w="1",
+    )
+    client = backend._get_mongo_client()
+    assert backend._get_mongo_client() is client
+    assert client.options.pool_options.max_pool_size == 5
+    assert client.write_concern.document == {"w": 1}
+
+    # a forked process must get its own client
+    monkeypatch.setattr("ska_src_site_capabilities_api.backend.mongo.os.getpid", lambda: -1)
+    forked_client = backend._get_mongo_client()
+    assert forked_client is not client
+    backend.close()
+    client.close()
 
 
-@pytest.fixture(scope="module")
-def mock_db(mock_client):
-    return mock_client["test"]
+@pytest.mark.unit
+def test_pool_statistics():
+    backend = MongoBackend(mongo_database="test", mongo_username="user", mongo_password="password", mongo_host="localhost", mongo_port=27017)
+    listener = backend.pool_statistics
+    listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(("localhost", 27017), 1, 0.5))
+    listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(("localhost", 27017), 2, 1.5))
+    listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(("localhost", 27017), 1))
+    listener.connection_check_out_failed(
+        monitoring.ConnectionCheckOutFailedEvent(("localhost", 27017), monitoring.ConnectionCheckOutFailedReason.TIMEOUT, 2.0)
+    )
+    statistics = backend.get_pool_statistics()
+    assert statistics["max_pool_size"] == 100
+    assert statistics["checked_out_connections"] == 1
+    assert statistics["total_checkouts"] == 2
+    assert statistics["mean_checkout_wait_s"] == 1.0
+    assert statistics["max_checkout_wait_s"] == 1.5
+    assert statistics["pool_exhausted_events"] == 1
 
 
 @pytest.mark.unit
@@ -51,6 +76,36 @@ def test_add_edit_node(mock_db, mock_backend):
     assert mock_db["nodes_archived"].count_documents({}) == count_nodes_archived + 1
 
 
+@pytest.mark.unit
+def test_add_edit_node_lost_race(dummy_nodes, monkeypatch):
+    client = mongomock.MongoClient()
+    backend = MongoBackend(client=client, mongo_database="test")
+    backend.ensure_indexes()
+    client["test"]["nodes"].insert_many(copy.deepcopy(dummy_nodes))
+
+    # both edits read version N, then the first one wins the race
+    stale_node = backend.get_node("TEST", "latest")
+    backend.add_edit_node(copy.deepcopy(stale_node), node_name="TEST")
+    revision = backend.get_topology_revision()
+
+    monkeypatch.setattr(backend, "get_node", lambda node_name, node_version="latest": copy.deepcopy(stale_node))
+    with pytest.raises(NodeVersionConflict):
+        backend.add_edit_node(copy.deepcopy(stale_node), node_name="TEST")
+
+    # adding a node that was added concurrently is a conflict too
+    monkeypatch.setattr(backend, "get_node", lambda node_name, node_version="latest": None)
+    with pytest.raises(NodeAlreadyExists):
+        backend.add_edit_node(copy.deepcopy(stale_node))
+    monkeypatch.undo()
+
+    # the losing edits neither archived the version they read (again) nor replaced the winner's version
+    archived_versions = [node["version"] for node in client["test"]["nodes_archived"].find({"name": "TEST"})]
+    assert archived_versions == [stale_node["version"]]
+    assert backend.get_node("TEST", "latest")["version"] == stale_node["version"] + 1
+    assert backend.get_node("TEST", stale_node["version"]) == stale_node
+    assert backend.get_topology_revision() == revision
+
+
 @pytest.mark.unit
 def test_delete_all_nodes(mock_db, mock_backend):
     mock_backend.delete_all_nodes()
@@ -78,6 +133,31 @@ def test_get_compute(id, expected_exists, mock_backend):
         assert not result
 
 
+@pytest.mark.unit
+def test_get_by_id_is_served_from_snapshot(mock_client, dummy_nodes):
+    db = mock_client["test_snapshot"]
+    db["nodes"].insert_many(copy.deepcopy(dummy_nodes))
+    backend = MongoBackend(client=mock_client, mongo_database="test_snapshot", snapshot_max_age_s=None)
+    assert backend.get_site(site_id="8b008348-0d8d-4505-a625-1e6e8df56e8a").get("name") == "TEST_A"
+    assert backend._snapshot.get_parent_chain("storage_area", "f62199c3-62ad-44ee-a6e0-dd34e891d423") == (
+        ("node", "TEST"),
+        ("site", "8b008348-0d8d-4505-a625-1e6e8df56e8a"),
+        ("storage", "180f2f39-4548-4f11-80b1-7471564e5c05"),
+    )
+
+    # changes made outside of the backend are not seen until the snapshot is reloaded...
+    db["nodes"].delete_many({})
+    assert backend.get_site(site_id="8b008348-0d8d-4505-a625-1e6e8df56e8a")
+
+    # ...but writes through the backend patch it
+    node = copy.deepcopy(dummy_nodes[0])
+    node["sites"][0]["name"] = "TEST_A_RENAMED"
+    backend.add_edit_node(node, node_name="TEST")
+    assert backend.get_site(site_id="8b008348-0d8d-4505-a625-1e6e8df56e8a").get("name") == "TEST_A_RENAMED"
+    backend.delete_node_by_name(node_name="TEST")
+    assert not backend.get_site(site_id="8b008348-0d8d-4505-a625-1e6e8df56e8a")
+
+
 @pytest.mark.unit
 @pytest.mark.parametrize("name,expected_exists", [("TEST", True), ("A", False)])
 def test_get_node(name, expected_exists, mock_backend):
@@ -159,6 +239,36 @@ def test_get_storage_area(id, expected_exists, mock_backend):
         assert not result
 
 
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "method, get_method, list_method",
+    [
+        ("get_compute_many", "get_compute", "list_compute"),
+        ("get_service_many", "get_service", "list_services"),
+        ("get_storage_many", "get_storage", "list_storages"),
+        ("get_storage_area_many", "get_storage_area", "list_storage_areas"),
+        ("get_queue_many", "get_queue_by_id", "list_queues"),
+    ],
+)
+def test_get_many(method, get_method, list_method, mock_backend):
+    ids = [entity.get("id") for entity in getattr(mock_backend, list_method)(include_inactive=True)][:2]
+    assert ids
+
+    result = getattr(mock_backend, method)(ids + ["missing", ids[0]])
+    assert result["found"] == {entity_id: getattr(mock_backend, get_method)(entity_id) for entity_id in ids}
+    assert result["not_found"] == ["missing"]
+    async_backend = AsyncMongoBackend(backend=mock_backend, max_workers=2)
+    assert asyncio.run(getattr(async_backend, method)(ids)) == {"found": result["found"], "not_found": []}
+
+
+@pytest.mark.unit
+def test_split_ids():
+    assert split_ids(" a,b,,a , c") == ["a", "b", "c"]
+    assert split_ids(None) == []
+    with pytest.raises(TooManyIdentifiers):
+        split_ids("a,b,c", max_ids=2)
+
+
 @pytest.mark.unit
 def test_list_compute_with_node_name_filter(mock_backend):
     compute = mock_backend.list_compute(node_names="TEST")
@@ -211,6 +321,18 @@ def test_list_sites(mock_backend):
     assert len(sites) == 2
 
 
+@pytest.mark.unit
+@pytest.mark.parametrize("method", ["list_compute", "list_queues", "list_services", "list_storages", "list_storage_areas"])
+@pytest.mark.parametrize("site_names,include_inactive", [(None, False), (None, True), ("TEST_A", False), ("TEST_B", True)])
+def test_list_aggregation_matches_fallback(method, site_names, include_inactive, mock_client, mock_backend):
+    aggregation_backend = MongoBackend(client=mock_client, mongo_database="test", use_active_view=False)
+    fallback_backend = MongoBackend(client=mock_client, mongo_database="test", use_aggregation=False, use_active_view=False)
+    kwargs = {"node_names": "TEST", "site_names": site_names, "include_inactive": include_inactive}
+    expected = getattr(fallback_backend, method)(**kwargs)
+    assert getattr(aggregation_backend, method)(**kwargs) == expected
+    assert getattr(mock_backend, method)(**kwargs) == expected
+
+
 @pytest.mark.unit
 def test_list_storages_with_node_name_filter(mock_backend):
     storages = mock_backend.list_storages(node_names="TEST")
@@ -296,3 +418,549 @@ def test_set_storage_area_enabled_disabled(is_force_disabled_flag, mock_backend,
     assert result.get("is_force_disabled") is is_force_disabled_flag
     # test document update
     assert mock_backend.get_storage_area(storage_area_id=id).get("is_force_disabled") is is_force_disabled_flag
+
+
+@pytest.mark.unit
+def test_ensure_indexes(mock_client, dummy_nodes):
+    db = mock_client["test_indexes"]
+    db["nodes"].insert_many(copy.deepcopy(dummy_nodes))
+    backend = MongoBackend(client=mock_client, mongo_database="test_indexes")
+    report = backend.get_index_report()
+    assert {index["name"] for index in report["missing"]} >= {"name_version", "name_unique", "site_id", "storage_area_id"}
+
+    result = backend.ensure_indexes()
+    assert "nodes.name_unique" in result["created"]
+    assert "nodes_archived.name_version" in result["created"]
+    assert not result["failed"]
+    assert not backend.get_index_report()["missing"]
+    assert not backend.ensure_indexes()["created"]
+
+    # editing a node must keep a single document per name in nodes
+    version = backend.get_node("TEST", "latest").get("version")
+    backend.add_edit_node(backend.get_node("TEST", "latest"), node_name="TEST")
+    assert db["nodes"].count_documents({"name": "TEST"}) == 1
+    assert backend.get_node("TEST", "latest").get("version") == version + 1
+    assert backend.get_node("TEST", version).get("version") == version
+
+
+@pytest.mark.unit
+def test_set_entity_field_update():
+    query, update, array_filters, projection = changes.build_set_entity_field_update("storage_area", "sa", "is_force_disabled", True)
+    assert query == {"sites.storages.areas.id": "sa"}
+    assert update == {"$set": {"sites.$[l0].storages.$[l1].areas.$[l2].is_force_disabled": True}, "$inc": {"version": 1}}
+    assert array_filters == [{"l0.storages.areas.id": "sa"}, {"l1.areas.id": "sa"}, {"l2.id": "sa"}]
+    assert projection["sites.storages.areas.is_force_disabled"] == 1
+
+    _, update, array_filters, _ = changes.build_set_entity_field_update("service", "svc", "is_force_disabled", False, scope="global")
+    assert update["$set"] == {"sites.$[l0].compute.$[l1].associated_global_services.$[l2].is_force_disabled": False}
+
+
+def apply_filtered_positional_update(document, update, array_filters):
+    """Applies an update with filtered positional operators ($[identifier]) to a document, as MongoDB would."""
+    filters = {}
+    for array_filter in array_filters:
+        ((key, expected),) = array_filter.items()
+        identifier, _, path = key.partition(".")
+        filters[identifier] = (path.split("."), expected)
+
+    def values_at(element, path):
+        if isinstance(element, list):
+            return [value for item in element for value in values_at(item, path)]
+        if not path:
+            return [element]
+        return values_at(element.get(path[0]), path[1:]) if isinstance(element, dict) else []
+
+    def set_at(element, path, value):
+        if len(path) == 1:
+            element[path[0]] = value
+        elif path[1].startswith("$["):
+            filter_path, expected = filters[path[1][2:-1]]
+            for item in element.get(path[0]) or []:
+                if expected in values_at(item, filter_path):
+                    set_at(item, path[2:], value)
+        else:
+            set_at(element.setdefault(path[0], {}), path[1:], value)
+
+    for path, value in update.get("$set", {}).items():
+        set_at(document, path.split("."), value)
+    for field, increment in update.get("$inc", {}).items():
+        document[field] = document.get(field, 0) + increment
+
+
+@pytest.mark.unit
+def test_set_entity_field_targeted(dummy_nodes, monkeypatch):
+    client = mongomock.MongoClient()
+    client["test"]["nodes"].insert_many(copy.deepcopy(dummy_nodes))
+    backend = MongoBackend(client=client, mongo_database="test")
+    db = client["test"]
+    storage_area_id = "f62199c3-62ad-44ee-a6e0-dd34e891d423"
+    original = backend.get_node("TEST", "latest")
+    backend.get_storage_area(storage_area_id)  # load the snapshot
+    lost_races, updates = [0], []
+
+    def update_one(collection, query, update, array_filters=None, **kwargs):
+        updates.append(query)
+        if lost_races[0]:
+            lost_races[0] -= 1
+            return SimpleNamespace(matched_count=0)
+        document = collection.find_one(query)
+        if document is None:
+            return SimpleNamespace(matched_count=0)
+        apply_filtered_positional_update(document, update, array_filters)
+        collection.replace_one({"_id": document["_id"]}, document)
+        return SimpleNamespace(matched_count=1)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "update_one", update_one)
+
+    # a lost race is retried, deleting the change record of the update not applied
+    lost_races[0] = 1
+    assert backend.set_storage_area_force_disabled_flag(storage_area_id, True)
+    assert len(updates) == 2 and updates[-1]["version"] == original["version"]
+    latest = db["nodes"].find_one({"name": "TEST"})
+    assert latest["version"] == original["version"] + 1
+    assert changes.iter_entities(latest, "storage_area", storage_area_id).__next__()["is_force_disabled"] is True
+    change_records = list(db["nodes_changes"].find({}, {"_id": 0}))
+    assert [(record["version"], record["entity_id"], record["value"]) for record in change_records] == [
+        (original["version"] + 1, storage_area_id, True)
+    ]
+    assert change_records[0]["last_updated_at"] == latest["last_updated_at"]
+    assert db["nodes_archived"].count_documents({}) == 0
+    assert backend.get_storage_area(storage_area_id)["is_force_disabled"] is True  # snapshot patched
+    assert backend.get_node("TEST", original["version"]) == original
+
+    # an orphaned change record (written before an update that was never applied) is ignored, then deleted
+    orphan = changes.make_change_record(latest, "site", "8b008348-0d8d-4505-a625-1e6e8df56e8a", "is_force_disabled", True)
+    db["nodes_changes"].insert_one(dict(orphan, last_updated_at="2000-01-01T00:00:00.000000"))
+    assert backend.set_storage_area_force_disabled_flag(storage_area_id, False)
+    assert db["nodes_changes"].count_documents({"version": original["version"] + 2}) == 1
+    assert backend.get_node("TEST", original["version"] + 1)["version"] == original["version"] + 1
+    assert backend.get_node("TEST", original["version"]) == original
+
+    # concurrent modifications are retried a bounded number of times, without leaving change records behind
+    lost_races[0] = MongoBackend.SET_ENTITY_FIELD_ATTEMPTS
+    count_change_records = db["nodes_changes"].count_documents({})
+    with pytest.raises(RuntimeError):
+        backend.set_storage_area_force_disabled_flag(storage_area_id, True)
+    assert db["nodes_changes"].count_documents({}) == count_change_records
+
+    # a write concern error (raised once the update is applied) is not taken for unsupported array filters
+    def update_one_unacknowledged(collection, query, update, array_filters=None, **kwargs):
+        update_one(collection, query, update, array_filters=array_filters)
+        raise WriteConcernError("waiting for replication timed out", code=64)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "update_one", update_one_unacknowledged)
+    version = db["nodes"].find_one({"name": "TEST"})["version"]
+    with pytest.raises(WriteConcernError):
+        backend.set_storage_area_force_disabled_flag(storage_area_id, True)
+    assert db["nodes"].find_one({"name": "TEST"})["version"] == version + 1
+    assert db["nodes_changes"].count_documents({"version": version + 1}) == 1
+
+    # unsupported array filters fall back to rewriting the node
+    def update_one_unsupported(collection, query, update, array_filters=None, **kwargs):
+        raise OperationFailure("The featureCompatibilityVersion must be 3.6 to use arrayFilters", code=72)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "update_one", update_one_unsupported)
+    assert backend.set_storage_area_force_disabled_flag(storage_area_id, False)
+    assert db["nodes"].find_one({"name": "TEST"})["version"] == version + 2
+    assert db["nodes_changes"].count_documents({"version": version + 2}) == 0
+    assert db["nodes_archived"].count_documents({"version": version + 1}) == 1
+    assert not changes.is_array_filters_unsupported(OperationFailure("E11000 duplicate key error", code=11000))
+
+
+@pytest.mark.unit
+def test_get_node_reconstructed_from_change_records(mock_client, dummy_nodes):
+    db = mock_client["test_changes"]
+    db["nodes"].insert_many(copy.deepcopy(dummy_nodes))
+    backend = MongoBackend(client=mock_client, mongo_database="test_changes")
+    original = backend.get_node("TEST", "latest")
+
+    # emulate two targeted flag updates as made on a server supporting filtered positional updates
+    node = copy.deepcopy(original)
+    for entity_type, entity_id in [("site", "8b008348-0d8d-4505-a625-1e6e8df56e8a"), ("storage", "180f2f39-4548-4f11-80b1-7471564e5c05")]:
+        change_record = changes.make_change_record(node, entity_type, entity_id, "is_force_disabled", True)
+        changes.apply_change_record(node, change_record)
+        db["nodes_changes"].insert_one(change_record)
+    db["nodes"].replace_one({"name": "TEST"}, node)
+
+    assert backend.get_node("TEST", original.get("version")) == original
+    assert backend.get_node("TEST", original.get("version") + 1).get("version") == original.get("version") + 1
+    assert len(backend.list_nodes(include_archived=True)) == 3
+
+
+@pytest.mark.unit
+def test_async_backend(mock_backend):
+    async_backend = AsyncMongoBackend(backend=mock_backend, max_workers=4)
+
+    async def run():
+        sites, node, storage_areas = await asyncio.gather(
+            async_backend.list_sites(),
+            async_backend.get_node("TEST"),
+            async_backend.list_storage_areas(node_names="TEST", include_inactive=True),
+        )
+        assert sites == mock_backend.list_sites()
+        assert node.get("name") == "TEST"
+        assert storage_areas == mock_backend.list_storage_areas(node_names="TEST", include_inactive=True)
+        assert await async_backend.set_site_force_disabled_flag("8b008348-0d8d-4505-a625-1e6e8df56e8a", False) == {
+            "site_id": "8b008348-0d8d-4505-a625-1e6e8df56e8a",
+            "is_force_disabled": False,
+        }
+
+    asyncio.run(run())
+    async_backend.close()
+
+
+@pytest.mark.unit
+def test_async_backend_does_not_block_event_loop(mock_backend, monkeypatch):
+    monkeypatch.setattr(mock_backend, "list_sites", lambda **kwargs: time.sleep(0.2) or [])
+    async_backend = AsyncMongoBackend(backend=mock_backend, max_workers=4)
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        await async_backend.list_sites()
+        ticker.cancel()
+        return ticks
+
+    assert asyncio.run(run()) > 5
+    async_backend.close()
+
+
+@pytest.mark.unit
+def test_downtime_windows_are_normalised_on_write(mock_client, dummy_nodes):
+    db = mock_client["test_downtime"]
+    backend = MongoBackend(client=mock_client, mongo_database="test_downtime")
+    node = copy.deepcopy(dummy_nodes[0])
+    site = node["sites"][0]
+    site["downtime"] = [{"type": "Planned", "date_range": "2000-01-01T00:00:00.000Z to 2300-01-01T00:00:00.000Z"}]
+    backend.add_edit_node(node)
+
+    windows = db["nodes"].find_one({"name": "TEST"}).get(downtime.DOWNTIME_WINDOWS_FIELD)
+    assert {"entity_id": site["id"], "start": datetime(2000, 1, 1), "end": datetime(2300, 1, 1)} in windows
+    assert downtime.DOWNTIME_WINDOWS_FIELD not in backend.get_node("TEST")
+    assert downtime.DOWNTIME_WINDOWS_FIELD not in backend.list_nodes()[0]
+
+    assert site["id"] in backend._get_ids_in_downtime(db)
+    assert site["name"] not in [s.get("name") for s in backend.list_sites()]
+    assert site["name"] in [s.get("name") for s in backend.list_sites(include_inactive=True)]
+    assert not backend.list_storages(site_names=site["name"])
+    fallback_backend = MongoBackend(client=mock_client, mongo_database="test_downtime", use_aggregation=False)
+    assert backend.list_services() == fallback_backend.list_services()
+
+
+@pytest.mark.unit
+def test_downtime_windows_are_backfilled(mock_client, dummy_nodes):
+    db = mock_client["test_downtime_backfill"]
+    db["nodes"].insert_many(copy.deepcopy(dummy_nodes))
+    backend = MongoBackend(client=mock_client, mongo_database="test_downtime_backfill")
+    assert backend._get_ids_in_downtime(db) == {"d4e5f678-9abc-4def-ef01-4567890123de"}
+    assert db["nodes"].count_documents({downtime.DOWNTIME_WINDOWS_FIELD: {"$exists": False}}) == 0
+
+
+@pytest.mark.unit
+def test_active_view_is_recomputed_at_downtime_boundaries(dummy_nodes):
+    node = copy.deepcopy(dummy_nodes[0])
+    site = node["sites"][0]
+    site["downtime"] = [{"date_range": "2030-01-01T00:00:00.000Z to 2030-01-02T00:00:00.000Z"}]
+    nodes = {node["name"]: node}
+    active_view = ActiveView()
+
+    def active_site_ids(now):
+        return [s.get("id") for n in active_view.get_active_nodes(nodes, now=now) for s in n.get("sites", [])]
+
+    assert site["id"] in active_site_ids(datetime(2029, 12, 31))
+    assert active_view.valid_until == datetime(2030, 1, 1)
+    cached = active_view.get_active_nodes(nodes, now=datetime(2029, 12, 31, 12))
+    assert cached[0] is active_view.get_active_nodes(nodes, now=datetime(2029, 12, 31, 18))[0]
+
+    assert site["id"] not in active_site_ids(datetime(2030, 1, 1, 12))
+    assert active_view.valid_until == datetime(2030, 1, 2)
+    assert site["id"] in active_site_ids(datetime(2030, 1, 3))
+    assert active_view.valid_until == datetime(2300, 12, 2)  # end of a downtime in the fixture
+
+    # a replaced node is recomputed
+    disabled_node = copy.deepcopy(node)
+    disabled_node["sites"][0]["is_force_disabled"] = True
+    nodes[node["name"]] = disabled_node
+    assert site["id"] not in active_site_ids(datetime(2030, 1, 3))
+
+
+@pytest.mark.unit
+def test_watcher_patches_snapshot_from_change_events(mock_client, dummy_nodes):
+    db = mock_client["test_watch_events"]
+    db["nodes"].insert_many(copy.deepcopy(dummy_nodes))
+    backend = MongoBackend(client=mock_client, mongo_database="test_watch_events")
+    site_id = "8b008348-0d8d-4505-a625-1e6e8df56e8a"
+    assert not backend.get_site(site_id).get("is_force_disabled")
+    watcher = TopologyWatcher(lambda: db, backend.topology_revision, backend._on_node_changed, backend._snapshot.invalidate)
+
+    # a node updated by another process is patched into the snapshot, including a rename
+    node = db["nodes"].find_one({"name": "TEST"})
+    node["name"] = "TEST_RENAMED"
+    node["sites"][0]["is_force_disabled"] = True
+    cluster_time = Timestamp(2000000000, 1)
+    watcher.handle_change({"ns": {"coll": "nodes"}, "operationType": "replace", "fullDocument": node, "clusterTime": cluster_time})
+    assert backend._snapshot.is_loaded
+    assert backend.get_site(site_id).get("is_force_disabled") is True
+    assert backend.get_site(site_id).get("parent_node_name") == "TEST_RENAMED"
+    assert "TEST" not in backend._snapshot.nodes
+    assert backend.get_topology_revision() == cluster_time_to_revision(cluster_time)
+
+    # deletions cannot be patched, so the snapshot is reloaded
+    watcher.handle_change({"ns": {"coll": "nodes"}, "operationType": "delete", "clusterTime": Timestamp(2000000000, 2)})
+    assert not backend._snapshot.is_loaded
+    assert backend.get_topology_revision() == cluster_time_to_revision(Timestamp(2000000000, 2))
+
+
+@pytest.mark.unit
+def test_watcher_falls_back_to_polling(mock_client, dummy_nodes, monkeypatch):
+    def watch(*args, **kwargs):
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+    monkeypatch.setattr(mongomock.database.Database, "watch", watch, raising=False)
+    db = mock_client["test_watch_polling"]
+    db["nodes"].insert_many(copy.deepcopy(dummy_nodes))
+    backend = MongoBackend(client=mock_client, mongo_database="test_watch_polling")
+    site_id = "8b008348-0d8d-4505-a625-1e6e8df56e8a"
+    assert not backend.get_site(site_id).get("is_force_disabled")
+
+    backend.start_watching(poll_interval_s=0.01)
+    try:
+        deadline = time.monotonic() + 5
+        while backend._watcher.mode != "polling" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert backend._watcher.mode == "polling"
+        revision = backend.get_topology_revision()
+
+        # emulate an edit made by another worker
+        db["nodes"].update_one({"name": "TEST"}, {"$set": {"sites.0.is_force_disabled": True}, "$inc": {"version": 1}})
+        while backend.get_topology_revision() == revision and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert backend.get_topology_revision() > revision
+        assert backend.get_site(site_id).get("is_force_disabled") is True
+    finally:
+        backend.close()
+    assert not backend._watcher.is_running
+
+
+@pytest.mark.unit
+def test_archived_versions_are_delta_encoded(mock_client, dummy_nodes):
+    db = mock_client["test_history"]
+    backend = MongoBackend(client=mock_client, mongo_database="test_history", archive_checkpoint_interval=3)
+    node = copy.deepcopy(dummy_nodes[0])
+    node.pop("version", None)
+    backend.add_edit_node(copy.deepcopy(node))
+    versions = {1: backend.get_node("TEST")}
+    for version in range(2, 8):
+        node["comments"] = "edit {}".format(version)
+        node["sites"][0]["is_force_disabled"] = version % 2 == 0
+        backend.add_edit_node(copy.deepcopy(node), node_name="TEST")
+        versions[version] = backend.get_node("TEST")
+
+    archived = list(db["nodes_archived"].find({}, {"_id": 0}).sort("version", 1))
+    assert [history.is_checkpoint(archived_node) for archived_node in archived] == [True, False, False, True, False, False]
+    assert len(bson.encode(archived[1])) < len(bson.encode(archived[0])) / 10
+    for version, expected in versions.items():
+        assert backend.get_node("TEST", version) == expected
+    assert sorted(n.get("version") for n in backend.list_nodes(include_archived=True)) == list(range(1, 8))
+
+    # archives written in full are migrated by compaction without changing any version
+    db["nodes_archived"].delete_many({})
+    db["nodes_archived"].insert_many([copy.deepcopy(versions[version]) for version in range(1, 7)])
+    report = backend.compact_archived_nodes()
+    assert (report.get("checkpoints"), report.get("deltas"), report.get("rewritten")) == (2, 4, 4)
+    assert report.get("size_after") < report.get("size_before") / 2
+    assert list(db["nodes_archived"].find({}, {"_id": 0}).sort("version", 1)) == archived
+    for version, expected in versions.items():
+        assert backend.get_node("TEST", version) == expected
+
+
+@pytest.mark.unit
+def test_list_as_of(mock_client, dummy_nodes, monkeypatch):
+    backend = MongoBackend(client=mock_client, mongo_database="test_as_of", archive_checkpoint_interval=3)
+    node = copy.deepcopy(dummy_nodes[0])
+    node.pop("version", None)
+    site_id = node["sites"][0]["id"]
+
+    node["last_updated_at"] = "2020-01-01T00:00:00"
+    backend.add_edit_node(copy.deepcopy(node))
+    node["last_updated_at"] = "2020-01-02T00:00:00"
+    node["sites"][0]["name"] = "RENAMED"
+    backend.add_edit_node(copy.deepcopy(node), node_name="TEST")
+    monkeypatch.setattr(downtime, "utcnow", lambda: datetime(2020, 1, 3))
+    backend.set_site_force_disabled_flag(site_id, True)
+    monkeypatch.undo()
+    node["last_updated_at"] = "2020-01-04T00:00:00.500000"
+    backend.add_edit_node(copy.deepcopy(node), node_name="TEST")
+
+    def site_names(as_of, **kwargs):
+        return [site.get("name") for site in backend.list_sites(as_of=as_of, **kwargs) if site.get("id") == site_id]
+
+    assert site_names("2019-12-31T00:00:00") == []
+    assert site_names("2020-01-01T12:00:00") == [dummy_nodes[0]["sites"][0]["name"]]
+    assert site_names(datetime(2020, 1, 2, 12)) == ["RENAMED"]
+    assert site_names("2020-01-03T13:00:00+02:00") == []
+    assert site_names("2020-01-03T13:00:00+02:00", include_inactive=True) == ["RENAMED"]
+    assert site_names("2020-01-04T00:00:00.500000") == ["RENAMED"]
+    assert site_names(datetime(2020, 1, 4)) == []
+    assert not [storage for storage in backend.list_storages(as_of="2020-01-04T00:00:00") if storage.get("parent_site_id") == site_id]
+    assert site_names(None) == ["RENAMED"]
+
+    # past instants are served from the cache until a node is deleted
+    assert backend._as_of_cache.get(("2020-01-02T12:00:00.000000", False)) is not None
+    backend.delete_node_by_name("TEST")
+    assert backend._as_of_cache.get(("2020-01-02T12:00:00.000000", False)) is None
+    assert site_names(datetime(2020, 1, 2, 12)) == []
+
+    # versions are resolved for all nodes at once, with one query per collection, ignoring change records of versions
+    # not reached yet (orphaned by an update that was never applied)
+    other = copy.deepcopy(node)
+    other["name"], other["last_updated_at"] = "OTHER", "2020-01-01T00:00:00"
+    backend.add_edit_node(other)
+    db = mock_client["test_as_of"]
+    latest = db["nodes"].find_one({"name": "OTHER"}, {"_id": 0})
+    orphan = changes.make_change_record(latest, "site", other["sites"][0]["id"], "is_force_disabled", False, updated_at=datetime(2020, 1, 5))
+    db["nodes_changes"].insert_one(dict(orphan))
+    aggregate, aggregated = mongomock.collection.Collection.aggregate, []
+
+    def counting_aggregate(collection, *args, **kwargs):
+        aggregated.append(collection.name)
+        return aggregate(collection, *args, **kwargs)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "aggregate", counting_aggregate)
+    assert backend._get_versions_as_of(db, "2020-01-06T00:00:00.000000") == {"OTHER": 1}
+    assert sorted(aggregated) == ["nodes", "nodes_archived", "nodes_changes"]
+    monkeypatch.undo()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("method", ["list_services", "list_sites", "list_storage_areas"])
+@pytest.mark.parametrize("backend_kwargs", [{}, {"use_active_view": False}, {"use_aggregation": False, "use_active_view": False}])
+def test_list_pagination(method, backend_kwargs, mock_client, mock_backend):
+    backend = MongoBackend(client=mock_client, mongo_database="test", **backend_kwargs)
+    expected = sorted(getattr(backend, method)(include_inactive=True), key=lambda entity: entity.get("id"))
+
+    items, cursor = [], None
+    while True:
+        page = getattr(backend, method)(include_inactive=True, limit=1, cursor=cursor)
+        assert len(page) <= 1
+        items.extend(page)
+        cursor = page.next_cursor
+        if not cursor:
+            break
+    assert items == expected
+    assert getattr(backend, method)(include_inactive=True, limit=len(expected)).next_cursor is None
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "method, fields",
+    [
+        ("list_services", "scope,type,parent_site_name"),
+        ("list_storages", "host, parent_site_name,supported_protocols.prefix,areas.name"),
+        ("list_sites", "name,storages.areas.id,compute.queues"),
+    ],
+)
+@pytest.mark.parametrize("include_inactive", [False, True])
+@pytest.mark.parametrize("backend_kwargs", [{}, {"use_active_view": False}, {"use_aggregation": False, "use_active_view": False}])
+def test_list_fields(method, fields, include_inactive, backend_kwargs, mock_client, dummy_nodes):
+    if mock_client["test_fields"]["nodes"].count_documents({}) == 0:
+        mock_client["test_fields"]["nodes"].insert_many(copy.deepcopy(dummy_nodes))
+    backend = MongoBackend(client=mock_client, mongo_database="test_fields", **backend_kwargs)
+    tree = projection.parse_fields(fields)
+    expected = [projection.project(entity, tree) for entity in getattr(backend, method)(include_inactive=include_inactive)]
+    assert expected and all(set(entity) <= set(tree) and "id" in entity for entity in expected)
+
+    assert getattr(backend, method)(include_inactive=include_inactive, fields=fields) == expected
+    page = getattr(backend, method)(include_inactive=include_inactive, fields=fields.split(","), limit=1)
+    assert page == sorted(expected, key=lambda entity: entity.get("id"))[:1]
+
+
+@pytest.mark.unit
+def test_list_nodes_pagination(mock_client, dummy_nodes):
+    backend = MongoBackend(client=mock_client, mongo_database="test_pagination")
+    for node_name in ("B", "A", "B"):
+        node = copy.deepcopy(dummy_nodes[0])
+        node.pop("version", None)
+        node["name"] = node_name
+        backend.add_edit_node(node, node_name=node_name)
+    expected = [("A", 1), ("B", 1), ("B", 2)]
+
+    first_page = backend.list_nodes(include_archived=True, limit=2)
+    assert [(node.get("name"), node.get("version")) for node in first_page] == expected[:2]
+    last_page = backend.list_nodes(include_archived=True, limit=2, cursor=first_page.next_cursor)
+    assert [(node.get("name"), node.get("version")) for node in last_page] == expected[2:]
+    assert last_page.next_cursor is None
+
+    with pytest.raises(InvalidCursor):
+        backend.list_nodes(cursor="not-a-cursor")
+    with pytest.raises(InvalidCursor):
+        backend.list_sites(cursor=first_page.next_cursor)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("compress", [False, True])
+def test_dump_nodes_streaming(compress, mock_client, dummy_nodes):
+    mock_client.drop_database("test_dump")
+    backend = MongoBackend(client=mock_client, mongo_database="test_dump", archive_checkpoint_interval=2)
+    for node_name in ("A", "B", "A", "A"):
+        node = copy.deepcopy(dummy_nodes[0])
+        node.pop("version", None)
+        node["name"] = node_name
+        backend.add_edit_node(node, node_name=node_name)
+    backend.set_site_force_disabled_flag(dummy_nodes[0]["sites"][0]["id"], True)
+    async_backend = AsyncMongoBackend(backend=backend, max_workers=2)
+
+    async def dump():
+        return b"".join([chunk async for chunk in iter_ndjson(async_backend.iter_nodes(batch_size=2), compress=compress, chunk_size=100)])
+
+    data = asyncio.run(dump())
+    lines = (gzip.decompress(data) if compress else data).decode("utf-8").splitlines()
+    expected = backend.list_nodes(include_archived=True)
+    assert [json.loads(line) for line in lines] == expected
+    assert {(node.get("name"), node.get("version")) for node in expected} >= {("A", 1), ("A", 2), ("A", 3), ("B", 1)}
+    async_backend.close()
+
+
+@pytest.mark.unit
+def test_topology_validator(mock_client, dummy_nodes, monkeypatch):
+    def watch(*args, **kwargs):
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+    monkeypatch.setattr(mongomock.database.Database, "watch", watch, raising=False)
+    mock_client.drop_database("test_validator")
+    backend = MongoBackend(client=mock_client, mongo_database="test_validator")
+    node = copy.deepcopy(dummy_nodes[0])
+    node.pop("version", None)
+    node["sites"][0]["downtime"] = [{"date_range": "2030-01-01T00:00:00.000Z to 2030-01-02T00:00:00.000Z", "type": "Planned"}]
+    backend.add_edit_node(node)
+
+    # other processes' writes are not followed, so the revision cannot vouch for a response
+    assert backend.get_topology_validator() is None
+
+    backend.start_watching(poll_interval_s=60)
+    try:
+        validator = backend.get_topology_validator()
+        assert validator is not None
+        assert backend.get_topology_validator() == validator
+
+        # changes when a downtime window starts or ends, and on every write
+        monkeypatch.setattr(downtime, "utcnow", lambda: datetime(2030, 1, 1, 12))
+        in_downtime_validator = backend.get_topology_validator()
+        assert in_downtime_validator != validator
+        backend.set_site_force_disabled_flag(node["sites"][0]["id"], True)
+        assert backend.get_topology_validator() not in (validator, in_downtime_validator)
+    finally:
+        backend.close()
+
+
+@pytest.mark.unit
+def test_encode_json_matches_stdlib(mock_backend):
+    for content in (mock_backend.list_nodes(include_archived=True), mock_backend.list_services(include_inactive=True), {"text": "é "}):
+        assert json_encoding.encode_json(content) == json_encoding.encode_json_stdlib(content)
@@ -0,0 +1,155 @@
+import asyncio
+import copy
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+import requests
+from fastapi import HTTPException
+
+from ska_src_site_capabilities_api.backend.mongo import MongoBackend
+from ska_src_site_capabilities_api.client.async_site_capabilities import AsyncSiteCapabilitiesClient
+from ska_src_site_capabilities_api.client.site_capabilities import SiteCapabilitiesClient
+from ska_src_site_capabilities_api.common import json_encoding
+from ska_src_site_capabilities_api.common.pagination import NEXT_CURSOR_HEADER
+from ska_src_site_capabilities_api.rest.response_cache import make_etag
+
+
+@pytest.mark.unit
+def test_async_client(mock_backend):
+    in_flight, max_in_flight, requests_seen = 0, 0, []
+    storage_areas = mock_backend.list_storage_areas(include_inactive=True)
+    storage_area_ids = [storage_area["id"] for storage_area in storage_areas]
+
+    async def handler(request):
+        nonlocal in_flight, max_in_flight
+        requests_seen.append(request)
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if request.url.path == "/v1/storage-areas/batch":
+            return httpx.Response(200, json=mock_backend.get_storage_area_many(request.url.params["ids"].split(",")))
+        if request.url.path == "/v1/storage-areas":
+            page = mock_backend.list_storage_areas(
+                include_inactive=True, limit=int(request.url.params["limit"]), cursor=request.url.params.get("cursor")
+            )
+            headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
+            return httpx.Response(200, json=list(page), headers=headers)
+        return httpx.Response(404, json={"detail": "Not found"})
+
+    async def run():
+        async with AsyncSiteCapabilitiesClient("http://test/v1", transport=httpx.MockTransport(handler), max_concurrency=2) as client:
+            many = await client.get_storage_area_many(storage_area_ids + ["0"], chunk_size=1)
+            iterated = [storage_area async for storage_area in client.iter_storage_areas(include_inactive=True, page_size=1)]
+            with pytest.raises(HTTPException) as exc_info:
+                await client.get_storage_area("0")
+            return many, iterated, exc_info.value.status_code
+
+    many, iterated, status_code = asyncio.run(run())
+    assert set(many["found"]) == set(storage_area_ids) and many["not_found"] == ["0"]
+    assert [storage_area["id"] for storage_area in iterated] == sorted(storage_area_ids)
+    assert status_code == 404
+    # chunks are fetched concurrently, but never more than max_concurrency at a time
+    assert max_in_flight == 2
+    # parameters left unset are not sent
+    first_page_request = next(request for request in requests_seen if request.url.path == "/v1/storage-areas")
+    assert "cursor" not in first_page_request.url.params and "fields" not in first_page_request.url.params
+
+
+class BackendSession:
+    """Stand-in for a requests session, answering the client's node and storage area calls from a backend."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.paths = []
+
+    @staticmethod
+    def _response(url, status_code, body, headers=None):
+        resp = requests.Response()
+        resp.status_code = status_code
+        resp.url = url
+        resp._content = body
+        resp.headers.update(headers or {})
+        return resp
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        path = url.removeprefix("http://test/v1")
+        self.paths.append(path)
+        if path == "/nodes":
+            body = json_encoding.encode_json(self.backend.list_nodes(include_inactive=True))
+            etag = make_etag(body)
+            if (headers or {}).get("If-None-Match") == etag:
+                return self._response(url, 304, b"", {"ETag": etag})
+            return self._response(url, 200, body, {"ETag": etag})
+        storage_area = self.backend.get_storage_area(path.removeprefix("/storage-areas/"))
+        if not storage_area:
+            return self._response(url, 404, b'{"detail":"Not found"}')
+        return self._response(url, 200, json_encoding.encode_json(storage_area))
+
+    def put(self, url, headers=None, **kwargs):
+        path = url.removeprefix("http://test/v1")
+        self.paths.append(path)
+        _, _, storage_area_id, action = path.split("/")
+        self.backend.set_storage_area_force_disabled_flag(storage_area_id, action == "disable")
+        return self._response(url, 200, b"{}")
+
+
+@pytest.mark.unit
+def test_client_snapshot_mode(mock_client, dummy_nodes):
+    mock_client.drop_database("test_client_snapshot")
+    mock_client["test_client_snapshot"]["nodes"].insert_many(copy.deepcopy(dummy_nodes))
+    backend = MongoBackend(client=mock_client, mongo_database="test_client_snapshot")
+    session = BackendSession(backend)
+    client = SiteCapabilitiesClient("http://test/v1", session=session, snapshot_max_staleness_s=60)
+    try:
+        # answered locally, as the API would
+        for include_inactive in (False, True):
+            assert client.list_compute(include_inactive=include_inactive).json() == backend.list_compute(include_inactive=include_inactive)
+            assert client.list_services(include_inactive=include_inactive, service_scope="local", fields="host").json() == backend.list_services(
+                include_inactive=include_inactive, service_scope="local", fields="host"
+            )
+        assert client.list_sites(only_names=True).json() == [site["name"] for site in backend.list_sites(fields="name")]
+        page = client.list_storage_areas(include_inactive=True, limit=1)
+        expected_page = backend.list_storage_areas(include_inactive=True, limit=1)
+        assert page.json() == expected_page and page.headers.get(NEXT_CURSOR_HEADER) == expected_page.next_cursor
+        storage_area_id = backend.list_storage_areas()[0]["id"]
+        assert client.get_storage_area(storage_area_id).json() == backend.get_storage_area(storage_area_id)
+        expected_many = {"found": {storage_area_id: backend.get_storage_area(storage_area_id)}, "not_found": []}
+        assert client.get_storage_area_many([storage_area_id]) == expected_many
+        assert session.paths == ["/nodes"]
+
+        # ids not in the snapshot are looked up from the API
+        with pytest.raises(HTTPException) as exc_info:
+            client.get_storage_area("0")
+        assert exc_info.value.status_code == 404 and session.paths[-1] == "/storage-areas/0"
+
+        # an unchanged topology is revalidated rather than reloaded
+        loaded_at = client.snapshot.topology.loaded_at
+        client.snapshot.refresh()
+        assert client.snapshot.topology.loaded_at == loaded_at
+
+        # writes made through the client are seen straight away
+        client.set_storage_area_disabled(storage_area_id)
+        assert storage_area_id not in [storage_area["id"] for storage_area in client.list_storage_areas().json()]
+        assert session.paths[-2:] == ["/storage-areas/{}/disable".format(storage_area_id), "/nodes"]
+    finally:
+        client.close()
+
+
+@pytest.mark.unit
+def test_client_imports():
+    # the clients (and the JSON encoding of their local answers) depend neither on the backend nor on Starlette
+    code = (
+        "import sys\n"
+        "import ska_src_site_capabilities_api.common.json_encoding\n"
+        "assert 'starlette' not in sys.modules\n"
+        "import ska_src_site_capabilities_api.client.async_site_capabilities\n"
+        "import ska_src_site_capabilities_api.client.site_capabilities\n"
+        "assert not [name for name in sys.modules if name.startswith(('ska_src_site_capabilities_api.backend', 'pymongo'))]\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(Path("src").absolute()), os.environ.get("PYTHONPATH")])))
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
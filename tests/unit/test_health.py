@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from ska_src_site_capabilities_api.backend.async_mongo import AsyncMongoBackend
+from ska_src_site_capabilities_api.rest import health
+
+
+@pytest.mark.unit
+def test_health_monitor(mock_backend):
+    calls = []
+
+    def probe(name, delay_s=0.0, error=None):
+        async def run(timeout_s):
+            calls.append(name)
+            await asyncio.sleep(delay_s)
+            if error is not None:
+                raise error
+
+        return run
+
+    monitor = health.HealthMonitor(
+        {
+            "up": probe("up", delay_s=0.1),
+            "slow": probe("slow", delay_s=1.0),
+            "failing": probe("failing", error=RuntimeError("ping returned status 503")),
+            "mongodb": health.mongodb_probe(AsyncMongoBackend(backend=mock_backend)),
+        },
+        interval_s=60,
+        timeout_s=0.2,
+    )
+
+    async def run():
+        start = time.perf_counter()
+        state = await monitor.get()
+        elapsed = time.perf_counter() - start
+        # served from the last known state until it is older than its maximum age
+        await asyncio.sleep(0.05)
+        again = await monitor.get()
+        return state, elapsed, again
+
+    state, elapsed, again = asyncio.run(run())
+    services = state["services"]
+    # probes run concurrently, each within its own timeout
+    assert elapsed < 0.5
+    assert services["up"]["status"] == "UP" and services["mongodb"]["status"] == "UP"
+    assert services["slow"] == {"status": "DOWN", "error": "no response within 0.2s", "latency_s": services["slow"]["latency_s"]}
+    assert services["failing"]["error"] == "RuntimeError: ping returned status 503"
+    assert services["mongodb"]["pool"]["max_pool_size"] == mock_backend.get_pool_statistics()["max_pool_size"]
+    assert not monitor.is_healthy
+    assert REGISTRY.get_sample_value("scapi_dependency_up", {"service": "slow"}) == 0
+    assert REGISTRY.get_sample_value("scapi_dependency_up", {"service": "up"}) == 1
+    assert sorted(calls) == ["failing", "slow", "up"]
+    assert again["checked_at"] == state["checked_at"] and again["age_s"] >= 0.05
+
+    # the background task refreshes the state at its interval
+    async def background():
+        monitor.interval_s = 0.05
+        monitor.probes = {"up": probe("up")}
+        monitor.start()
+        await asyncio.sleep(0.2)
+        await monitor.stop()
+
+    calls.clear()
+    asyncio.run(background())
+    assert len(calls) >= 3 and monitor.is_healthy
+
+    # services only reported do not count towards the overall health
+    monitor = health.HealthMonitor({"up": probe("up"), "mongodb": probe("mongodb", error=RuntimeError("unreachable"))}, report_only=("mongodb",))
+    state = asyncio.run(monitor.get())
+    assert state["services"]["mongodb"]["status"] == "DOWN" and state["healthy"] and monitor.is_healthy
+    monitor.report_only = frozenset()
+    assert not asyncio.run(monitor.get())["healthy"] and not monitor.is_healthy
@@ -0,0 +1,60 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+from starlette.requests import Request
+
+from ska_src_site_capabilities_api.common.exceptions import OutboundCallTimeout
+from ska_src_site_capabilities_api.rest import outbound
+from ska_src_site_capabilities_api.rest.dependencies import Permissions
+
+
+class SlowPermissionsClient:
+    """Stand-in for a PermissionsClient, taking <delay_s> to authorise any token and counting calls."""
+
+    def __init__(self, delay_s):
+        self.delay_s = delay_s
+        self.calls = []
+
+    def authorise_service_route(self, service, version, route, method, token, body, **kwargs):
+        self.calls.append((route, method, token, body))
+        time.sleep(self.delay_s)
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = json.dumps({"is_authorised": True}).encode("utf-8")
+        return resp
+
+
+@pytest.mark.unit
+def test_permission_checks_do_not_block_event_loop():
+    permissions = SlowPermissionsClient(delay_s=0.2)
+    outbound_calls = outbound.OutboundCalls(max_workers=4, timeout_s=1.0)
+    dependency = Permissions(permissions, "site-capabilities-api", "v1", outbound_calls=outbound_calls)
+    request = Request({"type": "http", "method": "GET", "headers": [], "route": SimpleNamespace(path="/v1/nodes"), "path_params": {}})
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        decisions = await asyncio.gather(*(dependency.is_authorised(request, "token") for _ in range(4)))
+        with pytest.raises(OutboundCallTimeout):
+            await outbound_calls.run("permissions-api", time.sleep, 0.2, timeout_s=0.05)
+        ticker.cancel()
+        return decisions, ticks
+
+    try:
+        decisions, ticks = asyncio.run(run())
+    finally:
+        outbound_calls.close()
+    assert decisions == [True] * 4 and len(permissions.calls) == 4
+    # the four checks ran concurrently, with the event loop free to serve other requests meanwhile
+    assert ticks > 10
@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import pytest
+import requests
+from prometheus_client import REGISTRY
+
+from ska_src_site_capabilities_api.common import outbound_http, utility
+from ska_src_site_capabilities_api.common.exceptions import RetryRequestError
+
+
+@pytest.mark.unit
+def test_retry_request(monkeypatch):
+    statuses, timeouts, sleeps = [], [], []
+
+    def send(adapter, request, timeout=None, **kwargs):
+        timeouts.append(timeout)
+        resp = requests.Response()
+        resp.status_code = statuses.pop(0)
+        resp.url = request.url
+        resp.request = request
+        resp._content = b"{}"
+        return resp
+
+    monkeypatch.setattr(requests.adapters.HTTPAdapter, "send", send)
+    monkeypatch.setattr(utility.time, "sleep", sleeps.append)
+    monkeypatch.setattr(outbound_http.random, "uniform", lambda low, high: high)
+
+    # one pooled session per upstream, applying a default timeout
+    session = outbound_http.get_session("https://iam.test/.well-known/openid-configuration")
+    assert outbound_http.get_session("https://iam.test/other") is session
+    assert outbound_http.get_session("https://auth.test/") is not session
+    statuses.extend([200])
+    session.get("https://iam.test/")
+    assert timeouts == [outbound_http.settings["default_timeout_s"]]
+
+    # server errors are retried with exponential backoff
+    def errors(reason):
+        return REGISTRY.get_sample_value("scapi_upstream_request_errors_total", {"upstream": "https://iam.test", "reason": reason}) or 0
+
+    errors_before = errors("503")
+    statuses.extend([503, 503, 200])
+    assert utility.retry_request("GET", "https://iam.test/", wait_for_s=0.1, max_wait_s=0.15).status_code == 200
+    assert sleeps == [0.1, 0.15] and errors("503") == errors_before + 2
+
+    # client errors are not
+    statuses.extend([404])
+    with pytest.raises(requests.exceptions.HTTPError):
+        utility.retry_request("GET", "https://iam.test/")
+
+    # retries stop once the deadline cannot be met
+    sleeps.clear()
+    statuses.extend([503])
+    with pytest.raises(RetryRequestError):
+        utility.retry_request("GET", "https://iam.test/", wait_for_s=5, deadline_s=1)
+    assert sleeps == [] and statuses == []
+
+    async def async_retry():
+        responses = [httpx.Response(503), httpx.Response(200, json={"issuer": "iam"})]
+        transport = httpx.MockTransport(lambda request: responses.pop(0))
+        async with outbound_http.UpstreamAsyncClient("https://iam.test", transport=transport) as client:
+            return await utility.async_retry_request("GET", "https://iam.test/", client=client, wait_for_s=0)
+
+    errors_before = errors("503")
+    assert asyncio.run(async_retry()).json() == {"issuer": "iam"}
+    assert errors("503") == errors_before + 1
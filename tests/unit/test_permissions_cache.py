@@ -0,0 +1,103 @@
+import asyncio
+import base64
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+from starlette.requests import Request
+
+from ska_src_site_capabilities_api.rest import permissions_cache
+from ska_src_site_capabilities_api.rest.dependencies import Permissions
+
+
+class CountingPermissionsClient:
+    """Stand-in for a PermissionsClient, authorising <authorised_token> only and counting calls."""
+
+    def __init__(self, authorised_token):
+        self.authorised_token = authorised_token
+        self.calls = []
+
+    def authorise_service_route(self, service, version, route, method, token, body, **kwargs):
+        self.calls.append((route, method, token, body))
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = json.dumps({"is_authorised": token == self.authorised_token}).encode("utf-8")
+        return resp
+
+
+def make_token(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({"sub": "user", "exp": exp}).encode("utf-8")).decode("ascii").rstrip("=")
+    return "header.{}.signature".format(payload)
+
+
+@pytest.mark.unit
+def test_permissions_cache(monkeypatch):
+    def make_request(node_name):
+        route = SimpleNamespace(path="/v1/nodes/{node_name}")
+        return Request({"type": "http", "method": "GET", "headers": [], "route": route, "path_params": {"node_name": node_name}})
+
+    token, other_token = make_token(time.time() + 3600), make_token(time.time() + 3600) + "x"
+    permissions = CountingPermissionsClient(authorised_token=token)
+    cache = permissions_cache.PermissionsCache(max_entries=2, ttl_s=60, negative_ttl_s=10)
+    dependency = Permissions(permissions, "site-capabilities-api", "v1", permissions_cache=cache)
+
+    # positive and negative decisions are cached by token, route, method and path parameters
+    for _ in range(3):
+        assert asyncio.run(dependency.is_authorised(make_request("A"), token))
+        assert not asyncio.run(dependency.is_authorised(make_request("A"), other_token))
+    assert permissions.calls == [
+        ("/nodes/{node_name}", "GET", token, {"node_name": "A"}),
+        ("/nodes/{node_name}", "GET", other_token, {"node_name": "A"}),
+    ]
+    assert asyncio.run(dependency.is_authorised(make_request("B"), token)) and len(permissions.calls) == 3
+
+    # the least recently used decision is evicted
+    assert len(cache) == 2
+    assert asyncio.run(dependency.is_authorised(make_request("A"), token)) and len(permissions.calls) == 4
+
+    # decisions expire with their TTL, and never outlive the token
+    now = time.monotonic()
+    monkeypatch.setattr(permissions_cache.time, "monotonic", lambda: now + 30)
+    assert asyncio.run(dependency.is_authorised(make_request("A"), token)) and len(permissions.calls) == 4
+    monkeypatch.setattr(permissions_cache.time, "monotonic", lambda: now + 61)
+    assert asyncio.run(dependency.is_authorised(make_request("A"), token)) and len(permissions.calls) == 5
+    expiring_token = make_token(time.time() + 5)
+    cache.put(("key",), True, token_expiry=permissions_cache.get_token_expiry(expiring_token))
+    monkeypatch.setattr(permissions_cache.time, "monotonic", lambda: now + 67)
+    assert cache.get(("key",)) is None
+    cache.put(("key",), True, token_expiry=time.time() - 1)
+    assert cache.get(("key",)) is None
+    assert permissions_cache.get_token_expiry("opaque-token") is None
+
+
+@pytest.mark.unit
+def test_only_decisions_are_cached():
+    answers, calls = [], []
+
+    def authorise_service_route(**kwargs):
+        calls.append(kwargs)
+        status_code, body = answers.pop(0)
+        resp = requests.Response()
+        resp.status_code = status_code
+        resp._content = json.dumps(body).encode("utf-8")
+        return resp
+
+    permissions = SimpleNamespace(authorise_service_route=authorise_service_route)
+    cache = permissions_cache.PermissionsCache(max_entries=10, ttl_s=60, negative_ttl_s=10)
+    dependency = Permissions(permissions, "site-capabilities-api", "v1", permissions_cache=cache)
+    request = Request({"type": "http", "method": "GET", "headers": [], "route": SimpleNamespace(path="/v1/nodes"), "path_params": {}})
+    token = make_token(time.time() + 3600)
+
+    # errors and malformed answers deny the request, without being cached as denials
+    answers.extend([(500, {"detail": "upstream error"}), (200, {}), (200, {"is_authorised": "yes"}), (200, ["is_authorised"])])
+    for _ in range(4):
+        assert not asyncio.run(dependency.is_authorised(request, token))
+    assert len(calls) == 4 and len(cache) == 0
+
+    # a well-formed decision is
+    answers.append((200, {"is_authorised": True}))
+    assert asyncio.run(dependency.is_authorised(request, token))
+    assert asyncio.run(dependency.is_authorised(request, token))
+    assert len(calls) == 5 and len(cache) == 1
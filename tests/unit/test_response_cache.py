@@ -0,0 +1,205 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from starlette.requests import Request
+
+from ska_src_site_capabilities_api.rest import response_cache
+from ska_src_site_capabilities_api.rest.responses import FastJSONResponse
+
+
+class StubBackend:
+    """Stand-in for an AsyncMongoBackend, with a settable topology validator and a count of listings computed."""
+
+    def __init__(self, validator="1"):
+        self.validator = validator
+        self.calls = 0
+
+    async def get_topology_validator(self):
+        return self.validator
+
+    async def list_sites(self):
+        self.calls += 1
+        return [{"id": str(index), "name": "SITE_{}".format(index), "comments": "x" * 32} for index in range(50)]
+
+
+def make_app(backend, cache=True, max_bytes=64 * 1024 * 1024):
+    cache = response_cache.ResponseCache(max_bytes=max_bytes) if cache else None
+    return SimpleNamespace(state=SimpleNamespace(backend=backend, response_cache=cache))
+
+
+def make_request(app, path="/v1/sites", query_string=b"", headers=None):
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "scheme": "http",
+            "server": ("test", 80),
+            "path": path,
+            "query_string": query_string,
+            "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in (headers or {}).items()],
+            "app": app,
+        }
+    )
+
+
+@response_cache.cached_response
+async def list_sites(request):
+    return FastJSONResponse(await request.app.state.backend.list_sites())
+
+
+def get(app, **kwargs):
+    return asyncio.run(list_sites(request=make_request(app, **kwargs)))
+
+
+@pytest.mark.unit
+def test_etag_matches():
+    body = b'[{"id":"1"}]'
+    etag = response_cache.make_etag(body)
+    assert etag.startswith('W/"') and etag == response_cache.make_etag(body) != response_cache.make_etag(body + b" ")
+
+    # weak comparison, against any tag of a list, or any tag at all
+    assert response_cache.etag_matches(etag, etag)
+    assert response_cache.etag_matches(etag.removeprefix("W/"), etag)
+    assert response_cache.etag_matches('"other", {}'.format(etag), etag)
+    assert response_cache.etag_matches(" * ", etag)
+    assert not response_cache.etag_matches('"other", W/"another"', etag)
+    assert not response_cache.etag_matches("", etag) and not response_cache.etag_matches(None, etag)
+
+
+@pytest.mark.unit
+def test_conditional_get():
+    backend = StubBackend()
+    app = make_app(backend)
+    response = get(app)
+    etag = response.headers["etag"]
+    assert response.status_code == 200 and etag == response_cache.make_etag(response.body) and backend.calls == 1
+
+    # a matching If-None-Match is answered with 304, without calling the backend
+    not_modified = get(app, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.headers["etag"] == etag and not not_modified.body
+    assert backend.calls == 1
+
+    # once the topology changed, the response is recomputed, still answering 304 if its content did not change
+    backend.validator = "2"
+    assert get(app, headers={"If-None-Match": etag}).status_code == 304 and backend.calls == 2
+    assert get(app, headers={"If-None-Match": 'W/"other"'}).status_code == 200 and backend.calls == 2
+
+
+@pytest.mark.unit
+def test_conditional_get_without_validator():
+    # without a validator (the topology watcher is not running), responses are neither tagged nor cached
+    backend = StubBackend(validator=None)
+    app = make_app(backend)
+    response = get(app, headers={"If-None-Match": "*"})
+    assert response.status_code == 200 and "etag" not in response.headers
+    assert get(app).status_code == 200 and backend.calls == 2 and len(app.state.response_cache) == 0
+
+    # nor without a cache
+    backend = StubBackend()
+    response = get(make_app(backend, cache=False))
+    assert response.status_code == 200 and "etag" not in response.headers
+
+
+@pytest.mark.unit
+def test_cached_response():
+    backend = StubBackend()
+    app = make_app(backend)
+    response = get(app)
+    assert response.headers["cache-control"] == "no-cache" and backend.calls == 1
+
+    # the same request (whatever the order of its query parameters) is served the stored bytes
+    hit = get(app)
+    assert hit.body == response.body and hit.headers["etag"] == response.headers["etag"] and backend.calls == 1
+    get(app, query_string=b"a=1&b=2")
+    assert get(app, query_string=b"b=2&a=1").body == response.body and backend.calls == 2
+
+    # responses computed under another validator are not served
+    backend.validator = "2"
+    assert get(app).body == response.body and backend.calls == 3
+    assert len(app.state.response_cache) == 1
+
+
+@pytest.mark.unit
+def test_cached_response_encodings(monkeypatch):
+    backend = StubBackend()
+    app = make_app(backend)
+    body = get(app).body
+    assert len(body) >= response_cache.MIN_COMPRESSED_SIZE
+
+    gzipped = get(app, headers={"Accept-Encoding": "gzip, deflate"})
+    assert gzipped.headers["content-encoding"] == "gzip" and gzipped.headers["vary"] == "Accept-Encoding"
+    assert response_cache.gzip.decompress(gzipped.body) == body
+    # a coding refused with q=0 is not used
+    for accept_encoding in ("gzip;q=0", "gzip; q=0.0, identity", "br"):
+        identity = get(app, headers={"Accept-Encoding": accept_encoding})
+        assert "content-encoding" not in identity.headers and identity.body == body
+    assert backend.calls == 1
+
+    # zstd is preferred when available
+    class ZstdCompressor:
+        def __init__(self, level):
+            self.level = level
+
+        def compress(self, data):
+            return b"zstd:" + data
+
+    monkeypatch.setattr(response_cache, "zstandard", SimpleNamespace(ZstdCompressor=ZstdCompressor))
+    app = make_app(backend)
+    get(app)
+    zstd = get(app, headers={"Accept-Encoding": "gzip, zstd"})
+    assert zstd.headers["content-encoding"] == "zstd" and zstd.body == b"zstd:" + body
+    assert get(app, headers={"Accept-Encoding": "gzip, zstd;q=0"}).headers["content-encoding"] == "gzip"
+
+    # small bodies are not compressed
+    small = response_cache.CachedResponse(b"[]", "application/json", {})
+    assert small.encoded_bodies == {} and "content-encoding" not in small.to_response("gzip").headers
+
+
+@pytest.mark.unit
+def test_response_cache_eviction():
+    cache = response_cache.ResponseCache(max_bytes=250)
+    for key in ("a", "b"):
+        cache.put("1", key, response_cache.CachedResponse(key.encode() * 100, "application/json", {}))
+    assert len(cache) == 2 and cache.size == 200
+
+    # the least recently used response is evicted once the size bound is exceeded
+    assert cache.get("1", "a") is not None
+    cache.put("1", "c", response_cache.CachedResponse(b"c" * 100, "application/json", {}))
+    assert cache.get("1", "b") is None and cache.get("1", "a") is not None and cache.get("1", "c") is not None
+    assert cache.size == 200
+
+    # responses larger than the bound are not cached, and a new validator drops all responses
+    cache.put("1", "d", response_cache.CachedResponse(b"d" * 300, "application/json", {}))
+    assert cache.get("1", "d") is None and len(cache) == 2
+    assert cache.get("2", "a") is None
+    cache.put("2", "a", response_cache.CachedResponse(b"a" * 100, "application/json", {}))
+    assert len(cache) == 1 and cache.size == 100 and cache.get("1", "c") is None
+
+
+@pytest.mark.unit
+def test_writes_invalidate_response_cache():
+    backend = StubBackend()
+    app = make_app(backend)
+
+    @response_cache.invalidates_response_cache
+    async def edit_node(request, node_name):
+        return FastJSONResponse({"name": node_name})
+
+    @response_cache.invalidates_response_cache
+    async def set_site_disabled(request, site_id):
+        raise RuntimeError("write failed")
+
+    get(app)
+    assert len(app.state.response_cache) == 1
+    asyncio.run(edit_node(request=make_request(app, path="/v1/nodes/TEST"), node_name="TEST"))
+    assert len(app.state.response_cache) == 0
+    get(app)
+    assert backend.calls == 2
+
+    # also after a failed write, which may have been partially applied
+    with pytest.raises(RuntimeError):
+        asyncio.run(set_site_disabled(request=make_request(app, path="/v1/sites/1/disable"), site_id="1"))
+    assert len(app.state.response_cache) == 0
+    get(app)
+    assert backend.calls == 3
@@ -0,0 +1,55 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from ska_src_site_capabilities_api.common import json_encoding, schema_registry, utility
+from ska_src_site_capabilities_api.common.exceptions import SchemaNotFound
+
+
+@pytest.mark.unit
+def test_schema_registry(tmp_path):
+    for schema_path in Path("etc/schemas").glob("*.json"):
+        (tmp_path / schema_path.name).write_text(schema_path.read_text())
+    registry = schema_registry.SchemaRegistry(tmp_path)
+    reloads = []
+    registry.add_reload_listener(lambda: reloads.append(True))
+
+    # dereferenced once, into plain dictionaries, with their encoding and the enums derived from them
+    assert registry.names == sorted(path.stem for path in tmp_path.glob("*.json"))
+    node_schema = registry.get("node")
+    assert node_schema == utility.load_and_dereference_schema(tmp_path.absolute() / "node.json")
+    assert json.loads(json.dumps(node_schema)) == node_schema
+    assert registry.get("node") is node_schema
+    assert registry.get_encoded("node") == json_encoding.encode_json(node_schema)
+    local_service_schema = json.loads((tmp_path / "local-service.json").read_text())
+    assert registry.service_types["local"] == local_service_schema["properties"]["type"]["enum"]
+    assert registry.storage_area_types == json.loads((tmp_path / "storage-area.json").read_text())["properties"]["type"]["enum"]
+    with pytest.raises(SchemaNotFound):
+        registry.get("../node")
+
+    # reloaded only when the files change
+    assert not registry.reload_if_changed() and reloads == []
+    local_service_schema["properties"]["type"]["enum"].append("new_service_type")
+    (tmp_path / "local-service.json").write_text(json.dumps(local_service_schema))
+    assert registry.reload_if_changed() and reloads == [True]
+    assert "new_service_type" in registry.service_types["local"]
+    assert registry.get("node") is not node_schema
+
+    # a failed reload keeps the schemas previously loaded
+    (tmp_path / "local-service.json").write_text("{")
+    assert not registry.reload_if_changed()
+    assert "new_service_type" in registry.service_types["local"]
+
+    # checked for changes in the background
+    (tmp_path / "local-service.json").write_text(json.dumps(local_service_schema))
+    (tmp_path / "extra.json").write_text('{"type": "object"}')
+    registry.start_watching(check_interval_s=0.01)
+    try:
+        deadline = time.monotonic() + 5
+        while "extra" not in registry.names and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        registry.stop_watching()
+    assert registry.get("extra") == {"type": "object"} and len(reloads) == 2
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+import argparse
+import copy
+import json
+import sys
+import time
+import uuid
+
+from starlette.responses import JSONResponse
+
+from ska_src_site_capabilities_api.common import json_encoding
+from ska_src_site_capabilities_api.common.snapshot import iter_node_entities
+from ska_src_site_capabilities_api.rest.responses import FastJSONResponse
+
+
+def scale_nodes(nodes, factor):
+    """Replicate nodes <factor> times, giving every copy fresh names and ids."""
+
+    def reassign_ids(element):
+        if isinstance(element, dict):
+            return {key: (str(uuid.uuid4()) if key == "id" else reassign_ids(value)) for key, value in element.items()}
+        if isinstance(element, list):
+            return [reassign_ids(item) for item in element]
+        return element
+
+    scaled_nodes = []
+    for copy_index in range(factor):
+        for node in nodes:
+            scaled_node = reassign_ids(copy.deepcopy(node))
+            scaled_node["name"] = "{}_{}".format(node.get("name"), copy_index)
+            scaled_nodes.append(scaled_node)
+    return scaled_nodes
+
+
+def time_rendering(response_class, content, repeat):
+    """Get the best time of <repeat> renderings of <content> as a <response_class>, and the size of its body."""
+    best_s = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = response_class(content).body
+        best_s = min(best_s, time.perf_counter() - start)
+    return best_s, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the encoding of list responses built from a nodes file")
+    parser.add_argument("--nodes-path", default="etc/init/nodes.json", help="path to a JSON array of nodes (default: etc/init/nodes.json)")
+    parser.add_argument("--scale", type=int, default=100, help="number of copies of the nodes to encode (default: 100)")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed encodings, the best of which is reported (default: 5)")
+    parser.add_argument(
+        "--allow-stdlib",
+        action="store_true",
+        help="run even if orjson (a dependency of the service) is not installed, measuring the standard library fallback",
+    )
+    args = parser.parse_args()
+    if json_encoding.orjson is None and not args.allow_stdlib:
+        sys.exit("orjson is not installed, so this would not measure the encoder the service ships with (install the locked dependencies)")
+
+    with open(args.nodes_path) as nodes_file:
+        nodes = scale_nodes(json.load(nodes_file), args.scale)
+
+    # the same flattened entities as the list_* routes return
+    listings = {"nodes": nodes}
+    for entity_type, _, entity, _ in (entity for node in nodes for entity in iter_node_entities(node)):
+        listings.setdefault(entity_type, []).append(entity)
+
+    # the responses the routes return (FastJSONResponse), against Starlette's JSONResponse they replaced
+    print("encoder: {}".format("orjson {}".format(json_encoding.orjson.__version__) if json_encoding.orjson is not None else "standard library"))
+    print("{:<14}{:>10}{:>12}{:>14}{:>14}{:>10}".format("listing", "items", "bytes", "stdlib (ms)", "fast (ms)", "speedup"))
+    for name, listing in listings.items():
+        stdlib_s, size = time_rendering(JSONResponse, listing, args.repeat)
+        fast_s, _ = time_rendering(FastJSONResponse, listing, args.repeat)
+        print("{:<14}{:>10}{:>12}{:>14.2f}{:>14.2f}{:>9.1f}x".format(name, len(listing), size, stdlib_s * 1000, fast_s * 1000, stdlib_s / fast_s))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+import requests
+from fastapi import Depends, FastAPI, Request
+
+from ska_src_site_capabilities_api.common.exceptions import PermissionDenied
+from ska_src_site_capabilities_api.rest.dependencies import Permissions
+from ska_src_site_capabilities_api.rest.outbound import OutboundCalls
+
+
+class SlowPermissionsClient:
+    """Stand-in for a PermissionsClient taking <delay_s> to authorise any token."""
+
+    def __init__(self, delay_s):
+        self.delay_s = delay_s
+
+    def authorise_service_route(self, **kwargs):
+        time.sleep(self.delay_s)
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = b'{"is_authorised": true}'
+        return resp
+
+
+def make_app(permissions):
+    """Make an app with a route protected by <permissions> and an unrelated, unprotected route."""
+    app = FastAPI()
+
+    async def verify(request: Request):
+        if not await permissions.is_authorised(request, "token"):
+            raise PermissionDenied
+
+    @app.get("/protected", dependencies=[Depends(verify)])
+    async def protected():
+        return {}
+
+    @app.get("/ping")
+    async def ping():
+        return {}
+
+    return app
+
+
+def percentile(latencies, fraction):
+    return sorted(latencies)[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+
+async def measure(app, n_protected, n_unrelated, interval_s):
+    """
+    Get the latencies of unrelated requests arriving every <interval_s> while <n_protected> protected requests are being
+    authorised, from their scheduled arrival (so that time spent waiting for a blocked event loop is included).
+    """
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+
+        async def unrelated_request(due):
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            await client.get("/ping")
+            return time.perf_counter() - due
+
+        protected = [asyncio.create_task(client.get("/protected")) for _ in range(n_protected)]
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(unrelated_request(start + index * interval_s) for index in range(n_unrelated)))
+        await asyncio.gather(*protected)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the latency of unrelated requests while permission checks wait on a slow permissions API")
+    parser.add_argument("--delay", type=float, default=0.5, help="time taken by the stand-in permissions API per call, in seconds (default: 0.5)")
+    parser.add_argument("--protected", type=int, default=8, help="number of concurrent protected requests (default: 8)")
+    parser.add_argument("--unrelated", type=int, default=50, help="number of unrelated requests, made one after the other (default: 50)")
+    parser.add_argument("--interval", type=float, default=0.01, help="pause between unrelated requests, in seconds (default: 0.01)")
+    args = parser.parse_args()
+
+    print("{:<24}{:>10}{:>10}{:>10}{:>10}".format("permission checks", "p50 (ms)", "p95 (ms)", "p99 (ms)", "max (ms)"))
+    for name, outbound_calls in (("inline (blocking)", None), ("offloaded", OutboundCalls(max_workers=args.protected, timeout_s=10.0))):
+        permissions = Permissions(SlowPermissionsClient(args.delay), "benchmark", "v1", outbound_calls=outbound_calls)
+        latencies = asyncio.run(measure(make_app(permissions), args.protected, args.unrelated, args.interval))
+        print(
+            "{:<24}{:>10.1f}{:>10.1f}{:>10.1f}{:>10.1f}".format(
+                name,
+                statistics.median(latencies) * 1000,
+                percentile(latencies, 0.95) * 1000,
+                percentile(latencies, 0.99) * 1000,
+                max(latencies) * 1000,
+            )
+        )
+        if outbound_calls is not None:
+            outbound_calls.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+
+from ska_src_site_capabilities_api.backend.mongo import MongoBackend
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite archived node versions as periodic full checkpoints plus deltas")
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=int,
+        default=int(os.environ.get("NODE_HISTORY_CHECKPOINT_INTERVAL", 10)),
+        help="number of archived versions per full checkpoint (default: $NODE_HISTORY_CHECKPOINT_INTERVAL or 10)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be rewritten")
+    parser.add_argument("--mongo-host", default=os.environ.get("MONGO_HOST"), help="MongoDB host (default: $MONGO_HOST)")
+    parser.add_argument("--mongo-port", default=os.environ.get("MONGO_PORT", 27017), help="MongoDB port (default: $MONGO_PORT)")
+    parser.add_argument("--mongo-username", default=os.environ.get("MONGO_USERNAME"), help="MongoDB username (default: $MONGO_USERNAME)")
+    parser.add_argument("--mongo-password", default=os.environ.get("MONGO_PASSWORD"), help="MongoDB password (default: $MONGO_PASSWORD)")
+    parser.add_argument("--mongo-database", default=os.environ.get("MONGO_DATABASE"), help="MongoDB database (default: $MONGO_DATABASE)")
+    args = parser.parse_args()
+
+    backend = MongoBackend(
+        mongo_database=args.mongo_database,
+        mongo_username=args.mongo_username,
+        mongo_password=args.mongo_password,
+        mongo_host=args.mongo_host,
+        mongo_port=args.mongo_port,
+        archive_checkpoint_interval=args.checkpoint_interval,
+    )
+    try:
+        result = backend.compact_archived_nodes(dry_run=args.dry_run)
+    finally:
+        backend.close()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+
+from ska_src_site_capabilities_api.backend.mongo import MongoBackend
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report on or reconcile the MongoDB indexes required by the site capabilities API")
+    parser.add_argument("command", choices=["report", "ensure"], help="report missing/unused indexes, or create missing indexes")
+    parser.add_argument("--mongo-host", default=os.environ.get("MONGO_HOST"), help="MongoDB host (default: $MONGO_HOST)")
+    parser.add_argument("--mongo-port", default=os.environ.get("MONGO_PORT", 27017), help="MongoDB port (default: $MONGO_PORT)")
+    parser.add_argument("--mongo-username", default=os.environ.get("MONGO_USERNAME"), help="MongoDB username (default: $MONGO_USERNAME)")
+    parser.add_argument("--mongo-password", default=os.environ.get("MONGO_PASSWORD"), help="MongoDB password (default: $MONGO_PASSWORD)")
+    parser.add_argument("--mongo-database", default=os.environ.get("MONGO_DATABASE"), help="MongoDB database (default: $MONGO_DATABASE)")
+    args = parser.parse_args()
+
+    backend = MongoBackend(
+        mongo_database=args.mongo_database,
+        mongo_username=args.mongo_username,
+        mongo_password=args.mongo_password,
+        mongo_host=args.mongo_host,
+        mongo_port=args.mongo_port,
+    )
+    try:
+        if args.command == "ensure":
+            result = backend.ensure_indexes()
+        else:
+            result = backend.get_index_report()
+    finally:
+        backend.close()
+    print(json.dumps(result, indent=2))
+    if args.command == "report" and result.get("missing"):
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()